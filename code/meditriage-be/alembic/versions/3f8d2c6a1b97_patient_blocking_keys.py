@@ -0,0 +1,52 @@
+"""patient_blocking_keys
+
+Revision ID: 3f8d2c6a1b97
+Revises: 7c1e5a9b2f40
+Create Date: 2026-10-19 11:40:07.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8d2c6a1b97'
+down_revision: Union[str, Sequence[str], None] = '7c1e5a9b2f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('patient_blocking_keys',
+    sa.Column('patient_id', sa.UUID(), nullable=False),
+    sa.Column('key', sa.String(length=80), nullable=False),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('patient_id', 'key')
+    )
+    op.create_index(op.f('ix_patient_blocking_keys_key'), 'patient_blocking_keys', ['key'], unique=False)
+
+    # Backfill keys of existing patients with the same function the app uses
+    from app.services.duplicate_detection import PatientIdentity, blocking_keys
+
+    bind = op.get_bind()
+    keys_table = sa.table('patient_blocking_keys', sa.column('patient_id', sa.UUID()), sa.column('key', sa.String()))
+    result = bind.execution_options(yield_per=BACKFILL_BATCH_SIZE).execute(sa.text(
+        "SELECT id, national_id, first_name, last_name, date_of_birth FROM patients"
+    ))
+    for rows in result.partitions():
+        op.bulk_insert(keys_table, [
+            {"patient_id": row.id, "key": key}
+            for row in rows
+            for key in blocking_keys(PatientIdentity(row.national_id, row.first_name, row.last_name, row.date_of_birth))
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_patient_blocking_keys_key'), table_name='patient_blocking_keys')
+    op.drop_table('patient_blocking_keys')
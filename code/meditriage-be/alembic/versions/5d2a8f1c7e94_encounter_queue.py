@@ -0,0 +1,86 @@
+"""encounter_queue
+
+Revision ID: 5d2a8f1c7e94
+Revises: c37b0e5f9d62
+Create Date: 2026-10-19 17:08:52.190334
+
+Creates the dashboard queue read model and fills it from the encounters
+currently on the queue.
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8f1c7e94'
+down_revision: Union[str, Sequence[str], None] = 'c37b0e5f9d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COMPLETED_WINDOW_HOURS = 24
+
+INCLUDED_COLUMNS = [
+    'completed_at', 'patient_id', 'patient_name', 'nurse_id', 'doctor_id', 'doctor_name',
+    'status', 'chief_complaint', 'last_activity_at', 'note_ready',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('encounter_queue',
+    sa.Column('encounter_id', sa.UUID(), nullable=False),
+    sa.Column('patient_id', sa.UUID(), nullable=False),
+    sa.Column('patient_name', sa.String(length=201), nullable=False),
+    sa.Column('nurse_id', sa.UUID(), nullable=False),
+    sa.Column('doctor_id', sa.UUID(), nullable=True),
+    sa.Column('doctor_name', sa.String(length=255), nullable=True),
+    sa.Column('status', postgresql.ENUM('TRIAGE_IN_PROGRESS', 'AWAITING_REVIEW', 'COMPLETED', name='encounterstatus', create_type=False), nullable=False),
+    sa.Column('is_urgent', sa.Boolean(), nullable=False),
+    sa.Column('chief_complaint', sa.String(length=500), nullable=True),
+    sa.Column('note_ready', sa.Boolean(), nullable=False),
+    sa.Column('encounter_timestamp', sa.DateTime(), nullable=False),
+    sa.Column('last_activity_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['encounter_id'], ['medical_encounters.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('encounter_id')
+    )
+    op.create_index(op.f('ix_encounter_queue_patient_id'), 'encounter_queue', ['patient_id'], unique=False)
+    op.create_index(op.f('ix_encounter_queue_doctor_id'), 'encounter_queue', ['doctor_id'], unique=False)
+
+    op.execute(sa.text("""
+        INSERT INTO encounter_queue (
+            encounter_id, patient_id, patient_name, nurse_id, doctor_id, doctor_name, status, is_urgent,
+            chief_complaint, note_ready, encounter_timestamp, last_activity_at, completed_at
+        )
+        SELECT e.id, e.patient_id, p.first_name || ' ' || p.last_name, e.nurse_id, e.doctor_id, d.full_name,
+               e.status, e.is_urgent, e.chief_complaint,
+               EXISTS (SELECT 1 FROM clinical_notes n WHERE n.encounter_id = e.id),
+               e.encounter_timestamp,
+               COALESCE((SELECT max(t."timestamp") FROM triage_interactions t WHERE t.encounter_id = e.id),
+                        e.encounter_timestamp),
+               CASE WHEN e.status = 'COMPLETED' THEN e.updated_at END
+        FROM medical_encounters e
+        JOIN patients p ON p.id = e.patient_id
+        LEFT JOIN users d ON d.id = e.doctor_id
+        WHERE e.deleted_at IS NULL AND (e.status <> 'COMPLETED' OR e.updated_at >= :completed_since)
+    """).bindparams(completed_since=datetime.utcnow() - timedelta(hours=COMPLETED_WINDOW_HOURS)))
+
+    # Built after the backfill; INCLUDE makes the queue read an index-only scan on Postgres
+    op.create_index(
+        'ix_encounter_queue_order', 'encounter_queue',
+        [sa.text('is_urgent DESC'), 'encounter_timestamp', 'encounter_id'],
+        unique=False, postgresql_include=INCLUDED_COLUMNS,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_encounter_queue_order', table_name='encounter_queue')
+    op.drop_index(op.f('ix_encounter_queue_doctor_id'), table_name='encounter_queue')
+    op.drop_index(op.f('ix_encounter_queue_patient_id'), table_name='encounter_queue')
+    op.drop_table('encounter_queue')
@@ -0,0 +1,31 @@
+"""doctor_availability
+
+Revision ID: 6b3f1d9e2a75
+Revises: 5d2a8f1c7e94
+Create Date: 2026-10-19 19:42:13.507281
+
+Stores doctor availability (read by the queue scheduler) on users, so
+every worker sees it.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b3f1d9e2a75'
+down_revision: Union[str, Sequence[str], None] = '5d2a8f1c7e94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('is_available', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'is_available')
@@ -0,0 +1,46 @@
+"""patient_search_indexes
+
+Revision ID: 7c1e5a9b2f40
+Revises: d4bd663d7460
+Create Date: 2026-10-19 09:12:41.218337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e5a9b2f40'
+down_revision: Union[str, Sequence[str], None] = 'd4bd663d7460'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so registration keeps working while a large table is indexed
+    with op.get_context().autocommit_block():
+        # Substring (LIKE '%q%') and word-similarity (%>) matches on the combined name;
+        # the expression must match patient_search.FULL_NAME exactly
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_patients_full_name_trgm ON patients "
+            "USING gin (lower(first_name || ' ' || last_name) gin_trgm_ops)"
+        )
+        # NIC prefix matches (LIKE 'q%') regardless of the database collation
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_patients_national_id_prefix ON patients "
+            "(national_id varchar_pattern_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_patients_national_id_prefix")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_patients_full_name_trgm")
@@ -0,0 +1,40 @@
+"""patient_duplicate_pairs
+
+Revision ID: 8e2c4a7f1b36
+Revises: 6b3f1d9e2a75
+Create Date: 2026-10-19 20:15:37.904126
+
+Stores the result of the last full duplicate-patient scan.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2c4a7f1b36'
+down_revision: Union[str, Sequence[str], None] = '6b3f1d9e2a75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('patient_duplicate_pairs',
+    sa.Column('patient_id', sa.UUID(), nullable=False),
+    sa.Column('other_patient_id', sa.UUID(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('scanned_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['other_patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('patient_id', 'other_patient_id')
+    )
+    op.create_index(op.f('ix_patient_duplicate_pairs_score'), 'patient_duplicate_pairs', ['score'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_patient_duplicate_pairs_score'), table_name='patient_duplicate_pairs')
+    op.drop_table('patient_duplicate_pairs')
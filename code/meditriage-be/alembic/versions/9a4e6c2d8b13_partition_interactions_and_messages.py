@@ -0,0 +1,157 @@
+"""partition_interactions_and_messages
+
+Revision ID: 9a4e6c2d8b13
+Revises: e81c3a7d4f25
+Create Date: 2026-10-19 15:02:44.316870
+
+On Postgres, rebuilds triage_interactions and consultation_messages as
+tables range-partitioned by month, copying existing rows across. The whole
+upgrade is one transaction that holds both tables exclusively: run it in a
+maintenance window. Elsewhere only the indexes change.
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e6c2d8b13'
+down_revision: Union[str, Sequence[str], None] = 'e81c3a7d4f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+# Month helpers and partition DDL as of this revision (kept here, not imported
+# from the app, so the migration does not depend on app code or settings)
+def _month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _months_between(first, last):
+    months, month = [], _month_start(first)
+    while month <= last:
+        months.append(month)
+        month = _add_months(month, 1)
+    return months
+
+
+def _create_partition_sql(table, month):
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_{month:%Y_%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+    )
+
+
+def _interaction_columns():
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('encounter_id', sa.UUID(), nullable=False),
+        sa.Column('sender_type', postgresql.ENUM('AI', 'PATIENT', 'NURSE', name='sendertype', create_type=False), nullable=False),
+        sa.Column('message_content', sa.Text(), nullable=False),
+        sa.Column('audio_url', sa.String(length=500), nullable=True),
+        sa.Column('transcription_confidence', sa.Float(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['encounter_id'], ['medical_encounters.id'], ),
+    ]
+
+
+def _message_columns():
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('room_id', sa.UUID(), nullable=False),
+        sa.Column('sender_id', sa.UUID(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('message_type', postgresql.ENUM('TEXT', 'SYSTEM', 'ATTACHMENT', name='messagetype', create_type=False), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['room_id'], ['consultation_rooms.id'], ),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+    ]
+
+
+# table, partition key, columns, old indexes, new indexes (name, columns)
+TABLES = (
+    ('triage_interactions', 'timestamp', _interaction_columns,
+     ['ix_triage_interactions_encounter_id', 'ix_triage_interactions_created_at'],
+     [('ix_triage_interactions_encounter_timestamp', ['encounter_id', 'timestamp']),
+      ('ix_triage_interactions_created_at', ['created_at'])]),
+    ('consultation_messages', 'created_at', _message_columns,
+     ['ix_consultation_messages_room_id', 'ix_consultation_messages_sender_id'],
+     [('ix_consultation_messages_room_created', ['room_id', 'created_at']),
+      ('ix_consultation_messages_sender_id', ['sender_id'])]),
+)
+
+
+def _rebuild(table, columns, primary_key, partition_by, old_indexes, new_indexes, months=None):
+    """Move `table` aside, create its replacement, copy the rows, drop the old one."""
+    old = f'{table}_old'
+    for name in old_indexes:
+        op.drop_index(name, table_name=table)
+    op.rename_table(table, old)
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+
+    kwargs = {'postgresql_partition_by': partition_by} if partition_by else {}
+    op.create_table(table, *columns(), sa.PrimaryKeyConstraint(*primary_key), **kwargs)
+    if months is not None:
+        for month in months:
+            op.execute(_create_partition_sql(table, month))
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    names = ', '.join(f'"{column.name}"' for column in columns() if isinstance(column, sa.Column))
+    op.execute(f'INSERT INTO {table} ({names}) SELECT {names} FROM {old}')
+    op.drop_table(old)
+    # Built after the copy; on a partitioned table each one cascades to every partition
+    for name, index_columns in new_indexes:
+        op.create_index(name, table, index_columns, unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.drop_index('ix_triage_interactions_encounter_id', table_name='triage_interactions')
+        op.create_index('ix_triage_interactions_encounter_timestamp', 'triage_interactions', ['encounter_id', 'timestamp'], unique=False)
+        op.drop_index('ix_consultation_messages_room_id', table_name='consultation_messages')
+        op.create_index('ix_consultation_messages_room_created', 'consultation_messages', ['room_id', 'created_at'], unique=False)
+        return
+
+    # A partitioned table can only be referenced through its full key (id, created_at)
+    op.drop_constraint('consultation_attachments_message_id_fkey', 'consultation_attachments', type_='foreignkey')
+
+    this_month = _month_start(datetime.utcnow().date())
+    for table, column, columns, old_indexes, new_indexes in TABLES:
+        oldest = bind.execute(sa.text(f'SELECT min("{column}") FROM {table}')).scalar()
+        first = _month_start(oldest.date()) if oldest else this_month
+        months = _months_between(min(first, this_month), _add_months(this_month, MONTHS_AHEAD))
+        _rebuild(table, columns, ['id', column], f'RANGE ("{column}")', old_indexes, new_indexes, months)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.drop_index('ix_consultation_messages_room_created', table_name='consultation_messages')
+        op.create_index('ix_consultation_messages_room_id', 'consultation_messages', ['room_id'], unique=False)
+        op.drop_index('ix_triage_interactions_encounter_timestamp', table_name='triage_interactions')
+        op.create_index('ix_triage_interactions_encounter_id', 'triage_interactions', ['encounter_id'], unique=False)
+        return
+
+    for table, _, columns, old_indexes, new_indexes in TABLES:
+        # Indexes on the old column lists, as they were before the upgrade
+        restored = [(name, [name[len(table) + 4:]]) for name in old_indexes]
+        _rebuild(table, columns, ['id'], None, [name for name, _ in new_indexes], restored)
+    op.create_foreign_key(
+        'consultation_attachments_message_id_fkey', 'consultation_attachments',
+        'consultation_messages', ['message_id'], ['id'],
+    )
@@ -0,0 +1,38 @@
+"""encounter_history_index
+
+Revision ID: b52e9f04c6d1
+Revises: 3f8d2c6a1b97
+Create Date: 2026-10-19 13:05:52.180446
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e9f04c6d1'
+down_revision: Union[str, Sequence[str], None] = '3f8d2c6a1b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        # Built concurrently so triage keeps writing encounters meanwhile
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_medical_encounters_patient_timestamp', 'medical_encounters',
+                ['patient_id', 'encounter_timestamp'], unique=False, postgresql_concurrently=True,
+            )
+    else:
+        op.create_index(
+            'ix_medical_encounters_patient_timestamp', 'medical_encounters',
+            ['patient_id', 'encounter_timestamp'], unique=False,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_medical_encounters_patient_timestamp', table_name='medical_encounters')
@@ -0,0 +1,51 @@
+"""archived_encounters
+
+Revision ID: c37b0e5f9d62
+Revises: 9a4e6c2d8b13
+Create Date: 2026-10-19 16:21:09.733518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c37b0e5f9d62'
+down_revision: Union[str, Sequence[str], None] = '9a4e6c2d8b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archived_encounters',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('patient_id', sa.UUID(), nullable=False),
+    sa.Column('nurse_id', sa.UUID(), nullable=False),
+    sa.Column('doctor_id', sa.UUID(), nullable=True),
+    sa.Column('status', postgresql.ENUM('TRIAGE_IN_PROGRESS', 'AWAITING_REVIEW', 'COMPLETED', name='encounterstatus', create_type=False), nullable=False),
+    sa.Column('is_urgent', sa.Boolean(), nullable=False),
+    sa.Column('chief_complaint', sa.String(length=500), nullable=True),
+    sa.Column('encounter_timestamp', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['nurse_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archived_encounters_patient_timestamp', 'archived_encounters', ['patient_id', 'encounter_timestamp'], unique=False)
+    if op.get_bind().dialect.name == "postgresql":
+        # The payload is already gzipped: store it out of line without a second compression pass
+        op.execute("ALTER TABLE archived_encounters ALTER COLUMN payload SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_archived_encounters_patient_timestamp', table_name='archived_encounters')
+    op.drop_table('archived_encounters')
@@ -0,0 +1,42 @@
+"""export_watermark_indexes
+
+Revision ID: e81c3a7d4f25
+Revises: b52e9f04c6d1
+Create Date: 2026-10-19 14:12:30.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81c3a7d4f25'
+down_revision: Union[str, Sequence[str], None] = 'b52e9f04c6d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns incremental analytics exports filter on
+INDEXES = (
+    ('ix_medical_encounters_updated_at', 'medical_encounters', 'updated_at'),
+    ('ix_clinical_notes_updated_at', 'clinical_notes', 'updated_at'),
+    ('ix_triage_interactions_created_at', 'triage_interactions', 'created_at'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        # Built concurrently so triage keeps writing meanwhile
+        with op.get_context().autocommit_block():
+            for name, table, column in INDEXES:
+                op.create_index(name, table, [column], unique=False, postgresql_concurrently=True)
+    else:
+        for name, table, column in INDEXES:
+            op.create_index(name, table, [column], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -8,6 +8,9 @@ from app.api.v1.controllers import (
     patient_controller,
     user_controller,
     consultation_controller,
+    health_controller,
+    metrics_controller,
+    profiling_controller,
 )
 
 api_router = APIRouter()
@@ -18,3 +21,6 @@ api_router.include_router(triage_controller.router)
 api_router.include_router(patient_controller.router)
 api_router.include_router(user_controller.router)
 api_router.include_router(consultation_controller.router)
+api_router.include_router(health_controller.router)
+api_router.include_router(metrics_controller.router)
+api_router.include_router(profiling_controller.router)
@@ -0,0 +1,26 @@
+"""
+Health check API controller.
+Reports service liveness and the circuit-breaker state of AI dependencies.
+"""
+from fastapi import APIRouter
+from app.services.llm.circuit_breaker import all_breakers, CircuitState
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("")
+def health_check():
+    """
+    Service health including AI dependency circuit breakers.
+    Status is "degraded" while any dependency circuit is not CLOSED.
+
+    **Required Role**: None (public)
+    """
+    dependencies = {name: breaker.snapshot() for name, breaker in all_breakers().items()}
+    degraded = any(dep["state"] != CircuitState.CLOSED.value for dep in dependencies.values())
+    return {
+        "status": "degraded" if degraded else "ok",
+        "dependencies": dependencies,
+    }
@@ -0,0 +1,19 @@
+"""
+Metrics API controller.
+Serves every in-process metric (HTTP, DB, LLM, WebSocket, triage stages)
+in Prometheus text format for scraping.
+"""
+from fastapi import APIRouter, Response
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus
+
+router = APIRouter(prefix="/metrics", tags=["Health"])
+
+
+@router.get("")
+def prometheus_metrics():
+    """
+    Prometheus scrape endpoint (text exposition format 0.0.4).
+
+    **Required Role**: None (public, like /health)
+    """
+    return Response(content=render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
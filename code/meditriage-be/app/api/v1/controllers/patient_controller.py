@@ -2,7 +2,8 @@
 Patient management API controller.
 Handles patient CRUD operations, search, and encounter history.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Optional, List
@@ -13,10 +14,14 @@ from app.schemas.patient import (
     PatientCreate,
     PatientUpdate,
     PatientResponse,
+    PatientLookupItem,
+    DuplicateCandidateResponse,
+    DuplicatePairResponse,
+    PatientImportReport,
     EncounterSummary,
 )
 from app.schemas.common import DeleteResponse
-from app.services import patient_service
+from app.services import patient_service, patient_search, patient_lookup, duplicate_detection, patient_import
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -43,28 +48,132 @@ def create_patient(
     return patient
 
 
+@router.post("/import", response_model=PatientImportReport)
+def import_patients(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON (.ndjson/.jsonl)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allow_admin),
+):
+    """
+    Bulk-import patients (onboarding a hospital's existing register).
+    Columns / keys are those of POST /patients. Rows are validated and
+    loaded in chunks; invalid rows and NICs that already exist are reported
+    by line number without stopping the import.
+
+    **Required Role**: Admin
+    """
+    try:
+        file_format = patient_import.detect_format(file.filename or "")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    logger.info(f"Patient import of {file.filename} started by admin {current_user.id}")
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return patient_import.import_patients(db, stream, file_format)
+    finally:
+        stream.detach()
+
+
 @router.get("/search", response_model=List[PatientResponse])
 def search_patients(
-    nic: Optional[str] = Query(None, description="National ID for exact match"),
-    name: Optional[str] = Query(None, description="Name for partial match"),
+    response: Response,
+    nic: Optional[str] = Query(None, description="Complete national ID (exact match)"),
+    nic_prefix: Optional[str] = Query(None, description="Leading characters of a national ID (type-ahead)"),
+    name: Optional[str] = Query(None, description="Any part of the full name (ranked)"),
+    limit: int = Query(patient_search.DEFAULT_LIMIT, ge=1, le=patient_search.MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(allow_staff),
 ):
     """
-    Search for patients by national ID (exact) or name (partial).
-    At least one search parameter must be provided.
+    Search for patients by national ID (exact), national ID prefix, or name
+    (partial, best match first).
+    At least one search parameter must be provided. Results are paged; when
+    more are available the X-Next-Cursor response header holds the cursor
+    for the next page.
 
     **Required Role**: Nurse or Doctor
     """
-    if not nic and not name:
+    if not nic and not nic_prefix and not name:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="At least one search parameter (nic or name) must be provided"
+            detail="At least one search parameter (nic, nic_prefix or name) must be provided"
         )
 
-    logger.info(f"Searching patients: nic={nic}, name={name}, user={current_user.full_name}")
-    patients = patient_service.search_patients(nic=nic, name=name, db=db)
-    return patients
+    logger.info(f"Searching patients: nic={nic}, nic_prefix={nic_prefix}, name={name}, user={current_user.full_name}")
+    page = patient_search.search(db, nic=nic, nic_prefix=nic_prefix, name=name, limit=limit, cursor=cursor)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.patients
+
+
+@router.get("/lookup", response_model=List[PatientLookupItem])
+def lookup_patients(
+    q: str = Query(..., min_length=1, description="Leading characters of a NIC or of name words"),
+    limit: int = Query(patient_lookup.DEFAULT_LIMIT, ge=1, le=patient_lookup.MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allow_staff),
+):
+    """
+    Type-ahead suggestions for the admission desk, served from the
+    in-process lookup index when PATIENT_LOOKUP_INDEX_ENABLED is set (no
+    database round-trip), otherwise from the patient search.
+
+    **Required Role**: Nurse or Doctor
+    """
+    index = patient_lookup.get_lookup_index()
+    if index.loaded:
+        return index.lookup(q, limit=limit)
+    if any(char.isdigit() for char in q):
+        return patient_search.search(db, nic_prefix=q, limit=limit).patients
+    return patient_search.search(db, name=q, limit=limit).patients
+
+
+@router.post("/duplicates/check", response_model=List[DuplicateCandidateResponse])
+def check_duplicate_patients(
+    data: PatientCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allow_nurse_admin),
+):
+    """
+    Existing patients that are probably the person about to be registered
+    (mistyped NIC, transliterated name, swapped day/month), best match first.
+    Call before POST /patients to offer the existing record instead.
+
+    **Required Role**: Nurse or Admin
+    """
+    return patient_service.check_duplicates(data, db)
+
+
+@router.get("/duplicates", response_model=List[DuplicatePairResponse])
+def list_duplicate_patients(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allow_admin),
+):
+    """
+    Likely duplicate pairs found by the last full-table scan, best first
+    (empty until a scan has run). For periodic data-quality review.
+
+    **Required Role**: Admin
+    """
+    return duplicate_detection.stored_duplicates(db)
+
+
+@router.post("/duplicates/scan", status_code=status.HTTP_202_ACCEPTED)
+def start_duplicate_scan(
+    current_user: User = Depends(allow_admin),
+):
+    """
+    Start a full-table duplicate scan in the background (seconds to minutes
+    on large tables); GET /patients/duplicates serves its result once it
+    finishes. Does nothing if the previous scan is still running.
+
+    **Required Role**: Admin
+    """
+    started = duplicate_detection.start_scan()
+    logger.info(f"Duplicate scan requested by admin {current_user.id}: started={started}")
+    return {"started": started}
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
@@ -116,18 +225,38 @@ def delete_patient(
     return DeleteResponse(success=success, id=str(patient_id))
 
 
+@router.get("/{patient_id}/duplicates", response_model=List[DuplicateCandidateResponse])
+def get_patient_duplicates(
+    patient_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allow_staff),
+):
+    """
+    Other patients that are probably the same person as this one.
+
+    **Required Role**: Nurse or Doctor
+    """
+    return patient_service.get_patient_duplicates(patient_id, db)
+
+
 @router.get("/{patient_id}/history", response_model=List[EncounterSummary])
 def get_patient_history(
     patient_id: UUID,
+    response: Response,
+    limit: int = Query(patient_service.HISTORY_DEFAULT_LIMIT, ge=1, le=patient_service.HISTORY_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(allow_staff),
 ):
     """
-    Get encounter history for a patient.
-    Returns summary of all past triage encounters with dates and chief complaints.
+    Get encounter history for a patient, newest first. Results are paged;
+    when older encounters remain, the X-Next-Cursor response header holds
+    the cursor for the next page.
 
     **Required Role**: Nurse or Doctor
     """
     logger.info(f"Fetching patient history: id={patient_id}, user={current_user.full_name}")
-    history = patient_service.get_patient_encounter_history(patient_id, db)
-    return history
+    page = patient_service.get_encounter_history_page(patient_id, db, limit=limit, cursor=cursor)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.encounters
@@ -0,0 +1,70 @@
+"""
+Profiling API controller.
+Runs time-boxed sampling profiles of the live process and serves
+per-request profiles, as collapsed stacks for flamegraph tools.
+"""
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from app.api.dependencies import allow_admin
+from app.core import profiler
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.models.user import User
+
+logger = get_logger(__name__)
+settings = get_settings()
+router = APIRouter(prefix="/profiling", tags=["Profiling"])
+
+COLLAPSED_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+@router.post("/cpu")
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(settings.PROFILING_INTERVAL_MS, ge=1, le=1000),
+    current_user: User = Depends(allow_admin),
+):
+    """
+    Sample every thread of this worker for `seconds` (capped at
+    PROFILING_MAX_SECONDS) and return collapsed stacks, ready for
+    flamegraph.pl or speedscope. Only one profile runs at a time.
+
+    **Required Role**: Admin
+    """
+    seconds = min(seconds, settings.PROFILING_MAX_SECONDS)
+    logger.info(f"Admin {current_user.id} started a {seconds:.0f}s CPU profile")
+    try:
+        result = await profiler.profile_for(seconds, interval=interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    filename = f"profile-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+    return Response(
+        content=result.collapsed(),
+        media_type=COLLAPSED_CONTENT_TYPE,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(result.samples),
+        },
+    )
+
+
+@router.get("/requests/{profile_id}")
+def get_request_profile(
+    profile_id: str,
+    current_user: User = Depends(allow_admin),
+):
+    """
+    Collapsed stacks of a request profiled via the X-Profile header (the
+    id is returned in its X-Profile-Id response header). Only the most
+    recent profiles are kept, in memory.
+
+    **Required Role**: Admin
+    """
+    collapsed = profiler.get_request_profiles().get(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return Response(
+        content=collapsed,
+        media_type=COLLAPSED_CONTENT_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="request-{profile_id}.collapsed"'},
+    )
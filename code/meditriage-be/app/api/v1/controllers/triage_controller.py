@@ -2,13 +2,14 @@
 Enhanced Triage interview API controller.
 Thin controller layer — delegates to triage_engine and encounter_service.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from uuid import UUID
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from app.db.session import get_db
-from app.api.dependencies import allow_nurse, allow_doctor, allow_staff
-from app.models.user import User
+from app.api.dependencies import allow_nurse, allow_doctor, allow_staff, allow_admin, allow_all_authenticated
+from app.models.user import User, UserRole
 from app.schemas.chat import (
     ChatMessageRequest,
     ChatMessageResponse,
@@ -20,17 +21,30 @@ from app.schemas.clinical import (
     EncounterUpdateRequest,
     EncounterResponse,
     EncounterListItem,
+    PrioritizedEncounterItem,
+    DoctorAvailabilityUpdate,
     ClinicalNoteResponse,
     ClinicalNoteUpdate,
 )
 from app.models.clinical import MedicalEncounter
-from app.services import triage_engine, encounter_service
+from app.services import triage_engine, encounter_service, encounter_queue, queue_scheduler
+from app.services.llm.circuit_breaker import CircuitOpenError
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/triage", tags=["Triage"])
 
 
+def _service_unavailable(error: CircuitOpenError) -> HTTPException:
+    """503 for a dependency whose circuit is open, with a Retry-After hint."""
+    logger.warning(f"Fast-failing request: {error}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="AI service is currently unavailable. Please try again shortly.",
+        headers={"Retry-After": str(int(error.retry_after) + 1)},
+    )
+
+
 @router.post("/start", response_model=StartInterviewResponse)
 async def start_triage_interview(
     request: StartInterviewRequest,
@@ -48,6 +62,8 @@ async def start_triage_interview(
         response = await triage_engine.start_interview(request, current_user.id, db)
         logger.info(f"Triage interview started successfully for patient_id={request.patient_id}")
         return response
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Patient not found or invalid status: patient_id={request.patient_id}, error={str(e)}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -79,6 +95,10 @@ async def triage_chat(
             logger.debug(f"Chat message processed for encounter_id={request.encounter_id}")
 
         return response
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise _service_unavailable(e)
     except ValueError as e:
         logger.error(f"Encounter not found or invalid: encounter_id={request.encounter_id}, error={str(e)}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -87,6 +107,30 @@ async def triage_chat(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to process message: {str(e)}")
 
 
+def _doctor_display_name(full_name: Optional[str]) -> Optional[str]:
+    if full_name and full_name.startswith("Dr. "):
+        return full_name[4:].strip()
+    return full_name
+
+
+def _prioritized_item(entry: queue_scheduler.ScheduledEncounter, now: datetime) -> PrioritizedEncounterItem:
+    return PrioritizedEncounterItem(
+        id=entry.encounter_id,
+        patient_id=entry.patient_id,
+        patient_name=entry.patient_name,
+        nurse_id=entry.nurse_id,
+        doctor_id=entry.doctor_id,
+        doctor_name=_doctor_display_name(entry.doctor_name),
+        status=entry.status,
+        is_urgent=entry.is_urgent,
+        chief_complaint=entry.chief_complaint,
+        encounter_timestamp=entry.encounter_timestamp,
+        sla_deadline=entry.sla_deadline,
+        sla_used=round(entry.sla_used(now), 3),
+        overdue=now > entry.sla_deadline,
+    )
+
+
 @router.get("/encounters", response_model=List[EncounterListItem])
 def list_active_encounters(
     db: Session = Depends(get_db),
@@ -94,31 +138,29 @@ def list_active_encounters(
 ):
     """
     Get the global active patient queue for Nurse/Doctor dashboards.
-    Returns all encounters with status TRIAGE_IN_PROGRESS or AWAITING_REVIEW.
+    Returns all encounters with status TRIAGE_IN_PROGRESS or AWAITING_REVIEW,
+    plus recently completed ones, read from the encounter_queue read model.
     Ordered: urgent encounters first, then by oldest arrival time.
 
     **Required Role**: Nurse or Doctor
     """
     logger.info(f"Active encounter list requested by user={current_user.full_name}")
     try:
-        encounters = encounter_service.get_active_encounters(db)
+        entries = encounter_queue.list_queue(db)
         return [
             EncounterListItem(
-                id=e.id,
+                id=e.encounter_id,
                 patient_id=e.patient_id,
-                patient_name=f"{e.patient.first_name} {e.patient.last_name}" if e.patient else None,
+                patient_name=e.patient_name,
                 nurse_id=e.nurse_id,
                 doctor_id=e.doctor_id,
-                doctor_name=(
-                    e.doctor.full_name[4:].strip() if e.doctor and e.doctor.full_name.startswith("Dr. ")
-                    else e.doctor.full_name if e.doctor else None
-                ),
+                doctor_name=_doctor_display_name(e.doctor_name),
                 status=e.status,
                 is_urgent=e.is_urgent,
                 chief_complaint=e.chief_complaint,
                 encounter_timestamp=e.encounter_timestamp,
             )
-            for e in encounters
+            for e in entries
         ]
     except Exception as e:
         logger.error(f"Failed to fetch active encounters: {str(e)}", exc_info=True)
@@ -129,6 +171,102 @@ def list_active_encounters(
 
 
 
+@router.get("/encounters/prioritized", response_model=List[PrioritizedEncounterItem])
+def list_prioritized_encounters(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allow_staff),
+):
+    """
+    Open encounters in scheduler order: earliest SLA deadline first, with
+    encounters of unavailable doctors pushed back.
+
+    **Required Role**: Nurse or Doctor
+    """
+    scheduler = queue_scheduler.refresh(db)
+    now = datetime.utcnow()
+    return [_prioritized_item(entry, now) for entry in scheduler.ordered(limit)]
+
+
+@router.get("/doctors/{doctor_id}/next-patient", response_model=Optional[PrioritizedEncounterItem])
+def get_next_patient(
+    doctor_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allow_staff),
+):
+    """
+    The encounter a doctor should review next: the earliest-deadline
+    AWAITING_REVIEW encounter assigned to them or to nobody (null if none).
+    Does not assign it; claim it with PATCH /{encounter_id}.
+
+    **Required Role**: Nurse or Doctor
+    """
+    entry = queue_scheduler.refresh(db).next_for_doctor(doctor_id)
+    return _prioritized_item(entry, datetime.utcnow()) if entry else None
+
+
+@router.put("/doctors/{doctor_id}/availability")
+def set_doctor_availability(
+    doctor_id: UUID,
+    data: DoctorAvailabilityUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allow_all_authenticated),
+):
+    """
+    Mark a doctor available or unavailable; the encounters assigned to an
+    unavailable doctor move down the prioritized queue.
+
+    **Required Role**: The doctor themselves, or Admin
+    """
+    if current_user.role != UserRole.ADMIN and current_user.id != doctor_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the doctor or an admin can change a doctor's availability"
+        )
+    queue_scheduler.set_doctor_availability(doctor_id, data.available, db)
+    logger.info(f"Doctor availability set: doctor_id={doctor_id}, available={data.available}, by={current_user.full_name}")
+    return {"doctor_id": doctor_id, "available": data.available}
+
+
+@router.get("/usage")
+def get_llm_usage(
+    current_user: User = Depends(allow_admin),
+):
+    """
+    Aggregate LLM token usage and latency per endpoint since the last restart.
+
+    **Required Role**: Admin
+    """
+    return triage_engine.get_usage_summary()
+
+
+@router.get("/timings")
+def get_stage_timings(
+    current_user: User = Depends(allow_admin),
+):
+    """
+    Latency histograms per triage stage (history load, scrub, prompt build,
+    provider call, parse, commit) since the last restart. Empty unless
+    TRACING_ENABLED is set.
+
+    **Required Role**: Admin
+    """
+    return triage_engine.get_stage_timings()
+
+
+@router.get("/{encounter_id}/usage")
+def get_encounter_llm_usage(
+    encounter_id: UUID,
+    current_user: User = Depends(allow_staff),
+):
+    """
+    LLM token usage recorded for one encounter, against its token budget.
+
+    **Required Role**: Nurse or Doctor
+    """
+    return triage_engine.get_encounter_usage(encounter_id)
+
+
 @router.get("/{encounter_id}/messages", response_model=List[MessageResponse])
 def get_encounter_messages(
     encounter_id: UUID,
@@ -361,6 +499,10 @@ async def force_finish_triage(
             encounter_status=encounter.status.value if encounter else None,
             doctor_id=encounter.doctor_id if encounter else None,
         )
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise _service_unavailable(e)
     except ValueError as e:
         logger.error(f"Encounter invalid for force finish: {str(e)}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
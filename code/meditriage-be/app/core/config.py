@@ -2,9 +2,13 @@
 Application configuration using Pydantic Settings.
 Loads environment variables from .env file.
 """
+from pydantic import field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
+# SOAP fields that may be re-requested (parser.SOAP_REQUIRED_FIELDS)
+SOAP_RETRY_FIELDS = 2
+
 
 class Settings(BaseSettings):
     """Central configuration loaded from environment variables."""
@@ -34,6 +38,45 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-4o-mini"
     ACTIVE_LLM: str = "DEEPSEEK"  # Toggle: DEEPSEEK | OPENAI
 
+    # AI Services — Multi-provider routing (uses every provider with an API key)
+    LLM_ROUTING_ENABLED: bool = False  # route to the fastest healthy provider, ACTIVE_LLM first
+    LLM_HEDGING_ENABLED: bool = False  # fire a second request when the first exceeds p95
+    LLM_ROUTING_WINDOW: int = 100      # rolling window of calls used for p50/p95/error rate
+
+    # AI Services — Response cache for identical (scrubbed) prompts
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 256
+    LLM_CACHE_TTL_SECONDS: float = 300.0
+
+    # AI Services — Circuit breakers (scrubber, cloud provider, pipeline construction)
+    CIRCUIT_FAILURE_THRESHOLD: int = 5      # consecutive failures before a circuit opens
+    CIRCUIT_RESET_TIMEOUT: float = 30.0     # seconds an open circuit fast-fails before a trial call
+    CIRCUIT_PROBE_INTERVAL: float = 10.0    # seconds between background health probes
+    LLM_CALL_TIMEOUT_SECONDS: float = 60.0  # per scrubber/provider call; a slower call fails
+
+    # AI Services — Token budgets
+    LLM_MAX_OUTPUT_TOKENS: int = 1024         # completion cap per call
+    LLM_JSON_MODE: bool = True                # provider JSON mode / response schema for SOAP output
+    SOAP_FIELD_RETRIES: int = 1               # re-requests per missing or truncated SOAP field
+    LLM_CONTEXT_WINDOW: int = 64000           # model context window (deepseek-chat: 64K)
+    LLM_MAX_PROMPT_TOKENS: int = 8000         # per-call prompt budget for interview turns
+    LLM_ENCOUNTER_TOKEN_BUDGET: int = 100000  # total tokens per encounter before history is cut to the minimum
+
+    # AI Services — Hybrid interviewer (scripted OLDCARTS questions asked locally)
+    HYBRID_INTERVIEWER_ENABLED: bool = False
+
+    # AI Services — Interview history compaction
+    # (opt-in: enable once scripts/benchmarks/bench_history_compaction.py has been reviewed)
+    HISTORY_COMPACTION_ENABLED: bool = False  # fold older turns into an OLDCARTS summary
+    HISTORY_KEEP_LAST_MESSAGES: int = 6       # most recent messages always sent verbatim
+
+    # SOAP note single-flight lock (in-process + Postgres advisory lock)
+    SOAP_LOCK_TIMEOUT_SECONDS: float = 120.0  # wait for a concurrent generation before 409
+    SOAP_LOCK_POLL_INTERVAL: float = 0.25     # seconds between advisory lock attempts
+
+    # Triage conversation state cache (per process; DB is the source of truth)
+    CONVERSATION_CACHE_SIZE: int = 2000  # encounters kept in memory, 0 disables
+
     # AI Services — Local PII Scrubbing (Ollama)
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_SCRUBBER_MODEL: str = "llama3.2:1b"  # lightweight model for PII removal
@@ -42,10 +85,87 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
     LOG_FILE: str = "logs/meditriage.log"
 
+    # SQL query profiling (debug): per-request counts, N+1 warnings, slow-query log
+    QUERY_PROFILING_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_LOG_FILE: str = "logs/slow_queries.log"
+    N_PLUS_ONE_THRESHOLD: int = 5  # repeats of one statement shape in a request
+
+    # Tracing (per-stage timings of triage turns)
+    TRACING_ENABLED: bool = False
+    TRACING_OTLP_ENDPOINT: str = ""  # e.g. http://localhost:4318/v1/traces (OTLP/HTTP JSON collector)
+    TRACING_SERVICE_NAME: str = "meditriage-api"
+
+    # Sampling profiler (admin POST /profiling/cpu; X-Profile header for one request)
+    PROFILING_MAX_SECONDS: float = 60.0
+    PROFILING_INTERVAL_MS: float = 10.0
+    PROFILING_REQUEST_TOKEN: str = ""  # empty disables per-request profiling
+
+    # In-process patient type-ahead index (GET /patients/lookup)
+    PATIENT_LOOKUP_INDEX_ENABLED: bool = False
+    PATIENT_LOOKUP_REFRESH_SECONDS: float = 300.0  # rebuild picks up patients added by other workers
+
+    # Duplicate-patient detection
+    DUPLICATE_MATCH_THRESHOLD: float = 0.85  # match score (0-1) reported as a likely duplicate
+    DUPLICATE_SCAN_WORKERS: int = 4  # processes scoring pairs in the full-table scan (scripts/scan_duplicates.py)
+    DUPLICATE_MAX_BLOCK_SIZE: int = 200  # blocks larger than this are too generic to compare
+
+    # Analytics export (scripts/export_analytics.py)
+    EXPORT_BATCH_SIZE: int = 10000  # rows fetched and written per batch
+    EXPORT_WATERMARK_LAG_SECONDS: float = 600.0  # > the longest triage transaction (see below)
+
+    # Monthly partitions of triage_interactions / consultation_messages (Postgres)
+    PARTITION_MONTHS_AHEAD: int = 3  # created by a daily task in the API
+    PARTITION_RETENTION_MONTHS: int = 24  # older months archived by scripts/archive_partitions.py
+    PARTITION_ARCHIVE_PATH: str = "archive/partitions"
+
+    # Dashboard queue and encounter archive (scripts/archive_encounters.py)
+    QUEUE_COMPLETED_WINDOW_HOURS: float = 24.0  # completed encounters stay on the dashboard this long
+    ARCHIVE_AFTER_DAYS: int = 90  # completed encounters older than this leave the hot tables
+    ARCHIVE_BATCH_SIZE: int = 500
+
+    # Queue scheduler (next patient per doctor, SLA-ordered queue view)
+    QUEUE_SLA_URGENT_MINUTES: float = 15.0  # review targets by acuity; ranked by arrival + target
+    QUEUE_SLA_ROUTINE_MINUTES: float = 240.0
+    QUEUE_UNAVAILABLE_DOCTOR_DELAY_MINUTES: float = 60.0  # deadline shift for an unavailable doctor's patients
+    QUEUE_SCHEDULER_RESYNC_SECONDS: float = 30.0  # full reload picks up changes made by other workers
+
     # Consultation Chat Room
     CONSULTATION_ENCRYPTION_KEY: str = ""
     CONSULTATION_MEDIA_PATH: str = "media/consultations"
 
+    @field_validator("QUEUE_SLA_URGENT_MINUTES", "QUEUE_SLA_ROUTINE_MINUTES")
+    @classmethod
+    def _positive_sla(cls, value: float) -> float:
+        # The scheduler ranks by arrival + target and reports waits as a share of it
+        if value <= 0:
+            raise ValueError("must be greater than 0")
+        return value
+
+    @model_validator(mode="after")
+    def _export_lag_covers_transactions(self) -> "Settings":
+        # Rows are stamped at flush, not commit: a transaction still open when an
+        # export starts must commit before the watermark passes its timestamps
+        if self.EXPORT_WATERMARK_LAG_SECONDS <= self.longest_triage_transaction_seconds:
+            raise ValueError(
+                "EXPORT_WATERMARK_LAG_SECONDS must exceed "
+                f"{self.longest_triage_transaction_seconds:g}s, the longest a triage "
+                "turn keeps its transaction open (SOAP_LOCK_TIMEOUT_SECONDS plus "
+                "LLM_CALL_TIMEOUT_SECONDS per scrubber/provider call)"
+            )
+        return self
+
+    @property
+    def longest_triage_transaction_seconds(self) -> float:
+        """
+        Upper bound on how long a triage turn holds its transaction open.
+        The patient message is added before the scrubber and interview calls,
+        then the turn may wait for the SOAP lock and generate the note (one
+        call plus SOAP_FIELD_RETRIES per required field) before committing.
+        """
+        calls = 3 + SOAP_RETRY_FIELDS * self.SOAP_FIELD_RETRIES
+        return self.SOAP_LOCK_TIMEOUT_SECONDS + calls * self.LLM_CALL_TIMEOUT_SECONDS
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -66,5 +66,13 @@ class ConnectionManager:
             return len(self.active_connections[room_id])
         return 0
 
+    def total_connections(self) -> int:
+        """Returns the number of active connections across all rooms."""
+        return sum(len(connections) for connections in self.active_connections.values())
+
+    def room_count(self) -> int:
+        """Returns the number of rooms with at least one active connection."""
+        return len(self.active_connections)
+
 # Singleton instance to be used across the application
 manager = ConnectionManager()
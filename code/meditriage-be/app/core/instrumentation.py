@@ -0,0 +1,137 @@
+"""
+Service metrics: HTTP, database, LLM and WebSocket.
+`PrometheusMiddleware` times every HTTP request by route template and
+tracks in-flight requests; `instrument_engine()` hooks SQLAlchemy cursor
+events to time each statement and to count queries and DB time per
+request. Everything is served by GET /api/v1/metrics.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from app.core.connection_manager import manager
+from app.core.metrics import Counter, Gauge, Histogram
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "meditriage_http_request_duration_seconds",
+    "HTTP request latency by route template, method and status code.",
+    labelnames=("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "meditriage_http_requests_in_flight",
+    "HTTP requests currently being served.",
+    labelnames=("method",),
+)
+DB_QUERY_SECONDS = Histogram(
+    "meditriage_db_query_duration_seconds",
+    "Time per SQL statement.",
+)
+DB_QUERIES = Counter(
+    "meditriage_db_queries_total",
+    "SQL statements executed.",
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "meditriage_db_queries_per_request",
+    "SQL statements issued while serving one HTTP request.",
+    labelnames=("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_SECONDS_PER_REQUEST = Histogram(
+    "meditriage_db_time_per_request_seconds",
+    "Total SQL statement time while serving one HTTP request.",
+    labelnames=("route",),
+)
+LLM_CALL_SECONDS = Histogram(
+    "meditriage_llm_call_duration_seconds",
+    "Reasoning provider call latency by API endpoint and outcome.",
+    labelnames=("endpoint", "outcome"),
+)
+LLM_TOKENS = Counter(
+    "meditriage_llm_tokens_total",
+    "Tokens sent to and received from the reasoning provider.",
+    labelnames=("endpoint", "kind"),
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "meditriage_websocket_connections",
+    "Open consultation room WebSocket connections.",
+)
+WEBSOCKET_ROOMS = Gauge(
+    "meditriage_websocket_rooms",
+    "Consultation rooms with at least one open connection.",
+)
+WEBSOCKET_CONNECTIONS.set_function(manager.total_connections)
+WEBSOCKET_ROOMS.set_function(manager.room_count)
+
+
+class _RequestDBStats:
+    """SQL statements and time accumulated by the current request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_request_db_stats: ContextVar[Optional[_RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    DB_QUERY_SECONDS.observe(elapsed)
+    DB_QUERIES.inc()
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement executed on the engine (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording request latency, in-flight requests and
+    per-request DB usage. Routes are labelled by their template
+    ("/api/v1/triage/{encounter_id}/note"), never the raw path, so label
+    cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = _RequestDBStats()
+        token = _request_db_stats.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec(method=method)
+            _request_db_stats.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=method, route=route, status=str(status_code))
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, route=route)
+            DB_SECONDS_PER_REQUEST.observe(stats.seconds, route=route)
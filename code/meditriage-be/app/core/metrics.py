@@ -0,0 +1,247 @@
+"""
+In-process metrics primitives and Prometheus text exposition.
+Histograms use fixed cumulative buckets (Prometheus semantics) so they can
+be aggregated cheaply on the hot path and exported without keeping samples.
+Every metric registers itself on creation; `render_prometheus()` serves
+them all in text format 0.0.4.
+"""
+import math
+import threading
+from typing import Callable, Optional, Union
+
+# Latency buckets in seconds (upper bounds; +Inf is implicit)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _HistogramSeries:
+    """Bucket counts, sum and count for one label combination."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[int]:
+        total, cumulative = 0, []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within its bucket (like histogram_quantile)."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        lower, previous = 0.0, 0
+        for bound, cumulative in zip(self.buckets, self.cumulative()):
+            if cumulative >= rank:
+                in_bucket = cumulative - previous
+                return lower + (bound - lower) * ((rank - previous) / in_bucket if in_bucket else 0.0)
+            lower, previous = bound, cumulative
+        return self.buckets[-1]  # falls in +Inf: report the largest finite bound
+
+    def snapshot(self) -> dict:
+        p50, p95, p99 = self.quantile(0.5), self.quantile(0.95), self.quantile(0.99)
+        return {
+            "count": self.count,
+            "sum_s": round(self.sum, 6),
+            "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            "p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+        }
+
+
+class _Metric:
+    """Name, help text, label names and a lock; registers the metric on creation."""
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """Monotonically increasing labelled counter."""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    """
+    Labelled gauge. Either updated directly (inc/dec/set) or read on
+    collection from a callback set with `set_function()`.
+    """
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Union[float, dict]]] = None
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], Union[float, dict]]) -> None:
+        """Read the value at collection time: a number, or {label tuple: value}."""
+        self._function = function
+
+    def values(self) -> dict[tuple[str, ...], float]:
+        if self._function is not None:
+            value = self._function()
+            return dict(value) if isinstance(value, dict) else {(): value}
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """
+    Labelled histogram.
+
+    Args:
+        name: Metric name (snake_case, unit suffix, e.g. "_seconds").
+        documentation: One-line description.
+        labelnames: Label names; observe() takes one value per label.
+        buckets: Bucket upper bounds in ascending order.
+    """
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(self.buckets)
+            series.observe(value)
+
+    def series(self) -> dict[tuple[str, ...], _HistogramSeries]:
+        with self._lock:
+            return dict(self._series)
+
+    def snapshot(self) -> dict:
+        """{label value (joined with ","): {count, sum_s, p50_ms, p95_ms, p99_ms}}."""
+        return {",".join(key): series.snapshot() for key, series in sorted(self.series().items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+_registry: list = []
+
+
+def all_metrics() -> list:
+    """Every metric created in this process, in creation order."""
+    return list(_registry)
+
+
+def reset_metrics() -> None:
+    for metric in _registry:
+        metric.reset()
+
+
+# ── Prometheus text exposition ─────────────────────────────────────────────
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def render_prometheus(metrics: Optional[list] = None) -> str:
+    """All (or the given) metrics in Prometheus text format."""
+    lines = []
+    for metric in metrics if metrics is not None else all_metrics():
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        if isinstance(metric, Histogram):
+            for key, series in sorted(metric.series().items()):
+                for bound, cumulative in zip(metric.buckets, series.cumulative()):
+                    labels = _format_labels(metric.labelnames, key, f'le="{_format_bound(bound)}"')
+                    lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(metric.labelnames, key, 'le="+Inf"')
+                lines.append(f"{metric.name}_bucket{labels} {series.count}")
+                labels = _format_labels(metric.labelnames, key)
+                lines.append(f"{metric.name}_sum{labels} {_format_value(series.sum)}")
+                lines.append(f"{metric.name}_count{labels} {series.count}")
+        else:
+            for key, value in sorted(metric.values().items()):
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,32 @@
+"""
+Keyset pagination cursors.
+A cursor is the sort key of the last row of a page, as URL-safe base64
+JSON, so clients treat it as opaque and the next page starts with an
+indexed range condition instead of an OFFSET.
+"""
+import base64
+import json
+from fastapi import HTTPException, status
+
+
+def encode_cursor(key: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(key, dict):
+            raise ValueError("cursor is not an object")
+        return key
+    except ValueError:
+        raise invalid_cursor()
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
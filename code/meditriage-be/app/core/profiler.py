@@ -0,0 +1,201 @@
+"""
+In-process sampling profiler.
+A daemon thread snapshots every thread's Python stack with
+`sys._current_frames()` at a fixed interval and counts identical stacks.
+The result is in collapsed-stack format ("root;caller;callee count" per
+line), which flamegraph.pl, speedscope and inferno read directly.
+
+Nothing runs between profiles, so it is safe to leave available in
+production: a profile costs one short stack walk per thread per interval
+(100 Hz by default) for its duration only.
+
+Two entry points:
+    - `profile_for(seconds)`: a time-boxed profile of the whole process
+      (admin endpoint POST /api/v1/profiling/cpu).
+    - `RequestProfilingMiddleware`: profiles a single request carrying the
+      X-Profile header set to PROFILING_REQUEST_TOKEN; the result is kept
+      in memory under the X-Profile-Id returned with the response.
+"""
+import asyncio
+import hmac
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Optional
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Leaf functions of threads that are parked rather than working; their stacks are dropped
+IDLE_FUNCTIONS = frozenset({"select", "poll", "wait", "acquire", "accept", "_worker_wait"})
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename.replace("\\", "/")
+    # keep "package/module.py" so labels stay short but unambiguous
+    short = "/".join(filename.rsplit("/", 2)[-2:])
+    return f"{code.co_name} ({short}:{code.co_firstlineno})".replace(";", ",")
+
+
+class SamplingProfiler:
+    """
+    Stack sampler for every thread of this process.
+
+    Args:
+        interval: Seconds between samples.
+        max_depth: Frames kept per stack (innermost first).
+        include_idle: Keep stacks of threads parked in IDLE_FUNCTIONS.
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 128, include_idle: bool = False):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> "SamplingProfiler":
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._started
+        return self
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own_ident)
+
+    def _sample(self, own_ident: int) -> None:
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or thread_names.get(ident) == "sampling-profiler":
+                continue
+            if not self.include_idle and frame.f_code.co_name in IDLE_FUNCTIONS:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(f"thread:{thread_names.get(ident, ident)}")
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one "frame;frame;... count" line per distinct stack."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+_process_profile_lock = asyncio.Lock()
+
+
+async def profile_for(seconds: float, interval: float = 0.01) -> SamplingProfiler:
+    """
+    Sample the whole process for `seconds`. One profile runs at a time.
+
+    Raises:
+        RuntimeError: If another process profile is already running.
+    """
+    if _process_profile_lock.locked():
+        raise RuntimeError("A profile is already running.")
+    async with _process_profile_lock:
+        profiler = SamplingProfiler(interval=interval).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+    logger.info(f"Process profile finished: {profiler.samples} samples over {profiler.duration:.1f}s")
+    return profiler
+
+
+class ProfileStore:
+    """Most recent per-request profiles (collapsed stacks) by id."""
+
+    def __init__(self, max_profiles: int = 20):
+        self.max_profiles = max_profiles
+        self._profiles: OrderedDict[str, str] = OrderedDict()
+
+    def put(self, profile_id: str, collapsed: str) -> None:
+        self._profiles[profile_id] = collapsed
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[str]:
+        return self._profiles.get(profile_id)
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+_request_profiles = ProfileStore()
+
+
+def get_request_profiles() -> ProfileStore:
+    return _request_profiles
+
+
+class RequestProfilingMiddleware:
+    """
+    Profiles a single HTTP request whose X-Profile header equals `token`.
+    Other requests pass straight through. Only one request is profiled at a
+    time; the sampler sees every thread, so the profile also contains work
+    done concurrently for other requests (labelled by thread).
+
+    Args:
+        app: The ASGI app.
+        token: Shared secret expected in X-Profile.
+        interval: Seconds between samples.
+    """
+
+    def __init__(self, app, token: str, interval: float = 0.005):
+        self.app = app
+        self.token = token.encode()
+        self.interval = interval
+        self._busy = threading.Lock()
+
+    def _requested(self, scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == b"x-profile":
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            logger.info("Request profiling skipped: another request is being profiled.")
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler(interval=self.interval).start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            self._busy.release()
+            _request_profiles.put(profile_id, profiler.collapsed())
+            logger.info(
+                f"Profiled {scope['method']} {scope['path']}: {profiler.samples} samples, id={profile_id}"
+            )
@@ -0,0 +1,217 @@
+"""
+SQL query profiler (debug / profiling mode).
+Hooks SQLAlchemy cursor events to count and time the statements issued
+inside a profiling scope (an HTTP request, or a block in a test), and:
+
+    - flags statement shapes repeated within one request as likely N+1
+      lazy loads,
+    - writes statements slower than SLOW_QUERY_THRESHOLD_MS, with their
+      EXPLAIN plan, to a dedicated slow-query log,
+    - enforces declared query budgets (`query_budget()`), so tests fail
+      when a change adds queries to a hot path.
+
+Enabled for the app with QUERY_PROFILING_ENABLED; budgets work wherever
+`install()` has been called on the engine.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Iterator, Optional
+from sqlalchemy import event
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+slow_query_logger = logging.getLogger("meditriage.slow_queries")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Plans are only requested for read statements; EXPLAIN without ANALYZE never executes them
+_EXPLAIN_PREFIX = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so executions that differ only in values compare equal."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryProfile:
+    """Statements recorded inside one profiling scope."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times (likely N+1), most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def summary(self, limit: int = 5) -> str:
+        lines = [f"{self.count} queries in {self.seconds * 1000:.1f}ms ({self.label or 'unlabelled'})"]
+        lines += [f"  {count}x {shape[:200]}" for shape, count in self.shapes.most_common(limit)]
+        return "\n".join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block issued more SQL statements than its declared budget."""
+
+
+_active_profiles: ContextVar[tuple] = ContextVar("query_profiles", default=())
+_slow_threshold: Optional[float] = None  # seconds; None disables the slow-query log
+
+
+@contextmanager
+def profile_queries(label: str = "") -> Iterator[QueryProfile]:
+    """Record every statement issued inside the block (profiles may nest)."""
+    profile = QueryProfile(label)
+    token = _active_profiles.set(_active_profiles.get() + (profile,))
+    try:
+        yield profile
+    finally:
+        _active_profiles.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "") -> Iterator[QueryProfile]:
+    """
+    Fail if the block issues more than `max_queries` statements.
+
+    Usage:
+        with query_budget(1):
+            encounter_queue.list_queue(db)
+
+    Raises:
+        QueryBudgetExceeded: With the most frequent statement shapes.
+    """
+    with profile_queries(label) as profile:
+        yield profile
+    if profile.count > max_queries:
+        raise QueryBudgetExceeded(f"Query budget of {max_queries} exceeded: {profile.summary()}")
+
+
+def explain(connection, statement: str, parameters) -> Optional[str]:
+    """
+    The plan for a read statement, fetched on the same DBAPI connection
+    without firing engine events. On Postgres it runs inside a savepoint so
+    a failing EXPLAIN cannot abort the caller's transaction.
+    """
+    prefix = _EXPLAIN_PREFIX.get(connection.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    postgres = connection.dialect.name == "postgresql"
+    cursor = connection.connection.cursor()
+    try:
+        if postgres:
+            cursor.execute("SAVEPOINT query_profiler_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception as e:
+            if postgres:
+                cursor.execute("ROLLBACK TO SAVEPOINT query_profiler_explain")
+            return f"(EXPLAIN failed: {e})"
+        if postgres:
+            cursor.execute("RELEASE SAVEPOINT query_profiler_explain")
+    finally:
+        cursor.close()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._profiler_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._profiler_started
+    for profile in _active_profiles.get():
+        profile.record(statement, elapsed)
+
+    if _slow_threshold is not None and elapsed >= _slow_threshold:
+        plan = None if executemany else explain(conn, statement, parameters)
+        slow_query_logger.warning(
+            f"{elapsed * 1000:.1f}ms: {_WHITESPACE.sub(' ', statement).strip()}"
+            + (f"\nPLAN:\n{plan}" if plan else "")
+        )
+
+
+def install(engine) -> None:
+    """Attach the profiler's cursor hooks to an engine (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def configure_slow_query_log(threshold_ms: Optional[float], log_file: Optional[str] = None) -> None:
+    """
+    Log statements slower than `threshold_ms` (None disables) to `log_file`,
+    a dedicated file that does not go through the application log.
+    """
+    global _slow_threshold
+    _slow_threshold = threshold_ms / 1000 if threshold_ms is not None else None
+    if log_file and not slow_query_logger.handlers:
+        log_path = Path(log_file)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        # Rotate like the application log: 10MB, 5 backups
+        handler = RotatingFileHandler(log_path, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.WARNING)
+        slow_query_logger.propagate = False
+
+
+class QueryProfilingMiddleware:
+    """
+    ASGI middleware profiling each HTTP request's SQL. Adds X-DB-Query-Count
+    and X-DB-Query-Time-Ms response headers (statements issued before the
+    response started) and warns about likely N+1 patterns.
+
+    Args:
+        app: The ASGI app.
+        n_plus_one_threshold: Repetitions of one statement shape that count as N+1.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries(f"{scope['method']} {scope['path']}") as profile:
+
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(profile.count).encode()),
+                        (b"x-db-query-time-ms", f"{profile.seconds * 1000:.1f}".encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers)
+
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        for shape, count in profile.repeated_shapes(self.n_plus_one_threshold):
+            logger.warning(f"Possible N+1 on {scope['method']} {route}: {count}x {shape[:300]}")
+        logger.debug(profile.summary())
@@ -0,0 +1,207 @@
+"""
+Lightweight tracing for triage turns.
+A turn is a tree of spans (history load, scrub, prompt build, provider
+call, parse, commit) timed with the monotonic clock. Span durations are
+aggregated into the `meditriage_triage_stage_seconds` histogram and, when
+TRACING_OTLP_ENDPOINT is set, each finished trace is posted to a local
+collector as OTLP/HTTP JSON.
+
+With TRACING_ENABLED off (the default) `span()` returns a shared no-op
+object, so instrumented code pays one flag check per stage.
+"""
+import asyncio
+import functools
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+import httpx
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import Histogram
+
+logger = get_logger(__name__)
+
+STAGE_SECONDS = Histogram(
+    "meditriage_triage_stage_seconds",
+    "Time spent in each stage of a triage turn.",
+    labelnames=("stage",),
+)
+
+
+class _Trace:
+    """Finished spans of one trace, exported together when the root span ends."""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: list["Span"] = []
+
+
+class Span:
+    """A timed, named unit of work. Use as a context manager via `span()`."""
+
+    def __init__(self, name: str, trace: _Trace, parent: Optional["Span"], attributes: dict):
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_unix_ns = 0
+        self.duration = 0.0
+        self._started = 0.0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_unix_ns = time.time_ns()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration = time.perf_counter() - self._started
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        STAGE_SECONDS.observe(self.duration, stage=self.name)
+        self.trace.spans.append(self)
+        if self.parent is None:
+            _export(self.trace)
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+_enabled: Optional[bool] = None
+_otlp_endpoint: Optional[str] = None
+_service_name = "meditriage-api"
+_export_tasks: set = set()
+
+
+def configure_tracing(
+    enabled: Optional[bool] = None,
+    otlp_endpoint: Optional[str] = None,
+    service_name: Optional[str] = None,
+) -> None:
+    """Override (or, with no arguments, reload from settings) the tracing configuration."""
+    global _enabled, _otlp_endpoint, _service_name
+    settings = get_settings()
+    _enabled = settings.TRACING_ENABLED if enabled is None else enabled
+    _otlp_endpoint = (settings.TRACING_OTLP_ENDPOINT if otlp_endpoint is None else otlp_endpoint) or None
+    _service_name = service_name or settings.TRACING_SERVICE_NAME
+
+
+def is_enabled() -> bool:
+    if _enabled is None:
+        configure_tracing()
+    return _enabled
+
+
+def span(name: str, **attributes: Any):
+    """
+    Time a stage. Nested spans become children of the enclosing one; a span
+    opened with no enclosing span starts a new trace.
+
+    Usage:
+        with span("scrub"):
+            sanitized = await scrubber.scrub(message)
+    """
+    if not is_enabled():
+        return _NOOP_SPAN
+    parent = _current_span.get()
+    trace = parent.trace if parent is not None else _Trace()
+    return Span(name, trace, parent, attributes)
+
+
+def current_span():
+    """The innermost open span (a no-op span when there is none)."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def traced(name: str):
+    """Decorator: run an async function inside a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_stage_timings() -> dict:
+    return {"enabled": is_enabled(), "stages": STAGE_SECONDS.snapshot()}
+
+
+# ── OTLP/HTTP JSON export ──────────────────────────────────────────────────
+
+def _attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def to_otlp_json(trace: _Trace) -> dict:
+    """Encode a finished trace as an OTLP ExportTraceServiceRequest (JSON mapping)."""
+    spans = []
+    for finished in trace.spans:
+        encoded = {
+            "traceId": trace.trace_id,
+            "spanId": finished.span_id,
+            "name": finished.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(finished.start_unix_ns),
+            "endTimeUnixNano": str(finished.start_unix_ns + int(finished.duration * 1e9)),
+            "attributes": [_attribute(key, value) for key, value in finished.attributes.items()],
+            "status": {"code": 2, "message": finished.error} if finished.error else {"code": 1},
+        }
+        if finished.parent is not None:
+            encoded["parentSpanId"] = finished.parent.span_id
+        spans.append(encoded)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", _service_name)]},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+async def _post_trace(endpoint: str, payload: dict) -> None:
+    try:
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            await client.post(endpoint, json=payload)
+    except httpx.HTTPError as e:
+        logger.debug(f"Trace export to {endpoint} failed: {e}")
+
+
+def _export(trace: _Trace) -> None:
+    """Post the trace in the background; tracing never delays or fails the request."""
+    if not _otlp_endpoint:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_post_trace(_otlp_endpoint, to_otlp_json(trace)))
+    _export_tasks.add(task)
+    task.add_done_callback(_export_tasks.discard)
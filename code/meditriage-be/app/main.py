@@ -1,12 +1,20 @@
 """
 MediTriage API — FastAPI Application Entry Point.
 """
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import get_settings
 from app.core.logging import setup_logging, get_logger
 from app.api.v1.api import api_router
+from app.core.instrumentation import PrometheusMiddleware, instrument_engine
+from app.core import query_profiler
+from app.core.profiler import RequestProfilingMiddleware
+from app.db.session import engine
+from app.services.llm.circuit_breaker import run_health_probes
+from app.services.patient_lookup import run_index_refresh
+from app.services.partitioning import run_partition_maintenance
 
 settings = get_settings()
 logger = get_logger(__name__)
@@ -14,7 +22,7 @@ logger = get_logger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan: initialize logging on startup."""
+    """Application lifespan: initialize logging and background health probes on startup."""
     # Startup: Initialize logging
     setup_logging(
         log_level=settings.LOG_LEVEL,
@@ -23,8 +31,21 @@ async def lifespan(app: FastAPI):
         enable_file=True,
     )
     logger.info(f"Starting {settings.PROJECT_NAME}")
+
+    # Background probes close AI dependency circuits as soon as they recover
+    probe_task = asyncio.create_task(run_health_probes(settings.CIRCUIT_PROBE_INTERVAL))
+    background_tasks = [probe_task]
+    # Monthly partitions are created ahead of time so inserts never land in the default partition
+    background_tasks.append(asyncio.create_task(run_partition_maintenance(settings.PARTITION_MONTHS_AHEAD)))
+    # Type-ahead index: built in the background, lookups fall back to the DB until it is ready
+    if settings.PATIENT_LOOKUP_INDEX_ENABLED:
+        background_tasks.append(asyncio.create_task(run_index_refresh(settings.PATIENT_LOOKUP_REFRESH_SECONDS)))
     yield
     # Shutdown
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
     logger.info(f"Shutting down {settings.PROJECT_NAME}")
 
 
@@ -41,8 +62,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Request latency / in-flight / per-request DB metrics (served at /api/v1/metrics)
+app.add_middleware(PrometheusMiddleware)
+instrument_engine(engine)
+
+# Debug: per-request SQL profile headers, N+1 warnings and the slow-query log
+if settings.QUERY_PROFILING_ENABLED:
+    query_profiler.install(engine)
+    query_profiler.configure_slow_query_log(settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_LOG_FILE)
+    app.add_middleware(query_profiler.QueryProfilingMiddleware, n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD)
+
+# Sample a single request sent with "X-Profile: <PROFILING_REQUEST_TOKEN>"
+if settings.PROFILING_REQUEST_TOKEN:
+    app.add_middleware(RequestProfilingMiddleware, token=settings.PROFILING_REQUEST_TOKEN)
+
 # Mount API v1 routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
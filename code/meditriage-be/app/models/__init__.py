@@ -5,11 +5,13 @@ Exports all models for easy importing and Alembic discovery.
 from .base import Base
 from .auth import Auth
 from .user import User, UserRole
-from .patient import Patient
+from .patient import Patient, PatientBlockingKey, PatientDuplicatePair
 from .clinical import (
     MedicalEncounter,
     TriageInteraction,
     ClinicalNote,
+    ArchivedEncounter,
+    EncounterQueueEntry,
     EncounterStatus,
     SenderType
 )
@@ -28,9 +30,13 @@ __all__ = [
     "User",
     "UserRole",
     "Patient",
+    "PatientBlockingKey",
+    "PatientDuplicatePair",
     "MedicalEncounter",
     "TriageInteraction",
     "ClinicalNote",
+    "ArchivedEncounter",
+    "EncounterQueueEntry",
     "EncounterStatus",
     "SenderType",
     "ConsultationRoom",
@@ -1,11 +1,12 @@
 """
 Clinical models for medical encounters, triage interactions, and clinical notes.
-Contains MedicalEncounter, TriageInteraction, and ClinicalNote models.
+Contains MedicalEncounter, TriageInteraction, ClinicalNote, ArchivedEncounter and
+EncounterQueueEntry models.
 """
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Boolean, Integer, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Boolean, Integer, Float, DateTime, ForeignKey, Index, LargeBinary, desc, Enum as SQLEnum
 
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -32,6 +33,10 @@ class MedicalEncounter(Base):
     Links patient, nurse (conducting triage), and doctor (reviewing).
     """
     __tablename__ = "medical_encounters"
+    __table_args__ = (
+        # Patient history: newest-first keyset pages without a sort
+        Index("ix_medical_encounters_patient_timestamp", "patient_id", "encounter_timestamp"),
+    )
 
     # Primary Key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -49,7 +54,7 @@ class MedicalEncounter(Base):
 
     # Audit Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # export watermark
     deleted_at = Column(DateTime, nullable=True)
 
     # Relationships
@@ -69,12 +74,17 @@ class TriageInteraction(Base):
     Records AI, patient, and nurse messages during triage.
     """
     __tablename__ = "triage_interactions"
+    __table_args__ = (
+        # Transcript of one encounter in order; built per monthly partition on Postgres
+        Index("ix_triage_interactions_encounter_timestamp", "encounter_id", "timestamp"),
+        {"postgresql_partition_by": 'RANGE ("timestamp")'},
+    )
 
-    # Primary Key
+    # Primary Key (includes the partition key, as Postgres requires)
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     # Foreign Key
-    encounter_id = Column(UUID(as_uuid=True), ForeignKey("medical_encounters.id"), nullable=False, index=True)
+    encounter_id = Column(UUID(as_uuid=True), ForeignKey("medical_encounters.id"), nullable=False)
 
     # Interaction Details
     sender_type = Column(SQLEnum(SenderType), nullable=False)
@@ -85,8 +95,8 @@ class TriageInteraction(Base):
     transcription_confidence = Column(Float, nullable=True)
 
     # Timestamp
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, primary_key=True)  # monthly partition key
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)  # export watermark
 
     # Relationships
     encounter = relationship("MedicalEncounter", back_populates="interactions")
@@ -120,10 +130,91 @@ class ClinicalNote(Base):
 
     # Audit Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # export watermark
 
     # Relationships
     encounter = relationship("MedicalEncounter", back_populates="clinical_note")
 
     def __repr__(self):
         return f"<ClinicalNote(id={self.id}, encounter_id={self.encounter_id}, version={self.version}, finalized={self.is_finalized})>"
+
+
+class ArchivedEncounter(Base):
+    """
+    Completed encounter moved out of the hot tables by the archival job.
+    The columns are the lookup index used by patient history; the transcript
+    and SOAP note are kept as one gzipped JSON document.
+    """
+    __tablename__ = "archived_encounters"
+    __table_args__ = (
+        Index("ix_archived_encounters_patient_timestamp", "patient_id", "encounter_timestamp"),
+    )
+
+    # Primary Key (the original encounter id)
+    id = Column(UUID(as_uuid=True), primary_key=True)
+
+    # Foreign Keys
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id"), nullable=False)
+    nurse_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    doctor_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+
+    # Encounter Details
+    status = Column(SQLEnum(EncounterStatus), nullable=False)
+    is_urgent = Column(Boolean, nullable=False)
+    chief_complaint = Column(String(500), nullable=True)
+    encounter_timestamp = Column(DateTime, nullable=False)
+
+    # Audit Timestamps
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Interactions and clinical note (see app/services/encounter_archive.py)
+    payload = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f"<ArchivedEncounter(id={self.id}, patient_id={self.patient_id}, archived_at={self.archived_at})>"
+
+
+class EncounterQueueEntry(Base):
+    """
+    Dashboard queue read model: one row per encounter on the queue, with the
+    patient and doctor names copied in. Maintained by the encounter write
+    paths (see app/services/encounter_queue.py), so reading the queue is a
+    scan of one index in queue order.
+    """
+    __tablename__ = "encounter_queue"
+    __table_args__ = (
+        # Queue order; the other columns ride along (INCLUDE) on Postgres for index-only scans
+        Index(
+            "ix_encounter_queue_order", desc("is_urgent"), "encounter_timestamp", "encounter_id",
+            postgresql_include=[
+                "completed_at", "patient_id", "patient_name", "nurse_id", "doctor_id", "doctor_name",
+                "status", "chief_complaint", "last_activity_at", "note_ready",
+            ],
+        ),
+    )
+
+    # Primary Key (one entry per encounter)
+    encounter_id = Column(UUID(as_uuid=True), ForeignKey("medical_encounters.id", ondelete="CASCADE"), primary_key=True)
+
+    # People (names denormalized from patients / users)
+    patient_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    patient_name = Column(String(201), nullable=False)
+    nurse_id = Column(UUID(as_uuid=True), nullable=False)
+    doctor_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    doctor_name = Column(String(255), nullable=True)
+
+    # Queue State
+    status = Column(SQLEnum(EncounterStatus), nullable=False)
+    is_urgent = Column(Boolean, nullable=False)
+    chief_complaint = Column(String(500), nullable=True)
+    note_ready = Column(Boolean, default=False, nullable=False)  # SOAP draft generated
+
+    # Timestamps
+    encounter_timestamp = Column(DateTime, nullable=False)
+    last_activity_at = Column(DateTime, nullable=False)  # latest triage turn
+    completed_at = Column(DateTime, nullable=True)       # leaves the queue QUEUE_COMPLETED_WINDOW_HOURS later
+
+    def __repr__(self):
+        return f"<EncounterQueueEntry(encounter_id={self.encounter_id}, status={self.status.value}, urgent={self.is_urgent})>"
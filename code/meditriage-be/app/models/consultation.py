@@ -4,7 +4,7 @@ Models for Consultation Chat Room feature.
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, ForeignKey, Enum as SQLEnum, UniqueConstraint
+from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, ForeignKey, Index, Enum as SQLEnum, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -60,26 +60,36 @@ class RoomMembership(Base):
 
 class ConsultationMessage(Base):
     __tablename__ = "consultation_messages"
+    __table_args__ = (
+        # Room history newest-first; built per monthly partition on Postgres
+        Index("ix_consultation_messages_room_created", "room_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    room_id = Column(UUID(as_uuid=True), ForeignKey("consultation_rooms.id"), nullable=False, index=True)
+    room_id = Column(UUID(as_uuid=True), ForeignKey("consultation_rooms.id"), nullable=False)
     sender_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True, index=True)
     content = Column(Text, nullable=False) # AES-encrypted
     message_type = Column(SQLEnum(MessageType), nullable=False, default=MessageType.TEXT)
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True)  # monthly partition key
 
     # Relationships
     room = relationship("ConsultationRoom", back_populates="messages")
     sender = relationship("User", foreign_keys=[sender_id])
-    attachment = relationship("ConsultationAttachment", back_populates="message", uselist=False, cascade="all, delete-orphan")
+    attachment = relationship(
+        "ConsultationAttachment",
+        primaryjoin="ConsultationMessage.id == foreign(ConsultationAttachment.message_id)",
+        back_populates="message", uselist=False, cascade="all, delete-orphan",
+    )
 
 
 class ConsultationAttachment(Base):
     __tablename__ = "consultation_attachments"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    message_id = Column(UUID(as_uuid=True), ForeignKey("consultation_messages.id"), unique=True, nullable=False, index=True)
+    # No FK: a partitioned table can only be referenced through its full key (id, created_at)
+    message_id = Column(UUID(as_uuid=True), unique=True, nullable=False, index=True)
     room_id = Column(UUID(as_uuid=True), ForeignKey("consultation_rooms.id"), nullable=False, index=True)
     uploader_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
@@ -91,6 +101,10 @@ class ConsultationAttachment(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    message = relationship("ConsultationMessage", back_populates="attachment")
+    message = relationship(
+        "ConsultationMessage",
+        primaryjoin="foreign(ConsultationAttachment.message_id) == ConsultationMessage.id",
+        back_populates="attachment",
+    )
     room = relationship("ConsultationRoom")
     uploader = relationship("User", foreign_keys=[uploader_id])
@@ -6,7 +6,7 @@ Clinical data is stored separately in medical encounters.
 import uuid
 import enum
 from datetime import datetime, date
-from sqlalchemy import Column, String, Date, DateTime, Enum
+from sqlalchemy import Column, String, Date, DateTime, Enum, Float, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -33,6 +33,8 @@ class Patient(Base):
     national_id = Column(String(20), unique=True, nullable=False, index=True)
 
     # Demographics
+    # Name search uses a pg_trgm GIN index on lower(first_name || ' ' || last_name),
+    # created by migration (see app/services/patient_search.py)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     date_of_birth = Column(Date, nullable=False)
@@ -48,6 +50,34 @@ class Patient(Base):
     # Relationships
     # One patient can have many encounters
     encounters = relationship("MedicalEncounter", back_populates="patient")
+    # Precomputed keys for duplicate-candidate lookup (see duplicate_detection.py)
+    blocking_keys = relationship("PatientBlockingKey", back_populates="patient", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Patient(id={self.id}, name={self.first_name} {self.last_name})>"
+
+
+class PatientBlockingKey(Base):
+    """
+    Duplicate-detection blocking key of a patient (e.g. DOB plus phonetic
+    first name). Patients sharing a key are candidate duplicates.
+    """
+    __tablename__ = "patient_blocking_keys"
+
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(80), primary_key=True, index=True)
+
+    patient = relationship("Patient", back_populates="blocking_keys")
+
+
+class PatientDuplicatePair(Base):
+    """
+    A likely duplicate pair found by the last full duplicate scan
+    (scripts/scan_duplicates.py); each scan replaces the whole table.
+    """
+    __tablename__ = "patient_duplicate_pairs"
+
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+    other_patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False, index=True)
+    scanned_at = Column(DateTime, nullable=False)
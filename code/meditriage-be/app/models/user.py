@@ -6,7 +6,7 @@ Authentication credentials are managed in the Auth model.
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, String, DateTime, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -34,6 +34,7 @@ class User(Base):
     role = Column(SQLEnum(UserRole), nullable=False)
     license_number = Column(String(50), nullable=True)
     full_name = Column(String(255), nullable=False)
+    is_available = Column(Boolean, default=True, nullable=False)  # doctors: taking patients (queue scheduler)
 
     # Audit Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -3,7 +3,7 @@ Database operations for Consultation Chat Room feature.
 Purely handles database I/O. Encryption boundary is above this layer (in the service).
 """
 from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from uuid import UUID
 from app.models.consultation import (
     ConsultationRoom,
@@ -30,6 +30,7 @@ def get_rooms_for_doctor(db: Session, doctor_id: UUID) -> List[ConsultationRoom]
     return (
         db.query(ConsultationRoom)
         .join(RoomMembership)
+        .options(selectinload(ConsultationRoom.memberships))
         .filter(RoomMembership.doctor_id == doctor_id, RoomMembership.is_active == True)
         .order_by(ConsultationRoom.created_at.desc())
         .all()
@@ -51,6 +51,18 @@ class EncounterListItem(BaseModel):
         from_attributes = True
 
 
+class PrioritizedEncounterItem(EncounterListItem):
+    """Queue item as ranked by the priority scheduler (earliest SLA deadline first)."""
+    sla_deadline: datetime               # arrival + review target for the encounter's acuity
+    sla_used: float                      # fraction of the target already waited (> 1: breached)
+    overdue: bool
+
+
+class DoctorAvailabilityUpdate(BaseModel):
+    """Request schema for marking a doctor (un)available to the queue scheduler."""
+    available: bool = Field(..., description="Whether the doctor is currently seeing patients")
+
+
 class EncounterUpdateRequest(BaseModel):
     """Request schema for updating encounter fields (urgency toggle and/or doctor assignment)."""
     is_urgent: Optional[bool] = Field(None, description="Mark encounter as urgent")
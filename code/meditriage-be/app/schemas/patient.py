@@ -50,6 +50,59 @@ class PatientSearchQuery(BaseModel):
     name: Optional[str] = Field(None, description="Name for partial match (first or last)")
 
 
+class PatientLookupItem(BaseModel):
+    """Type-ahead suggestion for the admission desk."""
+    id: UUID
+    national_id: str
+    first_name: str
+    last_name: str
+    date_of_birth: date
+
+    class Config:
+        from_attributes = True
+
+
+class DuplicateCandidateResponse(BaseModel):
+    """An existing patient that is probably the same person, with its match score (0-1)."""
+    patient: PatientResponse
+    score: float
+
+    class Config:
+        from_attributes = True
+
+
+class DuplicatePairResponse(BaseModel):
+    """Two existing patients that are probably the same person."""
+    patient_id: UUID
+    other_patient_id: UUID
+    score: float
+    scanned_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ImportRowErrorResponse(BaseModel):
+    """A rejected row of a bulk import."""
+    line: int
+    national_id: Optional[str]
+    error: str
+
+    class Config:
+        from_attributes = True
+
+
+class PatientImportReport(BaseModel):
+    """Outcome of a bulk import (errors are capped; `failed` counts all of them)."""
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ImportRowErrorResponse]
+
+    class Config:
+        from_attributes = True
+
+
 class EncounterSummary(BaseModel):
     """Summary of a medical encounter for patient history."""
     id: UUID
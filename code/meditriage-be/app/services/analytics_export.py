@@ -0,0 +1,243 @@
+"""
+Analytics export.
+Streams encounters, clinical notes and triage interactions to Parquet or
+NDJSON files for the analytics warehouse.
+
+Rows are read with a column-projected query and `yield_per` (a server-side
+cursor on Postgres), then written one batch at a time, so memory use is
+bounded by the batch size rather than the table size.
+
+Incremental exports take the previous run's watermark: only rows changed
+after it (updated_at; created_at for the append-only interactions) and up
+to this run's watermark are written. created_at/updated_at are set when a
+row is flushed, not when its transaction commits, so this run's watermark
+lags the clock by EXPORT_WATERMARK_LAG_SECONDS, which settings require to
+exceed the longest triage transaction: the SOAP lock wait plus every
+scrubber and provider call made between the first flush and the commit,
+each capped at LLM_CALL_TIMEOUT_SECONDS. Rows of a transaction still open
+when the export starts fall after the watermark and are picked up by the
+next run.
+
+Exports carry clinical text (transcripts, SOAP notes) keyed by patient_id,
+but no patient demographics.
+"""
+import json
+import os
+import time
+from operator import attrgetter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import Boolean, DateTime, Enum, Float, Integer, Uuid, and_, select
+from sqlalchemy.orm import Session
+from app.models.clinical import ClinicalNote, MedicalEncounter, TriageInteraction
+from app.core.config import get_settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+FORMATS = ("parquet", "ndjson")
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """One exported table: its columns and the column incremental exports filter on."""
+    name: str
+    columns: tuple
+    watermark: object
+
+
+DATASETS = (
+    Dataset("encounters", (
+        MedicalEncounter.id, MedicalEncounter.patient_id, MedicalEncounter.nurse_id, MedicalEncounter.doctor_id,
+        MedicalEncounter.status, MedicalEncounter.is_urgent, MedicalEncounter.chief_complaint,
+        MedicalEncounter.encounter_timestamp, MedicalEncounter.created_at, MedicalEncounter.updated_at,
+        MedicalEncounter.deleted_at,
+    ), MedicalEncounter.updated_at),
+    Dataset("clinical_notes", (
+        ClinicalNote.id, ClinicalNote.encounter_id, ClinicalNote.subjective, ClinicalNote.objective,
+        ClinicalNote.assessment, ClinicalNote.plan, ClinicalNote.is_finalized, ClinicalNote.version,
+        ClinicalNote.created_at, ClinicalNote.updated_at,
+    ), ClinicalNote.updated_at),
+    Dataset("triage_interactions", (
+        TriageInteraction.id, TriageInteraction.encounter_id, TriageInteraction.sender_type,
+        TriageInteraction.message_content, TriageInteraction.audio_url,
+        TriageInteraction.transcription_confidence, TriageInteraction.timestamp, TriageInteraction.created_at,
+    ), TriageInteraction.created_at),
+)
+
+
+def _converters(columns: tuple, iso_datetimes: bool) -> list:
+    """Per-column functions turning values into JSON/Arrow-friendly ones (None: keep as is)."""
+    converters = []
+    for column in columns:
+        if isinstance(column.type, Uuid):
+            converters.append(str)
+        elif isinstance(column.type, Enum):
+            converters.append(attrgetter("value"))
+        elif iso_datetimes and isinstance(column.type, DateTime):
+            converters.append(datetime.isoformat)
+        else:
+            converters.append(None)
+    return converters
+
+
+def _convert_column(values: list, converter) -> list:
+    if converter is None:
+        return values
+    return [None if value is None else converter(value) for value in values]
+
+
+class NdjsonWriter:
+    """One JSON object per line; datetimes in ISO 8601."""
+
+    def __init__(self, path: Path, columns: tuple):
+        self.names = [column.name for column in columns]
+        self.converters = _converters(columns, iso_datetimes=True)
+        self._file = path.open("w", encoding="utf-8")
+
+    def write_batch(self, rows: list) -> None:
+        # Convert column-wise: one pass per column instead of a type check per value
+        values = [_convert_column(list(column), converter) for column, converter in zip(zip(*rows), self.converters)]
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        names = self.names
+        self._file.write("".join(encode(dict(zip(names, row))) + "\n" for row in zip(*values)))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    """Appends one row group per batch, with a schema derived from the column types."""
+
+    def __init__(self, path: Path, columns: tuple):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow), or use NDJSON") from e
+        self._pa = pa
+        self.schema = pa.schema([(column.name, self._arrow_type(column.type)) for column in columns])
+        self.converters = _converters(columns, iso_datetimes=False)
+        self._writer = pq.ParquetWriter(str(path), self.schema, compression="zstd")
+
+    def _arrow_type(self, column_type):
+        pa = self._pa
+        if isinstance(column_type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(column_type, Boolean):
+            return pa.bool_()
+        if isinstance(column_type, Integer):
+            return pa.int64()
+        if isinstance(column_type, Float):
+            return pa.float64()
+        return pa.string()  # String, Text, UUID, Enum
+
+    def write_batch(self, rows: list) -> None:
+        arrays = [
+            self._pa.array(_convert_column(list(column), converter), type=field.type)
+            for column, converter, field in zip(zip(*rows), self.converters, self.schema)
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+_WRITERS = {"parquet": ParquetWriter, "ndjson": NdjsonWriter}
+
+
+@dataclass
+class ExportedFile:
+    dataset: str
+    path: str
+    rows: int
+
+
+@dataclass
+class ExportManifest:
+    """Written next to the files as manifest.json; `until` is the next run's `since`."""
+    format: str
+    since: Optional[str]
+    until: str
+    files: list[ExportedFile] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def export_dataset(
+    db: Session,
+    dataset: Dataset,
+    out_dir: Path,
+    file_format: str,
+    since: Optional[datetime],
+    until: datetime,
+    batch_size: int,
+) -> ExportedFile:
+    """Stream one dataset's rows changed in (since, until] to a file."""
+    condition = dataset.watermark <= until
+    if since is not None:
+        condition = and_(dataset.watermark > since, condition)
+    query = select(*dataset.columns).where(condition).execution_options(yield_per=batch_size)
+
+    extension = "parquet" if file_format == "parquet" else "ndjson"
+    path = out_dir / f"{dataset.name}.{extension}"
+    partial = path.with_suffix(path.suffix + ".partial")
+    writer = _WRITERS[file_format](partial, dataset.columns)
+    rows = 0
+    try:
+        for batch in db.execute(query).partitions():
+            writer.write_batch(batch)
+            rows += len(batch)
+    finally:
+        writer.close()
+    os.replace(partial, path)  # readers never see a half-written file
+    return ExportedFile(dataset.name, str(path), rows)
+
+
+def run_export(
+    db: Session,
+    out_dir: Path,
+    file_format: str = "parquet",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+) -> ExportManifest:
+    """
+    Export every dataset to `out_dir` and write manifest.json.
+
+    Args:
+        db: Database session
+        out_dir: Directory for this run's files (created if missing)
+        file_format: "parquet" or "ndjson"
+        since: Previous run's watermark; None exports everything
+        until: This run's watermark (default: now minus EXPORT_WATERMARK_LAG_SECONDS)
+        batch_size: Rows fetched and written per batch (default EXPORT_BATCH_SIZE)
+
+    Returns:
+        ExportManifest
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown export format {file_format!r}: expected one of {FORMATS}")
+    settings = get_settings()
+    until = until or datetime.utcnow() - timedelta(seconds=settings.EXPORT_WATERMARK_LAG_SECONDS)
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    manifest = ExportManifest(file_format, since.isoformat() if since else None, until.isoformat())
+    for dataset in DATASETS:
+        exported = export_dataset(db, dataset, out_dir, file_format, since, until, batch_size)
+        manifest.files.append(exported)
+        logger.info(f"Exported {exported.rows} {dataset.name} rows to {exported.path}")
+    manifest.seconds = round(time.perf_counter() - started, 3)
+
+    (out_dir / "manifest.json").write_text(json.dumps(asdict(manifest), indent=2), encoding="utf-8")
+    return manifest
+
+
+def read_watermark(state_file: Path) -> Optional[datetime]:
+    """The `until` of the manifest saved by the previous run, if any."""
+    if not state_file.exists():
+        return None
+    return datetime.fromisoformat(json.loads(state_file.read_text(encoding="utf-8"))["until"])
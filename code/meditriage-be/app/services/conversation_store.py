@@ -0,0 +1,96 @@
+"""
+Conversation state store for triage interviews.
+Keeps each active encounter's chat history and transcript in memory so a
+turn can be served without re-querying and re-hydrating the whole
+TriageInteraction log. The database stays the source of truth: a state
+missing from the store (evicted, or after a restart) is rebuilt from it
+by triage_engine.load_triage_context.
+
+Turns are appended only after the transaction that saved them commits,
+so a failed turn never leaves the cache ahead of the database. The store
+is per process: with several workers, turns served elsewhere leave a
+worker's cached state behind. load_triage_context compares each cached
+state's turn count with the interaction count it reads anyway and rebuilds
+the state when they differ.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+from uuid import UUID
+from app.models.clinical import TriageInteraction, SenderType
+from app.core.config import get_settings
+
+
+@dataclass
+class ConversationState:
+    """Chat history (provider format) and transcript lines for one encounter."""
+    history: list[dict] = field(default_factory=list)
+    transcript_lines: list[str] = field(default_factory=list)
+
+    def append(self, sender_type: SenderType, content: str) -> None:
+        """Add one turn. Maps: AI → assistant, PATIENT/NURSE → user."""
+        role = "assistant" if sender_type == SenderType.AI else "user"
+        self.history.append({"role": role, "content": content})
+        self.transcript_lines.append(f"{sender_type.value}: {content}")
+
+    @property
+    def transcript(self) -> str:
+        return "\n".join(self.transcript_lines)
+
+    @classmethod
+    def from_interactions(cls, interactions: list[TriageInteraction]) -> "ConversationState":
+        state = cls()
+        for interaction in interactions:
+            state.append(interaction.sender_type, interaction.message_content)
+        return state
+
+
+class ConversationStore:
+    """
+    Bounded LRU of ConversationState keyed by encounter id.
+
+    Args:
+        max_encounters: States kept in memory; 0 disables caching.
+    """
+
+    def __init__(self, max_encounters: int = 2000):
+        self.max_encounters = max_encounters
+        self._states: OrderedDict[UUID, ConversationState] = OrderedDict()
+
+    def get(self, encounter_id: UUID) -> Optional[ConversationState]:
+        state = self._states.get(encounter_id)
+        if state is not None:
+            self._states.move_to_end(encounter_id)
+        return state
+
+    def put(self, encounter_id: UUID, state: ConversationState) -> ConversationState:
+        if self.max_encounters <= 0:
+            return state
+        self._states[encounter_id] = state
+        self._states.move_to_end(encounter_id)
+        while len(self._states) > self.max_encounters:
+            self._states.popitem(last=False)
+        return state
+
+    def append(self, encounter_id: UUID, sender_type: SenderType, content: str) -> None:
+        """Append a committed turn to a cached state (no-op if not cached)."""
+        state = self.get(encounter_id)
+        if state is not None:
+            state.append(sender_type, content)
+
+    def discard(self, encounter_id: UUID) -> None:
+        self._states.pop(encounter_id, None)
+
+    def clear(self) -> None:
+        self._states.clear()
+
+
+_store: Optional[ConversationStore] = None
+
+
+def get_conversation_store() -> ConversationStore:
+    """Process-wide store, sized from CONVERSATION_CACHE_SIZE on first use."""
+    global _store
+    if _store is None:
+        _store = ConversationStore(get_settings().CONVERSATION_CACHE_SIZE)
+    return _store
@@ -0,0 +1,375 @@
+"""
+Duplicate-patient detection.
+Finds records that are probably the same person registered twice, e.g.
+with a mistyped NIC or a differently transliterated name
+("Wijesinghe" / "Vijesinhe", "Fernando" / "Pernando").
+
+Blocking: every patient has a few precomputed keys in
+patient_blocking_keys (DOB plus the phonetic key of the first or last name,
+birth year plus both name keys, and the NIC in canonical form). Only
+patients sharing a key are compared, so a registration check is a single
+indexed lookup whatever the size of the table.
+
+Scoring: candidates are ranked by a weighted Jaro-Winkler name similarity
+(either name order), NIC edit similarity and DOB agreement.
+
+`scan_duplicates` runs the same comparison over the whole table, scoring
+blocks in parallel worker processes. It can take minutes, so it runs in
+scripts/scan_duplicates.py (cron, or a subprocess started by
+`start_scan`), which stores its pairs in patient_duplicate_pairs; the API
+serves the stored result (`stored_duplicates`).
+"""
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from itertools import combinations
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from app.models.patient import Patient, PatientBlockingKey, PatientDuplicatePair
+from app.core.config import get_settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# ── Phonetic key ───────────────────────────────────────────────────────────
+
+# Applied in order. Romanized Sinhala/Tamil spells one sound many ways:
+# aspirates (th/t, dh/d, bh/b), w/v, f/p, s/sh, "singhe"/"sinhe", "swamy"/"samy".
+_TRANSLITERATIONS = [
+    ("ngh", "n"), ("ng", "n"), ("zh", "l"), ("sch", "s"), ("sh", "s"), ("ch", "C"),
+    ("th", "t"), ("dh", "d"), ("bh", "b"), ("kh", "k"), ("gh", "g"), ("jh", "j"), ("ph", "p"),
+    ("sw", "s"), ("ck", "k"), ("x", "ks"), ("q", "k"), ("c", "k"), ("f", "p"), ("w", "v"), ("z", "s"),
+]
+_VOWELS = set("aeiouy")
+_NON_LETTERS = re.compile(r"[^a-z]")
+PHONETIC_KEY_LENGTH = 6
+
+
+def phonetic_key(name: str) -> str:
+    """
+    Metaphone-style key tolerant of Sinhala/Tamil transliteration variants.
+    Keeps the consonant skeleton (an initial vowel becomes "A"), so
+    "Wijesinghe" and "Vijesinhe" both give "VJSN".
+    """
+    word = _NON_LETTERS.sub("", name.lower())
+    if not word:
+        return ""
+    for spelling, sound in _TRANSLITERATIONS:
+        word = word.replace(spelling, sound)
+    key = "A" if word[0] in _VOWELS else ""
+    for char in word:
+        if char in _VOWELS or char == "h":
+            continue
+        char = char.upper()
+        if not key or key[-1] != char:
+            key += char
+    return key[:PHONETIC_KEY_LENGTH]
+
+
+# ── Normalization and similarity ───────────────────────────────────────────
+
+_OLD_NIC = re.compile(r"^(\d{2})(\d{3})(\d{4})[vx]$")
+
+
+def normalize_nic(national_id: str) -> str:
+    """
+    Canonical 12-digit form of a Sri Lankan NIC. The old 9-digit + V/X
+    format (YYDDDSSSC) maps to the new one (19YYDDD0SSSC), so both formats
+    of one person's NIC compare equal.
+    """
+    nic = re.sub(r"[\s-]", "", national_id).lower()
+    match = _OLD_NIC.match(nic)
+    if match:
+        year, day, serial = match.groups()
+        return f"19{year}{day}0{serial}"
+    return nic
+
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler similarity in [0, 1]."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    a_matched, b_matched = [False] * len(a), [False] * len(b)
+    matches = 0
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_matched[j] and b[j] == char:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    if matches == 0:
+        return 0.0
+    a_chars = [char for char, matched in zip(a, a_matched) if matched]
+    b_chars = [char for char, matched in zip(b, b_matched) if matched]
+    transpositions = sum(x != y for x, y in zip(a_chars, b_chars)) / 2
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+class PatientIdentity(NamedTuple):
+    """The fields duplicate detection compares."""
+    national_id: str
+    first_name: str
+    last_name: str
+    date_of_birth: date
+
+
+def _name(first: str, last: str) -> str:
+    return " ".join(f"{first} {last}".lower().split())
+
+
+def _dob_similarity(a: date, b: date) -> float:
+    if a == b:
+        return 1.0
+    # Day and month swapped on the form
+    if a.year == b.year and a.day == b.month and a.month == b.day:
+        return 0.8
+    if a.year == b.year and (a.month == b.month or a.day == b.day):
+        return 0.5
+    return 0.0
+
+
+# Weights of name, NIC and DOB similarity in the match score
+NAME_WEIGHT, NIC_WEIGHT, DOB_WEIGHT = 0.5, 0.3, 0.2
+
+
+def match_score(a: PatientIdentity, b: PatientIdentity) -> float:
+    """Likelihood-like score in [0, 1] that two records are the same person."""
+    name_a = _name(a.first_name, a.last_name)
+    name_score = max(
+        jaro_winkler(name_a, _name(b.first_name, b.last_name)),
+        jaro_winkler(name_a, _name(b.last_name, b.first_name)),
+    )
+    nic_a, nic_b = normalize_nic(a.national_id), normalize_nic(b.national_id)
+    nic_score = 1 - levenshtein(nic_a, nic_b) / max(len(nic_a), len(nic_b), 1)
+    return round(
+        NAME_WEIGHT * name_score + NIC_WEIGHT * nic_score + DOB_WEIGHT * _dob_similarity(a.date_of_birth, b.date_of_birth),
+        4,
+    )
+
+
+# ── Blocking keys ──────────────────────────────────────────────────────────
+
+def blocking_keys(identity: PatientIdentity) -> set[str]:
+    """Keys under which a patient is indexed; patients sharing any key are compared."""
+    dob = identity.date_of_birth
+    first, last = phonetic_key(identity.first_name), phonetic_key(identity.last_name)
+    keys = {f"nic:{normalize_nic(identity.national_id)}"}
+    if first:
+        keys.add(f"dob:{dob.isoformat()}:{first}")
+    if last:
+        keys.add(f"dob:{dob.isoformat()}:{last}")
+    if first and last:
+        # Name order independent, so a first/last swap still blocks together
+        keys.add(f"year:{dob.year}:{':'.join(sorted((first, last)))}")
+    return keys
+
+
+def identity_of(patient: Patient) -> PatientIdentity:
+    return PatientIdentity(patient.national_id, patient.first_name, patient.last_name, patient.date_of_birth)
+
+
+def refresh_blocking_keys(patient: Patient) -> None:
+    """Bring the patient's stored keys in line with its current fields (flushed with the patient)."""
+    wanted = blocking_keys(identity_of(patient))
+    for stored in list(patient.blocking_keys):
+        if stored.key not in wanted:
+            patient.blocking_keys.remove(stored)
+    existing = {stored.key for stored in patient.blocking_keys}
+    for key in sorted(wanted - existing):
+        patient.blocking_keys.append(PatientBlockingKey(key=key))
+
+
+@dataclass
+class DuplicateCandidate:
+    patient: Patient
+    score: float
+
+
+def find_candidates(
+    identity: PatientIdentity,
+    db: Session,
+    exclude_id: Optional[UUID] = None,
+    threshold: Optional[float] = None,
+    limit: int = 10,
+) -> list[DuplicateCandidate]:
+    """
+    Existing patients that probably are the same person, best match first.
+
+    Args:
+        identity: Fields of the record being registered or checked
+        db: Database session
+        exclude_id: The record itself, when checking an existing patient
+        threshold: Minimum match score (default DUPLICATE_MATCH_THRESHOLD)
+        limit: Maximum number of candidates
+
+    Returns:
+        List of DuplicateCandidate
+    """
+    threshold = get_settings().DUPLICATE_MATCH_THRESHOLD if threshold is None else threshold
+    blocked = db.query(PatientBlockingKey.patient_id).filter(
+        PatientBlockingKey.key.in_(sorted(blocking_keys(identity)))
+    )
+    query = db.query(Patient).filter(Patient.id.in_(blocked))
+    if exclude_id is not None:
+        query = query.filter(Patient.id != exclude_id)
+    candidates = [
+        DuplicateCandidate(patient, match_score(identity, identity_of(patient)))
+        for patient in query.all()
+    ]
+    candidates = [candidate for candidate in candidates if candidate.score >= threshold]
+    candidates.sort(key=lambda candidate: candidate.score, reverse=True)
+    return candidates[:limit]
+
+
+# ── Batch scan ─────────────────────────────────────────────────────────────
+
+class DuplicatePair(NamedTuple):
+    patient_id: UUID
+    other_patient_id: UUID
+    score: float
+
+
+def _score_pairs(pairs: list[tuple[UUID, PatientIdentity, UUID, PatientIdentity]], threshold: float) -> list[DuplicatePair]:
+    """Worker: score one chunk of candidate pairs."""
+    matches = []
+    for a_id, a, b_id, b in pairs:
+        score = match_score(a, b)
+        if score >= threshold:
+            matches.append(DuplicatePair(a_id, b_id, score))
+    return matches
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def scan_duplicates(
+    db: Session,
+    threshold: Optional[float] = None,
+    workers: Optional[int] = None,
+    max_block_size: Optional[int] = None,
+    chunk_size: int = 5000,
+) -> list[DuplicatePair]:
+    """
+    Find likely duplicate pairs across the whole patient table.
+
+    Candidate pairs come from the stored blocking keys (streamed in key
+    order); blocks larger than `max_block_size` are skipped as too generic.
+    Pairs are scored in chunks across `workers` processes (1 scores inline).
+
+    Returns:
+        Pairs scoring at least `threshold`, best first
+    """
+    settings = get_settings()
+    threshold = settings.DUPLICATE_MATCH_THRESHOLD if threshold is None else threshold
+    workers = settings.DUPLICATE_SCAN_WORKERS if workers is None else workers
+    max_block_size = settings.DUPLICATE_MAX_BLOCK_SIZE if max_block_size is None else max_block_size
+
+    blocks: dict[str, list[UUID]] = defaultdict(list)
+    rows = db.query(PatientBlockingKey.key, PatientBlockingKey.patient_id).execution_options(yield_per=10_000)
+    for key, patient_id in rows:
+        blocks[key].append(patient_id)
+
+    pair_ids: set[tuple[UUID, UUID]] = set()
+    skipped = 0
+    for key, patient_ids in blocks.items():
+        if len(patient_ids) > max_block_size:
+            skipped += 1
+            continue
+        pair_ids.update(combinations(sorted(patient_ids, key=str), 2))
+    if skipped:
+        logger.warning(f"Duplicate scan skipped {skipped} blocks larger than {max_block_size} patients")
+
+    involved = {patient_id for pair in pair_ids for patient_id in pair}
+    identities: dict[UUID, PatientIdentity] = {}
+    projected = db.query(
+        Patient.id, Patient.national_id, Patient.first_name, Patient.last_name, Patient.date_of_birth,
+    ).execution_options(yield_per=10_000)
+    for patient_id, *fields in projected:
+        if patient_id in involved:
+            identities[patient_id] = PatientIdentity(*fields)
+
+    pairs = [(a, identities[a], b, identities[b]) for a, b in pair_ids if a in identities and b in identities]
+    if workers > 1 and len(pairs) > chunk_size:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_score_pairs, chunk, threshold) for chunk in _chunks(pairs, chunk_size)]
+            matches = [match for future in futures for match in future.result()]
+    else:
+        matches = _score_pairs(pairs, threshold)
+
+    matches.sort(key=lambda pair: pair.score, reverse=True)
+    logger.info(
+        f"Duplicate scan: {len(blocks)} blocks, {len(pairs)} candidate pairs, {len(matches)} likely duplicates"
+    )
+    return matches
+
+
+def save_scan(db: Session, pairs: list[DuplicatePair], scanned_at: Optional[datetime] = None) -> None:
+    """Replace the stored scan result with `pairs` in one transaction."""
+    scanned_at = scanned_at or datetime.utcnow()
+    db.execute(delete(PatientDuplicatePair))
+    if pairs:
+        db.execute(insert(PatientDuplicatePair), [
+            {"patient_id": pair.patient_id, "other_patient_id": pair.other_patient_id,
+             "score": pair.score, "scanned_at": scanned_at}
+            for pair in pairs
+        ])
+    db.commit()
+
+
+def stored_duplicates(db: Session) -> list[PatientDuplicatePair]:
+    """Pairs found by the last completed scan, best first."""
+    return (
+        db.query(PatientDuplicatePair)
+        .order_by(PatientDuplicatePair.score.desc(), PatientDuplicatePair.patient_id)
+        .all()
+    )
+
+
+SCAN_SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "scan_duplicates.py"
+_scan_process: Optional[subprocess.Popen] = None
+
+
+def start_scan() -> bool:
+    """
+    Start scripts/scan_duplicates.py in a subprocess, so its worker pool is
+    never forked from an API worker.
+
+    Returns:
+        False if the scan this process started last is still running
+    """
+    global _scan_process
+    if _scan_process is not None and _scan_process.poll() is None:
+        return False
+    _scan_process = subprocess.Popen(
+        [sys.executable, str(SCAN_SCRIPT)], cwd=SCAN_SCRIPT.parents[1], stdin=subprocess.DEVNULL,
+    )
+    logger.info(f"Duplicate scan started: pid={_scan_process.pid}")
+    return True
@@ -0,0 +1,204 @@
+"""
+Encounter archive.
+Moves encounters completed more than ARCHIVE_AFTER_DAYS ago, with their
+triage interactions and clinical note, out of the hot tables into
+archived_encounters, so the tables every triage turn and dashboard read
+touches only hold recent and in-flight work.
+
+An archived encounter keeps its summary columns (the lookup index patient
+history reads alongside medical_encounters) and stores the transcript and
+SOAP note as one gzipped JSON document. Reads fall back to it transparently:
+the history query unions both tables, and note and transcript lookups
+rebuild transient ClinicalNote / TriageInteraction objects from the
+document. Archived encounters are read-only.
+
+Encounters with a consultation room are left in place, since the room
+references them.
+"""
+import gzip
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.orm import Session
+from app.models.clinical import (
+    ArchivedEncounter,
+    ClinicalNote,
+    EncounterStatus,
+    MedicalEncounter,
+    SenderType,
+    TriageInteraction,
+)
+from app.models.consultation import ConsultationRoom
+from app.services import encounter_queue
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+PAYLOAD_VERSION = 1
+INTERACTION_FIELDS = (
+    "id", "sender_type", "message_content", "audio_url", "transcription_confidence", "timestamp", "created_at",
+)
+NOTE_FIELDS = (
+    "id", "subjective", "objective", "assessment", "plan", "is_finalized", "version", "created_at", "updated_at",
+)
+_DATETIME_FIELDS = {"timestamp", "created_at", "updated_at"}
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, SenderType):
+        return value.value
+    return value
+
+
+def pack(interactions: list, note: Optional[ClinicalNote]) -> bytes:
+    """Gzipped JSON document of an encounter's interactions (in order) and note."""
+    document = {
+        "version": PAYLOAD_VERSION,
+        "interactions": [
+            {field: _plain(getattr(interaction, field)) for field in INTERACTION_FIELDS}
+            for interaction in interactions
+        ],
+        "clinical_note": (
+            {field: _plain(getattr(note, field)) for field in NOTE_FIELDS} if note is not None else None
+        ),
+    }
+    return gzip.compress(json.dumps(document, ensure_ascii=False).encode("utf-8"))
+
+
+def unpack(payload: bytes) -> dict:
+    return json.loads(gzip.decompress(payload))
+
+
+def _restore_types(record: dict) -> dict:
+    restored = dict(record)
+    restored["id"] = UUID(record["id"])
+    for field in _DATETIME_FIELDS & record.keys():
+        restored[field] = datetime.fromisoformat(record[field])
+    if "sender_type" in record:
+        restored["sender_type"] = SenderType(record["sender_type"])
+    return restored
+
+
+def get_archived_encounter(encounter_id: UUID, db: Session) -> Optional[ArchivedEncounter]:
+    return db.query(ArchivedEncounter).filter(ArchivedEncounter.id == encounter_id).first()
+
+
+def archived_note(archived: ArchivedEncounter) -> Optional[ClinicalNote]:
+    """The archived SOAP note as a transient (never persisted) ClinicalNote."""
+    record = unpack(archived.payload)["clinical_note"]
+    if record is None:
+        return None
+    return ClinicalNote(encounter_id=archived.id, **_restore_types(record))
+
+
+def archived_interactions(archived: ArchivedEncounter) -> list[TriageInteraction]:
+    """The archived transcript, oldest first, as transient TriageInteractions."""
+    return [
+        TriageInteraction(encounter_id=archived.id, **_restore_types(record))
+        for record in unpack(archived.payload)["interactions"]
+    ]
+
+
+def archived_as_encounter(archived: ArchivedEncounter) -> MedicalEncounter:
+    """The archived summary columns as a transient MedicalEncounter."""
+    return MedicalEncounter(
+        id=archived.id,
+        patient_id=archived.patient_id,
+        nurse_id=archived.nurse_id,
+        doctor_id=archived.doctor_id,
+        status=archived.status,
+        is_urgent=archived.is_urgent,
+        chief_complaint=archived.chief_complaint,
+        encounter_timestamp=archived.encounter_timestamp,
+        created_at=archived.created_at,
+        updated_at=archived.updated_at,
+    )
+
+
+def _archive_batch(db: Session, encounter_ids: list[UUID]) -> None:
+    encounters = db.query(MedicalEncounter).filter(MedicalEncounter.id.in_(encounter_ids)).all()
+    interactions: dict[UUID, list] = {encounter_id: [] for encounter_id in encounter_ids}
+    for interaction in db.query(TriageInteraction).filter(
+        TriageInteraction.encounter_id.in_(encounter_ids)
+    ).order_by(TriageInteraction.timestamp):
+        interactions[interaction.encounter_id].append(interaction)
+    notes = {
+        note.encounter_id: note
+        for note in db.query(ClinicalNote).filter(ClinicalNote.encounter_id.in_(encounter_ids))
+    }
+
+    now = datetime.utcnow()
+    db.execute(insert(ArchivedEncounter), [
+        {
+            "id": encounter.id,
+            "patient_id": encounter.patient_id,
+            "nurse_id": encounter.nurse_id,
+            "doctor_id": encounter.doctor_id,
+            "status": encounter.status,
+            "is_urgent": encounter.is_urgent,
+            "chief_complaint": encounter.chief_complaint,
+            "encounter_timestamp": encounter.encounter_timestamp,
+            "created_at": encounter.created_at,
+            "updated_at": encounter.updated_at,
+            "archived_at": now,
+            "payload": pack(interactions[encounter.id], notes.get(encounter.id)),
+        }
+        for encounter in encounters
+    ])
+    # Set-based deletes (the session drops its copies of the deleted rows)
+    encounter_queue.remove(db, encounter_ids)
+    db.execute(delete(TriageInteraction).where(TriageInteraction.encounter_id.in_(encounter_ids)))
+    db.execute(delete(ClinicalNote).where(ClinicalNote.encounter_id.in_(encounter_ids)))
+    db.execute(delete(MedicalEncounter).where(MedicalEncounter.id.in_(encounter_ids)))
+
+
+def archive_completed_encounters(
+    db: Session,
+    older_than_days: int,
+    batch_size: int = 500,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Move encounters completed more than `older_than_days` ago into the archive.
+
+    Each batch is one transaction: the archive rows are written and the hot
+    rows deleted together. Batches are claimed with SKIP LOCKED on Postgres,
+    so concurrent runs do not block each other.
+
+    Args:
+        db: Database session
+        older_than_days: Minimum days since the encounter was last updated
+        batch_size: Encounters moved per transaction
+        now: Reference time (default: now, UTC)
+
+    Returns:
+        Number of encounters archived
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    eligible = select(MedicalEncounter.id).where(
+        MedicalEncounter.status == EncounterStatus.COMPLETED,
+        MedicalEncounter.deleted_at.is_(None),
+        MedicalEncounter.updated_at < cutoff,
+        ~exists().where(ConsultationRoom.encounter_id == MedicalEncounter.id),
+    ).limit(batch_size).with_for_update(skip_locked=True)
+
+    archived = 0
+    while True:
+        encounter_ids = list(db.execute(eligible).scalars())
+        if not encounter_ids:
+            break
+        try:
+            _archive_batch(db, encounter_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        archived += len(encounter_ids)
+        logger.info(f"Archived {len(encounter_ids)} encounters ({archived} so far)")
+    return archived
@@ -0,0 +1,195 @@
+"""
+Encounter queue read model.
+encounter_queue holds one row per encounter on the dashboard queue (open
+encounters, plus those completed in the last QUEUE_COMPLETED_WINDOW_HOURS)
+with the patient and doctor names copied in, so the dashboard is one scan of
+ix_encounter_queue_order instead of a join and sort over medical_encounters
+on every read.
+
+The write paths keep it current inside their own transactions:
+
+    encounter_service   creation, urgency / doctor / status changes, note
+                        finalization, cancellation
+    triage_engine       each triage turn (last_activity_at, note_ready)
+    patient_service,    patient and doctor renames
+    user_service (profile)
+    encounter_archive   archived encounters leave the queue
+
+Completed entries past the window are skipped on read and deleted by `prune`
+(scripts/archive_encounters.py).
+
+Changes are published to `subscribe`d listeners once their transaction
+commits (and dropped on rollback), so the queue can also feed push updates.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+from uuid import UUID
+from sqlalchemy import case, delete, event, false, insert, or_, select, update
+from sqlalchemy.orm import Session, aliased
+from app.models.clinical import EncounterQueueEntry, EncounterStatus, MedicalEncounter
+from app.models.patient import Patient
+from app.models.user import User
+from app.core.config import get_settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+ADDED, UPDATED, REMOVED = "added", "updated", "removed"
+_PENDING = "encounter_queue_changes"  # key in Session.info
+
+
+@dataclass(frozen=True)
+class QueueChange:
+    action: str
+    encounter_id: UUID
+
+
+_listeners: list[Callable[[list[QueueChange]], None]] = []
+
+
+def subscribe(listener: Callable[[list[QueueChange]], None]) -> Callable[[], None]:
+    """Call `listener` with each committed transaction's queue changes; returns an unsubscribe function."""
+    _listeners.append(listener)
+    return lambda: _listeners.remove(listener)
+
+
+def _record(db: Session, action: str, encounter_ids: Iterable[UUID]) -> None:
+    db.info.setdefault(_PENDING, []).extend(QueueChange(action, encounter_id) for encounter_id in encounter_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session: Session) -> None:
+    changes = session.info.pop(_PENDING, None)
+    if not changes:
+        return
+    for listener in list(_listeners):
+        try:
+            listener(changes)
+        except Exception as e:
+            logger.error(f"Encounter queue listener failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def add(db: Session, encounter: MedicalEncounter) -> None:
+    """Put an encounter on the queue (names are read in the same INSERT ... SELECT)."""
+    db.flush()
+    doctor = aliased(User)
+    entry = (
+        select(
+            MedicalEncounter.id,
+            MedicalEncounter.patient_id,
+            Patient.first_name + " " + Patient.last_name,
+            MedicalEncounter.nurse_id,
+            MedicalEncounter.doctor_id,
+            doctor.full_name,
+            MedicalEncounter.status,
+            MedicalEncounter.is_urgent,
+            MedicalEncounter.chief_complaint,
+            false(),
+            MedicalEncounter.encounter_timestamp,
+            MedicalEncounter.encounter_timestamp,
+            case((MedicalEncounter.status == EncounterStatus.COMPLETED, MedicalEncounter.updated_at), else_=None),
+        )
+        .join(Patient, Patient.id == MedicalEncounter.patient_id)
+        .outerjoin(doctor, doctor.id == MedicalEncounter.doctor_id)
+        .where(MedicalEncounter.id == encounter.id, MedicalEncounter.deleted_at.is_(None))
+    )
+    db.execute(insert(EncounterQueueEntry).from_select([
+        "encounter_id", "patient_id", "patient_name", "nurse_id", "doctor_id", "doctor_name", "status",
+        "is_urgent", "chief_complaint", "note_ready", "encounter_timestamp", "last_activity_at", "completed_at",
+    ], entry))
+    _record(db, ADDED, [encounter.id])
+
+
+def sync(db: Session, encounter: MedicalEncounter) -> None:
+    """Copy an encounter's urgency, doctor and status to its queue entry (re-adding it if missing)."""
+    if encounter.deleted_at is not None:
+        remove(db, [encounter.id])
+        return
+    db.flush()
+    result = db.execute(
+        update(EncounterQueueEntry)
+        .where(EncounterQueueEntry.encounter_id == encounter.id)
+        .values(
+            doctor_id=encounter.doctor_id,
+            doctor_name=select(User.full_name).where(User.id == encounter.doctor_id).scalar_subquery(),
+            status=encounter.status,
+            is_urgent=encounter.is_urgent,
+            chief_complaint=encounter.chief_complaint,
+            completed_at=encounter.updated_at if encounter.status == EncounterStatus.COMPLETED else None,
+        )
+    )
+    if result.rowcount:
+        _record(db, UPDATED, [encounter.id])
+    else:
+        add(db, encounter)  # e.g. a completed encounter pruned and then reopened
+
+
+def touch(db: Session, encounter_id: UUID, note_ready: bool = False, at: Optional[datetime] = None) -> None:
+    """Record a triage turn (and, once generated, the SOAP draft) on the queue entry."""
+    values = {"last_activity_at": at or datetime.utcnow()}
+    if note_ready:
+        values["note_ready"] = True
+    result = db.execute(
+        update(EncounterQueueEntry).where(EncounterQueueEntry.encounter_id == encounter_id).values(**values)
+    )
+    if result.rowcount:
+        _record(db, UPDATED, [encounter_id])
+
+
+def remove(db: Session, encounter_ids: list[UUID]) -> None:
+    """Take encounters off the queue (cancelled or archived)."""
+    result = db.execute(delete(EncounterQueueEntry).where(EncounterQueueEntry.encounter_id.in_(encounter_ids)))
+    if result.rowcount:
+        _record(db, REMOVED, encounter_ids)
+
+
+def _rename(db: Session, condition, **values) -> None:
+    encounter_ids = list(db.execute(select(EncounterQueueEntry.encounter_id).where(condition)).scalars())
+    if encounter_ids:
+        db.execute(update(EncounterQueueEntry).where(condition).values(**values))
+        _record(db, UPDATED, encounter_ids)
+
+
+def rename_patient(db: Session, patient: Patient) -> None:
+    _rename(db, EncounterQueueEntry.patient_id == patient.id,
+            patient_name=f"{patient.first_name} {patient.last_name}")
+
+
+def rename_doctor(db: Session, user: User) -> None:
+    _rename(db, EncounterQueueEntry.doctor_id == user.id, doctor_name=user.full_name)
+
+
+def list_queue(db: Session, now: Optional[datetime] = None) -> list:
+    """
+    The dashboard queue: urgent first, then oldest arrival first.
+
+    Reads only encounter_queue, in index order (an index-only scan on Postgres).
+
+    Args:
+        db: Database session
+        now: Reference time for the completed window (default: now, UTC)
+
+    Returns:
+        encounter_queue rows
+    """
+    window = timedelta(hours=get_settings().QUEUE_COMPLETED_WINDOW_HOURS)
+    completed_since = (now or datetime.utcnow()) - window
+    queue = EncounterQueueEntry.__table__
+    return db.execute(
+        select(queue)
+        .where(or_(queue.c.completed_at.is_(None), queue.c.completed_at >= completed_since))
+        .order_by(queue.c.is_urgent.desc(), queue.c.encounter_timestamp, queue.c.encounter_id)
+    ).all()
+
+
+def prune(db: Session, completed_before: datetime) -> int:
+    """Delete entries of encounters completed before `completed_before`; returns the rows deleted."""
+    result = db.execute(delete(EncounterQueueEntry).where(EncounterQueueEntry.completed_at < completed_before))
+    db.commit()
+    return result.rowcount
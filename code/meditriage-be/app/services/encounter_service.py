@@ -5,7 +5,7 @@ Business logic for medical encounters, clinical notes, and triage workflow manag
 from datetime import datetime
 from uuid import UUID
 from typing import Tuple, List, Optional
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.models.clinical import MedicalEncounter, TriageInteraction, ClinicalNote, EncounterStatus, SenderType
 from app.models.user import User, UserRole
@@ -14,45 +14,12 @@ from app.schemas.clinical import (
     EncounterUpdateRequest,
     ClinicalNoteUpdate
 )
+from app.services import encounter_archive, encounter_queue
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def get_active_encounters(db: Session) -> List[MedicalEncounter]:
-    """
-    Return all non-completed encounters for the dashboard queue.
-
-    Statuses included: TRIAGE_IN_PROGRESS, AWAITING_REVIEW
-    Ordering: urgent encounters first, then oldest arrival time first
-    (longest-waiting patient appears at the top within each urgency group).
-
-    Args:
-        db: Database session
-
-    Returns:
-        List of MedicalEncounter objects (with .patient relationship loaded)
-    """
-    active_statuses = [
-        EncounterStatus.TRIAGE_IN_PROGRESS,
-        EncounterStatus.AWAITING_REVIEW,
-        EncounterStatus.COMPLETED,
-    ]
-    encounters = (
-        db.query(MedicalEncounter)
-        .options(joinedload(MedicalEncounter.doctor))
-        .filter(MedicalEncounter.status.in_(active_statuses))
-        .filter(MedicalEncounter.deleted_at.is_(None))
-        .order_by(
-            MedicalEncounter.is_urgent.desc(),          # urgent first
-            MedicalEncounter.encounter_timestamp.asc()  # oldest arrival first
-        )
-        .all()
-    )
-    logger.info(f"Encounter queue fetched: {len(encounters)} encounter(s)")
-    return encounters
-
-
 def create_encounter(
     patient_id: UUID,
     nurse_id: UUID,
@@ -78,6 +45,7 @@ def create_encounter(
         status=EncounterStatus.TRIAGE_IN_PROGRESS,
     )
     db.add(encounter)
+    encounter_queue.add(db, encounter)
     db.commit()
     db.refresh(encounter)
     
@@ -88,7 +56,8 @@ def create_encounter(
 def get_encounter_with_messages(encounter_id: UUID, db: Session) -> Tuple[MedicalEncounter, List[TriageInteraction]]:
     """
     Get encounter with all triage interactions (chat history).
-    For reloading chat/conversation on refresh.
+    For reloading chat/conversation on refresh. Archived encounters are
+    read from the archive.
     
     Args:
         encounter_id: Encounter UUID
@@ -105,6 +74,9 @@ def get_encounter_with_messages(encounter_id: UUID, db: Session) -> Tuple[Medica
     ).first()
     
     if not encounter:
+        archived = encounter_archive.get_archived_encounter(encounter_id, db)
+        if archived:
+            return encounter_archive.archived_as_encounter(archived), encounter_archive.archived_interactions(archived)
         logger.warning(f"Encounter not found: id={encounter_id}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -149,6 +121,7 @@ def update_encounter_urgency(encounter_id: UUID, is_urgent: bool, db: Session) -
     
     # Persist the urgency flag
     encounter.is_urgent = is_urgent
+    encounter_queue.sync(db, encounter)
     logger.info(f"Encounter urgency updated: id={encounter_id}, is_urgent={is_urgent}")
     
     db.commit()
@@ -201,6 +174,7 @@ def update_encounter(
         encounter.status = data.status
         logger.info(f"Encounter status updated: id={encounter_id}, status={data.status}")
 
+    encounter_queue.sync(db, encounter)
     db.commit()
     db.refresh(encounter)
 
@@ -257,18 +231,20 @@ def delete_encounter(encounter_id: UUID, db: Session) -> None:
         )
 
     encounter.deleted_at = datetime.utcnow()
+    encounter_queue.remove(db, [encounter_id])
     db.commit()
 
     logger.info(f"Encounter deleted (cancelled): id={encounter_id}")
 
 
-def get_clinical_note(encounter_id: UUID, db: Session) -> Optional[ClinicalNote]:
+def get_clinical_note(encounter_id: UUID, db: Session, include_archived: bool = True) -> Optional[ClinicalNote]:
     """
     Fetch SOAP note for an encounter.
     
     Args:
         encounter_id: Encounter UUID
         db: Database session
+        include_archived: Fall back to the archive (returns a transient, read-only note)
         
     Returns:
         ClinicalNote if exists, None otherwise
@@ -276,6 +252,11 @@ def get_clinical_note(encounter_id: UUID, db: Session) -> Optional[ClinicalNote]
     note = db.query(ClinicalNote).filter(
         ClinicalNote.encounter_id == encounter_id
     ).first()
+
+    if not note and include_archived:
+        archived = encounter_archive.get_archived_encounter(encounter_id, db)
+        if archived:
+            note = encounter_archive.archived_note(archived)
     
     if note:
         logger.debug(f"Clinical note retrieved: encounter_id={encounter_id}, version={note.version}")
@@ -308,8 +289,16 @@ def update_clinical_note(
     Raises:
         HTTPException: 404 if note not found
         HTTPException: 403 if note already finalized, or if a nurse tries to finalize
+        HTTPException: 409 if the encounter is archived
     """
-    note = get_clinical_note(encounter_id, db)
+    note = get_clinical_note(encounter_id, db, include_archived=False)
+
+    if not note and encounter_archive.get_archived_encounter(encounter_id, db):
+        logger.warning(f"Attempted to edit archived note: encounter_id={encounter_id}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Cannot edit the clinical note of an archived encounter"
+        )
 
     if not note:
         logger.warning(f"Clinical note not found for update: encounter_id={encounter_id}")
@@ -351,6 +340,7 @@ def update_clinical_note(
             if encounter:
                 encounter.status = EncounterStatus.COMPLETED
                 encounter.doctor_id = current_user.id  # audit trail: who finalized
+                encounter_queue.sync(db, encounter)
         else:
             setattr(note, field, value)
 
@@ -0,0 +1,87 @@
+"""
+Per-encounter single-flight lock for SOAP note generation.
+Concurrent requests that would generate a clinical note for the same
+encounter (a frontend retry, a second nurse pressing "finish", or the
+interview completing at the same moment) are serialized: the first one
+generates and commits the note, the rest wait and then find it.
+
+Two layers:
+    In-process  an asyncio.Lock per encounter (one worker).
+    Postgres    a transaction-scoped advisory lock (several workers), polled
+                with pg_try_advisory_xact_lock so the event loop is never
+                blocked on the database. It is released when the holder's
+                transaction commits or rolls back.
+"""
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# encounter key -> (lock, number of holders + waiters)
+_locks: dict[str, tuple[asyncio.Lock, int]] = {}
+
+
+def advisory_lock_key(name: str) -> int:
+    """Stable signed 64-bit key for pg advisory locks."""
+    return int.from_bytes(hashlib.sha256(name.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+def _in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Clinical note generation is already in progress for this encounter. Please retry shortly.",
+    )
+
+
+async def _acquire_advisory_lock(db: Session, key: int, deadline: float, poll_interval: float) -> None:
+    while not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": key}).scalar():
+        if time.monotonic() >= deadline:
+            raise _in_progress()
+        await asyncio.sleep(poll_interval)
+
+
+@asynccontextmanager
+async def soap_generation_lock(encounter_id: UUID, db: Session) -> AsyncIterator[None]:
+    """
+    Hold the encounter's note-generation lock for the duration of the block.
+
+    The caller must re-check for an existing note inside the block and
+    commit before leaving it (the Postgres lock lives until commit).
+
+    Raises:
+        HTTPException 409: If the lock is not acquired within SOAP_LOCK_TIMEOUT_SECONDS.
+    """
+    settings = get_settings()
+    deadline = time.monotonic() + settings.SOAP_LOCK_TIMEOUT_SECONDS
+    name = f"soap:{encounter_id}"
+
+    lock, holders = _locks.get(name, (asyncio.Lock(), 0))
+    _locks[name] = (lock, holders + 1)
+    try:
+        try:
+            await asyncio.wait_for(lock.acquire(), timeout=settings.SOAP_LOCK_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise _in_progress()
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                await _acquire_advisory_lock(
+                    db, advisory_lock_key(name), deadline, settings.SOAP_LOCK_POLL_INTERVAL
+                )
+            yield
+        finally:
+            lock.release()
+    finally:
+        lock, holders = _locks[name]
+        if holders <= 1:
+            del _locks[name]
+        else:
+            _locks[name] = (lock, holders - 1)
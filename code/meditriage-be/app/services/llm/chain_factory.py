@@ -5,49 +5,101 @@ Chains: PII Scrubbing → LLM Reasoning → Output Parsing.
 This is the single entry point for all AI interactions.
 Business logic in triage_engine.py calls this module.
 """
+import asyncio
+import logging
+import time
 from typing import Optional
-from app.core.config import get_settings
+from app.core import tracing
+from app.core.config import Settings, get_settings
+from app.core.instrumentation import LLM_CALL_SECONDS
 from app.core.logging import get_logger
-from .scrubber import PIIScrubber
-from .parser import LLMOutputParser, InterviewResponse, SOAPNote
+from .scrubber import PIIScrubber, scrub_with_regex
+from .parser import LLMOutputParser, InterviewResponse, SOAPNote, soap_response_schema
 from .prompts import (
     TRIAGE_INTERVIEW_SYSTEM_PROMPT,
     SOAP_GENERATION_SYSTEM_PROMPT,
     INITIAL_GREETING_TEMPLATE,
+    INTERVIEW_SUMMARY_TEMPLATE,
+    SOAP_FIELD_RETRY_TEMPLATE,
 )
 from .providers.base_provider import BaseReasoningProvider
 from .providers.deepseek_provider import DeepSeekProvider
 from .providers.openai_provider import OpenAIProvider
+from .providers.routing_provider import RoutingProvider
+from .providers.caching_provider import CachingProvider
+from .circuit_breaker import get_breaker
+from .history import HistoryCompactor
+from .interviewer import ScriptedInterviewer, get_interview_metrics
+from .tokens import count_chat_tokens, count_tokens, trim_history_to_budget, trim_transcript, TOKENS_PER_MESSAGE
+from .usage import current_scope, get_ledger
 
 logger = get_logger(__name__)
 
 
-def _create_provider() -> BaseReasoningProvider:
-    """
-    Factory function: creates the active LLM provider based on config.
-    Swap providers by changing ACTIVE_LLM in .env (DEEPSEEK | OPENAI).
-    """
-    settings = get_settings()
-    active = settings.ACTIVE_LLM.upper()
-
-    if active == "OPENAI":
+def _build_provider(name: str, settings: Settings) -> BaseReasoningProvider:
+    """Build a single provider adapter by name (DEEPSEEK | OPENAI)."""
+    if name == "OPENAI":
         if not settings.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is not set in environment.")
         logger.info("Initializing OpenAI provider.")
         return OpenAIProvider(
             api_key=settings.OPENAI_API_KEY,
             model=settings.OPENAI_MODEL,
+            max_tokens=settings.LLM_MAX_OUTPUT_TOKENS,
+            json_mode=settings.LLM_JSON_MODE,
         )
-    else:
-        # Default: DeepSeek
-        if not settings.DEEPSEEK_API_KEY:
-            raise ValueError("DEEPSEEK_API_KEY is not set in environment.")
-        logger.info("Initializing DeepSeek provider.")
-        return DeepSeekProvider(
-            api_key=settings.DEEPSEEK_API_KEY,
-            base_url=settings.DEEPSEEK_BASE_URL,
-            model=settings.DEEPSEEK_MODEL,
+    # Default: DeepSeek
+    if not settings.DEEPSEEK_API_KEY:
+        raise ValueError("DEEPSEEK_API_KEY is not set in environment.")
+    logger.info("Initializing DeepSeek provider.")
+    return DeepSeekProvider(
+        api_key=settings.DEEPSEEK_API_KEY,
+        base_url=settings.DEEPSEEK_BASE_URL,
+        model=settings.DEEPSEEK_MODEL,
+        max_tokens=settings.LLM_MAX_OUTPUT_TOKENS,
+        json_mode=settings.LLM_JSON_MODE,
+    )
+
+
+def _create_provider() -> BaseReasoningProvider:
+    """
+    Factory function: creates the active LLM provider based on config.
+    Swap providers by changing ACTIVE_LLM in .env (DEEPSEEK | OPENAI).
+
+    With LLM_ROUTING_ENABLED, every provider that has an API key is wrapped
+    in a RoutingProvider, with ACTIVE_LLM as the initial preference.
+    With LLM_CACHE_ENABLED, the result is wrapped in a CachingProvider.
+    """
+    settings = get_settings()
+    provider = _create_reasoning_provider(settings)
+    if settings.LLM_CACHE_ENABLED:
+        provider = CachingProvider(
+            provider,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
         )
+    return provider
+
+
+def _create_reasoning_provider(settings: Settings) -> BaseReasoningProvider:
+    """The active provider, or a RoutingProvider over all configured providers."""
+    active = "OPENAI" if settings.ACTIVE_LLM.upper() == "OPENAI" else "DEEPSEEK"
+
+    if not settings.LLM_ROUTING_ENABLED:
+        return _build_provider(active, settings)
+
+    api_keys = {"DEEPSEEK": settings.DEEPSEEK_API_KEY, "OPENAI": settings.OPENAI_API_KEY}
+    names = [active] + [name for name in api_keys if name != active and api_keys[name]]
+    providers = {name: _build_provider(name, settings) for name in names}
+    if len(providers) == 1:
+        logger.info("LLM routing enabled but only one provider is configured.")
+        return providers[active]
+
+    return RoutingProvider(
+        providers,
+        window_size=settings.LLM_ROUTING_WINDOW,
+        hedge=settings.LLM_HEDGING_ENABLED,
+    )
 
 
 class TriagePipeline:
@@ -56,6 +108,9 @@ class TriagePipeline:
 
     Flow: Raw Input → PII Scrub → LLM Provider → Output Parse → Response
 
+    Provider calls go through the "llm_provider" circuit breaker: while it is
+    open, calls raise CircuitOpenError before any scrubbing work is done.
+
     Usage:
         pipeline = TriagePipeline()
         response = await pipeline.process_message(
@@ -69,8 +124,61 @@ class TriagePipeline:
         self.scrubber = PIIScrubber()
         self.parser = LLMOutputParser()
         self.provider = provider or _create_provider()
+        self.settings = settings = get_settings()
+        self.provider_breaker = get_breaker(
+            "llm_provider",
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+            probe=self.provider.health_check,
+        )
+        self.compactor = (
+            HistoryCompactor(keep_last=settings.HISTORY_KEEP_LAST_MESSAGES)
+            if settings.HISTORY_COMPACTION_ENABLED
+            else None
+        )
+        self.interviewer = ScriptedInterviewer() if settings.HYBRID_INTERVIEWER_ENABLED else None
         logger.info("TriagePipeline initialized.")
 
+    async def _call_provider(self, method, **kwargs) -> str:
+        """
+        Invoke a provider method through the provider breaker, recording the outcome.
+        A call running past LLM_CALL_TIMEOUT_SECONDS fails with TimeoutError, which
+        bounds how long a triage turn keeps its transaction open.
+        """
+        # Reserved here, right before the call, so a half-open trial is always settled below
+        self.provider_breaker.ensure_closed()
+        started_at = time.perf_counter()
+        endpoint = current_scope().endpoint
+        try:
+            result = await asyncio.wait_for(
+                method(**kwargs), timeout=self.settings.LLM_CALL_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - started_at, endpoint=endpoint, outcome="error")
+            self.provider_breaker.record_failure(e)
+            raise
+        LLM_CALL_SECONDS.observe(time.perf_counter() - started_at, endpoint=endpoint, outcome="success")
+        self.provider_breaker.record_success()
+        return result
+
+    def _prompt_budget(self, conversation_id: Optional[str]) -> int:
+        """
+        Prompt-token budget for an interview turn: the per-call cap, lowered to
+        whatever is left of the encounter's total budget.
+        """
+        budget = self.settings.LLM_MAX_PROMPT_TOKENS
+        if conversation_id is None:
+            return budget
+        spent = get_ledger().encounter_totals(conversation_id).total_tokens
+        remaining = self.settings.LLM_ENCOUNTER_TOKEN_BUDGET - spent - self.settings.LLM_MAX_OUTPUT_TOKENS
+        if remaining < budget:
+            logger.warning(
+                f"Encounter {conversation_id} has used {spent} tokens of its "
+                f"{self.settings.LLM_ENCOUNTER_TOKEN_BUDGET} budget; trimming chat history."
+            )
+            budget = max(0, remaining)
+        return budget
+
     def get_initial_greeting(self, chief_complaint: str) -> str:
         """
         Generate the first AI message to kick off the interview.
@@ -88,39 +196,89 @@ class TriagePipeline:
         message: str,
         chat_history: list[dict],
         patient_context: dict,
+        conversation_id: Optional[str] = None,
     ) -> InterviewResponse:
         """
         Process a single triage interview message through the full pipeline.
 
+        With the hybrid interviewer enabled, clearly answered core OLDCARTS
+        turns are answered locally with the next scripted question.
+        With history compaction enabled, only the most recent messages are sent
+        verbatim; earlier turns are folded into an OLDCARTS summary appended to
+        the system prompt.
+
         Args:
             message: Raw patient/nurse input.
             chat_history: Previous messages [{"role": "user"|"assistant", "content": "..."}].
             patient_context: {"age": int, "gender": str, "chief_complaint": str}.
+            conversation_id: Stable id (encounter id) so the summary is folded incrementally.
 
         Returns:
             InterviewResponse with the AI's next question or completion signal.
+
+        Raises:
+            CircuitOpenError: If the cloud provider's circuit is open.
         """
+        started_at = time.perf_counter()
+
+        # Step 0: Scripted OLDCARTS question, if the turn needs no clinical judgement
+        if self.interviewer is not None:
+            question = self.interviewer.next_question(chat_history, message)
+            if question is not None:
+                get_interview_metrics().record("local", time.perf_counter() - started_at)
+                logger.debug("Interview turn served by the scripted interviewer.")
+                return InterviewResponse(message=question, is_complete=False)
+
+        # Fail fast before scrubbing if the cloud provider is known to be down
+        self.provider_breaker.raise_if_open()
+
         # Step 1: PII Scrubbing
-        sanitized_message = await self.scrubber.scrub(message)
+        with tracing.span("scrub"):
+            sanitized_message = await self.scrubber.scrub(message)
         logger.debug(f"Scrubbed message: {sanitized_message[:100]}...")
 
-        # Step 2: Build system prompt with patient context
-        system_prompt = TRIAGE_INTERVIEW_SYSTEM_PROMPT.format(
-            age=patient_context.get("age", "unknown"),
-            gender=patient_context.get("gender", "unknown"),
-            chief_complaint=patient_context.get("chief_complaint", "unspecified"),
-        )
+        with tracing.span("prompt_build"):
+            # Step 2: Build system prompt with patient context
+            system_prompt = TRIAGE_INTERVIEW_SYSTEM_PROMPT.format(
+                age=patient_context.get("age", "unknown"),
+                gender=patient_context.get("gender", "unknown"),
+                chief_complaint=patient_context.get("chief_complaint", "unspecified"),
+            )
 
-        # Step 3: Call LLM provider
-        raw_response = await self.provider.generate_response(
-            system_prompt=system_prompt,
-            chat_history=chat_history,
-            user_message=sanitized_message,
-        )
+            # Step 3: Compact older turns into a summary (kept after the static prefix)
+            if self.compactor is not None:
+                summary, chat_history = self.compactor.compact(chat_history, conversation_id)
+                if summary:
+                    system_prompt += INTERVIEW_SUMMARY_TEMPLATE.format(summary=summary)
+
+            # Step 4: Enforce the per-call and per-encounter prompt budgets
+            budget = self._prompt_budget(conversation_id)
+            fitted_history = trim_history_to_budget(system_prompt, chat_history, sanitized_message, budget)
+            if len(fitted_history) < len(chat_history):
+                logger.info(
+                    f"Trimmed {len(chat_history) - len(fitted_history)} history messages "
+                    f"to fit a {budget}-token prompt budget."
+                )
+                chat_history = fitted_history
+            if logger.isEnabledFor(logging.DEBUG):
+                tokens_in = count_chat_tokens(system_prompt, chat_history, sanitized_message)
+                logger.debug(f"Interview prompt: {tokens_in} tokens, {len(chat_history)} history messages")
+
+        # Step 5: Call LLM provider
+        with tracing.span("provider_call"):
+            raw_response = await self._call_provider(
+                self.provider.generate_response,
+                system_prompt=system_prompt,
+                chat_history=chat_history,
+                user_message=sanitized_message,
+            )
         logger.debug(f"LLM response: {raw_response[:100]}...")
 
-        # Step 4: Parse output
-        return self.parser.parse_interview_response(raw_response)
+        # Step 6: Parse output
+        with tracing.span("parse"):
+            response = self.parser.parse_interview_response(raw_response)
+        get_interview_metrics().record("cloud", time.perf_counter() - started_at)
+        return response
 
     async def generate_soap_note(
         self,
@@ -136,21 +294,70 @@ class TriagePipeline:
 
         Returns:
             SOAPNote dataclass with structured SOAP fields and risk score.
+
+        Raises:
+            CircuitOpenError: If the cloud provider's circuit is open.
         """
-        # Build system prompt with patient context and transcript
-        system_prompt = SOAP_GENERATION_SYSTEM_PROMPT.format(
-            age=patient_context.get("age", "unknown"),
-            gender=patient_context.get("gender", "unknown"),
-            chief_complaint=patient_context.get("chief_complaint", "unspecified"),
-            transcript=conversation_transcript,
-        )
+        self.provider_breaker.raise_if_open()
+
+        prompt_fields = {
+            "age": patient_context.get("age", "unknown"),
+            "gender": patient_context.get("gender", "unknown"),
+            "chief_complaint": patient_context.get("chief_complaint", "unspecified"),
+        }
+        user_content = "Generate the SOAP note based on the transcript above."
+
+        # Keep the transcript within the context window, leaving room for the note itself
+        with tracing.span("soap.prompt_build"):
+            overhead = (
+                count_tokens(SOAP_GENERATION_SYSTEM_PROMPT.format(**prompt_fields, transcript=""))
+                + count_tokens(user_content)
+                + 2 * TOKENS_PER_MESSAGE
+            )
+            max_transcript_tokens = self.settings.LLM_CONTEXT_WINDOW - self.settings.LLM_MAX_OUTPUT_TOKENS - overhead
+            # The transcript holds raw patient turns: strip regex-detectable PII before it leaves
+            scrubbed_transcript = scrub_with_regex(conversation_transcript)
+            transcript = trim_transcript(scrubbed_transcript, max_transcript_tokens)
+            if transcript is not scrubbed_transcript:
+                logger.warning(f"SOAP transcript trimmed to fit {max_transcript_tokens} tokens.")
+
+            # Build system prompt with patient context and transcript
+            system_prompt = SOAP_GENERATION_SYSTEM_PROMPT.format(**prompt_fields, transcript=transcript)
 
         # Call LLM for structured output
-        raw_response = await self.provider.generate_structured_output(
-            system_prompt=system_prompt,
-            user_content="Generate the SOAP note based on the transcript above.",
-        )
+        with tracing.span("soap.provider_call"):
+            raw_response = await self._call_provider(
+                self.provider.generate_structured_output,
+                system_prompt=system_prompt,
+                user_content=user_content,
+                response_schema=soap_response_schema(),
+            )
         logger.info("SOAP note generated from LLM.")
 
-        # Parse JSON output
-        return self.parser.parse_soap_note(raw_response)
+        # Parse JSON output (truncated JSON is repaired), then re-request only what is missing
+        with tracing.span("soap.parse"):
+            soap_note = self.parser.parse_soap_note(raw_response)
+        for field_name in list(soap_note.incomplete_fields):
+            await self._retry_soap_field(soap_note, field_name, system_prompt)
+        return soap_note
+
+    async def _retry_soap_field(self, soap_note: SOAPNote, field_name: str, system_prompt: str) -> None:
+        """
+        Re-request a single missing or truncated SOAP field and fill it in.
+        Keeps whatever partial text the note already has if every retry fails.
+        """
+        for attempt in range(1, self.settings.SOAP_FIELD_RETRIES + 1):
+            logger.info(f"Re-requesting SOAP field '{field_name}' (attempt {attempt}).")
+            with tracing.span("soap.field_retry", field=field_name, attempt=attempt):
+                raw_response = await self._call_provider(
+                    self.provider.generate_structured_output,
+                    system_prompt=system_prompt,
+                    user_content=SOAP_FIELD_RETRY_TEMPLATE.format(field=field_name),
+                    response_schema=soap_response_schema((field_name,)),
+                )
+                value = self.parser.parse_soap_field(raw_response, field_name)
+            if value is not None:
+                setattr(soap_note, field_name, value)
+                soap_note.incomplete_fields.remove(field_name)
+                return
+        logger.warning(f"SOAP field '{field_name}' still incomplete after retries.")
@@ -0,0 +1,196 @@
+"""
+Circuit breakers for the AI pipeline's external dependencies.
+One breaker per dependency (pipeline construction, PII scrubber, cloud
+provider). While a breaker is OPEN, calls fail fast instead of waiting on
+a dependency that is known to be down; background health probes close it
+again as soon as the dependency recovers.
+
+States:
+    CLOSED     Normal operation. Consecutive failures are counted.
+    OPEN       Calls are rejected immediately with CircuitOpenError.
+    HALF_OPEN  Reset timeout elapsed: one trial call is let through.
+"""
+import asyncio
+import enum
+import time
+from typing import Any, Awaitable, Callable, Optional
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+HealthProbe = Callable[[], Awaitable[bool]]
+
+
+class CircuitState(str, enum.Enum):
+    """State of a circuit breaker."""
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the dependency's circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.0f}s.")
+
+
+class CircuitBreaker:
+    """
+    Failure-counting circuit breaker for a single dependency.
+
+    Args:
+        name: Dependency name shown in logs and on the health endpoint.
+        failure_threshold: Consecutive failures that open the circuit.
+        reset_timeout: Seconds to stay OPEN before allowing a trial call.
+        probe: Optional async health check used by the background prober.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        probe: Optional[HealthProbe] = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._last_error: Optional[str] = None
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state; an OPEN circuit turns HALF_OPEN once the reset timeout has passed."""
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit will allow a trial call."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """Whether a call may proceed now. In HALF_OPEN only one trial call is allowed."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self._state != CircuitState.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed: dependency recovered.")
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._last_error = None
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        self._failures += 1
+        self._last_error = str(error) if error else self._last_error
+        if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != CircuitState.OPEN:
+                logger.warning(
+                    f"Circuit '{self.name}' opened after {self._failures} failure(s): {self._last_error}"
+                )
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def raise_if_open(self) -> None:
+        """Raise CircuitOpenError while the circuit is OPEN, without reserving the half-open trial."""
+        if self.state == CircuitState.OPEN:
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def ensure_closed(self) -> None:
+        """Raise CircuitOpenError if a call may not proceed (reserves the half-open trial)."""
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run an async call through the breaker, recording its outcome."""
+        self.ensure_closed()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    async def run_probe(self) -> None:
+        """Run the health probe for a non-closed circuit and close it on success."""
+        if self.probe is None or self._state == CircuitState.CLOSED:
+            return
+        try:
+            healthy = await self.probe()
+        except Exception as e:
+            logger.debug(f"Health probe for '{self.name}' failed: {e}")
+            healthy = False
+        if healthy:
+            self.record_success()
+
+    def snapshot(self) -> dict:
+        """Serializable state for the health endpoint."""
+        state = self.state
+        return {
+            "state": state.value,
+            "consecutive_failures": self._failures,
+            "retry_after_seconds": round(self.retry_after(), 1) if state != CircuitState.CLOSED else 0,
+            "last_error": self._last_error,
+        }
+
+
+# ── Registry ────────────────────────────────────────────────────────────────
+# Breakers live at module level so their state survives pipeline re-creation.
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(
+    name: str,
+    failure_threshold: int = 5,
+    reset_timeout: float = 30.0,
+    probe: Optional[HealthProbe] = None,
+) -> CircuitBreaker:
+    """Return the named breaker, creating it on first use. A new probe replaces the old one."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name, failure_threshold, reset_timeout, probe)
+        _breakers[name] = breaker
+    elif probe is not None:
+        breaker.probe = probe
+    return breaker
+
+
+def all_breakers() -> dict[str, CircuitBreaker]:
+    return dict(_breakers)
+
+
+def reset_breakers() -> None:
+    """Forget all breakers (used by tests)."""
+    _breakers.clear()
+
+
+async def run_health_probes(interval: float) -> None:
+    """Background task: periodically probe every open/half-open circuit."""
+    while True:
+        await asyncio.sleep(interval)
+        for breaker in list(_breakers.values()):
+            await breaker.run_probe()
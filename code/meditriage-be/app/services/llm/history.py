@@ -0,0 +1,101 @@
+"""
+Chat history compaction for long triage interviews.
+Keeps the most recent messages verbatim and folds everything older into a
+structured OLDCARTS summary, so prompt size stays roughly flat instead of
+growing with every turn.
+
+Folding happens in fixed-size blocks rather than one message at a time:
+between folds the verbatim window only grows at the end, so consecutive
+requests share a long identical prefix and keep hitting the provider's
+prompt cache.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+from .oldcarts import InterviewSummary
+
+
+@dataclass
+class CompactionState:
+    """Incremental fold progress for one conversation."""
+    summary: InterviewSummary = field(default_factory=InterviewSummary)
+    folded: int = 0                          # number of leading messages already folded
+    pending_question: Optional[str] = None   # assistant question awaiting its folded answer
+
+
+class HistoryCompactor:
+    """
+    Compacts chat history into (summary, recent messages).
+
+    Args:
+        keep_last: Minimum number of most recent messages sent verbatim.
+        fold_block: Messages are folded in multiples of this many.
+        max_conversations: Bound on cached per-conversation fold states.
+    """
+
+    def __init__(self, keep_last: int = 6, fold_block: int = 4, max_conversations: int = 1024):
+        self.keep_last = keep_last
+        self.fold_block = max(1, fold_block)
+        self.max_conversations = max_conversations
+        self._states: OrderedDict[str, CompactionState] = OrderedDict()
+
+    def _cutoff(self, history: list[dict]) -> int:
+        """Index of the first verbatim message (everything before it is folded)."""
+        excess = len(history) - self.keep_last
+        if excess < self.fold_block:
+            return 0
+        cutoff = excess - excess % self.fold_block
+        # Start the verbatim window on a question, never on a dangling answer
+        while cutoff > 0 and history[cutoff].get("role") != "assistant":
+            cutoff -= 1
+        return cutoff
+
+    def _state_for(self, conversation_id: Optional[str]) -> CompactionState:
+        if conversation_id is None:
+            return CompactionState()
+        state = self._states.pop(conversation_id, None) or CompactionState()
+        self._states[conversation_id] = state
+        while len(self._states) > self.max_conversations:
+            self._states.popitem(last=False)
+        return state
+
+    def forget(self, conversation_id: str) -> None:
+        """Drop cached fold state for a finished conversation."""
+        self._states.pop(conversation_id, None)
+
+    def compact(
+        self,
+        chat_history: list[dict],
+        conversation_id: Optional[str] = None,
+    ) -> tuple[Optional[str], list[dict]]:
+        """
+        Fold older messages into the running summary.
+
+        Args:
+            chat_history: Full history [{"role": "user"|"assistant", "content": ...}].
+            conversation_id: Stable id (e.g. encounter id) enabling incremental folding.
+
+        Returns:
+            (rendered summary or None, messages to send verbatim)
+        """
+        cutoff = self._cutoff(chat_history)
+        if cutoff == 0:
+            return None, list(chat_history)
+
+        state = self._state_for(conversation_id)
+        if state.folded > cutoff:
+            # History is not an extension of what we folded before; start over
+            state = CompactionState()
+            if conversation_id is not None:
+                self._states[conversation_id] = state
+
+        for message in chat_history[state.folded:cutoff]:
+            if message.get("role") == "assistant":
+                state.pending_question = message.get("content", "")
+            else:
+                state.summary.record(state.pending_question, message.get("content", ""))
+                state.pending_question = None
+        state.folded = cutoff
+
+        summary = None if state.summary.is_empty() else state.summary.render()
+        return summary, chat_history[cutoff:]
@@ -0,0 +1,122 @@
+"""
+Hybrid interviewer: a local, rule-driven fast path for OLDCARTS turns.
+When the patient has clearly answered the last question and a core
+OLDCARTS slot has not been asked about yet, the next scripted question is
+returned instantly without scrubbing or a cloud call. Unclear answers,
+free-form narratives, red-flag symptoms and everything after the core
+slots (history, medications, completion) still go to the cloud model.
+"""
+from collections import deque
+from typing import Optional
+from .oldcarts import classify_question
+
+# Core slots asked locally, in interview order
+SCRIPTED_QUESTIONS: dict[str, str] = {
+    "onset": "When did your symptoms first start?",
+    "location": "Where exactly do you feel it? Can you point to the area?",
+    "duration": "How long does it last each time, or has it been continuous?",
+    "character": "How would you describe it - for example sharp, dull, burning, or pressure-like?",
+    "aggravating_alleviating": "Does anything make it better or worse?",
+    "radiation": "Does it spread or move anywhere else in your body?",
+    "timing": "Is it constant, or does it come and go?",
+    "severity": "On a scale of 1 to 10, how severe is it right now?",
+}
+
+# Answers containing these are left to the cloud model (clarification needed)
+UNCERTAIN_PHRASES = (
+    "not sure", "unsure", "don't know", "dont know", "no idea",
+    "what do you mean", "don't understand", "dont understand", "maybe",
+)
+
+# Symptoms that need clinical judgement rather than the next scripted question
+RED_FLAG_PHRASES = (
+    "can't breathe", "cannot breathe", "cant breathe", "unconscious", "fainted",
+    "passed out", "suicid", "seizure", "heavy bleeding", "severe bleeding",
+    "coughing blood", "vomiting blood", "slurred", "numbness",
+)
+
+# Free-form answers longer than this go to the cloud model
+MAX_SCRIPTED_ANSWER_WORDS = 30
+
+
+def is_clear_answer(answer: str) -> bool:
+    """A short, definite answer that needs no clarification or clinical follow-up."""
+    text = answer.strip().lower()
+    if not text or "?" in text:
+        return False
+    if len(text.split()) > MAX_SCRIPTED_ANSWER_WORDS:
+        return False
+    return not any(phrase in text for phrase in UNCERTAIN_PHRASES + RED_FLAG_PHRASES)
+
+
+class ScriptedInterviewer:
+    """Decides whether the next interview question can be asked locally."""
+
+    def next_question(self, chat_history: list[dict], message: str) -> Optional[str]:
+        """
+        The next scripted question, or None if the turn needs the cloud model.
+
+        Args:
+            chat_history: Previous messages [{"role": "user"|"assistant", "content": ...}].
+            message: The patient's latest answer.
+
+        Returns:
+            Scripted question text, or None.
+        """
+        if not is_clear_answer(message):
+            return None
+
+        asked = {
+            classify_question(turn.get("content", ""))
+            for turn in chat_history
+            if turn.get("role") == "assistant"
+        }
+        for slot, question in SCRIPTED_QUESTIONS.items():
+            if slot not in asked:
+                return question
+        return None
+
+
+class InterviewMetrics:
+    """Rolling count and latency of interview turns served locally vs by the cloud."""
+
+    def __init__(self, window_size: int = 1000):
+        self.latencies: dict[str, deque] = {
+            "local": deque(maxlen=window_size),
+            "cloud": deque(maxlen=window_size),
+        }
+
+    def record(self, path: str, latency: float) -> None:
+        self.latencies[path].append(latency)
+
+    @staticmethod
+    def _p50(values: deque) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[(len(ordered) - 1) // 2]
+
+    def snapshot(self) -> dict:
+        local, cloud = len(self.latencies["local"]), len(self.latencies["cloud"])
+        total = local + cloud
+        snapshot = {
+            "turns": total,
+            "local_fraction": round(local / total, 3) if total else None,
+        }
+        for path, values in self.latencies.items():
+            p50 = self._p50(values)
+            snapshot[f"{path}_turns"] = len(values)
+            snapshot[f"{path}_p50_ms"] = round(p50 * 1000, 1) if p50 is not None else None
+        return snapshot
+
+    def reset(self) -> None:
+        for values in self.latencies.values():
+            values.clear()
+
+
+_metrics = InterviewMetrics()
+
+
+def get_interview_metrics() -> InterviewMetrics:
+    return _metrics
+
@@ -0,0 +1,93 @@
+"""
+OLDCARTS slot model for triage interviews.
+Maps interviewer questions onto the history slots the interview prompt
+asks for (Onset, Location, Duration, Character, Aggravating/Alleviating,
+Radiation, Timing, Severity, plus medical history) and keeps a running
+structured summary of the answers given so far.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Slot:
+    """A single piece of history the interview gathers."""
+    key: str
+    label: str
+    keywords: tuple[str, ...]
+
+
+# Ordered by classification priority: more specific phrasings first
+# (e.g. "anywhere else" must hit Radiation before "where" hits Location).
+CLASSIFICATION_ORDER: tuple[Slot, ...] = (
+    Slot("allergies", "Allergies", ("allerg",)),
+    Slot("medications", "Medications", ("medication", "medicine", "tablets", "taking any")),
+    Slot("medical_history", "Medical history", ("medical history", "medical condition", "diagnosed", "surger", "hospitali")),
+    Slot("radiation", "Radiation", ("spread", "radiat", "travel", "move to", "anywhere else")),
+    Slot("severity", "Severity", ("scale", "1-10", "1 to 10", "rate", "how bad", "how severe")),
+    Slot("timing", "Timing", ("constant", "come and go", "comes and goes", "intermittent", "how often", "time of day")),
+    Slot("aggravating_alleviating", "Aggravating/Alleviating", ("worse", "better", "relieve", "trigger", "aggravat", "ease")),
+    Slot("character", "Character", ("feel like", "describe", "sharp", "dull", "burning", "kind of", "type of")),
+    Slot("onset", "Onset", ("when did", "first notice", "start", "began", "begin")),
+    Slot("duration", "Duration", ("how long", "last", "duration")),
+    Slot("location", "Location", ("where", "which part", "point to", "location")),
+)
+
+# Interview order (the order the prompt lists them in)
+SLOT_ORDER: tuple[str, ...] = (
+    "onset", "location", "duration", "character", "aggravating_alleviating",
+    "radiation", "timing", "severity", "medical_history", "medications", "allergies",
+)
+
+SLOTS: dict[str, Slot] = {slot.key: slot for slot in CLASSIFICATION_ORDER}
+
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def classify_question(question: str) -> Optional[str]:
+    """
+    Return the slot key an interviewer question is asking about, or None.
+    For multi-sentence messages (e.g. the greeting) only the last question
+    sentence is classified, so preamble text cannot pick the slot.
+    """
+    sentences = [part for part in _SENTENCE_SPLIT.split(question.strip()) if part.endswith("?")]
+    text = (sentences[-1] if sentences else question).lower()
+    for slot in CLASSIFICATION_ORDER:
+        if any(keyword in text for keyword in slot.keywords):
+            return slot.key
+    return None
+
+
+@dataclass
+class InterviewSummary:
+    """Running structured summary of folded interview turns."""
+    answers: dict[str, list[str]] = field(default_factory=dict)
+    other: list[str] = field(default_factory=list)
+
+    def record(self, question: Optional[str], answer: str) -> None:
+        """Fold one question/answer pair into the summary."""
+        answer = answer.strip()
+        if not answer:
+            return
+        slot = classify_question(question) if question else None
+        if slot:
+            self.answers.setdefault(slot, []).append(answer)
+        elif question:
+            self.other.append(f"{question.strip()} -> {answer}")
+        else:
+            self.other.append(answer)
+
+    def is_empty(self) -> bool:
+        return not self.answers and not self.other
+
+    def render(self) -> str:
+        """Compact text form, one line per slot in interview order."""
+        lines = [
+            f"- {SLOTS[key].label}: {'; '.join(self.answers[key])}"
+            for key in SLOT_ORDER
+            if key in self.answers
+        ]
+        lines.extend(f"- Other: {item}" for item in self.other)
+        return "\n".join(lines)
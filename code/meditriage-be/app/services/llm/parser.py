@@ -1,10 +1,16 @@
 """
 Output parser for LLM responses.
 Handles interview completion detection and SOAP note JSON parsing.
+
+SOAP output that is not valid JSON (usually because the completion was cut
+off at max_tokens) is repaired where possible: the parser closes open
+strings and brackets, or falls back to the last complete field. Fields that
+were missing or cut off are reported on the note so the pipeline can
+re-request just those fields.
 """
 import json
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -27,6 +33,100 @@ class SOAPNote:
     objective: str
     assessment: str
     plan: str
+    incomplete_fields: list[str] = field(default_factory=list)  # missing or truncated in the LLM output
+
+
+# Fields the SOAP prompt asks the LLM for
+SOAP_REQUIRED_FIELDS = ("subjective", "objective")
+
+
+def soap_response_schema(fields: tuple[str, ...] = SOAP_REQUIRED_FIELDS) -> dict:
+    """JSON schema for a SOAP response containing the given string fields."""
+    return {
+        "type": "object",
+        "properties": {name: {"type": "string"} for name in fields},
+        "required": list(fields),
+        "additionalProperties": False,
+    }
+
+
+def _strip_code_fences(text: str) -> str:
+    """Strip markdown code fences if present (```json ... ```)."""
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        lines = [l for l in cleaned.split("\n") if not l.strip().startswith("```")]
+        cleaned = "\n".join(lines)
+    return cleaned
+
+
+def parse_partial_json(text: str) -> tuple[dict, Optional[str]]:
+    """
+    Parse a JSON object that may be truncated or followed by extra text.
+
+    Scans once from the first "{", tracking string/escape state and open
+    brackets. A complete object is parsed as-is. A truncated one is closed
+    (open string quoted, brackets closed); if that is still not valid JSON
+    it is cut back to the last complete top-level member.
+
+    Args:
+        text: Raw LLM output.
+
+    Returns:
+        (parsed object, key whose value was cut off or None)
+
+    Raises:
+        ValueError: If no JSON object can be recovered.
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found.")
+
+    stack: list[str] = []
+    in_string = escape = False
+    member_ends: list[int] = []  # indices of top-level commas (end of a complete member)
+    end = None
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            stack.pop()
+            if not stack:
+                end = index + 1
+                break
+        elif char == "," and len(stack) == 1:
+            member_ends.append(index)
+
+    if end is not None:
+        data = json.loads(text[start:end])
+        if not isinstance(data, dict):
+            raise ValueError("JSON value is not an object.")
+        return data, None
+
+    # Truncated: close whatever is open and see if that is valid
+    closed = text[start:] + ('"' if in_string else "") + "".join(reversed(stack))
+    try:
+        data = json.loads(closed)
+        return data, (list(data)[-1] if data else None)
+    except json.JSONDecodeError:
+        pass
+
+    # Otherwise keep only the complete members
+    for cut in reversed(member_ends):
+        try:
+            return json.loads(text[start:cut] + "}"), None
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Truncated JSON object could not be repaired.")
 
 
 class LLMOutputParser:
@@ -73,32 +173,55 @@ class LLMOutputParser:
         Raises:
             ValueError: If the response cannot be parsed.
         """
-        cleaned = raw_response.strip()
-
-        # Strip markdown code blocks if present (```json ... ```)
-        if cleaned.startswith("```"):
-            lines = cleaned.split("\n")
-            # Remove first line (```json) and last line (```)
-            lines = [l for l in lines if not l.strip().startswith("```")]
-            cleaned = "\n".join(lines)
+        cleaned = _strip_code_fences(raw_response)
 
         try:
             data = json.loads(cleaned)
+            truncated_field = None
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse SOAP JSON: {e}\nRaw: {raw_response}")
+            try:
+                data, truncated_field = parse_partial_json(cleaned)
+                logger.warning(f"Repaired malformed SOAP JSON ({e}); truncated field: {truncated_field}")
+            except (ValueError, json.JSONDecodeError):
+                logger.error(f"Failed to parse SOAP JSON: {e}\nRaw: {raw_response}")
+                raise ValueError(
+                    f"LLM returned invalid JSON for SOAP note. Raw response: {raw_response[:200]}"
+                )
+
+        if not isinstance(data, dict):
             raise ValueError(
                 f"LLM returned invalid JSON for SOAP note. Raw response: {raw_response[:200]}"
             )
 
         # Validate required fields
-        required_fields = ["subjective", "objective"]
-        for field in required_fields:
-            if field not in data:
-                logger.warning(f"Missing field '{field}' in clinical note, using empty string.")
+        incomplete = []
+        for field_name in SOAP_REQUIRED_FIELDS:
+            if field_name not in data:
+                logger.warning(f"Missing field '{field_name}' in clinical note, using empty string.")
+                incomplete.append(field_name)
+            elif field_name == truncated_field:
+                incomplete.append(field_name)
 
         return SOAPNote(
             subjective=data.get("subjective", ""),
             objective=data.get("objective", ""),
             assessment=data.get("assessment", ""),
             plan=data.get("plan", ""),
+            incomplete_fields=incomplete,
         )
+
+    def parse_soap_field(self, raw_response: str, field_name: str) -> Optional[str]:
+        """
+        Parse a single-field SOAP retry response ({"<field>": "..."}).
+
+        Returns:
+            The field's text, or None if it could not be recovered intact.
+        """
+        try:
+            data, truncated_field = parse_partial_json(_strip_code_fences(raw_response))
+        except (ValueError, json.JSONDecodeError):
+            return None
+        value = data.get(field_name)
+        if not isinstance(value, str) or truncated_field == field_name:
+            return None
+        return value
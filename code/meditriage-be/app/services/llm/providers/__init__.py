@@ -4,9 +4,13 @@ LLM providers package initialization.
 from .base_provider import BaseReasoningProvider
 from .deepseek_provider import DeepSeekProvider
 from .openai_provider import OpenAIProvider
+from .routing_provider import RoutingProvider
+from .caching_provider import CachingProvider
 
 __all__ = [
     "BaseReasoningProvider",
     "DeepSeekProvider",
     "OpenAIProvider",
+    "RoutingProvider",
+    "CachingProvider",
 ]
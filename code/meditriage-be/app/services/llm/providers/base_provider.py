@@ -3,7 +3,11 @@ Abstract base class for LLM provider adapters.
 All providers (DeepSeek, OpenAI, etc.) must implement this interface.
 This ensures vendor lock-in is avoided via the Adapter Pattern.
 """
+import logging
 from abc import ABC, abstractmethod
+from typing import Optional
+
+logger = logging.getLogger(__name__)
 
 
 class BaseReasoningProvider(ABC):
@@ -36,7 +40,8 @@ class BaseReasoningProvider(ABC):
     async def generate_structured_output(
         self,
         system_prompt: str,
-        user_content: str
+        user_content: str,
+        response_schema: Optional[dict] = None,
     ) -> str:
         """
         Generate a structured output (for SOAP note generation).
@@ -44,8 +49,32 @@ class BaseReasoningProvider(ABC):
         Args:
             system_prompt: The system instruction with output format.
             user_content: The complete conversation transcript.
+            response_schema: Optional JSON schema for the output. Providers
+                enforce it where supported and otherwise fall back to plain
+                JSON mode.
 
         Returns:
             Raw string response (expected to be JSON).
         """
         ...
+
+    async def health_check(self) -> bool:
+        """
+        Cheap reachability check used by the circuit breaker's background probe.
+        Providers that cannot check without spending tokens keep this default,
+        which reports unhealthy; their circuit then recovers through a
+        half-open trial call.
+
+        Returns:
+            True if the provider is reachable.
+        """
+        logger.debug(f"{type(self).__name__} has no health check; waiting for a half-open trial call.")
+        return False
+
+    def cache_identity(self) -> str:
+        """
+        Identity of this provider's configuration for response-cache keys.
+        Adapters include the model and sampling settings so a config change
+        never serves responses produced under the old settings.
+        """
+        return type(self).__name__
@@ -0,0 +1,163 @@
+"""
+Response cache in front of a reasoning provider.
+Identical requests (same provider identity, model settings and messages)
+within the TTL are answered from memory, and concurrent identical requests
+share a single upstream call. This absorbs force-finish retries,
+double-clicks and page refreshes that resend a byte-identical prompt.
+
+Cache keys are SHA-256 digests, so prompts themselves are never stored.
+A response is only cached when its prompt contains no regex-detectable
+PII (NIC, phone, email), i.e. when it has been through the scrubber.
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+from .base_provider import BaseReasoningProvider
+from ..scrubber import contains_pii
+
+logger = logging.getLogger(__name__)
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Mark a failure retrieved even when every waiter was cancelled before it
+    if not task.cancelled():
+        task.exception()
+
+
+class CachingProvider(BaseReasoningProvider):
+    """
+    TTL + LRU response cache with in-flight request coalescing.
+
+    Args:
+        provider: The provider whose responses are cached.
+        max_entries: Maximum cached responses (least recently used evicted first).
+        ttl_seconds: How long a cached response stays valid.
+    """
+
+    def __init__(self, provider: BaseReasoningProvider, max_entries: int = 256, ttl_seconds: float = 300.0):
+        self.provider = provider
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        logger.info(f"CachingProvider initialized: max_entries={max_entries}, ttl={ttl_seconds}s")
+
+    def _key(self, kind: str, payload: dict) -> str:
+        material = json.dumps(
+            {"provider": self.provider.cache_identity(), "kind": kind, **payload},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _store(self, key: str, response: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _fetch(self, key: str, call: Callable[[], Awaitable[str]]) -> str:
+        """The shared upstream call: caches its response and leaves the in-flight table."""
+        try:
+            response = await call()
+        finally:
+            self._in_flight.pop(key, None)
+        self._store(key, response)
+        return response
+
+    async def _cached(self, key: str, call: Callable[[], Awaitable[str]]) -> str:
+        """Serve from cache, join an identical in-flight call, or start the call."""
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # Its own task, so cancelling the request that started it leaves the other waiters' call running
+            task = asyncio.create_task(self._fetch(key, call))
+            task.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = task
+        # shield: a cancelled waiter (the starter included) must not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def generate_response(
+        self,
+        system_prompt: str,
+        chat_history: list[dict],
+        user_message: str
+    ) -> str:
+        """Generate a conversational response, cached when the prompt is PII-free."""
+        call = functools.partial(
+            self.provider.generate_response,
+            system_prompt=system_prompt,
+            chat_history=chat_history,
+            user_message=user_message,
+        )
+        texts = [system_prompt, user_message] + [message.get("content", "") for message in chat_history]
+        if any(contains_pii(text) for text in texts):
+            return await call()
+        key = self._key("response", {
+            "system_prompt": system_prompt,
+            "chat_history": chat_history,
+            "user_message": user_message,
+        })
+        return await self._cached(key, call)
+
+    async def generate_structured_output(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_schema: Optional[dict] = None,
+    ) -> str:
+        """Generate structured output, cached when the prompt is PII-free."""
+        call = functools.partial(
+            self.provider.generate_structured_output,
+            system_prompt=system_prompt,
+            user_content=user_content,
+            response_schema=response_schema,
+        )
+        if contains_pii(system_prompt) or contains_pii(user_content):
+            return await call()
+        key = self._key("structured", {
+            "system_prompt": system_prompt,
+            "user_content": user_content,
+            "response_schema": response_schema,
+        })
+        return await self._cached(key, call)
+
+    async def health_check(self) -> bool:
+        return await self.provider.health_check()
+
+    def cache_identity(self) -> str:
+        return self.provider.cache_identity()
+
+    def stats_snapshot(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
@@ -3,9 +3,12 @@ DeepSeek provider adapter (MVP Phase).
 Uses LangChain's ChatOpenAI since DeepSeek is OpenAI API-compatible.
 """
 import logging
+import time
+from typing import Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from .base_provider import BaseReasoningProvider
+from ..usage import record_llm_response
 
 logger = logging.getLogger(__name__)
 
@@ -16,14 +19,15 @@ class DeepSeekProvider(BaseReasoningProvider):
     Implements the BaseReasoningProvider interface for the MVP phase.
     """
 
-    def __init__(self, api_key: str, base_url: str, model: str):
+    def __init__(self, api_key: str, base_url: str, model: str, max_tokens: int = 1024, json_mode: bool = True):
         self.llm = ChatOpenAI(
             api_key=api_key,
             base_url=base_url,
             model=model,
             temperature=0.3,  # low temperature for medical precision
-            max_tokens=1024,
+            max_tokens=max_tokens,
         )
+        self.json_mode = json_mode
         logger.info(f"DeepSeek provider initialized: model={model}")
 
     def _build_messages(
@@ -44,6 +48,12 @@ class DeepSeekProvider(BaseReasoningProvider):
         messages.append(HumanMessage(content=user_message))
         return messages
 
+    def _structured_llm(self, response_schema: Optional[dict]):
+        """LLM bound to JSON output. DeepSeek supports JSON mode but not response schemas."""
+        if not self.json_mode:
+            return self.llm
+        return self.llm.bind(response_format={"type": "json_object"})
+
     async def generate_response(
         self,
         system_prompt: str,
@@ -54,7 +64,9 @@ class DeepSeekProvider(BaseReasoningProvider):
         messages = self._build_messages(system_prompt, chat_history, user_message)
 
         try:
+            started_at = time.perf_counter()
             response = await self.llm.ainvoke(messages)
+            record_llm_response(response, messages, started_at)
             return response.content.strip()
         except Exception as e:
             logger.error(f"DeepSeek response generation failed: {e}")
@@ -63,17 +75,31 @@ class DeepSeekProvider(BaseReasoningProvider):
     async def generate_structured_output(
         self,
         system_prompt: str,
-        user_content: str
+        user_content: str,
+        response_schema: Optional[dict] = None,
     ) -> str:
-        """Generate structured SOAP note output."""
+        """Generate structured SOAP note output (JSON mode when enabled)."""
         messages = [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_content),
         ]
 
         try:
-            response = await self.llm.ainvoke(messages)
+            started_at = time.perf_counter()
+            response = await self._structured_llm(response_schema).ainvoke(messages)
+            record_llm_response(response, messages, started_at)
             return response.content.strip()
         except Exception as e:
             logger.error(f"DeepSeek structured output failed: {e}")
             raise
+
+    async def health_check(self) -> bool:
+        """Reachability check: listing models costs no tokens."""
+        await self.llm.root_async_client.models.list()
+        return True
+
+    def cache_identity(self) -> str:
+        return (
+            f"{type(self).__name__}:{self.llm.openai_api_base}:{self.llm.model_name}:"
+            f"{self.llm.temperature}:{self.llm.max_tokens}:{self.json_mode}"
+        )
@@ -4,9 +4,12 @@ Stub implementation — same interface, direct OpenAI usage.
 Activate by setting ACTIVE_LLM=OPENAI in environment.
 """
 import logging
+import time
+from typing import Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from .base_provider import BaseReasoningProvider
+from ..usage import record_llm_response
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +20,14 @@ class OpenAIProvider(BaseReasoningProvider):
     Implements the BaseReasoningProvider interface for the Final Release phase.
     """
 
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, max_tokens: int = 1024, json_mode: bool = True):
         self.llm = ChatOpenAI(
             api_key=api_key,
             model=model,
             temperature=0.3,
-            max_tokens=1024,
+            max_tokens=max_tokens,
         )
+        self.json_mode = json_mode
         logger.info(f"OpenAI provider initialized: model={model}")
 
     def _build_messages(
@@ -43,6 +47,17 @@ class OpenAIProvider(BaseReasoningProvider):
         messages.append(HumanMessage(content=user_message))
         return messages
 
+    def _structured_llm(self, response_schema: Optional[dict]):
+        """LLM bound to JSON output: strict schema when one is given, else JSON mode."""
+        if not self.json_mode:
+            return self.llm
+        if response_schema is not None:
+            return self.llm.bind(response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "structured_output", "schema": response_schema, "strict": True},
+            })
+        return self.llm.bind(response_format={"type": "json_object"})
+
     async def generate_response(
         self,
         system_prompt: str,
@@ -53,7 +68,9 @@ class OpenAIProvider(BaseReasoningProvider):
         messages = self._build_messages(system_prompt, chat_history, user_message)
 
         try:
+            started_at = time.perf_counter()
             response = await self.llm.ainvoke(messages)
+            record_llm_response(response, messages, started_at)
             return response.content.strip()
         except Exception as e:
             logger.error(f"OpenAI response generation failed: {e}")
@@ -62,17 +79,31 @@ class OpenAIProvider(BaseReasoningProvider):
     async def generate_structured_output(
         self,
         system_prompt: str,
-        user_content: str
+        user_content: str,
+        response_schema: Optional[dict] = None,
     ) -> str:
-        """Generate structured SOAP note output."""
+        """Generate structured SOAP note output (JSON mode when enabled)."""
         messages = [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_content),
         ]
 
         try:
-            response = await self.llm.ainvoke(messages)
+            started_at = time.perf_counter()
+            response = await self._structured_llm(response_schema).ainvoke(messages)
+            record_llm_response(response, messages, started_at)
             return response.content.strip()
         except Exception as e:
             logger.error(f"OpenAI structured output failed: {e}")
             raise
+
+    async def health_check(self) -> bool:
+        """Reachability check: listing models costs no tokens."""
+        await self.llm.root_async_client.models.list()
+        return True
+
+    def cache_identity(self) -> str:
+        return (
+            f"{type(self).__name__}:{self.llm.openai_api_base}:{self.llm.model_name}:"
+            f"{self.llm.temperature}:{self.llm.max_tokens}:{self.json_mode}"
+        )
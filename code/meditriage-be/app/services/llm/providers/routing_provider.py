@@ -0,0 +1,270 @@
+"""
+Latency-aware routing provider.
+Holds several provider adapters (DeepSeek, OpenAI, ...) behind the
+BaseReasoningProvider interface, routes every call to the fastest healthy
+adapter, fails over on errors and can hedge calls that exceed the p95 budget.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+from .base_provider import BaseReasoningProvider
+
+logger = logging.getLogger(__name__)
+
+ProviderCall = Callable[[BaseReasoningProvider], Awaitable[str]]
+
+
+class ProviderStats:
+    """
+    Rolling latency and error-rate window for a single provider.
+    Only the last `window_size` calls are kept, so old outages age out.
+    """
+
+    def __init__(self, window_size: int = 100):
+        self.latencies: deque[float] = deque(maxlen=window_size)
+        self.outcomes: deque[bool] = deque(maxlen=window_size)
+        self.last_failure_at: Optional[float] = None
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        self.last_failure_at = time.monotonic()
+
+    def record_censored(self, latency: float) -> None:
+        """A call abandoned after `latency` seconds: it would have taken at least that long."""
+        self.latencies.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of successful and censored call latencies (seconds)."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(95)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def snapshot(self) -> dict:
+        return {
+            "samples": len(self.outcomes),
+            "p50_ms": round(self.p50 * 1000, 1) if self.p50 is not None else None,
+            "p95_ms": round(self.p95 * 1000, 1) if self.p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+        }
+
+
+class RoutingProvider(BaseReasoningProvider):
+    """
+    Routes each call to the fastest healthy provider.
+
+    Ranking: healthy providers first, then by rolling p50 latency. Providers
+    without enough samples rank as if instant, so each one gets explored
+    before latency data decides; ties keep the configured order (ACTIVE_LLM
+    first).
+    On error the call fails over to the next provider in the ranking.
+    With hedging enabled, a second request is fired at the next provider
+    once the first exceeds its own p95 latency; the first answer wins.
+    """
+
+    def __init__(
+        self,
+        providers: dict[str, BaseReasoningProvider],
+        window_size: int = 100,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5,
+        recovery_seconds: float = 30.0,
+        hedge: bool = False,
+    ):
+        if not providers:
+            raise ValueError("RoutingProvider requires at least one provider.")
+        self.providers = dict(providers)
+        self.stats = {name: ProviderStats(window_size) for name in self.providers}
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.recovery_seconds = recovery_seconds
+        self.hedge = hedge
+        logger.info(
+            f"RoutingProvider initialized: providers={list(self.providers)}, hedge={hedge}"
+        )
+
+    def is_healthy(self, name: str) -> bool:
+        """A provider is unhealthy while its error rate is high, until it has rested."""
+        stats = self.stats[name]
+        if stats.error_rate <= self.max_error_rate:
+            return True
+        # Give a failing provider another chance once it has been left alone for a while
+        return (
+            stats.last_failure_at is not None
+            and time.monotonic() - stats.last_failure_at >= self.recovery_seconds
+        )
+
+    def ranked_providers(self) -> list[str]:
+        """Provider names in the order they should be tried."""
+        order = list(self.providers)
+
+        def sort_key(name: str):
+            stats = self.stats[name]
+            p50 = stats.p50 if len(stats.latencies) >= self.min_samples else None
+            return (
+                not self.is_healthy(name),
+                p50 if p50 is not None else 0.0,
+                order.index(name),
+            )
+
+        return sorted(order, key=sort_key)
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        """p95 budget after which a hedged request is fired, if known."""
+        stats = self.stats[name]
+        if len(stats.latencies) < self.min_samples:
+            return None
+        return stats.p95
+
+    async def _timed(
+        self, name: str, call: ProviderCall, censor_after: Optional[float] = None
+    ) -> str:
+        """
+        Run a call against one provider and record its latency/outcome.
+        A call cancelled after `censor_after` seconds (a hedged primary that lost
+        the race) records its elapsed time as a censored latency, so the slow
+        tail stays in the percentiles instead of only the calls that finished.
+        """
+        stats = self.stats[name]
+        start = time.perf_counter()
+        try:
+            result = await call(self.providers[name])
+        except asyncio.CancelledError:
+            elapsed = time.perf_counter() - start
+            if censor_after is not None and elapsed >= censor_after:
+                stats.record_censored(elapsed)
+            raise
+        except Exception:
+            stats.record_failure()
+            raise
+        stats.record_success(time.perf_counter() - start)
+        return result
+
+    async def _hedged(
+        self,
+        primary: str,
+        backup: Optional[str],
+        call: ProviderCall,
+        attempted: set[str],
+    ) -> str:
+        """Run against `primary`, firing `backup` if primary exceeds its p95."""
+        attempted.add(primary)
+        delay = self._hedge_delay(primary) if backup else None
+        if delay is None:
+            return await self._timed(primary, call)
+
+        pending = {asyncio.create_task(self._timed(primary, call, censor_after=delay))}
+        first_error: Optional[BaseException] = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                logger.info(
+                    f"Hedging LLM call: {primary} exceeded p95 ({delay * 1000:.0f}ms), firing {backup}"
+                )
+                attempted.add(backup)
+                pending.add(asyncio.create_task(self._timed(backup, call)))
+
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    first_error = first_error or task.exception()
+                if not pending:
+                    raise first_error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _route(self, call: ProviderCall) -> str:
+        """Try providers in ranked order until one succeeds."""
+        ranked = self.ranked_providers()
+        attempted: set[str] = set()
+        last_error: Optional[BaseException] = None
+
+        for index, primary in enumerate(ranked):
+            if primary in attempted:
+                continue  # already raced as a hedge and failed
+            untried = [name for name in ranked[index + 1:] if name not in attempted]
+            backup = untried[0] if self.hedge and untried else None
+            try:
+                return await self._hedged(primary, backup, call, attempted)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"LLM provider '{primary}' failed, failing over: {e}")
+
+        raise last_error
+
+    async def generate_response(
+        self,
+        system_prompt: str,
+        chat_history: list[dict],
+        user_message: str
+    ) -> str:
+        """Generate a conversational response via the best available provider."""
+        return await self._route(
+            lambda provider: provider.generate_response(
+                system_prompt=system_prompt,
+                chat_history=chat_history,
+                user_message=user_message,
+            )
+        )
+
+    async def generate_structured_output(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_schema: Optional[dict] = None,
+    ) -> str:
+        """Generate structured output via the best available provider."""
+        return await self._route(
+            lambda provider: provider.generate_structured_output(
+                system_prompt=system_prompt,
+                user_content=user_content,
+                response_schema=response_schema,
+            )
+        )
+
+    async def health_check(self) -> bool:
+        """Healthy if any routed provider answers its own health check."""
+        for provider in self.providers.values():
+            try:
+                if await provider.health_check():
+                    return True
+            except Exception:
+                continue
+        return False
+
+    def cache_identity(self) -> str:
+        """Any routed provider may answer, so the identity covers all of them."""
+        return "Routing(" + ",".join(
+            f"{name}={provider.cache_identity()}" for name, provider in self.providers.items()
+        ) + ")"
+
+    def stats_snapshot(self) -> dict:
+        """Per-provider latency/error summary, for health and metrics endpoints."""
+        return {
+            name: {**stats.snapshot(), "healthy": self.is_healthy(name)}
+            for name, stats in self.stats.items()
+        }
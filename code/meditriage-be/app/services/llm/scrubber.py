@@ -7,12 +7,15 @@ National IDs (NIC), and other PII before data is sent to any cloud LLM.
 Uses: Ollama with a lightweight model (e.g., Llama 3.2 1B).
 Fallback: Regex-based scrubbing if Ollama is unavailable.
 """
+import asyncio
 import re
+import httpx
 from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage
 from app.core.config import get_settings
 from app.core.logging import get_logger
 from .prompts import PII_SCRUBBING_PROMPT
+from .circuit_breaker import get_breaker
 
 logger = get_logger(__name__)
 
@@ -25,14 +28,36 @@ PHONE_PATTERN = re.compile(r'(?:\+94|0)\s*\d{2}[\s-]?\d{3}[\s-]?\d{4}')
 EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
 
 
+def scrub_with_regex(text: str) -> str:
+    """Replace regex-detectable PII (NIC, phone, email) with redaction tags."""
+    text = NIC_PATTERN.sub("[NIC_REDACTED]", text)
+    text = PHONE_PATTERN.sub("[PHONE_REDACTED]", text)
+    return EMAIL_PATTERN.sub("[EMAIL_REDACTED]", text)
+
+
+def contains_pii(text: str) -> bool:
+    """True if the text still contains regex-detectable PII."""
+    return any(pattern.search(text) for pattern in (NIC_PATTERN, PHONE_PATTERN, EMAIL_PATTERN))
+
+
 class PIIScrubber:
     """
     Strips PII from text using a LOCAL Ollama LLM before sending to cloud.
     Falls back to regex-based scrubbing if Ollama is not available.
+    While the Ollama circuit is open, regex is used immediately instead of
+    waiting for a request that is known to fail.
     """
 
     def __init__(self):
         settings = get_settings()
+        self._ollama_url = settings.OLLAMA_BASE_URL
+        self._timeout = settings.LLM_CALL_TIMEOUT_SECONDS
+        self.breaker = get_breaker(
+            "pii_scrubber",
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+            probe=self._probe_ollama,
+        )
         self._ollama_available = False
         try:
             self.llm = ChatOllama(
@@ -63,15 +88,24 @@ class PIIScrubber:
         Returns:
             Sanitized text with PII replaced by redaction tags.
         """
-        if self._ollama_available:
+        if self._ollama_available and self.breaker.allow_request():
             return await self._scrub_with_llm(text)
         return self._scrub_with_regex(text)
 
+    async def _probe_ollama(self) -> bool:
+        """Health probe for the circuit breaker: is the Ollama server answering?"""
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            response = await client.get(f"{self._ollama_url}/api/tags")
+        return response.status_code == 200
+
     async def _scrub_with_llm(self, text: str) -> str:
-        """Scrub PII using the local Ollama LLM."""
+        """Scrub PII using the local Ollama LLM (regex after LLM_CALL_TIMEOUT_SECONDS)."""
         try:
             prompt = PII_SCRUBBING_PROMPT.format(text=text)
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            response = await asyncio.wait_for(
+                self.llm.ainvoke([HumanMessage(content=prompt)]), timeout=self._timeout
+            )
+            self.breaker.record_success()
             sanitized = response.content.strip()
 
             if not sanitized:
@@ -82,15 +116,14 @@ class PIIScrubber:
             return sanitized
 
         except Exception as e:
+            self.breaker.record_failure(e)
             logger.error(f"Ollama scrubbing failed, falling back to regex: {e}")
             return self._scrub_with_regex(text)
 
     def _scrub_with_regex(self, text: str) -> str:
         """Fallback: Scrub PII using regex patterns."""
         original = text
-        text = NIC_PATTERN.sub("[NIC_REDACTED]", text)
-        text = PHONE_PATTERN.sub("[PHONE_REDACTED]", text)
-        text = EMAIL_PATTERN.sub("[EMAIL_REDACTED]", text)
+        text = scrub_with_regex(text)
 
         if text != original:
             logger.info("PII scrubbed via regex fallback.")
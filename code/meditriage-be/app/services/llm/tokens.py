@@ -0,0 +1,116 @@
+"""
+Token counting helpers for LLM prompts.
+Uses tiktoken's cl100k_base encoding (a close proxy for DeepSeek and
+OpenAI chat models). If the encoding cannot be loaded (tiktoken fetches
+its BPE file on first use, which fails on air-gapped hosts) counts fall
+back to a ~4 characters-per-token estimate.
+"""
+from functools import lru_cache
+from typing import Optional
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+ENCODING_NAME = "cl100k_base"
+
+# Per-message framing overhead used by OpenAI-style chat formats
+TOKENS_PER_MESSAGE = 4
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tiktoken encoding once; None if unavailable (cached, not retried)."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, using character estimate: {e}")
+        return None
+
+
+def is_exact() -> bool:
+    """True if counts come from tiktoken rather than the character estimate."""
+    return _get_encoding() is not None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in a piece of text."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_chat_tokens(
+    system_prompt: str,
+    chat_history: list[dict],
+    user_message: Optional[str] = None,
+) -> int:
+    """
+    Prompt tokens for a chat request (system prompt + history + latest message).
+
+    Args:
+        system_prompt: System instruction text.
+        chat_history: [{"role": ..., "content": ...}] messages.
+        user_message: Latest user message, if sent separately from the history.
+
+    Returns:
+        Estimated prompt token count including per-message framing.
+    """
+    total = count_tokens(system_prompt) + TOKENS_PER_MESSAGE
+    for message in chat_history:
+        total += count_tokens(message.get("content", "")) + TOKENS_PER_MESSAGE
+    if user_message is not None:
+        total += count_tokens(user_message) + TOKENS_PER_MESSAGE
+    return total
+
+
+def trim_history_to_budget(
+    system_prompt: str,
+    chat_history: list[dict],
+    user_message: str,
+    max_tokens: int,
+) -> list[dict]:
+    """
+    Drop the oldest history messages until the request fits `max_tokens`.
+
+    Messages are dropped from the front and the kept window always starts on
+    an assistant question, so no answer is sent without its question. The
+    system prompt and latest user message are never trimmed.
+
+    Returns:
+        The (possibly shortened) history.
+    """
+    sizes = [count_tokens(message.get("content", "")) + TOKENS_PER_MESSAGE for message in chat_history]
+    total = count_chat_tokens(system_prompt, [], user_message) + sum(sizes)
+    start = 0
+    while start < len(chat_history) and total > max_tokens:
+        total -= sizes[start]
+        start += 1
+    if start:
+        while start < len(chat_history) and chat_history[start].get("role") != "assistant":
+            start += 1
+    return chat_history[start:]
+
+
+def trim_transcript(transcript: str, max_tokens: int) -> str:
+    """
+    Fit a line-per-message transcript into `max_tokens`.
+    Keeps the opening line (the greeting that states the complaint) and as
+    many of the most recent lines as fit, marking the omitted middle.
+    """
+    if count_tokens(transcript) <= max_tokens:
+        return transcript
+    lines = transcript.splitlines()
+    head, tail = lines[:1], []
+    remaining = max_tokens - count_tokens(head[0] if head else "") - 16  # room for the marker
+    for line in reversed(lines[1:]):
+        cost = count_tokens(line) + 1
+        if cost > remaining:
+            break
+        tail.append(line)
+        remaining -= cost
+    omitted = len(lines) - len(head) - len(tail)
+    return "\n".join(head + [f"[... {omitted} earlier lines omitted ...]"] + tail[::-1])
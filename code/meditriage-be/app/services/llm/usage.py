@@ -0,0 +1,184 @@
+"""
+Token usage accounting for LLM calls.
+Records actual prompt/completion usage reported by the provider (or a
+tiktoken estimate when the provider reports none) against the current
+encounter and API endpoint, and keeps rolling latency per endpoint.
+
+The encounter/endpoint a call belongs to is carried in a context variable
+set by `usage_scope()`, so provider adapters can record usage without the
+ids being threaded through every call signature.
+"""
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from app.core.instrumentation import LLM_TOKENS
+from app.core.logging import get_logger
+from .tokens import count_tokens, TOKENS_PER_MESSAGE
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class UsageScope:
+    """Attribution for LLM calls made inside a `usage_scope()` block."""
+    encounter_id: Optional[str] = None
+    endpoint: str = "unscoped"
+
+
+_current_scope: ContextVar[UsageScope] = ContextVar("llm_usage_scope", default=UsageScope())
+
+
+@contextmanager
+def usage_scope(encounter_id: Optional[str] = None, endpoint: str = "unscoped") -> Iterator[UsageScope]:
+    """Attribute every LLM call made inside the block to an encounter and endpoint."""
+    scope = UsageScope(encounter_id=encounter_id, endpoint=endpoint)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_scope() -> UsageScope:
+    return _current_scope.get()
+
+
+@dataclass
+class UsageTotals:
+    """Accumulated token usage."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    estimated_calls: int = 0  # calls where the provider reported no usage
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cached_prompt_tokens: int, estimated: bool) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_prompt_tokens += cached_prompt_tokens
+        self.estimated_calls += int(estimated)
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "estimated_calls": self.estimated_calls,
+        }
+
+
+@dataclass
+class EndpointUsage:
+    """Usage totals plus a rolling latency window for one endpoint."""
+    totals: UsageTotals = field(default_factory=UsageTotals)
+    latencies: deque = field(default_factory=lambda: deque(maxlen=500))
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of call latencies (seconds)."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            **self.totals.snapshot(),
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+class UsageLedger:
+    """
+    In-memory usage ledger: per-encounter totals (bounded LRU) and
+    per-endpoint aggregates. Totals reset when the process restarts.
+    """
+
+    def __init__(self, max_encounters: int = 10_000):
+        self.max_encounters = max_encounters
+        self._encounters: OrderedDict[str, UsageTotals] = OrderedDict()
+        self._endpoints: dict[str, EndpointUsage] = {}
+
+    def record(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency: float,
+        cached_prompt_tokens: int = 0,
+        estimated: bool = False,
+        scope: Optional[UsageScope] = None,
+    ) -> None:
+        """Record one LLM call against the given (or current) scope."""
+        scope = scope or current_scope()
+
+        LLM_TOKENS.inc(prompt_tokens, endpoint=scope.endpoint, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, endpoint=scope.endpoint, kind="completion")
+
+        endpoint = self._endpoints.setdefault(scope.endpoint, EndpointUsage())
+        endpoint.totals.add(prompt_tokens, completion_tokens, cached_prompt_tokens, estimated)
+        endpoint.latencies.append(latency)
+
+        if scope.encounter_id is not None:
+            totals = self._encounters.pop(scope.encounter_id, None) or UsageTotals()
+            totals.add(prompt_tokens, completion_tokens, cached_prompt_tokens, estimated)
+            self._encounters[scope.encounter_id] = totals
+            while len(self._encounters) > self.max_encounters:
+                self._encounters.popitem(last=False)
+
+    def encounter_totals(self, encounter_id: str) -> UsageTotals:
+        return self._encounters.get(encounter_id) or UsageTotals()
+
+    def endpoint_snapshot(self) -> dict:
+        return {name: usage.snapshot() for name, usage in sorted(self._endpoints.items())}
+
+    def reset(self) -> None:
+        self._encounters.clear()
+        self._endpoints.clear()
+
+
+_ledger = UsageLedger()
+
+
+def get_ledger() -> UsageLedger:
+    return _ledger
+
+
+def record_llm_response(response, messages: list, started_at: float) -> None:
+    """
+    Record usage for a LangChain chat response.
+
+    Args:
+        response: AIMessage returned by `ainvoke`.
+        messages: The messages that were sent (used for the estimate fallback).
+        started_at: `time.perf_counter()` value taken before the call.
+    """
+    latency = time.perf_counter() - started_at
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        details = usage.get("input_token_details") or {}
+        _ledger.record(
+            prompt_tokens=usage.get("input_tokens", 0),
+            completion_tokens=usage.get("output_tokens", 0),
+            cached_prompt_tokens=details.get("cache_read", 0) or 0,
+            latency=latency,
+        )
+        return
+    prompt_tokens = sum(count_tokens(str(message.content)) + TOKENS_PER_MESSAGE for message in messages)
+    _ledger.record(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=count_tokens(str(getattr(response, "content", ""))),
+        latency=latency,
+        estimated=True,
+    )
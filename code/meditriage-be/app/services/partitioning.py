@@ -0,0 +1,252 @@
+"""
+Monthly partitions.
+On Postgres, triage_interactions (by timestamp) and consultation_messages
+(by created_at) are range-partitioned by month, so history queries and
+vacuum work on one month's table at a time and old months can be dropped
+without a bulk DELETE.
+
+    ensure_partitions   creates the next PARTITION_MONTHS_AHEAD months; the
+                        API runs it daily. Rows outside every month land in
+                        the <table>_default partition and are moved out when
+                        their month is created.
+    archive_partitions  copies months older than PARTITION_RETENTION_MONTHS to
+                        gzipped CSV files (COPY format, with a header), then
+                        detaches and drops them (scripts/archive_partitions.py).
+                        COPY needs the psycopg2 or psycopg 3 driver.
+
+An archived month is restored by re-creating its partition and loading the
+file with COPY ... FROM ... WITH (FORMAT csv, HEADER). Attachments of
+archived consultation messages are kept. Everything here is a no-op on other
+databases and before the partitioning migration has run.
+"""
+import asyncio
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES = {
+    "triage_interactions": "timestamp",
+    "consultation_messages": "created_at",
+}
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def months_between(first: date, last: date) -> list[date]:
+    """Month starts from first's month to last's month, inclusive."""
+    months, month = [], month_start(first)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+    )
+
+
+@dataclass(frozen=True)
+class Partition:
+    table: str
+    name: str
+    month: date
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+    ), {"table": table}).first() is not None
+
+
+def list_partitions(db: Session, table: str) -> list[Partition]:
+    """Monthly partitions of a table, oldest first (the default partition is not included)."""
+    names = db.execute(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = :table AND pg_table_is_visible(parent.oid)"
+    ), {"table": table}).scalars()
+    partitions = []
+    for name in names:
+        suffix = name[len(table) + 1:]
+        try:
+            month = datetime.strptime(suffix, "%Y_%m").date()
+        except ValueError:
+            continue  # <table>_default
+        partitions.append(Partition(table, name, month))
+    return sorted(partitions, key=lambda partition: partition.month)
+
+
+def _create_partition(db: Session, table: str, month: date) -> None:
+    column = PARTITIONED_TABLES[table]
+    lower, upper = month, add_months(month, 1)
+    bounds = {"lower": lower, "upper": upper}
+    stray = db.execute(text(
+        f'SELECT 1 FROM {table}_default WHERE "{column}" >= :lower AND "{column}" < :upper LIMIT 1'
+    ), bounds).first()
+    if stray is None:
+        db.execute(text(create_partition_sql(table, month)))
+        return
+    # Postgres refuses a new partition while the default partition holds rows for
+    # its range: move them into a standalone table, then attach it.
+    name = partition_name(table, month)
+    db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = db.execute(text(
+        f'WITH moved AS (DELETE FROM {table}_default WHERE "{column}" >= :lower AND "{column}" < :upper RETURNING *) '
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), bounds)
+    db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+    logger.warning(f"Moved {moved.rowcount} rows of {table} from the default partition into {name}")
+
+
+def ensure_partitions(db: Session, months_ahead: int, today: Optional[date] = None) -> list[str]:
+    """
+    Create missing monthly partitions from the current month to `months_ahead` months ahead.
+
+    Args:
+        db: Database session
+        months_ahead: Months after the current one to create
+        today: Reference date (default: today, UTC)
+
+    Returns:
+        Names of the partitions created
+    """
+    current = month_start(today or datetime.utcnow().date())
+    created = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(db, table):
+            continue
+        existing = {partition.month for partition in list_partitions(db, table)}
+        for month in months_between(current, add_months(current, months_ahead)):
+            if month not in existing:
+                _create_partition(db, table, month)
+                created.append(partition_name(table, month))
+    db.commit()
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    return created
+
+
+@dataclass
+class ArchivedPartition:
+    table: str
+    name: str
+    month: str
+    rows: int
+    path: str
+
+
+def _copy_out(db: Session, partition: Partition, path: Path) -> int:
+    """COPY one partition to a gzipped CSV file; returns the rows written."""
+    driver = db.get_bind().dialect.driver
+    if driver not in ("psycopg2", "psycopg"):
+        raise RuntimeError(f"Archiving partitions needs COPY support from psycopg2 or psycopg 3, not {driver}")
+    statement = f"COPY {partition.name} TO STDOUT WITH (FORMAT csv, HEADER)"
+    raw_connection = db.connection().connection
+    partial = path.with_name(path.name + ".partial")
+    with raw_connection.cursor() as cursor, gzip.open(partial, "wt", encoding="utf-8", newline="") as out:
+        if driver == "psycopg2":
+            cursor.copy_expert(statement, out)
+        else:
+            with cursor.copy(statement) as copy:
+                for chunk in copy:  # one CSV row per chunk
+                    out.write(bytes(chunk).decode("utf-8"))
+        rows = cursor.rowcount
+    os.replace(partial, path)
+    return rows
+
+
+def archive_partitions(
+    db: Session,
+    retention_months: int,
+    archive_dir: Path,
+    today: Optional[date] = None,
+) -> list[ArchivedPartition]:
+    """
+    Archive and drop monthly partitions entirely older than `retention_months`.
+
+    A partition is only dropped after its file is written and its row count
+    checked, in the same transaction as the detach; if anything fails the
+    partition stays attached and the next run retries it.
+
+    Args:
+        db: Database session
+        retention_months: Complete months to keep before the current one
+        archive_dir: Root directory; files go to <archive_dir>/<table>/<partition>.csv.gz
+        today: Reference date (default: today, UTC)
+
+    Returns:
+        The archived partitions
+    """
+    if retention_months < 1:
+        raise ValueError("retention_months must be at least 1")
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -retention_months)
+    archived = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(db, table):
+            continue
+        for partition in list_partitions(db, table):
+            if add_months(partition.month, 1) > cutoff:
+                break
+            directory = archive_dir / table
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{partition.name}.csv.gz"
+            expected = db.execute(text(f"SELECT count(*) FROM {partition.name}")).scalar_one()
+            rows = _copy_out(db, partition, path)
+            if rows != expected:
+                db.rollback()
+                raise RuntimeError(f"Archive of {partition.name} wrote {rows} rows, expected {expected}")
+            db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+            db.execute(text(f"DROP TABLE {partition.name}"))
+            db.commit()
+            record = ArchivedPartition(table, partition.name, partition.month.isoformat(), rows, str(path))
+            path.with_name(f"{partition.name}.json").write_text(json.dumps(record.__dict__), encoding="utf-8")
+            archived.append(record)
+            logger.info(f"Archived {rows} rows of {partition.name} to {path}")
+    return archived
+
+
+def _ensure_partitions(months_ahead: int) -> None:
+    db = SessionLocal()
+    try:
+        ensure_partitions(db, months_ahead)
+    finally:
+        db.close()
+
+
+async def run_partition_maintenance(months_ahead: int, interval: float = 86400.0) -> None:
+    """Create upcoming partitions now and then every `interval` seconds (runs until cancelled)."""
+    while True:
+        try:
+            await asyncio.to_thread(_ensure_partitions, months_ahead)
+        except Exception as e:
+            # Another worker creating the same partition concurrently ends up here too
+            logger.error(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(interval)
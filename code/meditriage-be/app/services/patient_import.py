@@ -0,0 +1,235 @@
+"""
+Bulk patient import.
+Loads a hospital's existing patient register from CSV or NDJSON without
+going through POST /patients row by row:
+
+    1. Stream the file and validate rows with PatientCreate, a chunk at a time.
+    2. Drop NICs repeated within the file and, with one set-based query per
+       chunk, NICs that already exist.
+    3. Load the chunk (patients and their duplicate-detection blocking keys)
+       with COPY on Postgres, or executemany inserts elsewhere, and commit.
+
+Invalid or duplicate rows are reported by line number and never abort the
+import; each committed chunk stays committed if a later one fails.
+"""
+import csv
+import enum
+import io
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import IO, Iterator, Optional
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.patient import Patient, PatientBlockingKey
+from app.schemas.patient import PatientCreate
+from app.services import patient_lookup
+from app.services.duplicate_detection import PatientIdentity, blocking_keys
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+PATIENT_COLUMNS = (
+    "id", "national_id", "first_name", "last_name", "date_of_birth",
+    "gender", "contact_number", "created_at", "updated_at",
+)
+
+
+@dataclass
+class ImportRowError:
+    line: int
+    national_id: Optional[str]
+    error: str
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import; `errors` lists at most MAX_REPORTED_ERRORS rows."""
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+
+    def add_error(self, line: int, national_id: Optional[str], error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line, national_id, error))
+
+
+def detect_format(filename: str) -> str:
+    """ "csv" or "ndjson", from the file extension."""
+    name = filename.lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith(".csv"):
+        return "csv"
+    raise ValueError(f"Unsupported import file {filename!r}: expected .csv, .ndjson or .jsonl")
+
+
+def read_rows(stream: IO[str], file_format: str) -> Iterator[tuple[int, object]]:
+    """
+    (line number, row) pairs; a row is a dict, or an error message for
+    NDJSON lines that are not JSON objects. CSV needs a header row.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # Empty cells are missing values, not empty strings
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+    elif file_format == "ndjson":
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, f"Invalid JSON: {e.msg}"
+                continue
+            yield line_number, row if isinstance(row, dict) else "Expected a JSON object"
+    else:
+        raise ValueError(f"Unknown import format {file_format!r}")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors())
+
+
+def _copy_value(value):
+    if value is None:
+        return ""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _copy_rows(db: Session, table: str, columns: tuple[str, ...], rows: list[tuple]) -> None:
+    """COPY rows into a table over the session's own connection (same transaction)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(_copy_value(value) for value in row)
+    buffer.seek(0)
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    dbapi = db.get_bind().dialect.loaded_dbapi
+    raw_connection = db.connection().connection
+    try:
+        with raw_connection.cursor() as cursor:
+            cursor.copy_expert(statement, buffer)
+    except dbapi.IntegrityError as e:
+        # The raw cursor bypasses SQLAlchemy's exception wrapping
+        raise IntegrityError(statement, None, e) from e
+
+
+def _load_chunk(db: Session, patients: list[dict]) -> None:
+    keys = [
+        {"patient_id": patient["id"], "key": key}
+        for patient in patients
+        for key in sorted(blocking_keys(PatientIdentity(
+            patient["national_id"], patient["first_name"], patient["last_name"], patient["date_of_birth"]
+        )))
+    ]
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_rows(db, "patients", PATIENT_COLUMNS, [
+            tuple(patient[column] for column in PATIENT_COLUMNS) for patient in patients
+        ])
+        _copy_rows(db, "patient_blocking_keys", ("patient_id", "key"), [
+            (key["patient_id"], key["key"]) for key in keys
+        ])
+    else:
+        db.execute(insert(Patient), patients)
+        db.execute(insert(PatientBlockingKey), keys)
+
+
+def _existing_nics(db: Session, nics: list[str]) -> set[str]:
+    return {nic for (nic,) in db.query(Patient.national_id).filter(Patient.national_id.in_(nics))}
+
+
+def _import_chunk(db: Session, chunk: list[tuple[int, PatientCreate]], report: ImportReport) -> None:
+    existing = _existing_nics(db, [data.national_id for _, data in chunk])
+    for attempt in range(2):
+        now = datetime.utcnow()
+        patients = []
+        for line, data in chunk:
+            if data.national_id in existing:
+                continue
+            patients.append({
+                "id": uuid.uuid4(),
+                **data.model_dump(),
+                "created_at": now,
+                "updated_at": now,
+            })
+        if not patients:
+            break
+        try:
+            _load_chunk(db, patients)
+            db.commit()
+            report.imported += len(patients)
+            break
+        except IntegrityError as e:
+            db.rollback()
+            if attempt:
+                logger.error(f"Patient import chunk failed: {e}")
+                for line, data in chunk:
+                    if data.national_id not in existing:
+                        report.add_error(line, data.national_id, "Rejected by a database constraint")
+                break
+            # A NIC was registered concurrently: re-check and retry the chunk once
+            existing = _existing_nics(db, [data.national_id for _, data in chunk])
+    for line, data in chunk:
+        if data.national_id in existing:
+            report.add_error(line, data.national_id, f"Patient with national ID {data.national_id} already exists")
+
+
+def import_patients(
+    db: Session,
+    stream: IO[str],
+    file_format: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ImportReport:
+    """
+    Import patients from a CSV or NDJSON text stream.
+
+    Args:
+        db: Database session
+        stream: Text stream of the file
+        file_format: "csv" or "ndjson"
+        chunk_size: Rows validated, deduplicated and loaded per transaction
+
+    Returns:
+        ImportReport with per-row errors
+    """
+    report = ImportReport()
+    seen_nics: set[str] = set()
+    chunk: list[tuple[int, PatientCreate]] = []
+
+    for line, row in read_rows(stream, file_format):
+        report.total_rows += 1
+        if isinstance(row, str):
+            report.add_error(line, None, row)
+            continue
+        try:
+            data = PatientCreate.model_validate(row)
+        except ValidationError as e:
+            report.add_error(line, row.get("national_id"), _validation_message(e))
+            continue
+        if data.national_id in seen_nics:
+            report.add_error(line, data.national_id, "National ID repeated earlier in the file")
+            continue
+        seen_nics.add(data.national_id)
+        chunk.append((line, data))
+        if len(chunk) >= chunk_size:
+            _import_chunk(db, chunk, report)
+            chunk = []
+    if chunk:
+        _import_chunk(db, chunk, report)
+
+    if report.imported:
+        patient_lookup.on_patients_imported(db)
+    logger.info(
+        f"Patient import: {report.total_rows} rows, {report.imported} imported, {report.failed} failed"
+    )
+    return report
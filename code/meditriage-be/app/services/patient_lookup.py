@@ -0,0 +1,237 @@
+"""
+In-process patient lookup index for admission-desk type-ahead.
+Every patient contributes one sorted key per normalized token (NIC, first
+name and last name tokens). A key is "token\\0slot", so all keys starting
+with a typed prefix form one contiguous run of a single sorted list and a
+lookup is two bisections plus a short scan, with no database round-trip.
+
+The index is optional (PATIENT_LOOKUP_INDEX_ENABLED). It is built at
+startup from a streaming, column-projected query and kept current by
+patient_service's create/update/delete paths. It is per process, so a
+patient registered through another worker appears here at the next
+periodic rebuild (PATIENT_LOOKUP_REFRESH_SECONDS). Until the first build
+finishes the lookup endpoint falls back to the database search.
+"""
+import asyncio
+import bisect
+import threading
+from datetime import date
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.models.patient import Patient
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+_SEPARATOR = "\0"  # sorts before every token character, so "nim" ranges over "nimal\0..."
+
+
+class LookupEntry(NamedTuple):
+    """Fields the type-ahead shows for one patient."""
+    id: UUID
+    national_id: str
+    first_name: str
+    last_name: str
+    date_of_birth: date
+
+
+def normalize(text: str) -> list[str]:
+    """Lower-cased whitespace-separated tokens."""
+    return text.lower().split()
+
+
+def _tokens(entry: LookupEntry) -> set[str]:
+    return {entry.national_id.strip().lower(), *normalize(entry.first_name), *normalize(entry.last_name)}
+
+
+def _haystack(tokens: set[str]) -> str:
+    """" tok1 tok2 ...": `" " + term in haystack` tests whether any token starts with term."""
+    return " " + " ".join(tokens)
+
+
+class PatientLookupIndex:
+    """
+    Sorted-array prefix index over patients.
+
+    Slots of removed patients are left empty until the next build; keys
+    are removed immediately, so lookups never see them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: list[str] = []
+        self._entries: list[Optional[LookupEntry]] = []
+        self._haystacks: list[str] = []  # per slot, for checking the non-anchor query words
+        self._slots: dict[UUID, int] = {}
+        self._journal: Optional[list] = None  # changes made while a build is reading
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys, self._entries, self._haystacks, self._slots = [], [], [], {}
+            self._journal = None
+            self.loaded = False
+
+    @property
+    def tracking(self) -> bool:
+        """Whether changes are being applied (loaded, or the first build is running)."""
+        return self.loaded or self._journal is not None
+
+    def build(self, entries: Iterable[LookupEntry]) -> None:
+        """
+        Replace the contents; lookups keep using the old arrays until the
+        swap. Changes made while `entries` is being read are replayed on top.
+        """
+        with self._lock:
+            self._journal = []
+        keys, slot_entries, haystacks, slots = [], [], [], {}
+        try:
+            for entry in entries:
+                slot = len(slot_entries)
+                tokens = _tokens(entry)
+                slot_entries.append(entry)
+                haystacks.append(_haystack(tokens))
+                slots[entry.id] = slot
+                keys.extend(f"{token}{_SEPARATOR}{slot}" for token in tokens)
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+        keys.sort()
+        with self._lock:
+            journal, self._journal = self._journal, None
+            self._keys, self._entries, self._haystacks, self._slots = keys, slot_entries, haystacks, slots
+            for change in journal:
+                if isinstance(change, LookupEntry):
+                    self._upsert_locked(change)
+                else:
+                    self._remove_locked(change)
+            self.loaded = True
+        logger.info(f"Patient lookup index built: {len(slots)} patients, {len(keys)} keys")
+
+    def upsert(self, entry: LookupEntry) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(entry)
+            self._upsert_locked(entry)
+
+    def remove(self, patient_id: UUID) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append(patient_id)
+            self._remove_locked(patient_id)
+
+    def _upsert_locked(self, entry: LookupEntry) -> None:
+        self._remove_locked(entry.id)
+        slot = len(self._entries)
+        tokens = _tokens(entry)
+        self._entries.append(entry)
+        self._haystacks.append(_haystack(tokens))
+        self._slots[entry.id] = slot
+        for token in tokens:
+            bisect.insort(self._keys, f"{token}{_SEPARATOR}{slot}")
+
+    def _remove_locked(self, patient_id: UUID) -> None:
+        slot = self._slots.pop(patient_id, None)
+        if slot is None:
+            return
+        for token in _tokens(self._entries[slot]):
+            key = f"{token}{_SEPARATOR}{slot}"
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+        self._entries[slot] = None
+        self._haystacks[slot] = ""
+
+    def lookup(self, query: str, limit: int = DEFAULT_LIMIT) -> list[LookupEntry]:
+        """
+        Patients having a token that starts with each query token, at most
+        `limit` of them. Exact token matches come first: "nimal\\0" sorts
+        before "nimalsiri\\0".
+        """
+        terms = normalize(query)
+        if not terms:
+            return []
+        limit = max(1, min(limit, MAX_LIMIT))
+        # Scan the run of the longest term (the most selective); check the others per entry
+        anchor = max(terms, key=len)
+        others = [" " + term for term in terms if term is not anchor]
+        results, seen = [], set()
+        with self._lock:
+            position = bisect.bisect_left(self._keys, anchor)
+            while position < len(self._keys) and len(results) < limit:
+                key = self._keys[position]
+                position += 1
+                if not key.startswith(anchor):
+                    break
+                slot = int(key.rsplit(_SEPARATOR, 1)[1])
+                if slot in seen:
+                    continue
+                seen.add(slot)
+                if others:
+                    haystack = self._haystacks[slot]
+                    if not all(term in haystack for term in others):
+                        continue
+                results.append(self._entries[slot])
+        return results
+
+
+_index = PatientLookupIndex()
+
+
+def get_lookup_index() -> PatientLookupIndex:
+    return _index
+
+
+def entry_for(patient: Patient) -> LookupEntry:
+    return LookupEntry(patient.id, patient.national_id, patient.first_name, patient.last_name, patient.date_of_birth)
+
+
+def load_from_db(db: Session, batch_size: int = 5000) -> None:
+    """Build the index from a streaming query over the patient columns it needs."""
+    rows = db.query(
+        Patient.id, Patient.national_id, Patient.first_name, Patient.last_name, Patient.date_of_birth,
+    ).execution_options(yield_per=batch_size)
+    _index.build(LookupEntry(*row) for row in rows)
+
+
+def on_patient_saved(patient: Patient) -> None:
+    """Keep the index current after a committed create or update (no-op while not loaded)."""
+    if _index.tracking:
+        _index.upsert(entry_for(patient))
+
+
+def on_patients_imported(db: Session) -> None:
+    """After a bulk import a rebuild is cheaper than inserting every key into the sorted list."""
+    if _index.tracking:
+        load_from_db(db)
+
+
+def on_patient_deleted(patient_id: UUID) -> None:
+    if _index.tracking:
+        _index.remove(patient_id)
+
+
+def _rebuild() -> None:
+    db = SessionLocal()
+    try:
+        load_from_db(db)
+    finally:
+        db.close()
+
+
+async def run_index_refresh(interval: float) -> None:
+    """Build the index, then rebuild it every `interval` seconds (runs until cancelled)."""
+    while True:
+        try:
+            await asyncio.to_thread(_rebuild)
+        except Exception as e:
+            logger.error(f"Patient lookup index build failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,140 @@
+"""
+Patient search engine.
+Serves the admission desk's type-ahead with bounded, ranked pages:
+
+    - NIC: exact match on national_id (`nic`, the "does this patient
+      exist" check), or prefix match for type-ahead (`nic_prefix`) ordered
+      by NIC (btree varchar_pattern_ops index on Postgres), so partial NICs
+      narrow as they are typed and an exact NIC comes first.
+    - Name: matched against the combined "first last" name. On Postgres a
+      pg_trgm GIN index on lower(first_name || ' ' || last_name) serves both
+      substring matches and typo-tolerant word similarity, ranked by
+      word_similarity. Other databases (SQLite in tests) fall back to
+      LIKE with a coarse exact/prefix/word-prefix/substring rank.
+
+Pages are keyset-paginated: the opaque cursor carries the sort key of the
+last row returned, so deep pages cost the same as the first.
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import Float, and_, case, cast, func, literal_column, or_
+from sqlalchemy.orm import Session
+from app.core.pagination import decode_cursor, encode_cursor, invalid_cursor
+from app.models.patient import Patient
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Must match the indexed expression in the patient search migration exactly
+FULL_NAME = func.lower(Patient.first_name + literal_column("' '") + Patient.last_name)
+
+
+@dataclass
+class PatientSearchPage:
+    """One page of search results and the cursor for the next (None on the last page)."""
+    patients: list[Patient] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def _score_key(after: dict) -> tuple:
+    try:
+        return after["score"], UUID(str(after["id"]))
+    except (KeyError, ValueError):
+        raise invalid_cursor()
+
+
+def _name_score(db: Session, name: str):
+    """Relevance of the combined name to the query, higher is better."""
+    if db.get_bind().dialect.name == "postgresql":
+        # word_similarity() is real; as float8 the score sorts and compares equal to
+        # the cursor's JSON float, so rows tied on the boundary score are not repeated
+        return cast(func.word_similarity(name, FULL_NAME), Float(53))
+    return case(
+        (FULL_NAME == name, 3),
+        (FULL_NAME.startswith(name, autoescape=True), 2),
+        (FULL_NAME.contains(" " + name, autoescape=True), 1),
+        else_=0,
+    )
+
+
+def _name_filter(db: Session, name: str):
+    substring = FULL_NAME.contains(name, autoescape=True)
+    if db.get_bind().dialect.name == "postgresql":
+        # "%>": word similarity above pg_trgm.word_similarity_threshold (typo tolerant)
+        return or_(substring, FULL_NAME.op("%>")(name))
+    return substring
+
+
+def search(
+    db: Session,
+    nic: Optional[str] = None,
+    name: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    nic_prefix: Optional[str] = None,
+) -> PatientSearchPage:
+    """
+    Search patients by NIC, NIC prefix or name; with none, list all patients.
+
+    Args:
+        db: Database session
+        nic: Complete national ID, matched exactly (takes precedence over the rest)
+        name: Any part of the patient's "first last" name
+        nic_prefix: Leading characters of a national ID (takes precedence over name)
+        limit: Page size (capped at MAX_LIMIT)
+        cursor: next_cursor of the previous page
+
+    Returns:
+        PatientSearchPage
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    after = decode_cursor(cursor) if cursor else None
+    nic = nic.strip() if nic else None
+    nic_prefix = nic_prefix.strip() if nic_prefix else None
+    name = " ".join(name.lower().split()) if name else None
+
+    if nic:
+        patients = db.query(Patient).filter(Patient.national_id == nic).all()
+        next_key = None
+        logger.debug(f"Searching patients by NIC: {nic}")
+    elif nic_prefix:
+        query = db.query(Patient).filter(Patient.national_id.startswith(nic_prefix, autoescape=True))
+        if after:
+            query = query.filter(Patient.national_id > str(after.get("nic", "")))
+        rows = query.order_by(Patient.national_id).limit(limit + 1).all()
+        patients = rows[:limit]
+        next_key = {"nic": patients[-1].national_id} if len(rows) > limit else None
+        logger.debug(f"Searching patients by NIC prefix: {nic_prefix}")
+    elif name:
+        score = _name_score(db, name).label("score")
+        query = db.query(Patient, score).filter(_name_filter(db, name))
+        if after:
+            after_score, after_id = _score_key(after)
+            query = query.filter(or_(
+                score < after_score,
+                and_(score == after_score, Patient.id > after_id),
+            ))
+        rows = query.order_by(score.desc(), Patient.id).limit(limit + 1).all()
+        patients = [patient for patient, _ in rows[:limit]]
+        next_key = None
+        if len(rows) > limit:
+            last_patient, last_score = rows[limit - 1]
+            next_key = {"score": last_score, "id": str(last_patient.id)}
+        logger.debug(f"Searching patients by name: {name}")
+    else:
+        query = db.query(Patient)
+        if after:
+            query = query.filter(Patient.id > _score_key(after)[1])
+        rows = query.order_by(Patient.id).limit(limit + 1).all()
+        patients = rows[:limit]
+        next_key = {"score": 0, "id": str(patients[-1].id)} if len(rows) > limit else None
+
+    logger.info(f"Patient search returned {len(patients)} results")
+    return PatientSearchPage(patients=patients, next_cursor=encode_cursor(next_key) if next_key else None)
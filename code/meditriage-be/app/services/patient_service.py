@@ -2,15 +2,21 @@
 Patient service layer.
 Business logic for patient management, search, and encounter history.
 """
+from dataclasses import dataclass, field
+from datetime import datetime
 from uuid import UUID
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, select, union_all
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from app.models.patient import Patient
-from app.models.clinical import MedicalEncounter
+from app.models.clinical import ArchivedEncounter, MedicalEncounter
+from app.models.user import User
 from app.schemas.patient import PatientCreate, PatientUpdate, EncounterSummary
+from app.services import duplicate_detection, encounter_queue, patient_lookup, patient_search
 from app.core.logging import get_logger
+from app.core.pagination import decode_cursor, encode_cursor, invalid_cursor
 
 logger = get_logger(__name__)
 
@@ -41,6 +47,15 @@ def create_patient(data: PatientCreate, db: Session) -> Patient:
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Patient with national ID {data.national_id} already exists"
         )
+
+    # Near matches (typo'd NIC, transliterated name) are reported, not refused:
+    # twins and namesakes legitimately share DOB and name keys
+    candidates = duplicate_detection.find_candidates(_identity(data), db)
+    if candidates:
+        logger.warning(
+            f"Registering NIC {data.national_id} with possible duplicates: "
+            + ", ".join(f"{c.patient.id} ({c.score:.2f})" for c in candidates)
+        )
     
     try:
         # Create new patient
@@ -52,9 +67,11 @@ def create_patient(data: PatientCreate, db: Session) -> Patient:
             gender=data.gender,
             contact_number=data.contact_number,
         )
+        duplicate_detection.refresh_blocking_keys(patient)
         db.add(patient)
         db.commit()
         db.refresh(patient)
+        patient_lookup.on_patient_saved(patient)
         
         logger.info(f"Patient created: id={patient.id}, nic={data.national_id}, name={data.first_name} {data.last_name}")
         return patient
@@ -68,40 +85,60 @@ def create_patient(data: PatientCreate, db: Session) -> Patient:
         )
 
 
+def _identity(data: PatientCreate) -> duplicate_detection.PatientIdentity:
+    return duplicate_detection.PatientIdentity(data.national_id, data.first_name, data.last_name, data.date_of_birth)
+
+
+def check_duplicates(data: PatientCreate, db: Session) -> List[duplicate_detection.DuplicateCandidate]:
+    """
+    Existing patients that are probably the person about to be registered.
+    
+    Args:
+        data: Registration form data
+        db: Database session
+        
+    Returns:
+        Likely duplicates, best match first
+    """
+    return duplicate_detection.find_candidates(_identity(data), db)
+
+
+def get_patient_duplicates(patient_id: UUID, db: Session) -> List[duplicate_detection.DuplicateCandidate]:
+    """
+    Other patients that are probably the same person as this one.
+    
+    Raises:
+        HTTPException: 404 if patient not found
+    """
+    patient = get_patient_by_id(patient_id, db)
+    return duplicate_detection.find_candidates(
+        duplicate_detection.identity_of(patient), db, exclude_id=patient.id
+    )
+
+
 def search_patients(
     nic: Optional[str] = None,
     name: Optional[str] = None,
-    db: Session = None
+    db: Session = None,
+    limit: int = patient_search.DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
 ) -> List[Patient]:
     """
-    Search for patients by national ID (exact match) or name (partial match).
+    Search for patients by national ID (exact match) or name (partial,
+    ranked match on the full name). Returns one page; use
+    patient_search.search for the cursor to the next page.
     
     Args:
-        nic: National ID for exact match
-        name: Name for partial match (searches first_name and last_name)
+        nic: Complete national ID
+        name: Name for partial match (searches "first_name last_name")
         db: Database session
+        limit: Maximum number of patients returned
+        cursor: Cursor from the previous page
         
     Returns:
-        List of matching patients
-    """
-    query = db.query(Patient)
-    
-    if nic:
-        # Exact match on national ID (high precision)
-        query = query.filter(Patient.national_id == nic)
-        logger.debug(f"Searching patients by NIC: {nic}")
-    elif name:
-        # Partial match on first_name OR last_name (high recall)
-        search_pattern = f"%{name}%"
-        query = query.filter(
-            (Patient.first_name.ilike(search_pattern)) |
-            (Patient.last_name.ilike(search_pattern))
-        )
-        logger.debug(f"Searching patients by name: {name}")
-    
-    patients = query.all()
-    logger.info(f"Patient search returned {len(patients)} results")
-    return patients
+        List of matching patients, best match first
+    """
+    return patient_search.search(db, nic=nic, name=name, limit=limit, cursor=cursor).patients
 
 
 def get_patient_by_id(patient_id: UUID, db: Session) -> Patient:
@@ -151,9 +188,13 @@ def update_patient(patient_id: UUID, data: PatientUpdate, db: Session) -> Patien
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(patient, field, value)
+    duplicate_detection.refresh_blocking_keys(patient)
+    if {"first_name", "last_name"} & update_data.keys():
+        encounter_queue.rename_patient(db, patient)
     
     db.commit()
     db.refresh(patient)
+    patient_lookup.on_patient_saved(patient)
     
     logger.info(f"Patient updated: id={patient_id}, fields={list(update_data.keys())}")
     return patient
@@ -180,12 +221,121 @@ def soft_delete_patient(patient_id: UUID, db: Session) -> bool:
     # TODO: Add is_active field to Patient model and implement soft delete
     db.delete(patient)
     db.commit()
+    patient_lookup.on_patient_deleted(patient_id)
     
     logger.info(f"Patient deleted: id={patient_id}")
     return True
 
 
-def get_patient_encounter_history(patient_id: UUID, db: Session) -> List[EncounterSummary]:
+@dataclass
+class EncounterHistoryPage:
+    """One page of a patient's encounter history, newest first."""
+    encounters: List[EncounterSummary] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 200
+
+
+def _history_summaries(table, patient_id: UUID, after: Optional[tuple], *conditions):
+    """Summary columns of a patient's encounters in `table`, after the (timestamp, id) keyset."""
+    nurse, doctor = aliased(User), aliased(User)
+    query = select(
+        table.id,
+        table.encounter_timestamp,
+        table.chief_complaint,
+        table.status,
+        table.is_urgent,
+        nurse.full_name.label("nurse_name"),
+        doctor.full_name.label("doctor_name"),
+    ).outerjoin(
+        nurse, table.nurse_id == nurse.id
+    ).outerjoin(
+        doctor, table.doctor_id == doctor.id
+    ).where(table.patient_id == patient_id, *conditions)
+    if after:
+        query = query.where(or_(
+            table.encounter_timestamp < after[0],
+            and_(table.encounter_timestamp == after[0], table.id < after[1]),
+        ))
+    return query
+
+
+def get_encounter_history_page(
+    patient_id: UUID,
+    db: Session,
+    limit: int = HISTORY_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> EncounterHistoryPage:
+    """
+    One page of encounter history, newest first, in a single query.
+    Selects only the summary columns, with nurse and doctor names joined
+    in, from both medical_encounters and archived_encounters, and continues
+    after `cursor` using their (patient_id, encounter_timestamp) indexes
+    instead of an OFFSET.
+    
+    Args:
+        patient_id: Patient UUID
+        db: Database session
+        limit: Page size (capped at HISTORY_MAX_LIMIT)
+        cursor: next_cursor of the previous page
+        
+    Returns:
+        EncounterHistoryPage
+        
+    Raises:
+        HTTPException: 404 if patient not found, 400 if the cursor is malformed
+    """
+    limit = max(1, min(limit, HISTORY_MAX_LIMIT))
+    after = None
+    if cursor:
+        decoded = decode_cursor(cursor)
+        try:
+            after = datetime.fromisoformat(decoded["ts"]), UUID(decoded["id"])
+        except (KeyError, TypeError, ValueError):
+            raise invalid_cursor()
+
+    # Recent encounters and archived ones, merged in one statement
+    history_rows = union_all(
+        _history_summaries(MedicalEncounter, patient_id, after, MedicalEncounter.deleted_at.is_(None)),
+        _history_summaries(ArchivedEncounter, patient_id, after),
+    ).subquery()
+    rows = db.execute(
+        select(history_rows).order_by(history_rows.c.encounter_timestamp.desc(), history_rows.c.id.desc()).limit(limit + 1)
+    ).all()
+
+    # Only an empty first page needs to tell "no visits" from "no such patient"
+    if not rows and not cursor:
+        get_patient_by_id(patient_id, db)
+
+    history = [
+        EncounterSummary(
+            id=row.id,
+            encounter_timestamp=row.encounter_timestamp,
+            chief_complaint=row.chief_complaint,
+            status=row.status.value,
+            is_urgent=row.is_urgent,
+            nurse_name=row.nurse_name or "Unknown",
+            doctor_name=row.doctor_name,
+        )
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = history[-1]
+        next_cursor = encode_cursor({"ts": last.encounter_timestamp.isoformat(), "id": str(last.id)})
+
+    logger.info(f"Retrieved {len(history)} encounters for patient: id={patient_id}")
+    return EncounterHistoryPage(encounters=history, next_cursor=next_cursor)
+
+
+def get_patient_encounter_history(
+    patient_id: UUID,
+    db: Session,
+    limit: int = HISTORY_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> List[EncounterSummary]:
     """
     Get encounter history for a patient.
     Returns summary view with dates, chief complaints, and statuses.
@@ -193,6 +343,8 @@ def get_patient_encounter_history(patient_id: UUID, db: Session) -> List[Encount
     Args:
         patient_id: Patient UUID
         db: Database session
+        limit: Maximum number of encounters (newest first)
+        cursor: Cursor from the previous page
         
     Returns:
         List of EncounterSummary objects
@@ -200,28 +352,4 @@ def get_patient_encounter_history(patient_id: UUID, db: Session) -> List[Encount
     Raises:
         HTTPException: 404 if patient not found
     """
-    # Verify patient exists
-    get_patient_by_id(patient_id, db)
-    
-    # Fetch all encounters for this patient with related data
-    encounters = db.query(MedicalEncounter).filter(
-        MedicalEncounter.patient_id == patient_id,
-        MedicalEncounter.deleted_at.is_(None)
-    ).order_by(MedicalEncounter.encounter_timestamp.desc()).all()
-    
-    # Build summary list
-    history = []
-    for enc in encounters:
-        summary = EncounterSummary(
-            id=enc.id,
-            encounter_timestamp=enc.encounter_timestamp,
-            chief_complaint=enc.chief_complaint,
-            status=enc.status.value,
-            is_urgent=enc.is_urgent,
-            nurse_name=enc.nurse.full_name if enc.nurse else "Unknown",
-            doctor_name=enc.doctor.full_name if enc.doctor else None,
-        )
-        history.append(summary)
-    
-    logger.info(f"Retrieved {len(history)} encounters for patient: id={patient_id}")
-    return history
+    return get_encounter_history_page(patient_id, db, limit=limit, cursor=cursor).encounters
@@ -0,0 +1,402 @@
+"""
+Priority scheduler for the encounter queue.
+Ranks open encounters by SLA deadline: arrival time plus the review target
+for their acuity (QUEUE_SLA_URGENT_MINUTES / QUEUE_SLA_ROUTINE_MINUTES).
+Earliest deadline first puts urgent encounters ahead of routine ones that
+arrived at the same time, and ages routine ones: a routine encounter that
+has waited longer than the difference between the two targets ranks above
+a newly arrived urgent one. Unlike a wait/SLA ratio, the deadline does not
+change as time passes, so the order only moves when an encounter does.
+
+Doctor availability (users.is_available) shifts the deadline of encounters
+assigned to a doctor marked unavailable by
+QUEUE_UNAVAILABLE_DOCTOR_DELAY_MINUTES, so patients who cannot be seen yet
+stop blocking the ones who can.
+
+Encounters sit in binary heaps indexed by encounter id, so each state
+change is an O(log n) sift instead of a re-sort:
+
+    queue       every open encounter (the reordered queue view)
+    ready       AWAITING_REVIEW encounters with no doctor
+    by doctor   AWAITING_REVIEW encounters assigned to that doctor
+
+"Next patient for doctor X" is the better of the tops of X's heap and the
+unassigned heap.
+
+The scheduler mirrors encounter_queue. Committed queue changes (see
+encounter_queue.subscribe) mark encounters stale, and the next read reloads
+just those rows. Like the patient lookup index it is per process: changes
+made through another worker, including availability set there, are picked
+up at the next full reload (QUEUE_SCHEDULER_RESYNC_SECONDS), which also
+re-reads availability from the database.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import false, select
+from sqlalchemy.orm import Session
+from app.models.clinical import EncounterQueueEntry, EncounterStatus
+from app.models.user import User, UserRole
+from app.services import encounter_queue
+from app.core.config import get_settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class IndexedHeap:
+    """Binary min-heap of (key, id) with an id -> position index, for O(log n) update and removal."""
+
+    def __init__(self):
+        self._heap: list[tuple] = []
+        self._positions: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self._positions
+
+    def push(self, item_id, key) -> None:
+        """Insert `item_id`, or move it if already present."""
+        position = self._positions.get(item_id)
+        if position is None:
+            self._heap.append((key, item_id))
+            self._positions[item_id] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+            return
+        old_key = self._heap[position][0]
+        self._heap[position] = (key, item_id)
+        if key < old_key:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def remove(self, item_id) -> None:
+        position = self._positions.pop(item_id, None)
+        if position is None:
+            return
+        last = self._heap.pop()
+        if position == len(self._heap):
+            return
+        self._heap[position] = last
+        self._positions[last[1]] = position
+        self._sift_up(position)
+        self._sift_down(self._positions[last[1]])
+
+    def peek(self) -> Optional[tuple]:
+        """The smallest (key, id), or None when empty."""
+        return self._heap[0] if self._heap else None
+
+    def ordered(self) -> list[tuple]:
+        return sorted(self._heap)
+
+    def _swap(self, i: int, j: int) -> None:
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._positions[heap[i][1]] = i
+        self._positions[heap[j][1]] = j
+
+    def _sift_up(self, position: int) -> None:
+        heap = self._heap
+        while position > 0:
+            parent = (position - 1) // 2
+            if heap[position] >= heap[parent]:
+                break
+            self._swap(position, parent)
+            position = parent
+
+    def _sift_down(self, position: int) -> None:
+        heap, size = self._heap, len(self._heap)
+        while True:
+            smallest, left = position, 2 * position + 1
+            if left < size and heap[left] < heap[smallest]:
+                smallest = left
+            if left + 1 < size and heap[left + 1] < heap[smallest]:
+                smallest = left + 1
+            if smallest == position:
+                return
+            self._swap(position, smallest)
+            position = smallest
+
+
+@dataclass
+class ScheduledEncounter:
+    """An open encounter as the scheduler sees it (the encounter_queue columns it uses)."""
+    encounter_id: UUID
+    patient_id: UUID
+    patient_name: str
+    nurse_id: UUID
+    doctor_id: Optional[UUID]
+    doctor_name: Optional[str]
+    status: EncounterStatus
+    is_urgent: bool
+    chief_complaint: Optional[str]
+    encounter_timestamp: datetime
+    sla_deadline: datetime
+
+    def sla_used(self, now: datetime) -> float:
+        """Fraction of the SLA target already waited (above 1: breached)."""
+        target = (self.sla_deadline - self.encounter_timestamp).total_seconds()
+        return (now - self.encounter_timestamp).total_seconds() / target
+
+
+_FIELDS = (
+    "encounter_id", "patient_id", "patient_name", "nurse_id", "doctor_id", "doctor_name",
+    "status", "is_urgent", "chief_complaint", "encounter_timestamp",
+)
+
+
+class QueueScheduler:
+    """
+    Heaps of open encounters keyed by (deadline, arrival, id).
+
+    Args:
+        urgent_sla_minutes: Review target for urgent encounters
+        routine_sla_minutes: Review target for the rest
+        unavailable_delay_minutes: Deadline shift for encounters of unavailable doctors
+    """
+
+    def __init__(self, urgent_sla_minutes: float, routine_sla_minutes: float, unavailable_delay_minutes: float):
+        if urgent_sla_minutes <= 0 or routine_sla_minutes <= 0:
+            raise ValueError("SLA targets must be positive")
+        self.sla = {True: timedelta(minutes=urgent_sla_minutes), False: timedelta(minutes=routine_sla_minutes)}
+        self.unavailable_delay = timedelta(minutes=unavailable_delay_minutes)
+        self._lock = threading.Lock()
+        self._unavailable: set[UUID] = set()  # doctors marked unavailable
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Forget every encounter and doctor availability."""
+        with self._lock:
+            self._reset_locked()
+            self._unavailable.clear()
+            self._stale: set[UUID] = set()
+            self._tracking = False  # recording changes (loaded, or a load is reading)
+            self.loaded_at: Optional[float] = None  # time.monotonic() of the last full load
+
+    def _reset_locked(self) -> None:
+        self._entries: dict[UUID, ScheduledEncounter] = {}
+        self._queue = IndexedHeap()
+        self._ready = IndexedHeap()
+        self._ready_by_doctor: dict[UUID, IndexedHeap] = {}
+        self._assigned: dict[UUID, set[UUID]] = {}  # doctor -> open encounter ids
+
+    def _key(self, entry: ScheduledEncounter) -> tuple:
+        deadline = entry.sla_deadline
+        if entry.doctor_id in self._unavailable:
+            deadline += self.unavailable_delay
+        return (deadline, entry.encounter_timestamp, str(entry.encounter_id))
+
+    def _ready_heap(self, entry: ScheduledEncounter) -> Optional[IndexedHeap]:
+        """The heap a doctor picks this encounter from, if it is waiting for review."""
+        if entry.status != EncounterStatus.AWAITING_REVIEW:
+            return None
+        if entry.doctor_id is None:
+            return self._ready
+        return self._ready_by_doctor.setdefault(entry.doctor_id, IndexedHeap())
+
+    def _discard_locked(self, encounter_id: UUID) -> None:
+        entry = self._entries.pop(encounter_id, None)
+        if entry is None:
+            return
+        self._queue.remove(encounter_id)
+        ready = self._ready_heap(entry)
+        if ready is not None:
+            ready.remove(encounter_id)
+        if entry.doctor_id is not None:
+            self._assigned[entry.doctor_id].discard(encounter_id)
+
+    def _apply_locked(self, row) -> None:
+        if row.status == EncounterStatus.COMPLETED:
+            self._discard_locked(row.encounter_id)
+            return
+        entry = ScheduledEncounter(
+            **{name: getattr(row, name) for name in _FIELDS},
+            sla_deadline=row.encounter_timestamp + self.sla[bool(row.is_urgent)],
+        )
+        old = self._entries.get(entry.encounter_id)
+        old_ready = self._ready_heap(old) if old is not None else None
+        new_ready = self._ready_heap(entry)
+        if old is not None and old.doctor_id != entry.doctor_id:
+            if old.doctor_id is not None:
+                self._assigned[old.doctor_id].discard(entry.encounter_id)
+        if entry.doctor_id is not None:
+            self._assigned.setdefault(entry.doctor_id, set()).add(entry.encounter_id)
+
+        key = self._key(entry)
+        self._entries[entry.encounter_id] = entry
+        self._queue.push(entry.encounter_id, key)
+        if old_ready is not None and old_ready is not new_ready:
+            old_ready.remove(entry.encounter_id)
+        if new_ready is not None:
+            new_ready.push(entry.encounter_id, key)
+
+    def apply(self, row) -> None:
+        """Insert or move one encounter (any object with the encounter_queue columns)."""
+        with self._lock:
+            self._apply_locked(row)
+
+    def remove(self, encounter_id: UUID) -> None:
+        with self._lock:
+            self._discard_locked(encounter_id)
+
+    def track(self) -> None:
+        """Start recording changes; call before reading the rows for `load`."""
+        with self._lock:
+            self._tracking = True
+
+    def load(self, rows, unavailable_doctors=()) -> None:
+        """Replace the contents with `rows` (open encounter_queue rows) and the unavailable doctors."""
+        with self._lock:
+            self._reset_locked()
+            self._unavailable = set(unavailable_doctors)
+            for row in rows:
+                self._apply_locked(row)
+            self.loaded_at = time.monotonic()
+
+    def mark_stale(self, changes: list) -> None:
+        """encounter_queue listener: reload these encounters on the next read."""
+        with self._lock:
+            if self._tracking:
+                self._stale.update(change.encounter_id for change in changes)
+
+    def take_stale(self) -> set[UUID]:
+        with self._lock:
+            stale, self._stale = self._stale, set()
+        return stale
+
+    def set_doctor_available(self, doctor_id: UUID, available: bool) -> None:
+        """Mark a doctor (un)available and re-rank only that doctor's encounters."""
+        with self._lock:
+            if available:
+                self._unavailable.discard(doctor_id)
+            else:
+                self._unavailable.add(doctor_id)
+            for encounter_id in self._assigned.get(doctor_id, ()):
+                entry = self._entries[encounter_id]
+                key = self._key(entry)
+                self._queue.push(encounter_id, key)
+                ready = self._ready_heap(entry)
+                if ready is not None:
+                    ready.push(encounter_id, key)
+
+    def is_available(self, doctor_id: UUID) -> bool:
+        return doctor_id not in self._unavailable
+
+    def next_for_doctor(self, doctor_id: UUID) -> Optional[ScheduledEncounter]:
+        """The encounter doctor `doctor_id` should review next: theirs or unassigned, earliest deadline."""
+        with self._lock:
+            candidates = [self._ready.peek()]
+            own = self._ready_by_doctor.get(doctor_id)
+            if own is not None:
+                candidates.append(own.peek())
+            candidates = [candidate for candidate in candidates if candidate is not None]
+            if not candidates:
+                return None
+            return self._entries[min(candidates)[1]]
+
+    def ordered(self, limit: Optional[int] = None) -> list[ScheduledEncounter]:
+        """Open encounters in priority order."""
+        with self._lock:
+            ordered = self._queue.ordered()
+            if limit is not None:
+                ordered = ordered[:limit]
+            return [self._entries[encounter_id] for _, encounter_id in ordered]
+
+
+_scheduler: Optional[QueueScheduler] = None
+
+
+def get_scheduler() -> QueueScheduler:
+    """Process-wide scheduler, configured from settings on first use."""
+    global _scheduler
+    if _scheduler is None:
+        settings = get_settings()
+        _scheduler = QueueScheduler(
+            settings.QUEUE_SLA_URGENT_MINUTES,
+            settings.QUEUE_SLA_ROUTINE_MINUTES,
+            settings.QUEUE_UNAVAILABLE_DOCTOR_DELAY_MINUTES,
+        )
+        encounter_queue.subscribe(_scheduler.mark_stale)
+    return _scheduler
+
+
+def _open_rows(db: Session, *conditions):
+    queue = EncounterQueueEntry.__table__
+    columns = [queue.c[name] for name in _FIELDS]
+    return db.execute(select(*columns).where(queue.c.status != EncounterStatus.COMPLETED, *conditions)).all()
+
+
+def _unavailable_doctors(db: Session) -> list[UUID]:
+    return list(db.execute(
+        select(User.id).where(User.role == UserRole.DOCTOR, User.is_available == false())
+    ).scalars())
+
+
+def refresh(db: Session) -> QueueScheduler:
+    """
+    Bring the scheduler up to date before a read.
+
+    Loads every open encounter and doctor availability when the scheduler
+    is empty or older than QUEUE_SCHEDULER_RESYNC_SECONDS, then reloads the
+    encounters changed since the last read.
+
+    Args:
+        db: Database session
+
+    Returns:
+        The process-wide QueueScheduler
+    """
+    scheduler = get_scheduler()
+    resync = get_settings().QUEUE_SCHEDULER_RESYNC_SECONDS
+    if scheduler.loaded_at is None or time.monotonic() - scheduler.loaded_at >= resync:
+        scheduler.track()  # changes committed while the rows are read are replayed below
+        scheduler.load(_open_rows(db), _unavailable_doctors(db))
+        logger.info(f"Queue scheduler loaded: {len(scheduler)} open encounters")
+    stale = scheduler.take_stale()
+    if stale:
+        rows = _open_rows(db, EncounterQueueEntry.encounter_id.in_(stale))
+        for row in rows:
+            scheduler.apply(row)
+        for encounter_id in stale - {row.encounter_id for row in rows}:
+            scheduler.remove(encounter_id)
+    return scheduler
+
+
+def set_doctor_availability(doctor_id: UUID, available: bool, db: Session) -> User:
+    """
+    Store a doctor's availability and re-rank their encounters in this process.
+
+    Other workers pick the change up at their next full reload.
+
+    Args:
+        doctor_id: Doctor's user UUID
+        available: Whether the doctor is taking patients
+        db: Database session
+
+    Returns:
+        Updated User object
+
+    Raises:
+        HTTPException: 404 if no doctor has this ID
+    """
+    doctor = db.query(User).filter(User.id == doctor_id, User.role == UserRole.DOCTOR).first()
+    if not doctor:
+        logger.warning(f"Doctor not found for availability update: id={doctor_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Doctor with ID {doctor_id} not found"
+        )
+
+    doctor.is_available = available
+    db.commit()
+    get_scheduler().set_doctor_available(doctor_id, available)
+    return doctor
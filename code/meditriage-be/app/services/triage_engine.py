@@ -4,8 +4,12 @@ Business logic layer for managing triage interviews.
 Sits between API endpoints and the AI pipeline.
 """
 from uuid import UUID
+from dataclasses import dataclass
 from datetime import date, datetime
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException
 from app.models.clinical import (
     MedicalEncounter,
@@ -15,7 +19,10 @@ from app.models.clinical import (
     SenderType,
 )
 from app.services.llm.chain_factory import TriagePipeline
+from app.services.llm.circuit_breaker import get_breaker
 from app.services.llm.parser import SOAPNote
+from app.services.llm.usage import get_ledger, usage_scope
+from app.services.llm.interviewer import get_interview_metrics
 from app.schemas.chat import (
     ChatMessageRequest,
     ChatMessageResponse,
@@ -23,7 +30,12 @@ from app.schemas.chat import (
     StartInterviewRequest,
     StartInterviewResponse,
 )
+from app.services import encounter_queue
 from app.services.encounter_service import create_encounter
+from app.services.conversation_store import ConversationState, get_conversation_store
+from app.services.generation_lock import soap_generation_lock
+from app.core import tracing
+from app.core.config import get_settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -35,16 +47,31 @@ _pipeline: TriagePipeline | None = None
 def _get_pipeline() -> TriagePipeline:
     """
     Lazy initialization of the triage pipeline singleton.
-    Resets on failure so the next request gets a fresh attempt
-    instead of reusing a broken instance indefinitely.
+    Construction is guarded by the "pipeline_init" circuit breaker: after a
+    failed construction, requests fast-fail with 503 until the reset timeout
+    passes, and only then is a single fresh construction attempted.
     """
     global _pipeline
     if _pipeline is None:
+        settings = get_settings()
+        breaker = get_breaker(
+            "pipeline_init",
+            failure_threshold=1,
+            reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+        )
+        if not breaker.allow_request():
+            raise HTTPException(
+                status_code=503,
+                detail="AI service is currently unavailable. Please try again shortly.",
+                headers={"Retry-After": str(int(breaker.retry_after()) + 1)},
+            )
         try:
             _pipeline = TriagePipeline()
+            breaker.record_success()
             logger.info("LLM pipeline initialized successfully.")
         except Exception as e:
-            _pipeline = None  # reset so next request retries fresh
+            _pipeline = None
+            breaker.record_failure(e)
             logger.error(f"Failed to initialize LLM pipeline: {e}")
             raise HTTPException(
                 status_code=503,
@@ -64,25 +91,93 @@ def _build_chat_history(interactions: list[TriageInteraction]) -> list[dict]:
     Convert database TriageInteraction records into LangChain chat history format.
     Maps: AI → assistant, PATIENT/NURSE → user
     """
-    history = []
-    for interaction in interactions:
-        if interaction.sender_type == SenderType.AI:
-            role = "assistant"
-        else:
-            role = "user"
-        history.append({"role": role, "content": interaction.message_content})
-    return history
+    return ConversationState.from_interactions(interactions).history
 
 
 def _build_transcript(interactions: list[TriageInteraction]) -> str:
     """Build a readable transcript from interaction records."""
-    lines = []
-    for interaction in interactions:
-        sender = interaction.sender_type.value
-        lines.append(f"{sender}: {interaction.message_content}")
-    return "\n".join(lines)
+    return ConversationState.from_interactions(interactions).transcript
+
+
+def _find_clinical_note(encounter_id: UUID, db: Session) -> Optional[ClinicalNote]:
+    """Fresh lookup of an encounter's clinical note (bypasses relationships loaded earlier)."""
+    return db.query(ClinicalNote).filter(ClinicalNote.encounter_id == encounter_id).first()
+
+
+@dataclass
+class TriageContext:
+    """Everything a triage turn needs before calling the LLM."""
+    encounter: MedicalEncounter
+    patient_context: dict
+    conversation: ConversationState
+
+
+def _build_patient_context(encounter: MedicalEncounter) -> dict:
+    """Patient context for the prompts: {"age", "gender", "chief_complaint"}."""
+    patient = encounter.patient
+    return {
+        "age": _calculate_age(patient.date_of_birth) if patient and patient.date_of_birth else "unknown",
+        "gender": "unknown",  # gender field not in Patient model yet
+        "chief_complaint": encounter.chief_complaint or "unspecified",
+    }
 
 
+def load_triage_context(encounter_id: UUID, db: Session) -> Optional[TriageContext]:
+    """
+    Load an encounter with its patient, clinical note and conversation in one query.
+
+    Interactions are joined in only when the conversation state is not
+    already cached, so a warm turn is a single encounter+patient+note SELECT
+    and a cold one is the same SELECT with the interaction log joined. The
+    SELECT also counts the encounter's interactions: a cached state with a
+    different number of turns (another worker served the encounter in
+    between) is rebuilt from the log.
+
+    Args:
+        encounter_id: UUID of the encounter.
+        db: Database session.
+
+    Returns:
+        TriageContext, or None if the encounter does not exist.
+    """
+    store = get_conversation_store()
+    conversation = store.get(encounter_id)
+
+    options = [joinedload(MedicalEncounter.patient), joinedload(MedicalEncounter.clinical_note)]
+    if conversation is None:
+        options.append(joinedload(MedicalEncounter.interactions))
+    interaction_count = (
+        select(func.count(TriageInteraction.id))
+        .where(TriageInteraction.encounter_id == MedicalEncounter.id)
+        .correlate(MedicalEncounter)
+        .scalar_subquery()
+    )
+
+    row = db.query(MedicalEncounter, interaction_count).options(*options).filter(
+        MedicalEncounter.id == encounter_id
+    ).first()
+    if row is None:
+        return None
+    encounter, turns = row
+
+    if conversation is not None and len(conversation.history) != turns:
+        logger.info(f"Cached conversation for encounter {encounter_id} is stale; rebuilding")
+        interactions = db.query(TriageInteraction).filter(
+            TriageInteraction.encounter_id == encounter_id
+        ).order_by(TriageInteraction.timestamp.asc()).all()
+        conversation = store.put(encounter.id, ConversationState.from_interactions(interactions))
+    elif conversation is None:
+        interactions = sorted(encounter.interactions, key=lambda interaction: interaction.timestamp)
+        conversation = store.put(encounter.id, ConversationState.from_interactions(interactions))
+
+    return TriageContext(
+        encounter=encounter,
+        patient_context=_build_patient_context(encounter),
+        conversation=conversation,
+    )
+
+
+@tracing.traced("triage.start")
 async def start_interview(
     request: StartInterviewRequest,
     nurse_id: UUID,
@@ -92,6 +187,9 @@ async def start_interview(
     Start a triage interview for an encounter.
     Creates a new medical encounter, generates the AI's initial greeting, and saves it.
     """
+    # Resolve the pipeline first so an AI outage fails fast without leaving an orphan encounter
+    pipeline = _get_pipeline()
+
     # Create the encounter
     encounter = create_encounter(
         patient_id=request.patient_id,
@@ -100,8 +198,6 @@ async def start_interview(
         db=db
     )
 
-    pipeline = _get_pipeline()
-
     # Generate initial greeting
     chief_complaint = encounter.chief_complaint or "unspecified symptoms"
     greeting = pipeline.get_initial_greeting(chief_complaint)
@@ -113,7 +209,13 @@ async def start_interview(
         message_content=greeting,
     )
     db.add(ai_interaction)
-    db.commit()
+    with tracing.span("commit"):
+        db.commit()
+
+    # Seed the conversation state so the first turn needs no history query
+    state = ConversationState()
+    state.append(SenderType.AI, greeting)
+    get_conversation_store().put(encounter.id, state)
 
     logger.info(f"Triage interview started for encounter {encounter.id}")
 
@@ -124,6 +226,7 @@ async def start_interview(
     )
 
 
+@tracing.traced("triage.chat")
 async def process_message(
     request: ChatMessageRequest,
     db: Session
@@ -133,51 +236,44 @@ async def process_message(
     Saves the patient message, calls AI, saves AI response.
     If interview is complete, generates SOAP note.
     """
-    # Fetch encounter with patient
-    encounter = db.query(MedicalEncounter).filter(
-        MedicalEncounter.id == request.encounter_id
-    ).first()
+    # Encounter, patient and history in one round trip
+    with tracing.span("history_load"):
+        context = load_triage_context(request.encounter_id, db)
 
-    if not encounter:
+    if not context:
         raise ValueError(f"Encounter {request.encounter_id} not found.")
 
+    encounter = context.encounter
+    encounter_id = encounter.id
+
     if encounter.status != EncounterStatus.TRIAGE_IN_PROGRESS:
         raise ValueError(f"Encounter is not in TRIAGE_IN_PROGRESS status.")
 
     if encounter.deleted_at is not None:
         raise ValueError(f"Encounter is cancelled and cannot receive new messages.")
 
+    # The new message is sent separately (scrubbed), so it is not part of the history
+    state = context.conversation
+    chat_history = list(state.history)
+    patient_context = context.patient_context
+
     # Save patient's message
     patient_interaction = TriageInteraction(
-        encounter_id=encounter.id,
+        encounter_id=encounter_id,
         sender_type=SenderType.PATIENT,
         message_content=request.message,
     )
     db.add(patient_interaction)
-    db.flush()  # flush to get ordering right before querying history
-
-    # Build chat history from all previous interactions
-    interactions = db.query(TriageInteraction).filter(
-        TriageInteraction.encounter_id == encounter.id
-    ).order_by(TriageInteraction.timestamp.asc()).all()
-
-    chat_history = _build_chat_history(interactions)
-
-    # Build patient context
-    patient = encounter.patient
-    patient_context = {
-        "age": _calculate_age(patient.date_of_birth) if patient.date_of_birth else "unknown",
-        "gender": "unknown",  # gender field not in Patient model yet
-        "chief_complaint": encounter.chief_complaint or "unspecified",
-    }
 
     # Process through AI pipeline
     pipeline = _get_pipeline()
-    ai_response = await pipeline.process_message(
-        message=request.message,
-        chat_history=chat_history,
-        patient_context=patient_context,
-    )
+    with usage_scope(encounter_id=str(encounter.id), endpoint="triage.chat"):
+        ai_response = await pipeline.process_message(
+            message=request.message,
+            chat_history=chat_history,
+            patient_context=patient_context,
+            conversation_id=str(encounter.id),
+        )
 
     # Save AI response
     ai_interaction = TriageInteraction(
@@ -193,40 +289,60 @@ async def process_message(
     if ai_response.is_complete:
         logger.info(f"Interview complete for encounter {encounter.id}. Generating SOAP note...")
 
-        # Build full transcript
-        transcript = _build_transcript(interactions)
-
-        # Generate SOAP note via AI
-        soap_note = await pipeline.generate_soap_note(
-            conversation_transcript=transcript,
-            patient_context=patient_context,
-        )
-
-        # Save clinical note to database
-        clinical_note = ClinicalNote(
-            encounter_id=encounter.id,
-            subjective=soap_note.subjective,
-            objective=soap_note.objective,
-            assessment="",
-            plan="",
-            is_finalized=False,
-            version=1,
-        )
-        db.add(clinical_note)
-
-        # Note: We keep status as TRIAGE_IN_PROGRESS here so the encounter can be cancelled.
-        # The frontend will explicitly update it to AWAITING_REVIEW upon submission.
-
-        soap_note_schema = SOAPNoteSchema(
-            subjective=soap_note.subjective,
-            objective=soap_note.objective,
-            assessment="",
-            plan="",
-        )
+        # One request per encounter generates the note; concurrent ones reuse it
+        async with soap_generation_lock(encounter_id, db):
+            clinical_note = _find_clinical_note(encounter_id, db)
+            if clinical_note is None:
+                # Build full transcript (previous turns plus this message)
+                transcript = "\n".join(
+                    state.transcript_lines + [f"{SenderType.PATIENT.value}: {request.message}"]
+                )
+
+                # Generate SOAP note via AI
+                with usage_scope(encounter_id=str(encounter.id), endpoint="triage.chat.soap"):
+                    soap_note = await pipeline.generate_soap_note(
+                        conversation_transcript=transcript,
+                        patient_context=patient_context,
+                    )
+
+                # Save clinical note to database
+                clinical_note = ClinicalNote(
+                    encounter_id=encounter.id,
+                    subjective=soap_note.subjective,
+                    objective=soap_note.objective,
+                    assessment="",
+                    plan="",
+                    is_finalized=False,
+                    version=1,
+                )
+                db.add(clinical_note)
+                logger.info(f"SOAP note created for encounter {encounter.id}")
+            else:
+                logger.info(f"SOAP note already generated for encounter {encounter_id}, reusing it.")
+
+            # Note: We keep status as TRIAGE_IN_PROGRESS here so the encounter can be cancelled.
+            # The frontend will explicitly update it to AWAITING_REVIEW upon submission.
+
+            soap_note_schema = SOAPNoteSchema(
+                subjective=clinical_note.subjective,
+                objective=clinical_note.objective,
+                assessment="",
+                plan="",
+            )
 
-        logger.info(f"SOAP note created for encounter {encounter.id}")
+            # Commit while holding the lock so waiters find the note
+            encounter_queue.touch(db, encounter_id, note_ready=True)
+            with tracing.span("commit"):
+                db.commit()
+    else:
+        encounter_queue.touch(db, encounter_id)
+        with tracing.span("commit"):
+            db.commit()
 
-    db.commit()
+    # Only committed turns go into the cached state
+    store = get_conversation_store()
+    store.append(encounter_id, SenderType.PATIENT, request.message)
+    store.append(encounter_id, SenderType.AI, ai_response.message)
 
     return ChatMessageResponse(
         ai_message=ai_response.message,
@@ -235,6 +351,7 @@ async def process_message(
     )
 
 
+@tracing.traced("triage.finish")
 async def force_finish_interview(
     encounter_id: UUID,
     db: Session
@@ -243,13 +360,14 @@ async def force_finish_interview(
     Forcefully finish a triage interview and generate a SOAP note,
     regardless of whether the AI organically completed the chat.
     """
-    encounter = db.query(MedicalEncounter).filter(
-        MedicalEncounter.id == encounter_id
-    ).first()
+    with tracing.span("history_load"):
+        context = load_triage_context(encounter_id, db)
 
-    if not encounter:
+    if not context:
         raise ValueError(f"Encounter {encounter_id} not found.")
 
+    encounter = context.encounter
+
     if encounter.status != EncounterStatus.TRIAGE_IN_PROGRESS:
         raise ValueError(f"Encounter is not in TRIAGE_IN_PROGRESS status.")
 
@@ -257,49 +375,87 @@ async def force_finish_interview(
         raise ValueError(f"Encounter is cancelled.")
 
     # Check if clinical note already exists (just in case)
-    existing_note = db.query(ClinicalNote).filter(
-        ClinicalNote.encounter_id == encounter_id
-    ).first()
+    if encounter.clinical_note:
+        return encounter.clinical_note
 
-    if existing_note:
-        return existing_note
+    # One request per encounter generates the note; concurrent ones wait and reuse it
+    async with soap_generation_lock(encounter_id, db):
+        existing_note = _find_clinical_note(encounter_id, db)
+        if existing_note:
+            logger.info(f"SOAP note already generated for encounter {encounter_id}, reusing it.")
+            return existing_note
 
-    # Build full transcript
-    interactions = db.query(TriageInteraction).filter(
-        TriageInteraction.encounter_id == encounter.id
-    ).order_by(TriageInteraction.timestamp.asc()).all()
+        # Build full transcript
+        transcript = context.conversation.transcript
+        patient_context = context.patient_context
 
-    transcript = _build_transcript(interactions)
+        pipeline = _get_pipeline()
+        logger.info(f"Force finishing interview for encounter {encounter.id}. Generating SOAP note...")
 
-    patient = encounter.patient
-    patient_context = {
-        "age": _calculate_age(patient.date_of_birth) if patient.date_of_birth else "unknown",
-        "gender": "unknown",
-        "chief_complaint": encounter.chief_complaint or "unspecified",
-    }
+        with usage_scope(encounter_id=str(encounter.id), endpoint="triage.finish.soap"):
+            soap_note = await pipeline.generate_soap_note(
+                conversation_transcript=transcript,
+                patient_context=patient_context,
+            )
 
-    pipeline = _get_pipeline()
-    logger.info(f"Force finishing interview for encounter {encounter.id}. Generating SOAP note...")
+        clinical_note = ClinicalNote(
+            encounter_id=encounter.id,
+            subjective=soap_note.subjective,
+            objective=soap_note.objective,
+            assessment="",
+            plan="",
+            is_finalized=False,
+            version=1,
+        )
+        db.add(clinical_note)
 
-    soap_note = await pipeline.generate_soap_note(
-        conversation_transcript=transcript,
-        patient_context=patient_context,
-    )
+        # Note: We keep status as TRIAGE_IN_PROGRESS here so the encounter can be cancelled.
+        # The frontend will explicitly update it to AWAITING_REVIEW upon submission.
+        encounter_queue.touch(db, encounter_id, note_ready=True)
 
-    clinical_note = ClinicalNote(
-        encounter_id=encounter.id,
-        subjective=soap_note.subjective,
-        objective=soap_note.objective,
-        assessment="",
-        plan="",
-        is_finalized=False,
-        version=1,
-    )
-    db.add(clinical_note)
-    
-    # Note: We keep status as TRIAGE_IN_PROGRESS here so the encounter can be cancelled.
-    # The frontend will explicitly update it to AWAITING_REVIEW upon submission.
-    
-    db.commit()
+        try:
+            with tracing.span("commit"):
+                db.commit()
+        except IntegrityError:
+            # Another worker won the race on the unique encounter_id (e.g. without advisory locks)
+            db.rollback()
+            existing_note = _find_clinical_note(encounter_id, db)
+            if existing_note is None:
+                raise
+            logger.warning(f"Concurrent SOAP note insert for encounter {encounter_id}; returning the existing note.")
+            return existing_note
 
     return clinical_note
+
+
+def get_encounter_usage(encounter_id: UUID) -> dict:
+    """
+    Token usage recorded for an encounter's LLM calls since the last restart.
+
+    Returns:
+        Usage totals plus the configured per-encounter budget.
+    """
+    totals = get_ledger().encounter_totals(str(encounter_id))
+    budget = get_settings().LLM_ENCOUNTER_TOKEN_BUDGET
+    return {
+        "encounter_id": str(encounter_id),
+        **totals.snapshot(),
+        "budget_tokens": budget,
+        "budget_remaining": max(0, budget - totals.total_tokens),
+    }
+
+
+def get_usage_summary() -> dict:
+    """
+    Aggregate token usage and LLM latency per endpoint since the last restart,
+    plus how many interview turns were served locally vs by the cloud model.
+    """
+    return {
+        "endpoints": get_ledger().endpoint_snapshot(),
+        "interview_turns": get_interview_metrics().snapshot(),
+    }
+
+
+def get_stage_timings() -> dict:
+    """Per-stage latency histograms of triage turns (recorded while tracing is enabled)."""
+    return tracing.get_stage_timings()
@@ -9,6 +9,7 @@ from fastapi import HTTPException, status
 from app.models.user import User, UserRole
 from app.models.auth import Auth
 from app.schemas.user import UserProfileUpdate
+from app.services import encounter_queue
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -82,6 +83,8 @@ def update_user_profile(user_id: UUID, data: UserProfileUpdate, db: Session) ->
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(user, field, value)
+    if "full_name" in update_data:
+        encounter_queue.rename_doctor(db, user)
     
     db.commit()
     db.refresh(user)
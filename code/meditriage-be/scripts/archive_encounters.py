@@ -0,0 +1,46 @@
+"""
+Move encounters completed more than ARCHIVE_AFTER_DAYS ago (with their
+transcripts and notes) from the hot tables into archived_encounters.
+Also drops dashboard queue entries whose completed window has passed.
+Meant for a nightly cron job; safe to re-run or run concurrently.
+
+Usage (from code/meditriage-be):
+    python scripts/archive_encounters.py [--older-than-days 90] [--batch-size 500]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.services import encounter_queue  # noqa: E402
+from app.services.encounter_archive import archive_completed_encounters  # noqa: E402
+
+
+def main() -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        archived = archive_completed_encounters(db, args.older_than_days, batch_size=args.batch_size)
+        window = timedelta(hours=settings.QUEUE_COMPLETED_WINDOW_HOURS)
+        pruned = encounter_queue.prune(db, datetime.utcnow() - window)
+    finally:
+        db.close()
+    print(f"{archived} encounters archived, {pruned} queue entries pruned in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
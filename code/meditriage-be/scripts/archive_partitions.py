@@ -0,0 +1,43 @@
+"""
+Archive monthly partitions of triage_interactions and consultation_messages
+older than PARTITION_RETENTION_MONTHS to gzipped CSV files, then drop them.
+Meant for a monthly cron job; safe to re-run.
+
+Usage (from code/meditriage-be):
+    python scripts/archive_partitions.py [--retention-months 24] [--archive-dir archive/partitions]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.partitioning import archive_partitions, ensure_partitions  # noqa: E402
+
+
+def main() -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retention-months", type=int, default=settings.PARTITION_RETENTION_MONTHS)
+    parser.add_argument("--archive-dir", type=Path, default=Path(settings.PARTITION_ARCHIVE_PATH))
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        ensure_partitions(db, settings.PARTITION_MONTHS_AHEAD)
+        archived = archive_partitions(db, args.retention_months, args.archive_dir)
+    finally:
+        db.close()
+
+    for partition in archived:
+        print(f"{partition.name}: {partition.rows} rows -> {partition.path}")
+    print(f"{len(archived)} partitions archived")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
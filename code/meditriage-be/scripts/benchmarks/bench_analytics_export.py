@@ -0,0 +1,151 @@
+"""
+Analytics export throughput and memory.
+
+Seeds a database with synthetic encounters, SOAP notes and triage
+interactions (10 per encounter), then runs app/services/analytics_export.py
+over it: a full export, then an incremental one covering the last 1% of
+activity. Each export runs in a fresh process whose peak RSS shows memory
+stays bounded by the batch size rather than the table size.
+
+Seeds a temporary SQLite file by default; --database-url points at an empty,
+migrated Postgres database (server-side cursors).
+
+Usage (from code/meditriage-be):
+    python scripts/benchmarks/bench_analytics_export.py [--interactions 1000000] [--format ndjson|parquet]
+        [--batch-size 10000] [--database-url URL]
+"""
+import argparse
+import multiprocessing
+import random
+import resource
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.models.clinical import ClinicalNote, EncounterStatus, MedicalEncounter, SenderType, TriageInteraction  # noqa: E402
+from app.services.analytics_export import run_export  # noqa: E402
+
+MESSAGES_PER_ENCOUNTER = 10
+SEED_BATCH = 5000
+START = datetime(2026, 1, 1)
+MESSAGES = [
+    "I have had a headache for three days, mostly behind my eyes.",
+    "On a scale of one to ten, how severe is the pain right now?",
+    "About a seven. It gets worse when I look at bright lights.",
+    "Have you noticed any fever, neck stiffness or vomiting?",
+    "Some nausea this morning but no vomiting.",
+]
+
+
+def seed(db, interactions: int, rng: random.Random) -> datetime:
+    """Insert the synthetic data; returns the time of the last activity."""
+    encounters = interactions // MESSAGES_PER_ENCOUNTER
+    nurse_id = uuid.uuid4()
+    at = START
+    for first in range(0, encounters, SEED_BATCH):
+        encounter_rows, note_rows, interaction_rows = [], [], []
+        for _ in range(min(SEED_BATCH, encounters - first)):
+            encounter_id = uuid.uuid4()
+            at += timedelta(seconds=rng.randrange(1, 60))
+            encounter_rows.append({
+                "id": encounter_id, "patient_id": uuid.uuid4(), "nurse_id": nurse_id,
+                "status": EncounterStatus.AWAITING_REVIEW, "is_urgent": rng.random() < 0.1,
+                "chief_complaint": "Headache", "encounter_timestamp": at, "created_at": at, "updated_at": at,
+            })
+            note_rows.append({
+                "id": uuid.uuid4(), "encounter_id": encounter_id, "subjective": MESSAGES[0],
+                "objective": "BP 128/82, HR 76", "assessment": "Tension-type headache",
+                "plan": "Paracetamol, review in 1 week", "created_at": at, "updated_at": at,
+            })
+            for turn in range(MESSAGES_PER_ENCOUNTER):
+                sent = at + timedelta(seconds=turn * 20)
+                interaction_rows.append({
+                    "id": uuid.uuid4(), "encounter_id": encounter_id,
+                    "sender_type": SenderType.AI if turn % 2 else SenderType.PATIENT,
+                    "message_content": MESSAGES[turn % len(MESSAGES)],
+                    "timestamp": sent, "created_at": sent,
+                })
+        db.execute(insert(MedicalEncounter), encounter_rows)
+        db.execute(insert(ClinicalNote), note_rows)
+        db.execute(insert(TriageInteraction), interaction_rows)
+        db.commit()
+    return at + timedelta(seconds=MESSAGES_PER_ENCOUNTER * 20)
+
+
+def export_in_child(url: str, out_dir: Path, file_format: str, since, until, batch_size: int):
+    """Run the export in a fresh interpreter so its peak RSS is its own; returns (manifest, peak MiB)."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        manifest = pool.apply(_export, (url, out_dir, file_format, since, until, batch_size))
+        pool.close()
+        pool.join()
+    return manifest, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+
+def _export(url, out_dir, file_format, since, until, batch_size):
+    engine = create_engine(url)
+    with sessionmaker(bind=engine)() as db:
+        return run_export(db, out_dir, file_format, since=since, until=until, batch_size=batch_size)
+
+
+def report(label: str, manifest, peak_rss: Optional[float] = None) -> None:
+    rows = sum(exported.rows for exported in manifest.files)
+    interactions = next(f.rows for f in manifest.files if f.dataset == "triage_interactions")
+    print(f"{label}:")
+    for exported in manifest.files:
+        print(f"  {exported.dataset:<20} {exported.rows:>9} rows  {Path(exported.path).stat().st_size / 2**20:8.1f} MiB")
+    print(f"  elapsed     {manifest.seconds:.1f}s  ({rows / manifest.seconds:.0f} rows/s, "
+          f"{interactions / manifest.seconds:.0f} interactions/s)")
+    if peak_rss is not None:
+        print(f"  peak RSS    {peak_rss:.1f} MiB (whole export process)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interactions", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("ndjson", "parquet"), default="ndjson")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--database-url", help="empty, migrated database (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'export.db'}"
+        engine = create_engine(url)
+        if not args.database_url:
+            from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+            from sqlalchemy.ext.compiler import compiles
+
+            @compiles(PG_UUID, "sqlite")
+            def compile_uuid_sqlite(element, compiler, **kw):
+                # Text affinity: a bare UUID column would turn all-digit hex ids into numbers
+                return "CHAR(36)"
+
+            Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+
+        last = seed(db, args.interactions, random.Random(5))
+        print(f"database: {engine.dialect.name}, seeded {args.interactions} interactions")
+
+
+        db.close()
+        full, peak = export_in_child(url, Path(tmp) / "full", args.format, None, last, args.batch_size)
+        report("full export", full, peak)
+
+        since = START + (last - START) * 0.99
+        incremental, _ = export_in_child(url, Path(tmp) / "incremental", args.format, since, last, args.batch_size)
+        report("incremental export (last 1%)", incremental)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Tokens-in per interview turn, with and without history compaction.
+
+Replays a scripted OLDCARTS interview through the same prompt assembly as
+TriagePipeline.process_message and prints the prompt size of every turn.
+
+Usage (from code/meditriage-be):
+    python scripts/benchmarks/bench_history_compaction.py [--keep-last 6] [--turns 14]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from app.services.llm.history import HistoryCompactor  # noqa: E402
+from app.services.llm.prompts import (  # noqa: E402
+    INITIAL_GREETING_TEMPLATE,
+    INTERVIEW_SUMMARY_TEMPLATE,
+    TRIAGE_INTERVIEW_SYSTEM_PROMPT,
+)
+from app.services.llm.tokens import count_chat_tokens, is_exact  # noqa: E402
+
+CHIEF_COMPLAINT = "Chest pain"
+
+SCRIPT = [
+    ("When did the chest pain first start?", "About two days ago, in the evening after dinner."),
+    ("Where exactly do you feel the pain?", "In the middle of my chest, just behind the breastbone."),
+    ("How long does each episode of pain last?", "Usually ten or fifteen minutes, sometimes longer."),
+    ("How would you describe the pain - sharp, dull, pressure, or burning?", "It feels like a heavy pressure, like something sitting on me."),
+    ("Does anything make the pain worse or better?", "Walking up stairs makes it worse, resting helps a bit."),
+    ("Does the pain spread anywhere else, like your arm, jaw, or back?", "Sometimes it goes into my left arm."),
+    ("Is the pain constant or does it come and go?", "It comes and goes, mostly when I am active."),
+    ("On a scale of 1 to 10, how severe is the pain at its worst?", "About a 7."),
+    ("Have you had any shortness of breath, sweating, or nausea with it?", "A little short of breath, and I was sweaty yesterday."),
+    ("Do you have any existing medical conditions, such as high blood pressure or diabetes?", "I have high blood pressure."),
+    ("Are you currently taking any medications?", "Amlodipine 5 mg once a day."),
+    ("Do you have any allergies to medications?", "Penicillin gives me a rash."),
+    ("Has anyone in your family had heart problems?", "My father had a heart attack at 60."),
+    ("Do you smoke or drink alcohol?", "I smoked for 20 years but quit last year."),
+]
+
+
+def _system_prompt() -> str:
+    return TRIAGE_INTERVIEW_SYSTEM_PROMPT.format(age=58, gender="Male", chief_complaint=CHIEF_COMPLAINT)
+
+
+def run(keep_last: int, turns: int) -> None:
+    compactor = HistoryCompactor(keep_last=keep_last)
+    history = [{"role": "assistant", "content": INITIAL_GREETING_TEMPLATE.format(chief_complaint=CHIEF_COMPLAINT)}]
+    answers = ["It started two days ago."] + [answer for _, answer in SCRIPT]
+    questions = [question for question, _ in SCRIPT]
+    total_full = total_compact = 0
+
+    print(f"Token counts: {'tiktoken cl100k_base' if is_exact() else 'character estimate (tiktoken unavailable)'}")
+    print(f"{'turn':>4} {'history':>8} {'full':>7} {'compact':>8} {'saved':>7}")
+    for turn in range(min(turns, len(answers))):
+        user_message = answers[turn]
+        system_prompt = _system_prompt()
+        full = count_chat_tokens(system_prompt, history, user_message)
+
+        summary, recent = compactor.compact(history, conversation_id="bench")
+        compact_prompt = system_prompt
+        if summary:
+            compact_prompt += INTERVIEW_SUMMARY_TEMPLATE.format(summary=summary)
+        compact = count_chat_tokens(compact_prompt, recent, user_message)
+
+        total_full += full
+        total_compact += compact
+        saved = 100 * (full - compact) / full
+        print(f"{turn + 1:>4} {len(history):>8} {full:>7} {compact:>8} {saved:>6.1f}%")
+
+        history.append({"role": "user", "content": user_message})
+        if turn < len(questions):
+            history.append({"role": "assistant", "content": questions[turn]})
+
+    saved = 100 * (total_full - total_compact) / total_full
+    print(f"total {'':>7} {total_full:>7} {total_compact:>8} {saved:>6.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keep-last", type=int, default=6, help="messages kept verbatim")
+    parser.add_argument("--turns", type=int, default=len(SCRIPT) + 1, help="interview turns to replay")
+    args = parser.parse_args()
+    run(args.keep_last, args.turns)
@@ -0,0 +1,102 @@
+"""
+Fraction of interview turns served locally, and p50 turn latency, with and
+without the hybrid (scripted OLDCARTS) interviewer.
+
+Replays the scripted interview from bench_history_compaction.py through
+TriagePipeline.process_message against a fake cloud provider and scrubber
+with configurable latency, so the numbers reflect pipeline overhead plus
+the simulated network/model time.
+
+Usage (from code/meditriage-be):
+    python scripts/benchmarks/bench_hybrid_interviewer.py [--cloud-latency 0.8] [--scrub-latency 0.15]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from bench_history_compaction import CHIEF_COMPLAINT, SCRIPT  # noqa: E402
+from app.services.llm.chain_factory import TriagePipeline  # noqa: E402
+from app.services.llm.interviewer import ScriptedInterviewer  # noqa: E402
+from app.services.llm.providers.base_provider import BaseReasoningProvider  # noqa: E402
+
+
+class FakeCloudProvider(BaseReasoningProvider):
+    """Answers with the next scripted question after a fixed delay."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_response(self, system_prompt, chat_history, user_message):
+        await asyncio.sleep(self.latency)
+        asked = sum(1 for message in chat_history if message["role"] == "assistant")
+        self.calls += 1
+        return SCRIPT[asked][0] if asked < len(SCRIPT) else "[INTERVIEW_COMPLETE]"
+
+    async def generate_structured_output(self, system_prompt, user_content, response_schema=None):
+        raise NotImplementedError
+
+
+class FakeScrubber:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def scrub(self, text: str) -> str:
+        await asyncio.sleep(self.latency)
+        return text
+
+
+async def replay(hybrid: bool, cloud_latency: float, scrub_latency: float) -> dict:
+    provider = FakeCloudProvider(cloud_latency)
+    pipeline = TriagePipeline(provider=provider)
+    pipeline.scrubber = FakeScrubber(scrub_latency)
+    pipeline.interviewer = ScriptedInterviewer() if hybrid else None
+
+    history = [{"role": "assistant", "content": pipeline.get_initial_greeting(CHIEF_COMPLAINT)}]
+    latencies = []
+    for _, answer in SCRIPT:
+        started = time.perf_counter()
+        response = await pipeline.process_message(
+            message=answer,
+            chat_history=list(history),
+            patient_context={"age": 58, "gender": "Male", "chief_complaint": CHIEF_COMPLAINT},
+            conversation_id="bench",
+        )
+        latencies.append(time.perf_counter() - started)
+        if response.is_complete:
+            break
+        history += [{"role": "user", "content": answer}, {"role": "assistant", "content": response.message}]
+
+    turns = len(latencies)
+    return {
+        "turns": turns,
+        "local": turns - provider.calls,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "total_s": sum(latencies),
+    }
+
+
+async def main(cloud_latency: float, scrub_latency: float) -> None:
+    print(f"cloud latency {cloud_latency * 1000:.0f}ms, scrub latency {scrub_latency * 1000:.0f}ms")
+    print(f"{'mode':>8} {'turns':>6} {'local':>6} {'local%':>7} {'p50 ms':>8} {'total s':>8}")
+    for hybrid in (False, True):
+        result = await replay(hybrid, cloud_latency, scrub_latency)
+        print(
+            f"{'hybrid' if hybrid else 'cloud':>8} {result['turns']:>6} {result['local']:>6} "
+            f"{100 * result['local'] / result['turns']:>6.1f}% {result['p50_ms']:>8.1f} {result['total_s']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cloud-latency", type=float, default=0.8, help="seconds per cloud LLM call")
+    parser.add_argument("--scrub-latency", type=float, default=0.15, help="seconds per PII scrub")
+    args = parser.parse_args()
+    asyncio.run(main(args.cloud_latency, args.scrub_latency))
@@ -0,0 +1,160 @@
+"""
+History queries on a plain vs a monthly-partitioned interactions table.
+
+Loads the same synthetic triage interactions (10 per encounter, spread over
+--months months) into two scratch tables of a Postgres database, one plain
+and one partitioned like triage_interactions, then times:
+
+    transcript   one encounter's messages in order (the triage/history read)
+    recent week  messages in the last 7 days (pruned to one partition)
+    retention    removing the oldest month: DELETE vs DETACH + DROP
+
+The tables are created and dropped by the script (bench_interactions_*); the
+database needs Postgres 13+ and is otherwise left untouched. At 50M rows
+each copy takes several GB of disk.
+
+Usage (from code/meditriage-be):
+    python scripts/benchmarks/bench_partitioned_history.py --database-url postgresql://... [--rows 50000000]
+        [--months 24] [--queries 500] [--keep]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from app.services.partitioning import add_months, create_partition_sql, months_between  # noqa: E402
+
+PLAIN = "bench_interactions_plain"
+PARTITIONED = "bench_interactions_partitioned"
+MESSAGES_PER_ENCOUNTER = 10
+LOAD_BATCH = 1_000_000
+COLUMNS = """
+    id uuid NOT NULL,
+    encounter_id uuid NOT NULL,
+    sender_type text NOT NULL,
+    message_content text NOT NULL,
+    "timestamp" timestamp NOT NULL,
+    created_at timestamp NOT NULL
+"""
+
+
+def create_tables(conn, start: date, months: int) -> None:
+    conn.execute(text(f"DROP TABLE IF EXISTS {PLAIN}, {PARTITIONED}"))
+    conn.execute(text(f"CREATE TABLE {PLAIN} ({COLUMNS}, PRIMARY KEY (id))"))
+    conn.execute(text(f'CREATE TABLE {PARTITIONED} ({COLUMNS}, PRIMARY KEY (id, "timestamp")) PARTITION BY RANGE ("timestamp")'))
+    for month in months_between(start, add_months(start, months)):
+        conn.execute(text(create_partition_sql(PARTITIONED, month)))
+
+
+def load(conn, table: str, rows: int, start: datetime, seconds: float) -> float:
+    """Generate rows server-side in batches; encounter n has id md5(n)::uuid."""
+    encounters = rows // MESSAGES_PER_ENCOUNTER
+    step = seconds / encounters
+    started = time.perf_counter()
+    for low in range(0, rows, LOAD_BATCH):
+        conn.execute(text(f"""
+            INSERT INTO {table} (id, encounter_id, sender_type, message_content, "timestamp", created_at)
+            SELECT gen_random_uuid(), md5((g / {MESSAGES_PER_ENCOUNTER})::text)::uuid,
+                   CASE WHEN g % 2 = 0 THEN 'PATIENT' ELSE 'AI' END,
+                   'Synthetic triage message number ' || g,
+                   ts, ts
+            FROM generate_series(:low, :high) AS g,
+                 LATERAL (SELECT CAST(:start AS timestamp)
+                                 + make_interval(secs => (g / {MESSAGES_PER_ENCOUNTER}) * {step})
+                                 + make_interval(secs => (g % {MESSAGES_PER_ENCOUNTER}) * 20) AS ts) AS t
+        """), {"low": low, "high": min(low + LOAD_BATCH, rows) - 1, "start": start})
+        conn.commit()
+    conn.execute(text(f'CREATE INDEX ON {table} (encounter_id, "timestamp")'))
+    conn.execute(text(f"ANALYZE {table}"))
+    conn.commit()
+    return time.perf_counter() - started
+
+
+def timed(conn, statement: str, params_list: list[dict]) -> list[float]:
+    latencies = []
+    for params in params_list:
+        started = time.perf_counter()
+        conn.execute(text(statement), params).fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def summary(latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return f"p50 {statistics.median(ordered):7.2f} ms   p95 {p95:7.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="scratch Postgres database")
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--keep", action="store_true", help="leave the tables for manual EXPLAINs")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    first_month = add_months(date.today().replace(day=1), -args.months + 1)
+    start = datetime.combine(first_month, datetime.min.time())
+    span = (datetime.utcnow() - start).total_seconds()
+    rng = random.Random(7)
+    encounters = args.rows // MESSAGES_PER_ENCOUNTER
+    transcript_params = [{"n": str(rng.randrange(encounters))} for _ in range(args.queries)]
+    week_params = [{"since": datetime.utcnow() - timedelta(days=7)}] * 20
+
+    with engine.connect() as conn:
+        create_tables(conn, first_month, args.months)
+        conn.commit()
+        for table in (PLAIN, PARTITIONED):
+            seconds = load(conn, table, args.rows, start, span)
+            size = conn.execute(text(f"SELECT pg_size_pretty(pg_total_relation_size('{table}'))")).scalar()
+            if table == PARTITIONED:
+                size = conn.execute(text(
+                    "SELECT pg_size_pretty(sum(pg_total_relation_size(inhrelid))) FROM pg_inherits "
+                    f"WHERE inhparent = '{table}'::regclass"
+                )).scalar()
+            print(f"{table}: {args.rows} rows loaded in {seconds:.0f}s, {size}")
+
+        for table in (PLAIN, PARTITIONED):
+            print(f"\n{table}")
+            transcript = (
+                f'SELECT id, sender_type, message_content, "timestamp" FROM {table} '
+                'WHERE encounter_id = md5(:n)::uuid ORDER BY "timestamp"'
+            )
+            timed(conn, transcript, transcript_params[:50])  # warm up
+            print(f"  transcript   {summary(timed(conn, transcript, transcript_params))}")
+            week = f'SELECT count(*) FROM {table} WHERE "timestamp" >= :since'
+            print(f"  recent week  {summary(timed(conn, week, week_params))}")
+
+        oldest = first_month
+        started = time.perf_counter()
+        deleted = conn.execute(text(
+            f'DELETE FROM {PLAIN} WHERE "timestamp" < :upper'
+        ), {"upper": add_months(oldest, 1)}).rowcount
+        conn.commit()
+        delete_seconds = time.perf_counter() - started
+        name = f"{PARTITIONED}_{oldest:%Y_%m}"
+        started = time.perf_counter()
+        conn.execute(text(f"ALTER TABLE {PARTITIONED} DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+        conn.commit()
+        print(f"\nretention of the oldest month ({deleted} rows): "
+              f"DELETE {delete_seconds:.1f}s, DETACH + DROP {time.perf_counter() - started:.2f}s")
+
+        if not args.keep:
+            conn.execute(text(f"DROP TABLE {PLAIN}, {PARTITIONED}"))
+            conn.commit()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Bulk patient import throughput.
+
+Writes a synthetic CSV register (a few invalid and repeated rows mixed in)
+and imports it with app/services/patient_import.py into a fresh database:
+a temporary SQLite file by default (batched inserts), or --database-url
+pointing at an empty, migrated Postgres database (COPY).
+
+Usage (from code/meditriage-be):
+    python scripts/benchmarks/bench_patient_import.py [--patients 100000] [--database-url URL]
+"""
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.services.patient_import import import_patients  # noqa: E402
+
+FIRST_NAMES = ["Nimal", "Kamal", "Sunil", "Amara", "Kumari", "Saman", "Dilani", "Ishara", "Selvam", "Priya"]
+LAST_NAMES = ["Perera", "Fernando", "Silva", "Jayasinghe", "Bandara", "Herath", "Sivakumar", "Rathnayake"]
+GENDERS = ["MALE", "FEMALE", ""]
+
+
+def write_register(path: Path, count: int, seed: int = 3) -> None:
+    rng = random.Random(seed)
+    with path.open("w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(["national_id", "first_name", "last_name", "date_of_birth", "gender", "contact_number"])
+        previous_nic = None
+        for i in range(count):
+            born = date(1940, 1, 1) + timedelta(days=rng.randrange(30_000))
+            nic = f"{born.year}{i:08d}"
+            if i % 1000 == 999:
+                nic = previous_nic  # repeated NIC
+            elif i % 5000 == 4998:
+                nic = "123"  # too short
+            previous_nic = nic
+            writer.writerow([
+                nic, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), born.isoformat(),
+                rng.choice(GENDERS), f"+9477{rng.randrange(10**7):07d}",
+            ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--database-url", help="empty, migrated database (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        register = Path(tmp) / "patients.csv"
+        write_register(register, args.patients)
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'import.db'}"
+        engine = create_engine(url)
+        if not args.database_url:
+            Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+
+        started = time.perf_counter()
+        with register.open(encoding="utf-8", newline="") as stream:
+            report = import_patients(db, stream, "csv", chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - started
+        db.close()
+        engine.dispose()
+
+    print(f"database:   {engine.dialect.name}")
+    print(f"rows:       {report.total_rows}")
+    print(f"imported:   {report.imported}")
+    print(f"rejected:   {report.failed}")
+    print(f"elapsed:    {elapsed:.1f}s ({report.imported / elapsed:.0f} patients/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Memory footprint and latency of the in-process patient lookup index.
+
+Builds the type-ahead index (app/services/patient_lookup.py) over synthetic
+patients with Sri Lankan style names and NICs, reports the memory it holds
+(tracemalloc) scaled to 100k patients, and times prefix lookups.
+
+Usage (from code/meditriage-be):
+    python scripts/benchmarks/bench_patient_lookup.py [--patients 100000] [--lookups 20000]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from app.services.patient_lookup import LookupEntry, PatientLookupIndex  # noqa: E402
+
+FIRST_NAMES = [
+    "Nimal", "Kamal", "Sunil", "Amara", "Kumari", "Saman", "Chathura", "Dilani", "Ishara", "Tharindu",
+    "Nadeesha", "Ruwan", "Sanduni", "Kasun", "Hiruni", "Mohamed", "Fathima", "Selvam", "Priya", "Arjun",
+]
+LAST_NAMES = [
+    "Perera", "Fernando", "Silva", "Jayasinghe", "Bandara", "Wickramasinghe", "Rajapaksa", "Herath",
+    "Gunawardena", "Dissanayake", "Kumarasamy", "Sivakumar", "Rathnayake", "Weerasinghe", "Nanayakkara",
+]
+
+
+def synthetic_patients(count: int, seed: int = 7) -> list[LookupEntry]:
+    rng = random.Random(seed)
+    patients = []
+    for i in range(count):
+        born = date(1940, 1, 1) + timedelta(days=rng.randrange(30_000))
+        nic = f"{born.year}{rng.randrange(1, 366):03d}{i % 10_000:04d}{rng.randrange(10)}"
+        patients.append(LookupEntry(
+            uuid.uuid4(), nic, rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)}{i % 97 or ''}", born,
+        ))
+    return patients
+
+
+def queries(patients: list[LookupEntry], count: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    picked = []
+    for _ in range(count):
+        patient = rng.choice(patients)
+        kind = rng.randrange(3)
+        if kind == 0:
+            picked.append(patient.national_id[: rng.randrange(4, 10)])
+        elif kind == 1:
+            picked.append(patient.last_name[: rng.randrange(2, 6)])
+        else:
+            picked.append(f"{patient.first_name} {patient.last_name[:3]}")
+    return picked
+
+
+def run(patient_count: int, lookup_count: int, limit: int) -> None:
+    # Entries are created inside the traced window: the index holds them (as it does rows from the DB)
+    tracemalloc.start()
+    patients = synthetic_patients(patient_count)
+    started = time.perf_counter()
+    index = PatientLookupIndex()
+    index.build(iter(patients))
+    build_seconds = time.perf_counter() - started
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    for query in queries(patients, lookup_count):
+        started = time.perf_counter()
+        index.lookup(query, limit=limit)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    keys = len(index._keys)
+    print(f"patients:           {patient_count}")
+    print(f"keys:               {keys}")
+    print(f"build:              {build_seconds:.2f}s")
+    print(f"index memory:       {held / 1024 / 1024:.1f} MiB (entries, keys and slot arrays)")
+    print(f"per 100k patients:  {held / patient_count * 100_000 / 1024 / 1024:.1f} MiB")
+    print(f"lookup (limit={limit}): p50 {statistics.median(latencies) * 1e6:.0f}us, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f}us, max {latencies[-1] * 1e6:.0f}us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    run(args.patients, args.lookups, args.limit)
+
+
+if __name__ == "__main__":
+    main()
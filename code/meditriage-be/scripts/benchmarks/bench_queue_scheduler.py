@@ -0,0 +1,235 @@
+"""
+Queue scheduler under 5k concurrent encounters.
+
+Two parts, both in memory (app/services/queue_scheduler.py, no database):
+
+    operations  keeps --encounters open encounters and applies --changes
+                random state changes (urgency, assignment, review, completion
+                with a new arrival, doctor availability), timing each change
+                and a "next patient" pick. The baseline re-sorts the whole
+                queue on every change and scans it for the pick.
+    policy      a discrete-event simulation of a shift in which --doctors
+                doctors review arrivals: SLA breaches and waits when doctors
+                take the next patient from the scheduler (earliest deadline)
+                versus the old order (urgent first, then oldest).
+
+Usage (from code/meditriage-be):
+    python scripts/benchmarks/bench_queue_scheduler.py [--encounters 5000] [--changes 50000] [--doctors 20]
+        [--shift-hours 12] [--load 1.2]
+"""
+import argparse
+import heapq
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from app.models.clinical import EncounterStatus  # noqa: E402
+from app.services.queue_scheduler import QueueScheduler  # noqa: E402
+
+START = datetime(2026, 10, 19, 8, 0)
+URGENT_SLA, ROUTINE_SLA = 15, 240  # the QUEUE_SLA_* defaults
+URGENT_SHARE = 0.2
+REVIEW_MINUTES = 10.0  # mean time a doctor spends per encounter
+BASELINE_CHANGES = 1000  # a re-sort takes milliseconds; time a sample
+
+
+def make_row(rng: random.Random, doctors: list, at: datetime) -> SimpleNamespace:
+    reviewing = rng.random() < 0.6
+    return SimpleNamespace(
+        encounter_id=uuid4(), patient_id=uuid4(), patient_name="Synthetic Patient", nurse_id=uuid4(),
+        doctor_id=rng.choice(doctors) if reviewing and rng.random() < 0.3 else None, doctor_name=None,
+        status=EncounterStatus.AWAITING_REVIEW if reviewing else EncounterStatus.TRIAGE_IN_PROGRESS,
+        is_urgent=rng.random() < URGENT_SHARE, chief_complaint=None, encounter_timestamp=at,
+    )
+
+
+def percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    return f"p50 {statistics.median(ordered):8.1f} us   p99 {p99:8.1f} us"
+
+
+def old_order(row) -> tuple:
+    return (not row.is_urgent, row.encounter_timestamp)
+
+
+def run_operations(encounters: int, changes: int, doctor_count: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    doctors = [uuid4() for _ in range(doctor_count)]
+    rows = {}
+    for i in range(encounters):
+        row = make_row(rng, doctors, START + timedelta(seconds=i))
+        rows[row.encounter_id] = row
+    scheduler = QueueScheduler(URGENT_SLA, ROUTINE_SLA, 60)
+    started = time.perf_counter()
+    scheduler.load(rows.values())
+    print(f"load {encounters} encounters: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    # Random changes, generated up front so both sides replay the same ones
+    ids, clock, plan = list(rows), START + timedelta(seconds=encounters), []
+    for _ in range(changes):
+        encounter_id = rng.choice(ids)
+        kind = rng.random()
+        if kind < 0.02:
+            plan.append(("availability", rng.choice(doctors), rng.random() < 0.5))
+            continue
+        row = SimpleNamespace(**vars(rows[encounter_id]))
+        if kind < 0.3:
+            row.is_urgent = not row.is_urgent
+        elif kind < 0.55:
+            row.doctor_id = rng.choice(doctors)
+        elif kind < 0.8:
+            row.status = EncounterStatus.AWAITING_REVIEW
+        else:
+            # Completed, and a new arrival keeps the queue at `encounters`
+            row.status = EncounterStatus.COMPLETED
+            clock += timedelta(seconds=1)
+            arrival = make_row(rng, doctors, clock)
+            plan.append(("apply", row, None))
+            plan.append(("apply", arrival, None))
+            ids[ids.index(encounter_id)] = arrival.encounter_id
+            rows.pop(encounter_id)
+            rows[arrival.encounter_id] = arrival
+            continue
+        rows[encounter_id] = row
+        plan.append(("apply", row, None))
+
+    scheduled, toggles, picks = [], [], []
+    for kind, subject, available in plan:
+        started = time.perf_counter()
+        if kind == "availability":
+            scheduler.set_doctor_available(subject, available)
+            toggles.append((time.perf_counter() - started) * 1e6)
+        else:
+            scheduler.apply(subject)
+            scheduled.append((time.perf_counter() - started) * 1e6)
+        doctor = rng.choice(doctors)
+        started = time.perf_counter()
+        scheduler.next_for_doctor(doctor)
+        picks.append((time.perf_counter() - started) * 1e6)
+
+    # Baseline: the list re-sorted after every change, the pick a scan of it
+    baseline_rows = {row.encounter_id: row for row in scheduler.ordered()}
+    resorts, scans = [], []
+    for kind, subject, _ in plan[:BASELINE_CHANGES]:
+        started = time.perf_counter()
+        if kind == "apply":
+            if subject.status == EncounterStatus.COMPLETED:
+                baseline_rows.pop(subject.encounter_id, None)
+            else:
+                baseline_rows[subject.encounter_id] = subject
+        ordered = sorted(baseline_rows.values(), key=old_order)
+        resorts.append((time.perf_counter() - started) * 1e6)
+        doctor = rng.choice(doctors)
+        started = time.perf_counter()
+        next(
+            (row for row in ordered if row.status == EncounterStatus.AWAITING_REVIEW
+             and row.doctor_id in (None, doctor)),
+            None,
+        )
+        scans.append((time.perf_counter() - started) * 1e6)
+
+    print(f"\n{len(plan)} changes with {len(scheduler)} open encounters")
+    print(f"  scheduler change      {percentiles(scheduled)}")
+    print(f"  availability toggle   {percentiles(toggles)}   (re-ranks one doctor's encounters)")
+    print(f"  scheduler next pick   {percentiles(picks)}")
+    print(f"  re-sort per change    {percentiles(resorts)}   (first {len(resorts)} changes)")
+    print(f"  scan for next pick    {percentiles(scans)}")
+
+
+def simulate(policy: str, doctor_count: int, shift_hours: float, load: float, seed: int = 11) -> dict:
+    """One shift of arrivals, reviewed to the end; returns waits (minutes) by acuity and SLA breaches."""
+    rng = random.Random(seed)
+    doctors = [uuid4() for _ in range(doctor_count)]
+    rate = load * doctor_count / REVIEW_MINUTES  # arrivals per minute
+    scheduler = QueueScheduler(URGENT_SLA, ROUTINE_SLA, 60)
+    fifo, waiting = [], {}
+    events = [(rng.expovariate(rate), 0, "arrival", None)]
+    events += [(0.0, 1, "free", doctor) for doctor in doctors]
+    heapq.heapify(events)
+    idle, sequence = set(), 2
+    waits = {True: [], False: []}
+    end = shift_hours * 60
+
+    def pick(doctor):
+        if policy == "scheduler":
+            entry = scheduler.next_for_doctor(doctor)
+            if entry is None:
+                return None
+            scheduler.remove(entry.encounter_id)
+            return waiting.pop(entry.encounter_id)
+        if not fifo:
+            return None
+        _, _, encounter_id = heapq.heappop(fifo)
+        return waiting.pop(encounter_id)
+
+    while events:
+        now, _, kind, subject = heapq.heappop(events)
+        if kind == "arrival":
+            if now < end:
+                row = make_row(rng, doctors, START + timedelta(minutes=now))
+                row.status, row.doctor_id = EncounterStatus.AWAITING_REVIEW, None
+                waiting[row.encounter_id] = (row, now)
+                scheduler.apply(row)
+                heapq.heappush(fifo, (not row.is_urgent, now, row.encounter_id))
+                heapq.heappush(events, (now + rng.expovariate(rate), sequence, "arrival", None))
+                sequence += 1
+            doctor = idle.pop() if idle else None
+            if doctor is None:
+                continue
+            kind, subject = "free", doctor
+        if kind == "free":
+            picked = pick(subject)
+            if picked is None:
+                idle.add(subject)
+                continue
+            row, arrived = picked
+            waits[row.is_urgent].append(now - arrived)
+            heapq.heappush(events, (now + rng.expovariate(1 / REVIEW_MINUTES), sequence, "free", subject))
+            sequence += 1
+
+    breaches = {
+        urgent: sum(wait > (URGENT_SLA if urgent else ROUTINE_SLA) for wait in samples)
+        for urgent, samples in waits.items()
+    }
+    return {"waits": waits, "breaches": breaches}
+
+
+def run_policy(doctor_count: int, shift_hours: float, load: float) -> None:
+    print(f"\n{shift_hours:g}h of arrivals at {load:.0%} of the review capacity of {doctor_count} doctors "
+          f"(SLA {URGENT_SLA}/{ROUTINE_SLA} min)")
+    for policy in ("old order", "scheduler"):
+        result = simulate(policy, doctor_count, shift_hours, load)
+        for urgent, label in ((True, "urgent"), (False, "routine")):
+            samples = sorted(result["waits"][urgent])
+            if not samples:
+                continue
+            p95 = samples[int(len(samples) * 0.95) - 1]
+            breached = result["breaches"][urgent] / len(samples)
+            print(f"  {policy:10s} {label:8s} {len(samples):5d} seen   p95 wait {p95:6.1f} min   "
+                  f"max {samples[-1]:6.1f} min   SLA breached {breached:6.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--encounters", type=int, default=5000)
+    parser.add_argument("--changes", type=int, default=50_000)
+    parser.add_argument("--doctors", type=int, default=20)
+    parser.add_argument("--shift-hours", type=float, default=12)
+    parser.add_argument("--load", type=float, default=1.2, help="arrival rate / review capacity")
+    args = parser.parse_args()
+    run_operations(args.encounters, args.changes, args.doctors)
+    run_policy(args.doctors, args.shift_hours, args.load)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+"""
+Replay-based load test for the triage API against local fake LLM servers.
+
+Starts three HTTP servers in this process, each on its own thread and event loop:
+    fake cloud LLM  OpenAI-compatible /v1/chat/completions (the DeepSeek adapter points here)
+    fake Ollama     /api/chat and /api/tags for the PII scrubber
+    the app         app.main:app via uvicorn, on SQLite (default) or Postgres
+then replays recorded interview scripts through POST /triage/start,
+/triage/chat and /triage/{id}/finish with a fixed number of concurrent
+virtual nurses. Fake model latency is lognormal around a median.
+
+Reports throughput, p50/p95/p99 per stage and DB pool waits, and writes
+everything to a JSON file that can be diffed across versions.
+
+Stages:
+    http.*          client-observed request latency per endpoint
+    llm.interview   fake cloud server time per interview turn call
+    llm.soap        fake cloud server time per SOAP note call
+    scrubber        fake Ollama server time per scrub call
+    db.pool_wait    time to check a connection out of the app's pool
+    db.query        time per SQL statement
+
+Usage (from code/meditriage-be):
+    python scripts/benchmarks/load_test.py [--concurrency 8] [--sessions 40] [--out load_test.json]
+    python scripts/benchmarks/load_test.py --database-url postgresql+psycopg2://.../meditriage_load
+
+Postgres runs seed users, patients and encounters: point it at a scratch
+database that has been migrated with `alembic upgrade head`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from bench_history_compaction import CHIEF_COMPLAINT, SCRIPT  # noqa: E402
+
+
+# -----------------------------------------------------------------------------
+# Measurements
+# -----------------------------------------------------------------------------
+
+class StageRecorder:
+    """Thread-safe latency samples per stage (the servers run on other threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    @staticmethod
+    def _percentile(ordered: list[float], pct: float) -> float:
+        """Nearest-rank percentile of an already sorted list."""
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self.samples.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "p50_ms": round(self._percentile(values, 50) * 1000, 2),
+                "p95_ms": round(self._percentile(values, 95) * 1000, 2),
+                "p99_ms": round(self._percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+                "total_s": round(sum(values), 3),
+            }
+            for stage, values in sorted(samples.items())
+        }
+
+
+class LatencyModel:
+    """Lognormal latency with a given median; sigma 0 gives a fixed delay."""
+
+    def __init__(self, median: float, sigma: float, seed: int):
+        self.median = median
+        self.sigma = sigma
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        if self.sigma <= 0:
+            return self.median
+        with self._lock:
+            return self.median * self._random.lognormvariate(0.0, self.sigma)
+
+
+# -----------------------------------------------------------------------------
+# Fake LLM servers
+# -----------------------------------------------------------------------------
+
+INTERVIEW_QUESTIONS = [question for question, _ in SCRIPT]
+
+
+def _is_soap_request(body: dict) -> bool:
+    if body.get("response_format"):
+        return True
+    system = next((m.get("content", "") for m in body.get("messages", []) if m.get("role") == "system"), "")
+    return "clinical documentation" in system
+
+
+def _fake_soap_note() -> str:
+    return json.dumps({
+        "subjective": "Patient reports intermittent central chest pressure for two days, worse on exertion, "
+                      "radiating to the left arm, severity 7/10, with mild shortness of breath.",
+        "objective": "Not documented in interview.",
+    })
+
+
+def build_fake_cloud(latency: LatencyModel, recorder: StageRecorder, error_rate: float, seed: int) -> FastAPI:
+    """OpenAI-compatible chat completions that return scripted questions or a SOAP note."""
+    app = FastAPI()
+    failures = random.Random(seed)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        started = time.perf_counter()
+        body = await request.json()
+        soap = _is_soap_request(body)
+        await asyncio.sleep(latency.sample())
+
+        if error_rate and failures.random() < error_rate:
+            recorder.record("llm.errors", time.perf_counter() - started)
+            return JSONResponse(
+                status_code=503,
+                content={"error": {"message": "fake upstream overloaded", "type": "server_error"}},
+            )
+
+        if soap:
+            content = _fake_soap_note()
+        else:
+            asked = sum(1 for message in body.get("messages", []) if message.get("role") == "assistant")
+            content = INTERVIEW_QUESTIONS[asked % len(INTERVIEW_QUESTIONS)]
+
+        prompt_tokens = sum(len(str(m.get("content", ""))) // 4 + 4 for m in body.get("messages", []))
+        completion_tokens = len(content) // 4
+        recorder.record("llm.soap" if soap else "llm.interview", time.perf_counter() - started)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+
+def build_fake_ollama(latency: LatencyModel, recorder: StageRecorder) -> FastAPI:
+    """Ollama /api/chat that returns the input text unchanged (already PII-free scripts)."""
+    app = FastAPI()
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": []}
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        started = time.perf_counter()
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        text = prompt.split("INPUT TEXT:", 1)[-1].split("SANITIZED TEXT:", 1)[0].strip()
+        await asyncio.sleep(latency.sample())
+        recorder.record("scrubber", time.perf_counter() - started)
+
+        line = json.dumps({
+            "model": body.get("model", "fake"),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": text},
+            "done": True,
+            "done_reason": "stop",
+            "prompt_eval_count": len(prompt) // 4,
+            "eval_count": len(text) // 4,
+        }) + "\n"
+        if body.get("stream", True):
+            return StreamingResponse(iter([line]), media_type="application/x-ndjson")
+        return json.loads(line)
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, port: int) -> uvicorn.Server:
+    """Run an ASGI app on its own thread and event loop; returns once it accepts connections."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError(f"server on port {port} failed to start")
+        time.sleep(0.05)
+    return server
+
+
+# -----------------------------------------------------------------------------
+# Application under test
+# -----------------------------------------------------------------------------
+
+def configure_environment(args, cloud_port: int, ollama_port: int, workdir: Path) -> None:
+    """
+    Point the app at the fake servers. Must run before any `app.*` import:
+    settings are cached and the engine is created at import time.
+    """
+    os.environ.update({
+        "DATABASE_URL": args.database_url or f"sqlite:///{workdir / 'load_test.db'}",
+        "ACTIVE_LLM": "DEEPSEEK",
+        "DEEPSEEK_API_KEY": "sk-load-test",
+        "DEEPSEEK_BASE_URL": f"http://127.0.0.1:{cloud_port}/v1",
+        "OPENAI_API_KEY": "",
+        "OLLAMA_BASE_URL": f"http://127.0.0.1:{ollama_port}",
+        "LLM_ROUTING_ENABLED": "false",
+        "LLM_CACHE_ENABLED": str(args.llm_cache).lower(),
+        "HYBRID_INTERVIEWER_ENABLED": str(args.hybrid).lower(),
+        "LOG_LEVEL": "WARNING",
+        "LOG_FILE": str(workdir / "load_test.log"),
+    })
+
+
+def instrument_app(app, recorder: StageRecorder):
+    """Time pool checkouts (via the get_db dependency) and every SQL statement."""
+    from sqlalchemy import event
+    from app.db.session import SessionLocal, engine, get_db
+
+    def timed_get_db():
+        db = SessionLocal()
+        started = time.perf_counter()
+        db.connection()  # check out now so the wait is measured here
+        recorder.record("db.pool_wait", time.perf_counter() - started)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = timed_get_db
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        recorder.record("db.query", time.perf_counter() - conn.info["query_started"].pop())
+
+    return engine
+
+
+def seed(engine, sessions: int) -> tuple[str, list[str]]:
+    """Create tables if missing, one nurse and one patient per session; returns (token, patient ids)."""
+    from sqlalchemy.orm import Session
+    from app.core.security import create_access_token, hash_password
+    from app.models.auth import Auth
+    from app.models.base import Base
+    from app.models.patient import Gender, Patient
+    from app.models.user import User, UserRole
+
+    if engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+        from sqlalchemy.ext.compiler import compiles
+
+        @compiles(PG_UUID, "sqlite")
+        def compile_uuid_sqlite(element, compiler, **kw):
+            return "CHAR(36)"
+
+    Base.metadata.create_all(engine)
+    run_id = uuid.uuid4().hex[:8]
+    with Session(engine) as db:
+        nurse = User(role=UserRole.NURSE, full_name="Load Test Nurse")
+        db.add(nurse)
+        db.flush()
+        db.add(Auth(
+            user_id=nurse.id,
+            username=f"loadtest_{run_id}",
+            email=f"loadtest_{run_id}@example.invalid",
+            hashed_password=hash_password(run_id),
+        ))
+        patients = [
+            Patient(
+                national_id=f"LT{run_id}{index:06d}",
+                first_name="Load",
+                last_name=f"Patient{index}",
+                date_of_birth=date(1950 + index % 50, 1 + index % 12, 1 + index % 28),
+                gender=Gender.MALE if index % 2 else Gender.FEMALE,
+            )
+            for index in range(sessions)
+        ]
+        db.add_all(patients)
+        db.commit()
+        token = create_access_token({"sub": str(nurse.id), "role": nurse.role.value})
+        return token, [str(patient.id) for patient in patients]
+
+
+# -----------------------------------------------------------------------------
+# Load generator
+# -----------------------------------------------------------------------------
+
+def load_scripts(path: Optional[str]) -> list[dict]:
+    """Recorded interviews: [{"chief_complaint": str, "answers": [str, ...]}, ...]."""
+    if path is None:
+        return [{"chief_complaint": CHIEF_COMPLAINT, "answers": [answer for _, answer in SCRIPT]}]
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def replay_session(client: httpx.AsyncClient, patient_id: str, script: dict,
+                         recorder: StageRecorder, statuses: Counter) -> bool:
+    """One interview: start, every scripted answer, then force-finish. Returns True on success."""
+
+    async def call(stage: str, path: str, payload: Optional[dict] = None) -> Optional[dict]:
+        started = time.perf_counter()
+        try:
+            response = await client.post(path, json=payload)
+        except httpx.HTTPError as e:
+            statuses[f"{stage}:{type(e).__name__}"] += 1
+            return None
+        recorder.record(stage, time.perf_counter() - started)
+        statuses[f"{stage}:{response.status_code}"] += 1
+        return response.json() if response.status_code == 200 else None
+
+    started = await call("http.start", "/api/v1/triage/start",
+                         {"patient_id": patient_id, "chief_complaint": script["chief_complaint"]})
+    if started is None:
+        return False
+    encounter_id = started["encounter_id"]
+
+    for answer in script["answers"]:
+        reply = await call("http.chat", "/api/v1/triage/chat", {"encounter_id": encounter_id, "message": answer})
+        if reply is None:
+            return False
+        if reply["is_interview_complete"]:
+            return True
+
+    return await call("http.finish", f"/api/v1/triage/{encounter_id}/finish") is not None
+
+
+async def run_load(base_url: str, token: str, patient_ids: list[str], scripts: list[dict],
+                   concurrency: int, recorder: StageRecorder) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, patient_id in enumerate(patient_ids):
+        queue.put_nowait((patient_id, scripts[index % len(scripts)]))
+
+    statuses: Counter = Counter()
+    completed = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers={"Authorization": f"Bearer {token}"},
+                                 timeout=120.0, limits=limits) as client:
+
+        async def nurse() -> None:
+            nonlocal completed
+            while not queue.empty():
+                patient_id, script = queue.get_nowait()
+                if await replay_session(client, patient_id, script, recorder, statuses):
+                    completed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(nurse() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    requests = sum(statuses.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "sessions_completed": completed,
+        "sessions_failed": len(patient_ids) - completed,
+        "requests": requests,
+        "requests_per_s": round(requests / elapsed, 2),
+        "sessions_per_min": round(60 * completed / elapsed, 2),
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args) -> dict:
+    recorder = StageRecorder()
+    workdir = Path(tempfile.mkdtemp(prefix="meditriage-load-"))
+    cloud_port, ollama_port, app_port = _free_port(), _free_port(), _free_port()
+
+    cloud_latency = LatencyModel(args.llm_latency, args.llm_sigma, args.seed)
+    scrub_latency = LatencyModel(args.scrub_latency, args.scrub_sigma, args.seed + 1)
+    start_server(build_fake_cloud(cloud_latency, recorder, args.llm_error_rate, args.seed + 2), cloud_port)
+    start_server(build_fake_ollama(scrub_latency, recorder), ollama_port)
+
+    configure_environment(args, cloud_port, ollama_port, workdir)
+    from app.main import app
+    from app.services.llm.interviewer import get_interview_metrics
+    from app.services.llm.usage import get_ledger
+
+    engine = instrument_app(app, recorder)
+    token, patient_ids = seed(engine, args.sessions)
+    app_server = start_server(app, app_port)
+
+    scripts = load_scripts(args.scripts)
+    load = asyncio.run(run_load(f"http://127.0.0.1:{app_port}", token, patient_ids, scripts,
+                                args.concurrency, recorder))
+    app_server.should_exit = True
+
+    return {
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "database": engine.dialect.name,
+            "concurrency": args.concurrency,
+            "sessions": args.sessions,
+            "scripts": len(scripts),
+            "llm_latency_median_s": args.llm_latency,
+            "llm_latency_sigma": args.llm_sigma,
+            "llm_error_rate": args.llm_error_rate,
+            "scrub_latency_median_s": args.scrub_latency,
+            "scrub_latency_sigma": args.scrub_sigma,
+            "llm_cache": args.llm_cache,
+            "hybrid_interviewer": args.hybrid,
+            "seed": args.seed,
+        },
+        "throughput": load,
+        "stages": recorder.summary(),
+        "db_pool": {
+            "class": type(engine.pool).__name__,
+            "size": getattr(engine.pool, "size", lambda: None)(),
+            "max_overflow": getattr(engine.pool, "_max_overflow", None),
+            "status_after_run": engine.pool.status(),
+        },
+        "app": {
+            "llm_usage": get_ledger().endpoint_snapshot(),
+            "interview_turns": get_interview_metrics().snapshot(),
+        },
+    }
+
+
+def print_report(result: dict) -> None:
+    load = result["throughput"]
+    print(f"{load['sessions_completed']} sessions ({load['sessions_failed']} failed), "
+          f"{load['requests']} requests in {load['elapsed_s']:.1f}s: "
+          f"{load['requests_per_s']:.1f} req/s, {load['sessions_per_min']:.1f} sessions/min")
+    print(f"{'stage':<16} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, stats in result["stages"].items():
+        print(f"{stage:<16} {stats['count']:>7} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+              f"{stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+    errors = {key: count for key, count in load["statuses"].items() if not key.endswith(":200")}
+    if errors:
+        print(f"errors: {errors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=None, help="default: a fresh SQLite file in a temp dir")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent virtual nurses")
+    parser.add_argument("--sessions", type=int, default=40, help="interviews to replay in total")
+    parser.add_argument("--scripts", default=None,
+                        help='JSON file [{"chief_complaint": ..., "answers": [...]}]; default: chest pain script')
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="median seconds per cloud LLM call")
+    parser.add_argument("--llm-sigma", type=float, default=0.35, help="lognormal sigma of cloud latency (0 = fixed)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="fraction of cloud calls answered 503")
+    parser.add_argument("--scrub-latency", type=float, default=0.15, help="median seconds per Ollama scrub")
+    parser.add_argument("--scrub-sigma", type=float, default=0.25, help="lognormal sigma of scrub latency")
+    parser.add_argument("--llm-cache", action="store_true", help="keep the LLM response cache enabled")
+    parser.add_argument("--hybrid", action="store_true", help="enable the hybrid (scripted) interviewer")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="load_test.json", help="JSON result file")
+    args = parser.parse_args()
+
+    result = main(args)
+    print_report(result)
+    Path(args.out).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    print(f"results written to {args.out}")
@@ -0,0 +1,62 @@
+"""
+Export encounters, clinical notes and triage interactions from DATABASE_URL
+to Parquet or NDJSON files for analytics.
+
+Each run writes to a new directory under --out, named after its watermark,
+with a manifest.json. With --state-file, the run exports only rows changed
+since the watermark saved there, then saves its own manifest there.
+
+Usage (from code/meditriage-be):
+    python scripts/export_analytics.py --out exports/ [--format parquet|ndjson]
+        [--state-file exports/last_run.json | --since 2026-10-01T00:00:00] [--batch-size 10000]
+"""
+import argparse
+import json
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.analytics_export import FORMATS, read_watermark, run_export  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    watermark = parser.add_mutually_exclusive_group()
+    watermark.add_argument("--state-file", type=Path, help="manifest of the previous run; updated on success")
+    watermark.add_argument("--since", type=datetime.fromisoformat, help="export rows changed after this UTC time")
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args()
+
+    since = read_watermark(args.state_file) if args.state_file else args.since
+    db = SessionLocal()
+    try:
+        # A placeholder name until the watermark is known
+        run_dir = args.out / "in-progress"
+        manifest = run_export(db, run_dir, args.format, since=since, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    final_dir = args.out / manifest.until.replace(":", "-")
+    shutil.rmtree(final_dir, ignore_errors=True)
+    run_dir.rename(final_dir)
+    if args.state_file:
+        args.state_file.write_text(json.dumps({"until": manifest.until, "directory": str(final_dir)}), encoding="utf-8")
+
+    rows = sum(exported.rows for exported in manifest.files)
+    print(f"{rows} rows exported to {final_dir} in {manifest.seconds:.1f}s "
+          f"({rows / manifest.seconds if manifest.seconds else 0:.0f} rows/s)")
+    for exported in manifest.files:
+        print(f"  {exported.dataset}: {exported.rows}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Bulk-import patients from a CSV or NDJSON file into DATABASE_URL.
+Same pipeline as POST /api/v1/patients/import, without the upload.
+
+Usage (from code/meditriage-be):
+    python scripts/import_patients.py patients.csv [--chunk-size 5000] [--errors errors.ndjson]
+"""
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.patient_import import DEFAULT_CHUNK_SIZE, detect_format, import_patients  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--errors", type=Path, help="write rejected rows here as NDJSON")
+    args = parser.parse_args()
+
+    file_format = args.format or detect_format(args.file.name)
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        with args.file.open(encoding="utf-8-sig", newline="") as stream:
+            report = import_patients(db, stream, file_format, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"{report.total_rows} rows, {report.imported} imported, {report.failed} rejected "
+          f"in {elapsed:.1f}s ({report.imported / elapsed if elapsed else 0:.0f} patients/s)")
+    if args.errors:
+        with args.errors.open("w", encoding="utf-8") as out:
+            for error in report.errors:
+                out.write(json.dumps(asdict(error)) + "\n")
+    else:
+        for error in report.errors[:20]:
+            print(f"  line {error.line}: {error.error}")
+    return 0 if report.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
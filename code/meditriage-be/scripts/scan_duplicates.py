@@ -0,0 +1,43 @@
+"""
+Scan the whole patient table for likely duplicate pairs and store them in
+patient_duplicate_pairs, where GET /patients/duplicates reads them. Pairs
+are scored in DUPLICATE_SCAN_WORKERS processes. Meant for a nightly cron
+job; POST /patients/duplicates/scan also starts it.
+
+Usage (from code/meditriage-be):
+    python scripts/scan_duplicates.py [--workers 4] [--threshold 0.85]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# make project root importable
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.duplicate_detection import save_scan, scan_duplicates  # noqa: E402
+
+
+def main() -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.DUPLICATE_SCAN_WORKERS)
+    parser.add_argument("--threshold", type=float, default=settings.DUPLICATE_MATCH_THRESHOLD)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        pairs = scan_duplicates(db, threshold=args.threshold, workers=args.workers)
+        save_scan(db, pairs)
+    finally:
+        db.close()
+    print(f"{len(pairs)} likely duplicate pairs stored in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,8 +8,8 @@ from app.models.base import Base
 # Make sure all models are imported so their tables are registered on Base.metadata
 from app.models.user import User
 from app.models.auth import Auth
-from app.models.patient import Patient
-from app.models.clinical import MedicalEncounter, TriageInteraction, ClinicalNote
+from app.models.patient import Patient, PatientBlockingKey
+from app.models.clinical import MedicalEncounter, TriageInteraction, ClinicalNote, ArchivedEncounter, EncounterQueueEntry
 
 @compiles(SQL_UUID, "sqlite")
 @compiles(PG_UUID, "sqlite")
@@ -31,3 +31,75 @@ def fixture_db_session():
         yield db
     finally:
         db.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Circuit breakers are module-level; give every test a clean registry."""
+    from app.services.llm.circuit_breaker import reset_breakers
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+@pytest.fixture(autouse=True)
+def reset_usage_ledger():
+    """The usage ledger and interview metrics are module-level; start every test with empty totals."""
+    from app.services.llm.usage import get_ledger
+    from app.services.llm.interviewer import get_interview_metrics
+    get_ledger().reset()
+    get_interview_metrics().reset()
+    yield
+    get_ledger().reset()
+    get_interview_metrics().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_conversation_store():
+    """The conversation state cache is process-wide; never let it leak between tests."""
+    from app.services.conversation_store import get_conversation_store
+    get_conversation_store().clear()
+    yield
+    get_conversation_store().clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_patient_lookup_index():
+    """The type-ahead index is process-wide; every test starts with it unloaded."""
+    from app.services.patient_lookup import get_lookup_index
+    get_lookup_index().clear()
+    yield
+    get_lookup_index().clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_queue_scheduler():
+    """The queue scheduler is process-wide; every test starts with it unloaded."""
+    from app.services.queue_scheduler import get_scheduler
+    get_scheduler().clear()
+    yield
+    get_scheduler().clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_tracing():
+    """Tracing configuration and metric histograms are process-wide; start disabled and empty."""
+    from app.core.metrics import reset_metrics
+    from app.core.tracing import configure_tracing
+    configure_tracing(enabled=False, otlp_endpoint="")
+    reset_metrics()
+    yield
+    configure_tracing(enabled=False, otlp_endpoint="")
+    reset_metrics()
+
+
+@pytest.fixture
+def query_budget(db_session):
+    """
+    Fail a test block that issues more SQL statements than declared:
+        with query_budget(1):
+            encounter_queue.list_queue(db_session)
+    """
+    from app.core import query_profiler
+    query_profiler.install(db_session.get_bind())
+    return query_profiler.query_budget
@@ -1,3 +1,5 @@
+import pytest
+from pydantic import ValidationError
 from app.core.config import Settings, get_settings
 
 def test_settings_default_project_name():
@@ -26,3 +28,34 @@ def test_settings_singleton_via_lru_cache():
     settings_1 = get_settings()
     settings_2 = get_settings()
     assert settings_1 is settings_2
+
+def test_settings_reject_non_positive_sla(monkeypatch):
+    """Verify that a queue SLA target of 0 is rejected (the scheduler divides by it)."""
+    monkeypatch.setenv("QUEUE_SLA_ROUTINE_MINUTES", "0")
+    with pytest.raises(ValidationError):
+        Settings()
+
+def test_settings_reject_export_lag_shorter_than_transactions(monkeypatch):
+    """Verify that the export watermark lag must exceed the longest transaction (SOAP lock timeout)."""
+    monkeypatch.setenv("EXPORT_WATERMARK_LAG_SECONDS", "60")
+    monkeypatch.setenv("SOAP_LOCK_TIMEOUT_SECONDS", "120")
+    with pytest.raises(ValidationError):
+        Settings()
+
+def test_settings_export_lag_covers_provider_calls(monkeypatch):
+    """Verify that the lag also covers every provider call made before a triage turn commits."""
+    monkeypatch.setenv("SOAP_LOCK_TIMEOUT_SECONDS", "120")
+    monkeypatch.setenv("LLM_CALL_TIMEOUT_SECONDS", "60")
+    monkeypatch.setenv("SOAP_FIELD_RETRIES", "1")
+    # 120s lock wait + 60s x (scrub, interview, SOAP note, one retry per field)
+    monkeypatch.setenv("EXPORT_WATERMARK_LAG_SECONDS", "420")
+    with pytest.raises(ValidationError):
+        Settings()
+    monkeypatch.setenv("EXPORT_WATERMARK_LAG_SECONDS", "421")
+    assert Settings().longest_triage_transaction_seconds == 420
+
+def test_settings_soap_retry_fields_match_parser():
+    """Verify that the transaction bound counts every SOAP field the parser may re-request."""
+    from app.core.config import SOAP_RETRY_FIELDS
+    from app.services.llm.parser import SOAP_REQUIRED_FIELDS
+    assert SOAP_RETRY_FIELDS == len(SOAP_REQUIRED_FIELDS)
@@ -36,3 +36,21 @@ def test_connection_manager_broadcast_isolated():
         assert ws3.sent_messages == []
 
     asyncio.run(run_test())
+
+
+def test_connection_manager_totals_across_rooms():
+    async def run_test():
+        manager = ConnectionManager()
+        ws1, ws2, ws3 = DummyWebSocket(), DummyWebSocket(), DummyWebSocket()
+
+        await manager.connect("room-1", ws1)
+        await manager.connect("room-1", ws2)
+        await manager.connect("room-2", ws3)
+        assert manager.total_connections() == 3
+        assert manager.room_count() == 2
+
+        manager.disconnect("room-2", ws3)
+        assert manager.total_connections() == 2
+        assert manager.room_count() == 1
+
+    asyncio.run(run_test())
@@ -0,0 +1,80 @@
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.instrumentation import (
+    DB_QUERIES,
+    DB_QUERIES_PER_REQUEST,
+    HTTP_IN_FLIGHT,
+    HTTP_REQUEST_SECONDS,
+    PrometheusMiddleware,
+    instrument_engine,
+)
+from app.core.metrics import render_prometheus
+
+
+def build_app():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    instrument_engine(engine)
+    instrument_engine(engine)  # idempotent
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int, db: Session = Depends(get_db)):
+        db.execute(text("SELECT 1"))
+        db.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    @app.get("/missing")
+    def missing():
+        raise HTTPException(status_code=404, detail="nope")
+
+    return app
+
+
+def test_middleware_labels_requests_by_route_template():
+    """Latency is recorded per route template and status, not per raw path."""
+    client = TestClient(build_app())
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+    client.get("/not-a-route")
+
+    snapshot = HTTP_REQUEST_SECONDS.snapshot()
+    assert snapshot["GET,/items/{item_id},200"]["count"] == 2
+    assert snapshot["GET,/missing,404"]["count"] == 1
+    assert snapshot["GET,unmatched,404"]["count"] == 1
+    assert HTTP_IN_FLIGHT.values() == {("GET",): 0.0}
+
+
+def test_queries_counted_per_request():
+    """Statements issued while serving a request are attributed to its route."""
+    client = TestClient(build_app())
+    client.get("/items/1")
+
+    assert DB_QUERIES.values()[()] >= 2
+    assert DB_QUERIES_PER_REQUEST.series()[("/items/{item_id}",)].sum == 2
+
+
+def test_metrics_render_includes_service_metrics():
+    """The exposition includes HTTP, DB, LLM and WebSocket metrics."""
+    TestClient(build_app()).get("/items/1")
+    text_output = render_prometheus()
+    for name in (
+        "meditriage_http_request_duration_seconds_bucket",
+        "meditriage_db_query_duration_seconds_count",
+        "# TYPE meditriage_llm_call_duration_seconds histogram",
+        "meditriage_websocket_connections 0",
+        "meditriage_triage_stage_seconds",
+    ):
+        assert name in text_output
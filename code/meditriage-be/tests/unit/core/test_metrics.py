@@ -0,0 +1,88 @@
+from app.core.metrics import Counter, Gauge, Histogram, all_metrics, render_prometheus
+
+
+def test_histogram_counts_and_sum_per_label():
+    """Observations are aggregated per label value."""
+    histogram = Histogram("test_latency_seconds", "Test latency.", labelnames=("stage",))
+    histogram.observe(0.2, stage="scrub")
+    histogram.observe(0.4, stage="scrub")
+    histogram.observe(1.5, stage="provider_call")
+
+    snapshot = histogram.snapshot()
+    assert snapshot["scrub"]["count"] == 2
+    assert snapshot["scrub"]["sum_s"] == 0.6
+    assert snapshot["provider_call"]["count"] == 1
+
+
+def test_histogram_quantile_interpolates_within_bucket():
+    """Quantiles are estimated from bucket counts like Prometheus histogram_quantile."""
+    histogram = Histogram("test_quantile_seconds", "Test.", buckets=(0.1, 0.2, 0.4))
+    for value in (0.05, 0.15, 0.15, 0.3):
+        histogram.observe(value)
+
+    series = histogram.series()[()]
+    assert series.cumulative() == [1, 3, 4, 4]
+    assert abs(series.quantile(0.5) - 0.15) < 1e-9
+    assert series.quantile(1.0) == 0.4
+
+
+def test_histogram_overflow_reports_largest_bound():
+    """Values above every bucket land in +Inf and report the largest finite bound."""
+    histogram = Histogram("test_overflow_seconds", "Test.", buckets=(0.1, 1.0))
+    histogram.observe(5.0)
+    assert histogram.series()[()].quantile(0.99) == 1.0
+
+
+def test_histogram_registered_and_resettable():
+    """Histograms register themselves and reset() drops every series."""
+    histogram = Histogram("test_registered_seconds", "Test.")
+    histogram.observe(0.1)
+    assert histogram in all_metrics()
+    histogram.reset()
+    assert histogram.snapshot() == {}
+
+
+def test_counter_and_gauge_values():
+    """Counters accumulate per label; gauges move both ways."""
+    counter = Counter("test_events_total", "Test events.", labelnames=("kind",))
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    gauge = Gauge("test_in_flight", "Test gauge.", labelnames=("method",))
+    gauge.inc(method="GET")
+    gauge.inc(method="GET")
+    gauge.dec(method="GET")
+
+    assert counter.values() == {("a",): 3.0}
+    assert gauge.values() == {("GET",): 1.0}
+
+
+def test_gauge_function_read_at_collection():
+    """A callback gauge reports whatever the function returns when collected."""
+    current = {"value": 2}
+    gauge = Gauge("test_callback", "Test callback gauge.")
+    gauge.set_function(lambda: current["value"])
+    current["value"] = 5
+    assert gauge.values() == {(): 5}
+
+
+def test_render_prometheus_text_format():
+    """Histograms render cumulative buckets, +Inf, sum and count; labels are escaped."""
+    histogram = Histogram("test_render_seconds", "Render test.", labelnames=("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route='/a"b')
+    histogram.observe(0.5, route='/a"b')
+    counter = Counter("test_render_total", "Render counter.")
+    counter.inc(3)
+
+    text = render_prometheus([histogram, counter])
+    assert text.splitlines() == [
+        "# HELP test_render_seconds Render test.",
+        "# TYPE test_render_seconds histogram",
+        'test_render_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'test_render_seconds_bucket{route="/a\\"b",le="1.0"} 2',
+        'test_render_seconds_bucket{route="/a\\"b",le="+Inf"} 2',
+        'test_render_seconds_sum{route="/a\\"b"} 0.55',
+        'test_render_seconds_count{route="/a\\"b"} 2',
+        "# HELP test_render_total Render counter.",
+        "# TYPE test_render_total counter",
+        "test_render_total 3",
+    ]
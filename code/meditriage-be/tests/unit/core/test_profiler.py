@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import profiler
+from app.core.profiler import RequestProfilingMiddleware, SamplingProfiler, profile_for
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def clear_request_profiles():
+    profiler.get_request_profiles().clear()
+    yield
+    profiler.get_request_profiles().clear()
+
+
+def busy_work(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sampler_collects_collapsed_stacks_of_busy_thread():
+    """A busy thread shows up with its thread name as root and its functions as frames."""
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_work, args=(stop,), name="busy-worker")
+    worker.start()
+    sampler = SamplingProfiler(interval=0.002).start()
+    time.sleep(0.2)
+    sampler.stop()
+    stop.set()
+    worker.join()
+
+    assert sampler.samples > 0
+    lines = sampler.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("thread:busy-worker;")]
+    assert busy and any("busy_work (core/test_profiler.py:" in line for line in busy)
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+    assert not any("thread:sampling-profiler" in line for line in lines)
+
+
+def test_idle_threads_are_skipped_unless_requested():
+    """Threads parked on a lock or event contribute nothing by default."""
+    parked = threading.Event()
+    waiter = threading.Thread(target=parked.wait, name="parked-waiter")
+    waiter.start()
+    try:
+        quiet = SamplingProfiler(interval=0.002).start()
+        time.sleep(0.05)
+        quiet.stop()
+        verbose = SamplingProfiler(interval=0.002, include_idle=True).start()
+        time.sleep(0.05)
+        verbose.stop()
+    finally:
+        parked.set()
+        waiter.join()
+
+    assert "thread:parked-waiter" not in quiet.collapsed()
+    assert "thread:parked-waiter" in verbose.collapsed()
+
+
+@pytest.mark.anyio
+async def test_only_one_process_profile_at_a_time():
+    """A second profile request while one is running is refused."""
+    first = asyncio.create_task(profile_for(0.1, interval=0.005))
+    await asyncio.sleep(0.01)
+    with pytest.raises(RuntimeError):
+        await profile_for(0.1)
+    result = await first
+    assert result.samples > 0
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/work")
+    def work():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            sum(i * i for i in range(1000))
+        return {"ok": True}
+
+    app.add_middleware(RequestProfilingMiddleware, token="secret", interval=0.002)
+    return app
+
+
+def test_request_profiled_only_with_matching_token():
+    """The X-Profile header must match the configured token; the profile is stored under X-Profile-Id."""
+    client = TestClient(build_app())
+
+    assert "x-profile-id" not in client.get("/work").headers
+    assert "x-profile-id" not in client.get("/work", headers={"X-Profile": "wrong"}).headers
+
+    response = client.get("/work", headers={"X-Profile": "secret"})
+    assert response.status_code == 200
+    collapsed = profiler.get_request_profiles().get(response.headers["x-profile-id"])
+    assert collapsed and "work (core/test_profiler.py:" in collapsed
+
+
+def test_profiling_endpoint_is_admin_only():
+    """The process profile endpoint is guarded by allow_admin."""
+    from app.api.v1.controllers import profiling_controller
+    from app.api.dependencies import allow_admin
+    routes = {route.path: route for route in profiling_controller.router.routes}
+    for path in ("/profiling/cpu", "/profiling/requests/{profile_id}"):
+        dependencies = [dep.call for dep in routes[path].dependant.dependencies]
+        assert allow_admin in dependencies
@@ -0,0 +1,103 @@
+import logging
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core import query_profiler
+from app.core.query_profiler import (
+    QueryBudgetExceeded,
+    QueryProfilingMiddleware,
+    profile_queries,
+    statement_shape,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    query_profiler.install(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    yield engine
+    query_profiler.configure_slow_query_log(None)
+
+
+def test_statement_shape_ignores_values():
+    """Statements differing only in literals or IN-list length share a shape."""
+    assert statement_shape("SELECT * FROM t WHERE id = 1") == statement_shape("SELECT * FROM t WHERE id = 42")
+    assert statement_shape("SELECT * FROM t WHERE name = 'x'") == "SELECT * FROM t WHERE name = ?"
+    assert statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT * FROM t WHERE id IN (?)"
+    )
+    assert statement_shape("SELECT *\n  FROM t") == "SELECT * FROM t"
+
+
+def test_profile_flags_repeated_shapes(engine):
+    """A statement repeated per row is reported as a likely N+1."""
+    with engine.connect() as conn, profile_queries("loop") as profile:
+        conn.execute(text("SELECT id FROM items"))
+        for item_id in (1, 2, 3):
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+
+    assert profile.count == 4
+    assert profile.repeated_shapes(3) == [("SELECT name FROM items WHERE id = ?", 3)]
+    assert profile.repeated_shapes(4) == []
+
+
+def test_query_budget_raises_when_exceeded(engine):
+    """A block over its declared budget fails with the offending statement shapes."""
+    with engine.connect() as conn:
+        with query_profiler.query_budget(2):
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+        with pytest.raises(QueryBudgetExceeded, match="SELECT name FROM items"):
+            with query_profiler.query_budget(2):
+                for item_id in (1, 2, 3):
+                    conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+
+
+def test_slow_query_logged_with_plan(engine, caplog):
+    """Statements over the threshold go to the slow-query log with their EXPLAIN plan."""
+    query_profiler.configure_slow_query_log(0)
+    query_profiler.slow_query_logger.propagate = True
+    with caplog.at_level(logging.WARNING, logger="meditriage.slow_queries"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 1})
+
+    record = caplog.records[-1].getMessage()
+    assert "SELECT name FROM items WHERE id = ?" in record
+    assert "PLAN:" in record and "items" in record.split("PLAN:")[1]
+
+
+def test_middleware_adds_headers_and_warns_on_n_plus_one(engine, caplog):
+    """Each response carries its query count, and repeated shapes are logged as N+1."""
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(QueryProfilingMiddleware, n_plus_one_threshold=3)
+
+    @app.get("/items")
+    def list_items(db: Session = Depends(get_db)):
+        ids = [row.id for row in db.execute(text("SELECT id FROM items"))]
+        return [db.execute(text("SELECT name FROM items WHERE id = :id"), {"id": i}).scalar() for i in ids]
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_profiler"):
+        response = TestClient(app).get("/items")
+
+    assert response.json() == ["a", "b", "c"]
+    assert response.headers["x-db-query-count"] == "4"
+    assert float(response.headers["x-db-query-time-ms"]) >= 0
+    assert any("Possible N+1 on GET /items: 3x" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,82 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core import tracing
+from app.core.tracing import STAGE_SECONDS, configure_tracing, span, traced, to_otlp_json
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def test_span_is_noop_when_disabled():
+    """Disabled tracing returns the shared no-op span and records nothing."""
+    with span("scrub") as current:
+        current.set_attribute("ignored", True)
+    assert current is tracing._NOOP_SPAN
+    assert STAGE_SECONDS.snapshot() == {}
+
+
+def test_spans_nest_and_record_stage_histogram():
+    """Child spans share the root's trace and every span feeds the stage histogram."""
+    configure_tracing(enabled=True)
+    with span("triage.chat") as root:
+        with span("scrub") as child:
+            pass
+        with span("provider_call"):
+            pass
+
+    assert child.parent is root
+    assert child.trace is root.trace
+    assert [finished.name for finished in root.trace.spans] == ["scrub", "provider_call", "triage.chat"]
+    assert set(STAGE_SECONDS.snapshot()) == {"scrub", "provider_call", "triage.chat"}
+    assert root.duration >= child.duration
+
+
+def test_span_records_error_and_reraises():
+    """An exception marks the span as failed without being swallowed."""
+    configure_tracing(enabled=True)
+    with pytest.raises(ValueError):
+        with span("parse") as failed:
+            raise ValueError("bad json")
+    assert failed.error == "ValueError"
+    assert STAGE_SECONDS.snapshot()["parse"]["count"] == 1
+
+
+def test_to_otlp_json_shape():
+    """Exported traces follow the OTLP/HTTP JSON mapping."""
+    configure_tracing(enabled=True, service_name="test-service")
+    with span("triage.chat") as root:
+        with span("scrub", attempt=1):
+            pass
+
+    payload = to_otlp_json(root.trace)
+    resource = payload["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": "test-service"}}
+    child, parent = resource["scopeSpans"][0]["spans"]
+    assert len(parent["traceId"]) == 32 and len(parent["spanId"]) == 16
+    assert child["parentSpanId"] == parent["spanId"]
+    assert "parentSpanId" not in parent
+    assert child["attributes"] == [{"key": "attempt", "value": {"intValue": "1"}}]
+    assert int(parent["endTimeUnixNano"]) >= int(parent["startTimeUnixNano"])
+
+
+@pytest.mark.anyio
+async def test_root_span_exports_trace_to_collector():
+    """Finishing a root span posts the whole trace to the configured collector."""
+    configure_tracing(enabled=True, otlp_endpoint="http://collector:4318/v1/traces")
+
+    @traced("triage.chat")
+    async def turn():
+        with span("scrub"):
+            return "done"
+
+    with patch("app.core.tracing._post_trace", new_callable=AsyncMock) as mock_post:
+        assert await turn() == "done"
+        for task in list(tracing._export_tasks):
+            await task
+
+    endpoint, payload = mock_post.await_args.args
+    assert endpoint == "http://collector:4318/v1/traces"
+    names = [s["name"] for s in payload["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+    assert names == ["scrub", "triage.chat"]
@@ -93,6 +93,30 @@ def test_repo_get_rooms_for_doctor(db_session):
     assert rooms[0].id == room.id
 
 
+def test_repo_get_rooms_for_doctor_loads_member_counts_eagerly(db_session, query_budget):
+    doctor = User(role=UserRole.DOCTOR, full_name="Dr. One")
+    db_session.add(doctor)
+    db_session.flush()
+    for title in ("A", "B", "C"):
+        room = consultation_repo.create_room(
+            db_session,
+            {"encounter_id": uuid.uuid4(), "created_by_id": doctor.id, "title": title},
+        )
+        consultation_repo.add_member(
+            db_session,
+            {"room_id": room.id, "doctor_id": doctor.id, "added_by_id": None, "is_active": True},
+        )
+    doctor_id = doctor.id
+    db_session.expunge_all()
+
+    # rooms + one batched memberships load, independent of the number of rooms
+    with query_budget(2):
+        rooms = consultation_repo.get_rooms_for_doctor(db_session, doctor_id)
+        counts = [len(room.memberships) for room in rooms]
+
+    assert counts == [1, 1, 1]
+
+
 def test_repo_get_membership(db_session):
     doctor = User(role=UserRole.DOCTOR, full_name="Dr. One")
     db_session.add(doctor)
@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.services.llm.providers.base_provider import BaseReasoningProvider
+from app.services.llm.providers.caching_provider import CachingProvider
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+class CountingProvider(BaseReasoningProvider):
+    """Returns a numbered response per upstream call, after an optional delay."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def generate_response(self, system_prompt, chat_history, user_message):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return f"response {self.calls}"
+
+    async def generate_structured_output(self, system_prompt, user_content, response_schema=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f'{{"subjective": "S{self.calls}"}}'
+
+
+def _ask(cache, user_message="It hurts", system_prompt="sys"):
+    return cache.generate_response(system_prompt=system_prompt, chat_history=[], user_message=user_message)
+
+
+@pytest.mark.anyio
+async def test_identical_requests_hit_cache():
+    """A repeated identical request is served from the cache"""
+    upstream = CountingProvider()
+    cache = CachingProvider(upstream)
+    assert await _ask(cache) == "response 1"
+    assert await _ask(cache) == "response 1"
+    assert upstream.calls == 1
+    assert cache.stats_snapshot()["hits"] == 1
+
+
+@pytest.mark.anyio
+async def test_different_requests_miss_cache():
+    """Any difference in the messages produces a different key"""
+    upstream = CountingProvider()
+    cache = CachingProvider(upstream)
+    await _ask(cache, system_prompt="a")
+    await _ask(cache, system_prompt="b")
+    assert upstream.calls == 2
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_requests_are_coalesced():
+    """Concurrent identical calls share one upstream request"""
+    upstream = CountingProvider(delay=0.05)
+    cache = CachingProvider(upstream)
+    results = await asyncio.gather(*(_ask(cache) for _ in range(5)))
+    assert results == ["response 1"] * 5
+    assert upstream.calls == 1
+    assert cache.stats_snapshot()["coalesced"] == 4
+
+
+@pytest.mark.anyio
+async def test_failures_are_shared_but_not_cached():
+    """A failed upstream call fails its waiters and is retried on the next request"""
+    upstream = CountingProvider(delay=0.01, fail=True)
+    cache = CachingProvider(upstream)
+    results = await asyncio.gather(_ask(cache), _ask(cache), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert upstream.calls == 1
+
+    upstream.fail = False
+    assert await _ask(cache) == "response 2"
+
+
+@pytest.mark.anyio
+async def test_cancelled_first_request_does_not_cancel_joined_waiters():
+    """Cancelling the request that started a shared call leaves the call running for the others"""
+    upstream = CountingProvider(delay=0.05)
+    cache = CachingProvider(upstream)
+    first = asyncio.create_task(_ask(cache))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(_ask(cache))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    assert await second == "response 1"
+    assert first.cancelled()
+    assert upstream.calls == 1
+    assert await _ask(cache) == "response 1"  # cached by the shared call
+
+
+@pytest.mark.anyio
+async def test_entries_expire_after_ttl():
+    """Cached responses are not served after the TTL"""
+    upstream = CountingProvider()
+    cache = CachingProvider(upstream, ttl_seconds=10)
+    with patch("app.services.llm.providers.caching_provider.time.monotonic", return_value=100.0):
+        await _ask(cache)
+    with patch("app.services.llm.providers.caching_provider.time.monotonic", return_value=111.0):
+        await _ask(cache)
+    assert upstream.calls == 2
+
+
+@pytest.mark.anyio
+async def test_cache_is_bounded():
+    """The least recently used entry is evicted when the cache is full"""
+    upstream = CountingProvider()
+    cache = CachingProvider(upstream, max_entries=2)
+    for prompt in ("a", "b", "c"):
+        await _ask(cache, system_prompt=prompt)
+    assert cache.stats_snapshot()["entries"] == 2
+    await _ask(cache, system_prompt="a")
+    assert upstream.calls == 4
+
+
+@pytest.mark.anyio
+async def test_prompts_with_pii_are_never_cached():
+    """Requests containing regex-detectable PII bypass the cache entirely"""
+    upstream = CountingProvider()
+    cache = CachingProvider(upstream)
+    await _ask(cache, user_message="My NIC is 199012345678")
+    await _ask(cache, user_message="My NIC is 199012345678")
+    assert upstream.calls == 2
+    assert cache.stats_snapshot()["entries"] == 0
+
+
+@pytest.mark.anyio
+async def test_structured_output_is_cached():
+    """Identical SOAP requests (e.g. a double-clicked finish) reuse the first note"""
+    upstream = CountingProvider()
+    cache = CachingProvider(upstream)
+    first = await cache.generate_structured_output(system_prompt="soap", user_content="go")
+    second = await cache.generate_structured_output(system_prompt="soap", user_content="go")
+    assert first == second
+    assert upstream.calls == 1
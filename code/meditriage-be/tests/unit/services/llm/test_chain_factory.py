@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, AsyncMock
 from app.services.llm.chain_factory import TriagePipeline
 from app.services.llm.parser import InterviewResponse, SOAPNote
+from app.services.llm.prompts import TRIAGE_INTERVIEW_SYSTEM_PROMPT
 
 @pytest.fixture
 def anyio_backend():
@@ -20,6 +21,11 @@ def test_get_initial_greeting_contains_complaint(mock_provider):
     res = pipeline.get_initial_greeting("severe chest pain")
     assert "severe chest pain" in res
 
+def test_history_compaction_is_opt_in(mock_provider):
+    """History compaction stays off unless HISTORY_COMPACTION_ENABLED is set"""
+    pipeline = TriagePipeline(provider=mock_provider)
+    assert pipeline.compactor is None
+
 def test_pipeline_accepts_custom_provider(mock_provider):
     """TriagePipeline can be initialized with a custom BaseReasoningProvider instance"""
     pipeline = TriagePipeline(provider=mock_provider)
@@ -154,3 +160,237 @@ async def test_generate_soap_note_returns_soap_note(mock_provider):
         patient_context={"age": 30, "gender": "male", "chief_complaint": "cough"}
     )
     assert res is expected_note
+
+def test_create_provider_wraps_configured_providers_when_routing_enabled():
+    """With LLM_ROUTING_ENABLED, every provider with an API key is routed, ACTIVE_LLM first"""
+    from unittest.mock import patch
+    from app.core.config import Settings
+    from app.services.llm.chain_factory import _create_provider
+    from app.services.llm.providers.routing_provider import RoutingProvider
+
+    settings = Settings(
+        ACTIVE_LLM="OPENAI",
+        OPENAI_API_KEY="sk-test",
+        DEEPSEEK_API_KEY="ds-test",
+        LLM_ROUTING_ENABLED=True,
+        LLM_CACHE_ENABLED=False,
+    )
+    with patch("app.services.llm.chain_factory.get_settings", return_value=settings):
+        provider = _create_provider()
+
+    assert isinstance(provider, RoutingProvider)
+    assert list(provider.providers) == ["OPENAI", "DEEPSEEK"]
+
+def test_create_provider_wraps_in_response_cache():
+    """With LLM_CACHE_ENABLED, the active provider is wrapped in a CachingProvider"""
+    from unittest.mock import patch
+    from app.core.config import Settings
+    from app.services.llm.chain_factory import _create_provider
+    from app.services.llm.providers.caching_provider import CachingProvider
+    from app.services.llm.providers.deepseek_provider import DeepSeekProvider
+
+    settings = Settings(DEEPSEEK_API_KEY="ds-test", LLM_CACHE_ENABLED=True, LLM_CACHE_TTL_SECONDS=60)
+    with patch("app.services.llm.chain_factory.get_settings", return_value=settings):
+        provider = _create_provider()
+
+    assert isinstance(provider, CachingProvider)
+    assert isinstance(provider.provider, DeepSeekProvider)
+    assert provider.ttl_seconds == 60
+
+@pytest.mark.anyio
+async def test_generate_soap_note_scrubs_transcript(mock_provider):
+    """Regex-detectable PII in the raw transcript never reaches the provider"""
+    pipeline = TriagePipeline(provider=mock_provider)
+    pipeline.parser = MagicMock()
+    pipeline.parser.parse_soap_note = MagicMock(return_value=MagicMock())
+
+    await pipeline.generate_soap_note(
+        conversation_transcript="PATIENT: call me on 0771234567",
+        patient_context={"age": 30, "gender": "male", "chief_complaint": "cough"},
+    )
+    system_prompt = mock_provider.generate_structured_output.call_args.kwargs["system_prompt"]
+    assert "0771234567" not in system_prompt
+    assert "[PHONE_REDACTED]" in system_prompt
+
+@pytest.mark.anyio
+async def test_process_message_compacts_long_history(mock_provider):
+    """Older turns are folded into a summary in the system prompt; only recent ones are sent verbatim"""
+    from app.services.llm.history import HistoryCompactor
+
+    pipeline = TriagePipeline(provider=mock_provider)
+    pipeline.compactor = HistoryCompactor(keep_last=4)
+
+    pipeline.scrubber = MagicMock()
+    pipeline.scrubber.scrub = AsyncMock(return_value="Scrubbed message")
+
+    pipeline.parser = MagicMock()
+    pipeline.parser.parse_interview_response = MagicMock(return_value=MagicMock())
+
+    history = []
+    for question, answer in [
+        ("When did it start?", "Two days ago"),
+        ("Where is the pain?", "Left side of the chest"),
+        ("How severe is it on a scale of 1 to 10?", "About 7"),
+        ("Are you taking any medications?", "None"),
+        ("Any allergies?", "Penicillin"),
+    ]:
+        history += [{"role": "assistant", "content": question}, {"role": "user", "content": answer}]
+
+    await pipeline.process_message(
+        message="Raw message",
+        chat_history=history,
+        patient_context={"age": 30, "gender": "male", "chief_complaint": "chest pain"},
+        conversation_id="enc-1",
+    )
+    kwargs = mock_provider.generate_response.call_args.kwargs
+    assert kwargs["chat_history"] == history[4:]  # folded in blocks of 4 messages
+    assert "- Onset: Two days ago" in kwargs["system_prompt"]
+    assert "- Location: Left side of the chest" in kwargs["system_prompt"]
+    assert kwargs["system_prompt"].startswith(TRIAGE_INTERVIEW_SYSTEM_PROMPT.split("{")[0])
+
+@pytest.mark.anyio
+async def test_process_message_trims_history_when_encounter_budget_spent(mock_provider):
+    """Once an encounter has used its token budget, old history is no longer sent"""
+    from app.services.llm.usage import get_ledger, usage_scope
+
+    pipeline = TriagePipeline(provider=mock_provider)
+    pipeline.compactor = None
+
+    pipeline.scrubber = MagicMock()
+    pipeline.scrubber.scrub = AsyncMock(return_value="Scrubbed message")
+
+    pipeline.parser = MagicMock()
+    pipeline.parser.parse_interview_response = MagicMock(return_value=MagicMock())
+
+    with usage_scope(encounter_id="enc-1"):
+        get_ledger().record(
+            prompt_tokens=pipeline.settings.LLM_ENCOUNTER_TOKEN_BUDGET, completion_tokens=0, latency=0.1
+        )
+
+    history = [{"role": "assistant", "content": "When did it start?"}, {"role": "user", "content": "Today"}]
+    await pipeline.process_message(
+        message="Raw message",
+        chat_history=history,
+        patient_context={"age": 30, "gender": "male", "chief_complaint": "cough"},
+        conversation_id="enc-1",
+    )
+    assert mock_provider.generate_response.call_args.kwargs["chat_history"] == []
+
+@pytest.mark.anyio
+async def test_generate_soap_note_trims_oversized_transcript(mock_provider):
+    """Transcripts larger than the context window are trimmed before the SOAP call"""
+    pipeline = TriagePipeline(provider=mock_provider)
+    pipeline.settings = pipeline.settings.model_copy(update={"LLM_CONTEXT_WINDOW": 3000})
+    pipeline.parser = MagicMock()
+    pipeline.parser.parse_soap_note = MagicMock(return_value=MagicMock())
+
+    transcript = "\n".join(f"PATIENT: message number {i} about the symptoms" for i in range(2000))
+    await pipeline.generate_soap_note(
+        conversation_transcript=transcript,
+        patient_context={"age": 30, "gender": "male", "chief_complaint": "cough"},
+    )
+    system_prompt = mock_provider.generate_structured_output.call_args.kwargs["system_prompt"]
+    assert "earlier lines omitted" in system_prompt
+    assert "message number 1999" in system_prompt
+
+@pytest.mark.anyio
+async def test_generate_soap_note_retries_only_incomplete_field(mock_provider):
+    """A truncated SOAP field is re-requested on its own instead of regenerating the note"""
+    mock_provider.generate_structured_output = AsyncMock(side_effect=[
+        '{"subjective": "Chest pain for two days", "objective": "Appears diaph',
+        '{"objective": "Appears diaphoretic, in mild distress."}',
+    ])
+    pipeline = TriagePipeline(provider=mock_provider)
+
+    note = await pipeline.generate_soap_note(
+        conversation_transcript="AI: Hello\nPATIENT: My chest hurts",
+        patient_context={"age": 30, "gender": "male", "chief_complaint": "chest pain"},
+    )
+    assert note.subjective == "Chest pain for two days"
+    assert note.objective == "Appears diaphoretic, in mild distress."
+    assert note.incomplete_fields == []
+    retry_kwargs = mock_provider.generate_structured_output.call_args_list[1].kwargs
+    assert '"objective"' in retry_kwargs["user_content"]
+    assert retry_kwargs["response_schema"]["required"] == ["objective"]
+
+@pytest.mark.anyio
+async def test_process_message_scripted_turn_skips_cloud(mock_provider):
+    """With the hybrid interviewer, a clearly answered core turn needs no scrub or LLM call"""
+    from app.services.llm.interviewer import ScriptedInterviewer, SCRIPTED_QUESTIONS
+
+    pipeline = TriagePipeline(provider=mock_provider)
+    pipeline.interviewer = ScriptedInterviewer()
+    pipeline.scrubber = MagicMock()
+    pipeline.scrubber.scrub = AsyncMock(return_value="Scrubbed message")
+
+    res = await pipeline.process_message(
+        message="Two days ago",
+        chat_history=[{"role": "assistant", "content": SCRIPTED_QUESTIONS["onset"]}],
+        patient_context={"age": 30, "gender": "male", "chief_complaint": "cough"},
+    )
+    assert res.message == SCRIPTED_QUESTIONS["location"]
+    assert res.is_complete is False
+    pipeline.scrubber.scrub.assert_not_called()
+    mock_provider.generate_response.assert_not_called()
+
+@pytest.mark.anyio
+async def test_process_message_records_stage_timings_when_tracing(mock_provider):
+    """With tracing enabled, a cloud turn records scrub, prompt build, provider call and parse"""
+    from app.core.tracing import STAGE_SECONDS, configure_tracing
+
+    configure_tracing(enabled=True)
+    pipeline = TriagePipeline(provider=mock_provider)
+    pipeline.scrubber = MagicMock()
+    pipeline.scrubber.scrub = AsyncMock(return_value="Scrubbed message")
+
+    await pipeline.process_message(
+        message="Raw message",
+        chat_history=[],
+        patient_context={"age": 30, "gender": "male", "chief_complaint": "cough"},
+    )
+    assert set(STAGE_SECONDS.snapshot()) == {"scrub", "prompt_build", "provider_call", "parse"}
+
+@pytest.mark.anyio
+async def test_provider_calls_recorded_in_llm_histogram(mock_provider):
+    """Every provider call is timed per usage endpoint and outcome"""
+    from app.core.instrumentation import LLM_CALL_SECONDS
+    from app.services.llm.usage import usage_scope
+
+    pipeline = TriagePipeline(provider=mock_provider)
+    pipeline.scrubber = MagicMock()
+    pipeline.scrubber.scrub = AsyncMock(return_value="Scrubbed message")
+
+    with usage_scope(endpoint="triage.chat"):
+        await pipeline.process_message(
+            message="Raw message",
+            chat_history=[],
+            patient_context={"age": 30, "gender": "male", "chief_complaint": "cough"},
+        )
+    assert LLM_CALL_SECONDS.snapshot()["triage.chat,success"]["count"] == 1
+
+@pytest.mark.anyio
+async def test_provider_call_times_out(mock_provider):
+    """A provider call running past LLM_CALL_TIMEOUT_SECONDS fails and counts against the breaker"""
+    import asyncio
+    from app.core.config import Settings
+    from app.core.instrumentation import LLM_CALL_SECONDS
+    from app.services.llm.usage import usage_scope
+
+    async def slow_response(**kwargs):
+        await asyncio.sleep(1)
+        return "AI response"
+
+    mock_provider.generate_response = slow_response
+    pipeline = TriagePipeline(provider=mock_provider)
+    pipeline.settings = Settings(LLM_CALL_TIMEOUT_SECONDS=0.01)
+    pipeline.scrubber = MagicMock()
+    pipeline.scrubber.scrub = AsyncMock(return_value="Scrubbed message")
+
+    with usage_scope(endpoint="triage.chat"), pytest.raises(asyncio.TimeoutError):
+        await pipeline.process_message(
+            message="Raw message",
+            chat_history=[],
+            patient_context={"age": 30, "gender": "male", "chief_complaint": "cough"},
+        )
+    assert pipeline.provider_breaker._failures == 1
+    assert LLM_CALL_SECONDS.snapshot()["triage.chat,error"]["count"] == 1
@@ -0,0 +1,203 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi import HTTPException
+from app.services.llm.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    get_breaker,
+)
+from app.services.llm.chain_factory import TriagePipeline
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+async def _fail():
+    raise RuntimeError("dependency down")
+
+
+async def _ok():
+    return "ok"
+
+
+@pytest.mark.anyio
+async def test_breaker_opens_after_threshold():
+    """The circuit opens after failure_threshold consecutive failures."""
+    breaker = CircuitBreaker("dep", failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await breaker.call(_fail)
+    assert breaker.state == CircuitState.OPEN
+
+
+@pytest.mark.anyio
+async def test_open_breaker_fast_fails_without_calling():
+    """While OPEN, calls are rejected with CircuitOpenError and never reach the dependency."""
+    breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=60)
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+
+    dependency = AsyncMock(return_value="ok")
+    with pytest.raises(CircuitOpenError) as exc_info:
+        await breaker.call(dependency)
+    dependency.assert_not_called()
+    assert exc_info.value.retry_after > 0
+
+
+@pytest.mark.anyio
+async def test_success_resets_failure_count():
+    """A success between failures keeps the circuit CLOSED."""
+    breaker = CircuitBreaker("dep", failure_threshold=2, reset_timeout=60)
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+    await breaker.call(_ok)
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.anyio
+async def test_half_open_allows_single_trial_then_closes():
+    """After the reset timeout one trial call is allowed; success closes the circuit."""
+    breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=0)
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False  # trial already in flight
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.anyio
+async def test_half_open_failure_reopens():
+    """A failed trial call re-opens the circuit immediately."""
+    breaker = CircuitBreaker("dep", failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker._opened_at -= 60  # pretend the reset timeout has passed
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+    assert breaker.state == CircuitState.OPEN
+
+
+@pytest.mark.anyio
+async def test_health_probe_closes_open_circuit():
+    """A successful background probe closes an OPEN circuit before the timeout."""
+    probe = AsyncMock(return_value=True)
+    breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=60, probe=probe)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    await breaker.run_probe()
+    probe.assert_called_once()
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.anyio
+async def test_failing_probe_keeps_circuit_open():
+    """A probe that raises leaves the circuit OPEN."""
+    breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=60,
+                             probe=AsyncMock(side_effect=RuntimeError("still down")))
+    breaker.record_failure()
+    await breaker.run_probe()
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_registry_returns_same_breaker():
+    """get_breaker() returns one shared instance per name."""
+    assert get_breaker("scrubber") is get_breaker("scrubber")
+
+
+@pytest.mark.anyio
+async def test_pipeline_fast_fails_before_scrubbing_when_provider_open():
+    """With the provider circuit open, process_message() neither scrubs nor calls the provider."""
+    provider = MagicMock()
+    provider.generate_response = AsyncMock(return_value="AI response")
+    pipeline = TriagePipeline(provider=provider)
+    pipeline.scrubber = MagicMock()
+    pipeline.scrubber.scrub = AsyncMock(return_value="scrubbed")
+    for _ in range(pipeline.provider_breaker.failure_threshold):
+        pipeline.provider_breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        await pipeline.process_message(
+            message="hi", chat_history=[],
+            patient_context={"age": 30, "gender": "male", "chief_complaint": "cough"},
+        )
+    pipeline.scrubber.scrub.assert_not_called()
+    provider.generate_response.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_pipeline_records_provider_failures():
+    """Provider errors are counted on the pipeline's provider breaker."""
+    provider = MagicMock()
+    provider.generate_structured_output = AsyncMock(side_effect=RuntimeError("timeout"))
+    pipeline = TriagePipeline(provider=provider)
+
+    with pytest.raises(RuntimeError):
+        await pipeline.generate_soap_note("transcript", {"age": 30})
+    assert pipeline.provider_breaker._failures == 1
+
+
+def test_get_pipeline_fast_fails_after_construction_failure():
+    """After one failed construction, _get_pipeline() returns 503 without retrying construction."""
+    from app.services import triage_engine
+
+    with patch.object(triage_engine, "_pipeline", None), \
+         patch.object(triage_engine, "TriagePipeline", side_effect=RuntimeError("boom")) as ctor:
+        with pytest.raises(HTTPException) as first:
+            triage_engine._get_pipeline()
+        with pytest.raises(HTTPException) as second:
+            triage_engine._get_pipeline()
+
+    assert first.value.status_code == 503
+    assert second.value.status_code == 503
+    assert "Retry-After" in second.value.headers
+    assert ctor.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_half_open_trial_released_when_scrubbing_fails():
+    """A turn that fails before reaching the provider does not hold the half-open trial."""
+    provider = MagicMock()
+    provider.generate_response = AsyncMock(return_value='{"message": "Next question?", "is_complete": false}')
+    pipeline = TriagePipeline(provider=provider)
+    pipeline.interviewer = None
+    pipeline.scrubber = MagicMock()
+    pipeline.scrubber.scrub = AsyncMock(side_effect=RuntimeError("scrubber down"))
+    breaker = pipeline.provider_breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker._opened_at -= breaker.reset_timeout  # pretend the reset timeout has passed
+    context = {"age": 30, "gender": "male", "chief_complaint": "cough"}
+
+    with pytest.raises(RuntimeError):
+        await pipeline.process_message(message="hi", chat_history=[], patient_context=context)
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    pipeline.scrubber.scrub = AsyncMock(return_value="scrubbed")
+    await pipeline.process_message(message="hi", chat_history=[], patient_context=context)
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.anyio
+async def test_provider_without_health_check_reports_unhealthy():
+    """The default health check returns False instead of raising."""
+    from app.services.llm.providers.base_provider import BaseReasoningProvider
+
+    class NoProbeProvider(BaseReasoningProvider):
+        async def generate_response(self, system_prompt, chat_history, user_message):
+            return ""
+
+        async def generate_structured_output(self, system_prompt, user_content, response_schema=None):
+            return ""
+
+    assert await NoProbeProvider().health_check() is False
@@ -0,0 +1,94 @@
+from app.services.llm.history import HistoryCompactor
+from app.services.llm.oldcarts import InterviewSummary, classify_question
+
+
+def _interview(pairs):
+    history = []
+    for question, answer in pairs:
+        history += [{"role": "assistant", "content": question}, {"role": "user", "content": answer}]
+    return history
+
+
+PAIRS = [
+    ("When did the pain first start?", "Yesterday morning"),
+    ("Where exactly do you feel it?", "Lower right abdomen"),
+    ("Does the pain spread anywhere else?", "To my back"),
+    ("How would you describe the pain?", "Sharp"),
+    ("On a scale of 1 to 10, how bad is it?", "8"),
+    ("Do you have any allergies?", "None"),
+]
+
+
+def test_classify_question_maps_oldcarts_slots():
+    """Interviewer questions map onto the OLDCARTS slot they ask about"""
+    assert classify_question("When did the cough start?") == "onset"
+    assert classify_question("Where is the pain located?") == "location"
+    assert classify_question("Does it spread anywhere else?") == "radiation"
+    assert classify_question("How long does each episode last?") == "duration"
+    assert classify_question("Is it constant or does it come and go?") == "timing"
+    assert classify_question("What makes it worse?") == "aggravating_alleviating"
+    assert classify_question("Are you allergic to anything? Any allergies?") == "allergies"
+    assert classify_question("Hello there") is None
+
+
+def test_summary_renders_in_interview_order():
+    """The rendered summary lists slots in OLDCARTS order, unclassified answers last"""
+    summary = InterviewSummary()
+    summary.record("How severe is it, on a scale of 1 to 10?", "6")
+    summary.record("When did it start?", "Monday")
+    summary.record("Anything else?", "No")
+    assert summary.render().splitlines() == [
+        "- Onset: Monday",
+        "- Severity: 6",
+        "- Other: Anything else? -> No",
+    ]
+
+
+def test_short_history_is_not_compacted():
+    """Histories within the verbatim window are returned unchanged without a summary"""
+    compactor = HistoryCompactor(keep_last=6)
+    history = _interview(PAIRS[:3])
+    summary, recent = compactor.compact(history, "enc")
+    assert summary is None
+    assert recent == history
+
+
+def test_compaction_keeps_recent_turns_and_starts_on_question():
+    """Older turns are folded; the verbatim window starts on an assistant question"""
+    compactor = HistoryCompactor(keep_last=4, fold_block=4)
+    history = _interview(PAIRS)
+    summary, recent = compactor.compact(history, "enc")
+    assert recent == history[8:]
+    assert recent[0]["role"] == "assistant"
+    assert "- Onset: Yesterday morning" in summary
+    assert "- Radiation: To my back" in summary
+    assert "Sharp" in summary
+    assert "None" not in summary  # still verbatim
+
+
+def test_incremental_folding_matches_full_rebuild():
+    """Folding turn by turn yields the same summary as compacting the final history at once"""
+    incremental = HistoryCompactor(keep_last=2, fold_block=2)
+    history = _interview(PAIRS)
+    for end in range(1, len(history) + 1):
+        summary, _ = incremental.compact(history[:end], "enc")
+    fresh_summary, _ = HistoryCompactor(keep_last=2, fold_block=2).compact(history)
+    assert summary == fresh_summary
+
+
+def test_prefix_is_stable_between_folds():
+    """Between block folds the summary is unchanged, so the prompt prefix stays cacheable"""
+    compactor = HistoryCompactor(keep_last=4, fold_block=4)
+    history = _interview(PAIRS)
+    first, _ = compactor.compact(history[:9], "enc")
+    second, _ = compactor.compact(history[:10], "enc")
+    assert first == second
+
+
+def test_state_store_is_bounded():
+    """Per-conversation fold state is evicted least-recently-used"""
+    compactor = HistoryCompactor(keep_last=2, fold_block=2, max_conversations=2)
+    history = _interview(PAIRS)
+    for conversation_id in ("a", "b", "c"):
+        compactor.compact(history, conversation_id)
+    assert list(compactor._states) == ["b", "c"]
@@ -0,0 +1,58 @@
+from app.services.llm.interviewer import (
+    SCRIPTED_QUESTIONS,
+    InterviewMetrics,
+    ScriptedInterviewer,
+    is_clear_answer,
+)
+from app.services.llm.oldcarts import classify_question
+from app.services.llm.prompts import INITIAL_GREETING_TEMPLATE
+
+
+def test_scripted_questions_classify_to_their_slot():
+    """Every scripted question is recognised as asking about its own slot"""
+    for slot, question in SCRIPTED_QUESTIONS.items():
+        assert classify_question(question) == slot
+
+
+def test_is_clear_answer():
+    """Short definite answers are clear; questions, uncertainty and red flags are not"""
+    assert is_clear_answer("Two days ago")
+    assert not is_clear_answer("")
+    assert not is_clear_answer("What do you mean?")
+    assert not is_clear_answer("I'm not sure")
+    assert not is_clear_answer("I fainted this morning")
+    assert not is_clear_answer("word " * 40)
+
+
+def test_next_question_asks_first_unasked_slot():
+    """After the greeting (onset) is answered, the location question is asked locally"""
+    history = [{"role": "assistant", "content": INITIAL_GREETING_TEMPLATE.format(chief_complaint="headache")}]
+    question = ScriptedInterviewer().next_question(history, "Yesterday evening")
+    assert question == SCRIPTED_QUESTIONS["location"]
+
+
+def test_next_question_defers_unclear_answers():
+    """An unclear answer is left to the cloud model for clarification"""
+    history = [{"role": "assistant", "content": SCRIPTED_QUESTIONS["onset"]}]
+    assert ScriptedInterviewer().next_question(history, "I don't know") is None
+
+
+def test_next_question_defers_once_core_slots_asked():
+    """After all core OLDCARTS slots have been asked, turns go to the cloud model"""
+    history = []
+    for question in SCRIPTED_QUESTIONS.values():
+        history += [{"role": "assistant", "content": question}, {"role": "user", "content": "ok"}]
+    assert ScriptedInterviewer().next_question(history, "About a 6") is None
+
+
+def test_interview_metrics_snapshot():
+    """Metrics report the local fraction and per-path p50 latency"""
+    metrics = InterviewMetrics()
+    metrics.record("local", 0.001)
+    metrics.record("cloud", 0.9)
+    metrics.record("cloud", 1.1)
+    metrics.record("cloud", 1.0)
+    snapshot = metrics.snapshot()
+    assert snapshot["turns"] == 4
+    assert snapshot["local_fraction"] == 0.25
+    assert snapshot["cloud_p50_ms"] == 1000.0
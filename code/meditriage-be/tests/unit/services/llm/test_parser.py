@@ -91,3 +91,32 @@ def test_parse_soap_empty_string(parser):
     raw = ""
     with pytest.raises(ValueError):
         parser.parse_soap_note(raw)
+
+def test_parse_soap_repairs_truncated_json(parser):
+    """JSON cut off mid-value is repaired and the cut-off field is flagged incomplete"""
+    raw = '{"subjective": "Chest pain for two days", "objective": "Appears diaph'
+    note = parser.parse_soap_note(raw)
+    assert note.subjective == "Chest pain for two days"
+    assert note.objective == "Appears diaph"
+    assert note.incomplete_fields == ["objective"]
+
+def test_parse_soap_repairs_truncated_key(parser):
+    """JSON cut off inside a key keeps the complete members and flags the missing field"""
+    raw = '{"subjective": "Chest pain", "obje'
+    note = parser.parse_soap_note(raw)
+    assert note.subjective == "Chest pain"
+    assert note.objective == ""
+    assert note.incomplete_fields == ["objective"]
+
+def test_parse_soap_ignores_trailing_text(parser):
+    """Text around a complete JSON object does not break parsing"""
+    raw = 'Here is the note: {"subjective": "S1", "objective": "O {1}"} Hope this helps.'
+    note = parser.parse_soap_note(raw)
+    assert note.objective == "O {1}"
+    assert note.incomplete_fields == []
+
+def test_parse_soap_field(parser):
+    """A single-field retry response yields that field's text; truncated values yield None"""
+    assert parser.parse_soap_field('{"objective": "Afebrile"}', "objective") == "Afebrile"
+    assert parser.parse_soap_field('{"objective": "Afeb', "objective") is None
+    assert parser.parse_soap_field("nope", "objective") is None
@@ -0,0 +1,180 @@
+import asyncio
+import pytest
+from app.services.llm.providers.base_provider import BaseReasoningProvider
+from app.services.llm.providers.routing_provider import RoutingProvider, ProviderStats
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+class FakeProvider(BaseReasoningProvider):
+    """Stand-in for a remote LLM endpoint with injected latency and failures."""
+
+    def __init__(self, name, latency=0.0, fail=False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def _respond(self):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} unavailable")
+        return f"{self.name} reply"
+
+    async def generate_response(self, system_prompt, chat_history, user_message):
+        return await self._respond()
+
+    async def generate_structured_output(self, system_prompt, user_content, response_schema=None):
+        return await self._respond()
+
+
+async def _chat(router):
+    return await router.generate_response(system_prompt="sys", chat_history=[], user_message="hi")
+
+
+def test_provider_stats_percentiles():
+    """p50/p95 are nearest-rank percentiles over the rolling window."""
+    stats = ProviderStats(window_size=100)
+    for ms in range(1, 101):
+        stats.record_success(ms / 1000)
+    assert stats.p50 == pytest.approx(0.050)
+    assert stats.p95 == pytest.approx(0.095)
+    assert stats.error_rate == 0.0
+
+
+def test_provider_stats_window_drops_old_failures():
+    """Failures age out of the window once enough successes are recorded."""
+    stats = ProviderStats(window_size=4)
+    stats.record_failure()
+    stats.record_failure()
+    assert stats.error_rate == 1.0
+    for _ in range(4):
+        stats.record_success(0.01)
+    assert stats.error_rate == 0.0
+
+
+@pytest.mark.anyio
+async def test_router_prefers_configured_order_without_samples():
+    """Before any latency data exists, the first configured provider (ACTIVE_LLM) is used."""
+    primary, secondary = FakeProvider("primary"), FakeProvider("secondary")
+    router = RoutingProvider({"primary": primary, "secondary": secondary})
+    assert await _chat(router) == "primary reply"
+    assert secondary.calls == 0
+
+
+@pytest.mark.anyio
+async def test_router_routes_to_fastest_provider():
+    """Once both providers have samples, the lower-p50 provider is ranked first."""
+    slow, fast = FakeProvider("slow", latency=0.03), FakeProvider("fast", latency=0.0)
+    router = RoutingProvider({"slow": slow, "fast": fast}, min_samples=2)
+    for _ in range(2):
+        await router._timed("slow", lambda p: p.generate_response("s", [], "m"))
+        await router._timed("fast", lambda p: p.generate_response("s", [], "m"))
+
+    assert router.ranked_providers() == ["fast", "slow"]
+    assert await _chat(router) == "fast reply"
+
+
+@pytest.mark.anyio
+async def test_router_fails_over_on_error():
+    """An erroring provider is skipped and the next provider answers."""
+    broken, backup = FakeProvider("broken", fail=True), FakeProvider("backup")
+    router = RoutingProvider({"broken": broken, "backup": backup})
+    assert await _chat(router) == "backup reply"
+    assert router.stats["broken"].error_rate == 1.0
+
+
+@pytest.mark.anyio
+async def test_router_demotes_unhealthy_provider():
+    """A provider above the error-rate threshold is tried after healthy ones."""
+    broken, backup = FakeProvider("broken", fail=True), FakeProvider("backup")
+    router = RoutingProvider({"broken": broken, "backup": backup}, max_error_rate=0.5)
+    await _chat(router)
+    assert router.ranked_providers() == ["backup", "broken"]
+    await _chat(router)
+    assert broken.calls == 1
+
+
+@pytest.mark.anyio
+async def test_router_raises_when_all_providers_fail():
+    """The last provider error propagates when nobody can answer."""
+    router = RoutingProvider({
+        "a": FakeProvider("a", fail=True),
+        "b": FakeProvider("b", fail=True),
+    })
+    with pytest.raises(RuntimeError):
+        await _chat(router)
+
+
+@pytest.mark.anyio
+async def test_hedged_request_fires_after_p95_and_first_answer_wins():
+    """When the primary exceeds its p95 budget, the backup is raced and the loser cancelled."""
+    primary, backup = FakeProvider("primary", latency=0.0), FakeProvider("backup", latency=0.01)
+    router = RoutingProvider({"primary": primary, "backup": backup}, min_samples=3, hedge=True)
+    for _ in range(3):
+        await router._timed("primary", lambda p: p.generate_response("s", [], "m"))
+        await router._timed("backup", lambda p: p.generate_response("s", [], "m"))
+    backup.calls = 0
+
+    # Primary now stalls far beyond its recorded p95
+    primary.latency = 0.5
+    result = await _chat(router)
+
+    await asyncio.sleep(0)  # let the cancelled loser unwind
+    assert result == "backup reply"
+    assert backup.calls == 1
+    assert primary.cancelled == 1
+
+
+@pytest.mark.anyio
+async def test_hedged_primary_records_censored_latency():
+    """A primary cancelled by a winning hedge still counts, at least the hedge delay, in its latencies."""
+    primary, backup = FakeProvider("primary", latency=0.0), FakeProvider("backup", latency=0.01)
+    router = RoutingProvider({"primary": primary, "backup": backup}, min_samples=3, hedge=True)
+    for _ in range(3):
+        await router._timed("primary", lambda p: p.generate_response("s", [], "m"))
+        await router._timed("backup", lambda p: p.generate_response("s", [], "m"))
+    delay = router._hedge_delay("primary")
+
+    primary.latency = 0.5
+    assert await _chat(router) == "backup reply"
+    await asyncio.sleep(0)  # let the cancelled loser unwind
+
+    stats = router.stats["primary"]
+    assert len(stats.latencies) == 4
+    assert stats.p95 >= delay
+    assert stats.latencies[-1] >= delay
+    assert list(stats.outcomes) == [True] * 3  # neither a success nor a failure
+
+
+@pytest.mark.anyio
+async def test_no_hedge_when_primary_is_within_budget():
+    """A primary that answers within its p95 does not trigger a second request."""
+    primary, backup = FakeProvider("primary", latency=0.01), FakeProvider("backup", latency=0.03)
+    router = RoutingProvider({"primary": primary, "backup": backup}, min_samples=3, hedge=True)
+    for _ in range(3):
+        await router._timed("primary", lambda p: p.generate_response("s", [], "m"))
+        await router._timed("backup", lambda p: p.generate_response("s", [], "m"))
+    backup.calls = 0
+    primary.latency = 0.0
+
+    assert await _chat(router) == "primary reply"
+    assert backup.calls == 0
+
+
+@pytest.mark.anyio
+async def test_structured_output_is_routed():
+    """generate_structured_output() goes through the same routing logic."""
+    broken, backup = FakeProvider("broken", fail=True), FakeProvider("backup")
+    router = RoutingProvider({"broken": broken, "backup": backup})
+    result = await router.generate_structured_output(system_prompt="sys", user_content="t")
+    assert result == "backup reply"
@@ -0,0 +1,52 @@
+from unittest.mock import patch
+from app.services.llm import tokens
+
+
+def test_count_tokens_empty_text():
+    """Empty text has no tokens"""
+    assert tokens.count_tokens("") == 0
+
+
+def test_count_tokens_falls_back_to_estimate():
+    """Without a tiktoken encoding, counts use a ~4 characters-per-token estimate"""
+    with patch.object(tokens, "_get_encoding", return_value=None):
+        assert tokens.count_tokens("a" * 40) == 10
+        assert tokens.is_exact() is False
+
+
+def test_count_chat_tokens_includes_message_overhead():
+    """Chat totals add per-message framing for the system prompt, history and user message"""
+    with patch.object(tokens, "_get_encoding", return_value=None):
+        history = [{"role": "assistant", "content": "a" * 8}]
+        total = tokens.count_chat_tokens("a" * 8, history, "a" * 8)
+    assert total == 3 * (2 + tokens.TOKENS_PER_MESSAGE)
+
+
+def test_trim_history_keeps_history_within_budget():
+    """History that already fits the budget is returned unchanged"""
+    history = [{"role": "user", "content": "hello"}]
+    assert tokens.trim_history_to_budget("system", history, "hi", 1000) == history
+
+
+def test_trim_history_drops_oldest_and_starts_on_question():
+    """Oldest messages are dropped first and the kept window starts on an assistant message"""
+    with patch.object(tokens, "_get_encoding", return_value=None):
+        history = [
+            {"role": "assistant", "content": "q" * 400},
+            {"role": "user", "content": "a" * 400},
+            {"role": "assistant", "content": "q" * 40},
+            {"role": "user", "content": "a" * 40},
+        ]
+        trimmed = tokens.trim_history_to_budget("s" * 40, history, "m" * 40, 100)
+    assert trimmed == history[2:]
+
+
+def test_trim_transcript_keeps_opening_and_recent_lines():
+    """Over-budget transcripts keep the first line and the most recent lines"""
+    with patch.object(tokens, "_get_encoding", return_value=None):
+        lines = ["AI: greeting"] + [f"PATIENT: line {i} " + "x" * 40 for i in range(20)]
+        trimmed = tokens.trim_transcript("\n".join(lines), 80).splitlines()
+    assert trimmed[0] == "AI: greeting"
+    assert "earlier lines omitted" in trimmed[1]
+    assert trimmed[-1] == lines[-1]
+    assert len(trimmed) < len(lines)
@@ -0,0 +1,61 @@
+import time
+from types import SimpleNamespace
+from app.services.llm.usage import UsageLedger, get_ledger, record_llm_response, usage_scope
+
+
+def test_record_attributes_usage_to_scope():
+    """Calls inside usage_scope() are recorded against that encounter and endpoint"""
+    ledger = UsageLedger()
+    with usage_scope(encounter_id="enc-1", endpoint="triage.chat"):
+        ledger.record(prompt_tokens=100, completion_tokens=20, latency=0.5)
+        ledger.record(prompt_tokens=120, completion_tokens=10, latency=1.5, cached_prompt_tokens=64)
+    ledger.record(prompt_tokens=5, completion_tokens=5, latency=0.1)
+
+    totals = ledger.encounter_totals("enc-1")
+    assert totals.calls == 2
+    assert totals.total_tokens == 250
+    assert totals.cached_prompt_tokens == 64
+
+    endpoints = ledger.endpoint_snapshot()
+    assert endpoints["triage.chat"]["prompt_tokens"] == 220
+    assert endpoints["triage.chat"]["latency_p95_ms"] == 1500.0
+    assert endpoints["unscoped"]["calls"] == 1
+
+
+def test_unknown_encounter_has_zero_usage():
+    """Encounters without recorded calls report empty totals"""
+    assert UsageLedger().encounter_totals("missing").total_tokens == 0
+
+
+def test_encounter_totals_are_bounded():
+    """Per-encounter totals are evicted least-recently-used"""
+    ledger = UsageLedger(max_encounters=2)
+    for encounter_id in ("a", "b", "c"):
+        with usage_scope(encounter_id=encounter_id):
+            ledger.record(prompt_tokens=1, completion_tokens=1, latency=0.1)
+    assert ledger.encounter_totals("a").calls == 0
+    assert ledger.encounter_totals("c").calls == 1
+
+
+def test_record_llm_response_uses_provider_usage():
+    """Provider-reported usage_metadata is recorded as actual usage"""
+    response = SimpleNamespace(
+        content="Next question?",
+        usage_metadata={"input_tokens": 300, "output_tokens": 12, "input_token_details": {"cache_read": 256}},
+    )
+    with usage_scope(encounter_id="enc-2", endpoint="triage.chat"):
+        record_llm_response(response, [], time.perf_counter())
+    totals = get_ledger().encounter_totals("enc-2")
+    assert (totals.prompt_tokens, totals.completion_tokens, totals.cached_prompt_tokens) == (300, 12, 256)
+    assert totals.estimated_calls == 0
+
+
+def test_record_llm_response_estimates_missing_usage():
+    """Without usage_metadata the call is recorded with an estimate and flagged"""
+    response = SimpleNamespace(content="Next question?", usage_metadata=None)
+    messages = [SimpleNamespace(content="You are a triage assistant.")]
+    with usage_scope(encounter_id="enc-3"):
+        record_llm_response(response, messages, time.perf_counter())
+    totals = get_ledger().encounter_totals("enc-3")
+    assert totals.prompt_tokens > 0
+    assert totals.estimated_calls == 1
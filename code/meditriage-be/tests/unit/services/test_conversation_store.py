@@ -0,0 +1,43 @@
+import uuid
+from app.models.clinical import SenderType
+from app.services.conversation_store import ConversationState, ConversationStore
+
+
+def test_state_append_maps_roles_and_transcript():
+    """Appended turns are mapped to provider roles and transcript lines"""
+    state = ConversationState()
+    state.append(SenderType.AI, "Hello")
+    state.append(SenderType.NURSE, "Patient looks pale")
+    assert state.history == [
+        {"role": "assistant", "content": "Hello"},
+        {"role": "user", "content": "Patient looks pale"},
+    ]
+    assert state.transcript == "AI: Hello\nNURSE: Patient looks pale"
+
+
+def test_append_ignores_uncached_encounters():
+    """Appending to an encounter that is not cached does not create a partial state"""
+    store = ConversationStore()
+    encounter_id = uuid.uuid4()
+    store.append(encounter_id, SenderType.PATIENT, "hello")
+    assert store.get(encounter_id) is None
+
+
+def test_store_is_bounded_lru():
+    """The least recently used state is evicted when the store is full"""
+    store = ConversationStore(max_encounters=2)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    store.put(a, ConversationState())
+    store.put(b, ConversationState())
+    store.get(a)
+    store.put(c, ConversationState())
+    assert store.get(b) is None
+    assert store.get(a) is not None
+
+
+def test_zero_size_disables_caching():
+    """With max_encounters=0 nothing is kept in memory"""
+    store = ConversationStore(max_encounters=0)
+    encounter_id = uuid.uuid4()
+    store.put(encounter_id, ConversationState())
+    assert store.get(encounter_id) is None
@@ -0,0 +1,143 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+from app.models.patient import Patient, PatientBlockingKey
+from app.schemas.patient import PatientCreate, PatientUpdate
+from app.services import patient_service
+from app.services.duplicate_detection import (
+    PatientIdentity,
+    find_candidates,
+    jaro_winkler,
+    match_score,
+    normalize_nic,
+    phonetic_key,
+    refresh_blocking_keys,
+    save_scan,
+    scan_duplicates,
+    start_scan,
+    stored_duplicates,
+)
+
+
+def register(db_session, nic, first, last, dob=date(1985, 3, 14)):
+    return patient_service.create_patient(
+        PatientCreate(national_id=nic, first_name=first, last_name=last, date_of_birth=dob), db_session
+    )
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Wijesinghe", "Vijesinhe"),
+    ("Fernando", "Pernando"),
+    ("Sivakumar", "Shivakumar"),
+    ("Kumaraswamy", "Kumarasamy"),
+    ("Nishantha", "Nishanta"),
+    ("Mohamed", "Muhammad"),
+])
+def test_phonetic_key_folds_transliteration_variants(a, b):
+    assert phonetic_key(a) == phonetic_key(b)
+
+
+def test_phonetic_key_separates_different_names():
+    assert phonetic_key("Perera") != phonetic_key("Silva")
+    assert phonetic_key("") == ""
+
+
+def test_old_and_new_nic_formats_normalize_equal():
+    """Old YYDDDSSSCV maps to new 19YYDDD0SSSC."""
+    assert normalize_nic("853740123V") == "198537400123"
+    assert normalize_nic("1985 3740 0123") == "198537400123"
+
+
+def test_match_score_ranks_typos_above_namesakes():
+    original = PatientIdentity("198537400123", "Nimal", "Wijesinghe", date(1985, 3, 14))
+    typo = PatientIdentity("198537400132", "Nimal", "Vijesinhe", date(1985, 3, 14))
+    namesake = PatientIdentity("199001200456", "Nimal", "Wijesinghe", date(1990, 1, 12))
+
+    assert match_score(original, original) == 1.0
+    assert match_score(original, typo) >= 0.85
+    assert match_score(original, namesake) < 0.85
+    assert jaro_winkler("martha", "marhta") == pytest.approx(0.961, abs=1e-3)
+
+
+def test_blocking_keys_stored_and_refreshed(db_session):
+    patient = register(db_session, "198537400123", "Nimal", "Perera")
+    keys = {row.key for row in db_session.query(PatientBlockingKey).filter_by(patient_id=patient.id)}
+    assert "nic:198537400123" in keys
+    assert f"dob:1985-03-14:{phonetic_key('Nimal')}" in keys
+
+    patient_service.update_patient(patient.id, PatientUpdate(last_name="Silva"), db_session)
+    keys = {row.key for row in db_session.query(PatientBlockingKey).filter_by(patient_id=patient.id)}
+    assert f"dob:1985-03-14:{phonetic_key('Silva')}" in keys
+    assert f"dob:1985-03-14:{phonetic_key('Perera')}" not in keys
+
+    patient_service.soft_delete_patient(patient.id, db_session)
+    assert db_session.query(PatientBlockingKey).count() == 0
+
+
+def test_registration_check_finds_typo_and_format_variants(db_session):
+    """A mistyped NIC with a transliterated name, and the old NIC format, are both flagged."""
+    existing = register(db_session, "198537400123", "Nimal", "Wijesinghe")
+    register(db_session, "199912300001", "Kamal", "Perera", date(1999, 5, 2))
+
+    typo = PatientCreate(
+        national_id="198537400132", first_name="Nimal", last_name="Vijesinhe", date_of_birth=date(1985, 3, 14)
+    )
+    candidates = patient_service.check_duplicates(typo, db_session)
+    assert [c.patient.id for c in candidates] == [existing.id]
+
+    old_format = PatientIdentity("853740123V", "Nimal", "Wijesinghe", date(1985, 3, 14))
+    assert find_candidates(old_format, db_session)[0].score == 1.0
+
+    assert patient_service.get_patient_duplicates(existing.id, db_session) == []
+
+
+def test_scan_finds_existing_duplicate_pairs(db_session):
+    a = register(db_session, "198537400123", "Nimal", "Wijesinghe")
+    b = register(db_session, "198537400132", "Nimal", "Vijesinhe")
+    register(db_session, "199912300001", "Kamal", "Perera", date(1999, 5, 2))
+
+    pairs = scan_duplicates(db_session, workers=1)
+    assert len(pairs) == 1
+    assert {pairs[0].patient_id, pairs[0].other_patient_id} == {a.id, b.id}
+
+
+def test_scan_result_is_stored_and_replaced(db_session):
+    a = register(db_session, "198537400123", "Nimal", "Wijesinghe")
+    b = register(db_session, "198537400132", "Nimal", "Vijesinhe")
+    assert stored_duplicates(db_session) == []
+
+    save_scan(db_session, scan_duplicates(db_session, workers=1))
+    stored = stored_duplicates(db_session)
+    assert [(pair.patient_id, pair.other_patient_id) for pair in stored] in ([(a.id, b.id)], [(b.id, a.id)])
+
+    save_scan(db_session, [])
+    assert stored_duplicates(db_session) == []
+
+
+def test_start_scan_runs_one_script_at_a_time():
+    with patch("app.services.duplicate_detection.subprocess.Popen") as popen, \
+            patch("app.services.duplicate_detection._scan_process", None):
+        popen.return_value.poll.return_value = None  # still running
+        assert start_scan() is True
+        assert start_scan() is False
+        popen.return_value.poll.return_value = 0  # finished
+        assert start_scan() is True
+    assert popen.call_count == 2
+    assert popen.call_args.args[0][1].endswith("scripts/scan_duplicates.py")
+
+
+def test_scan_skips_oversized_blocks(db_session):
+    db_session.add_all([
+        Patient(national_id=f"19853740{i:04d}", first_name="Nimal", last_name="Perera", date_of_birth=date(1985, 3, 14))
+        for i in range(3)
+    ])
+    db_session.flush()
+    for patient in db_session.query(Patient).all():
+        refresh_blocking_keys(patient)
+    db_session.commit()
+
+    assert len(scan_duplicates(db_session, workers=1)) == 3
+    # Same result when the pairs are scored in worker processes
+    assert sorted(scan_duplicates(db_session, workers=2, chunk_size=1)) == sorted(scan_duplicates(db_session, workers=1))
+    assert scan_duplicates(db_session, workers=1, max_block_size=2) == []
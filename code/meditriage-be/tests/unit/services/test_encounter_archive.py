@@ -0,0 +1,100 @@
+import pytest
+from datetime import date, datetime, timedelta
+from fastapi import HTTPException
+
+from app.models.clinical import (
+    ArchivedEncounter, ClinicalNote, EncounterStatus, MedicalEncounter, SenderType, TriageInteraction,
+)
+from app.models.consultation import ConsultationRoom
+from app.models.patient import Patient
+from app.models.user import User, UserRole
+from app.schemas.clinical import ClinicalNoteUpdate
+from app.services import encounter_service, patient_service
+from app.services.encounter_archive import archive_completed_encounters
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+@pytest.fixture
+def people(db_session):
+    patient = Patient(national_id="199012345678", first_name="John", last_name="Doe", date_of_birth=date(1990, 1, 1))
+    nurse = User(role=UserRole.NURSE, full_name="Nurse Silva")
+    doctor = User(role=UserRole.DOCTOR, full_name="Dr. Perera")
+    db_session.add_all([patient, nurse, doctor])
+    db_session.commit()
+    return patient, nurse, doctor
+
+
+def make_visit(db_session, people, days_ago, status=EncounterStatus.COMPLETED, complaint="Headache"):
+    patient, nurse, doctor = people
+    at = NOW - timedelta(days=days_ago)
+    encounter = MedicalEncounter(
+        patient_id=patient.id, nurse_id=nurse.id, doctor_id=doctor.id, status=status,
+        chief_complaint=complaint, encounter_timestamp=at, created_at=at, updated_at=at,
+    )
+    db_session.add(encounter)
+    db_session.flush()
+    db_session.add_all([
+        TriageInteraction(encounter_id=encounter.id, sender_type=SenderType.AI,
+                          message_content="What brings you in?", timestamp=at),
+        TriageInteraction(encounter_id=encounter.id, sender_type=SenderType.PATIENT,
+                          message_content=f"{complaint} since yesterday", timestamp=at + timedelta(minutes=1)),
+        ClinicalNote(encounter_id=encounter.id, subjective=complaint, plan="Rest", is_finalized=True,
+                     version=3, created_at=at, updated_at=at),
+    ])
+    db_session.commit()
+    return encounter
+
+
+def test_archive_moves_only_old_completed_encounters(db_session, people):
+    old = make_visit(db_session, people, days_ago=120)
+    recent = make_visit(db_session, people, days_ago=10)
+    open_old = make_visit(db_session, people, days_ago=120, status=EncounterStatus.AWAITING_REVIEW)
+    discussed = make_visit(db_session, people, days_ago=120)
+    db_session.add(ConsultationRoom(encounter_id=discussed.id, created_by_id=people[2].id, title="MDT"))
+    db_session.commit()
+    old_id = old.id
+
+    assert archive_completed_encounters(db_session, older_than_days=90, batch_size=1, now=NOW) == 1
+
+    assert db_session.query(ArchivedEncounter.id).scalar() == old_id
+    hot_ids = {row.id for row in db_session.query(MedicalEncounter.id)}
+    assert hot_ids == {recent.id, open_old.id, discussed.id}
+    assert db_session.query(TriageInteraction).filter_by(encounter_id=old_id).count() == 0
+    assert db_session.query(ClinicalNote).filter_by(encounter_id=old_id).count() == 0
+    # Nothing left to do on a second run
+    assert archive_completed_encounters(db_session, older_than_days=90, now=NOW) == 0
+
+
+def test_archived_encounter_reads_fall_back_transparently(db_session, people):
+    old_id = make_visit(db_session, people, days_ago=120, complaint="Cough").id
+    archive_completed_encounters(db_session, older_than_days=90, now=NOW)
+
+    note = encounter_service.get_clinical_note(old_id, db_session)
+    assert (note.subjective, note.plan, note.version, note.is_finalized) == ("Cough", "Rest", 3, True)
+
+    encounter, interactions = encounter_service.get_encounter_with_messages(old_id, db_session)
+    assert encounter.chief_complaint == "Cough"
+    assert [i.sender_type for i in interactions] == [SenderType.AI, SenderType.PATIENT]
+    assert interactions[1].message_content == "Cough since yesterday"
+
+    with pytest.raises(HTTPException) as exc:
+        encounter_service.update_clinical_note(old_id, ClinicalNoteUpdate(plan="Changed"), people[2], db_session)
+    assert exc.value.status_code == 409
+
+
+def test_history_merges_hot_and_archived_in_one_query(db_session, people, query_budget):
+    visits = [make_visit(db_session, people, days_ago=days) for days in (200, 150, 100, 5, 1)]
+    archive_completed_encounters(db_session, older_than_days=90, now=NOW)
+    assert db_session.query(ArchivedEncounter).count() == 3
+    patient_id = people[0].id
+
+    with query_budget(1):
+        first = patient_service.get_encounter_history_page(patient_id, db_session, limit=2)
+    second = patient_service.get_encounter_history_page(patient_id, db_session, limit=2, cursor=first.next_cursor)
+    third = patient_service.get_encounter_history_page(patient_id, db_session, limit=2, cursor=second.next_cursor)
+
+    pages = [first, second, third]
+    assert [s.id for page in pages for s in page.encounters] == [v.id for v in reversed(visits)]
+    assert third.next_cursor is None
+    assert second.encounters[1].doctor_name == "Dr. Perera"
@@ -0,0 +1,131 @@
+import pytest
+from datetime import date, datetime, timedelta
+
+from app.models.clinical import ClinicalNote, EncounterQueueEntry, EncounterStatus
+from app.models.patient import Patient
+from app.models.user import User, UserRole
+from app.schemas.clinical import ClinicalNoteUpdate, EncounterUpdateRequest
+from app.schemas.patient import PatientUpdate
+from app.schemas.user import UserProfileUpdate
+from app.services import encounter_queue, encounter_service, patient_service, user_service
+
+
+@pytest.fixture
+def people(db_session):
+    patient = Patient(national_id="199012345678", first_name="John", last_name="Doe", date_of_birth=date(1990, 1, 1))
+    nurse = User(role=UserRole.NURSE, full_name="Nurse Silva")
+    doctor = User(role=UserRole.DOCTOR, full_name="Dr. Perera")
+    db_session.add_all([patient, nurse, doctor])
+    db_session.commit()
+    return patient, nurse, doctor
+
+
+def entry(db_session, encounter_id):
+    db_session.expire_all()
+    return db_session.get(EncounterQueueEntry, encounter_id)
+
+
+def test_created_encounter_joins_queue_with_patient_name(db_session, people):
+    patient, nurse, _ = people
+    encounter = encounter_service.create_encounter(patient.id, nurse.id, "Chest pain", db_session)
+
+    queued = entry(db_session, encounter.id)
+    assert queued.patient_name == "John Doe"
+    assert queued.status == EncounterStatus.TRIAGE_IN_PROGRESS
+    assert queued.doctor_name is None
+    assert queued.last_activity_at == encounter.encounter_timestamp
+    assert not queued.note_ready
+
+
+def test_updates_are_copied_to_the_queue_entry(db_session, people):
+    patient, nurse, doctor = people
+    encounter = encounter_service.create_encounter(patient.id, nurse.id, "Chest pain", db_session)
+
+    encounter_service.update_encounter(encounter.id, EncounterUpdateRequest(
+        is_urgent=True, doctor_id=doctor.id, status=EncounterStatus.AWAITING_REVIEW,
+    ), db_session)
+
+    queued = entry(db_session, encounter.id)
+    assert (queued.is_urgent, queued.doctor_name, queued.status) == (True, "Dr. Perera", EncounterStatus.AWAITING_REVIEW)
+
+
+def test_list_queue_orders_urgent_then_oldest_in_one_query(db_session, people, query_budget):
+    patient, nurse, _ = people
+    first = encounter_service.create_encounter(patient.id, nurse.id, "Cough", db_session)
+    second = encounter_service.create_encounter(patient.id, nurse.id, "Fever", db_session)
+    urgent = encounter_service.create_encounter(patient.id, nurse.id, "Chest pain", db_session)
+    encounter_service.update_encounter_urgency(urgent.id, True, db_session)
+    ids = [urgent.id, first.id, second.id]
+    db_session.expunge_all()
+
+    with query_budget(1):
+        queue = encounter_queue.list_queue(db_session)
+    assert [row.encounter_id for row in queue] == ids
+
+
+def test_finalized_encounter_stays_for_the_completed_window(db_session, people):
+    patient, nurse, doctor = people
+    encounter = encounter_service.create_encounter(patient.id, nurse.id, "Cough", db_session)
+    db_session.add(ClinicalNote(encounter_id=encounter.id, subjective="Cough"))
+    db_session.commit()
+
+    encounter_service.update_clinical_note(encounter.id, ClinicalNoteUpdate(is_finalized=True), doctor, db_session)
+
+    queued = entry(db_session, encounter.id)
+    assert queued.status == EncounterStatus.COMPLETED
+    assert queued.completed_at is not None
+    assert len(encounter_queue.list_queue(db_session)) == 1
+    later = queued.completed_at + timedelta(hours=25)
+    assert encounter_queue.list_queue(db_session, now=later) == []
+    assert encounter_queue.prune(db_session, completed_before=later - timedelta(hours=24)) == 1
+
+
+def test_cancelled_encounter_leaves_queue(db_session, people):
+    patient, nurse, _ = people
+    encounter = encounter_service.create_encounter(patient.id, nurse.id, "Cough", db_session)
+
+    encounter_service.delete_encounter(encounter.id, db_session)
+
+    assert entry(db_session, encounter.id) is None
+
+
+def test_renames_reach_queue_entries(db_session, people):
+    patient, nurse, doctor = people
+    encounter = encounter_service.create_encounter(patient.id, nurse.id, "Cough", db_session)
+    encounter_service.update_encounter(encounter.id, EncounterUpdateRequest(doctor_id=doctor.id), db_session)
+
+    patient_service.update_patient(patient.id, PatientUpdate(last_name="Silva"), db_session)
+    user_service.update_user_profile(doctor.id, UserProfileUpdate(full_name="Dr. Fernando"), db_session)
+
+    queued = entry(db_session, encounter.id)
+    assert (queued.patient_name, queued.doctor_name) == ("John Silva", "Dr. Fernando")
+
+
+def test_touch_records_triage_activity(db_session, people):
+    patient, nurse, _ = people
+    encounter = encounter_service.create_encounter(patient.id, nurse.id, "Cough", db_session)
+    at = datetime.utcnow() + timedelta(minutes=5)
+
+    encounter_queue.touch(db_session, encounter.id, note_ready=True, at=at)
+    db_session.commit()
+
+    queued = entry(db_session, encounter.id)
+    assert (queued.last_activity_at, queued.note_ready) == (at, True)
+
+
+def test_listeners_see_committed_changes_only(db_session, people):
+    patient, nurse, _ = people
+    received = []
+    unsubscribe = encounter_queue.subscribe(received.append)
+    try:
+        encounter = encounter_service.create_encounter(patient.id, nurse.id, "Cough", db_session)
+        encounter_queue.touch(db_session, encounter.id)
+        db_session.rollback()
+        encounter_service.update_encounter_urgency(encounter.id, True, db_session)
+    finally:
+        unsubscribe()
+
+    assert received == [
+        [encounter_queue.QueueChange(encounter_queue.ADDED, encounter.id)],
+        [encounter_queue.QueueChange(encounter_queue.UPDATED, encounter.id)],
+    ]
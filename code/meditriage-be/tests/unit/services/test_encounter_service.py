@@ -10,9 +10,9 @@ from app.models.clinical import (
     EncounterStatus, SenderType
 )
 from app.schemas.clinical import EncounterUpdateRequest, ClinicalNoteUpdate
+from app.services import encounter_queue
 from app.services.encounter_service import (
     create_encounter,
-    get_active_encounters,
     get_encounter_with_messages,
     update_encounter,
     delete_encounter,
@@ -59,6 +59,7 @@ def make_encounter(db, patient, nurse, status=EncounterStatus.TRIAGE_IN_PROGRESS
     )
     db.add(enc)
     db.flush()
+    encounter_queue.add(db, enc)
     return enc
 
 
@@ -118,11 +119,11 @@ def test_create_encounter_stores_chief_complaint(db_session):
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# get_active_encounters
+# Dashboard queue (encounter_queue.list_queue)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def test_get_active_encounters_includes_correct_statuses(db_session):
-    """Returns encounters with active statuses (TRIAGE_IN_PROGRESS, AWAITING_REVIEW, COMPLETED)."""
+def test_queue_includes_correct_statuses(db_session):
+    """Returns encounters with active statuses (TRIAGE_IN_PROGRESS, AWAITING_REVIEW, recent COMPLETED)."""
     patient = make_patient(db_session)
     nurse = make_user(db_session)
     db_session.commit()
@@ -131,14 +132,47 @@ def test_get_active_encounters_includes_correct_statuses(db_session):
     enc2 = make_encounter(db_session, patient, nurse, status=EncounterStatus.AWAITING_REVIEW)
     db_session.commit()
 
-    results = get_active_encounters(db_session)
-    result_ids = [r.id for r in results]
+    results = encounter_queue.list_queue(db_session)
+    result_ids = [r.encounter_id for r in results]
 
     assert enc1.id in result_ids
     assert enc2.id in result_ids
 
 
-def test_get_active_encounters_excludes_soft_deleted(db_session):
+def test_queue_drops_completed_after_window(db_session):
+    """COMPLETED encounters stay on the dashboard for QUEUE_COMPLETED_WINDOW_HOURS, then leave it."""
+    patient = make_patient(db_session)
+    nurse = make_user(db_session)
+    db_session.commit()
+
+    recent = make_encounter(db_session, patient, nurse, status=EncounterStatus.COMPLETED)
+    old = make_encounter(db_session, patient, nurse, status=EncounterStatus.COMPLETED)
+    old.updated_at = datetime.utcnow() - timedelta(days=2)
+    encounter_queue.sync(db_session, old)
+    db_session.commit()
+
+    result_ids = [r.encounter_id for r in encounter_queue.list_queue(db_session)]
+
+    assert recent.id in result_ids
+    assert old.id not in result_ids
+
+
+def test_queue_loads_queue_in_one_query(db_session, query_budget):
+    """Patient and doctor names for the whole queue come from a single query (no N+1)."""
+    nurse = make_user(db_session)
+    doctor = make_user(db_session, role=UserRole.DOCTOR, full_name="Dr. House")
+    for i in range(3):
+        make_encounter(db_session, make_patient(db_session, national_id=f"19901234567{i}"), nurse, doctor=doctor)
+    db_session.commit()
+    db_session.expunge_all()
+
+    with query_budget(1):
+        results = encounter_queue.list_queue(db_session)
+        names = [(r.patient_name, r.doctor_name) for r in results]
+    assert names == [("John Doe", "Dr. House")] * 3
+
+
+def test_queue_excludes_soft_deleted(db_session):
     """Soft-deleted encounters are excluded."""
     patient = make_patient(db_session)
     nurse = make_user(db_session)
@@ -149,14 +183,14 @@ def test_get_active_encounters_excludes_soft_deleted(db_session):
                              deleted_at=datetime.utcnow())
     db_session.commit()
 
-    results = get_active_encounters(db_session)
-    result_ids = [r.id for r in results]
+    results = encounter_queue.list_queue(db_session)
+    result_ids = [r.encounter_id for r in results]
 
     assert active.id in result_ids
     assert deleted.id not in result_ids
 
 
-def test_get_active_encounters_urgent_first(db_session):
+def test_queue_urgent_first(db_session):
     """Urgent encounters appear before non-urgent ones."""
     patient = make_patient(db_session)
     nurse = make_user(db_session)
@@ -169,13 +203,13 @@ def test_get_active_encounters_urgent_first(db_session):
                             encounter_timestamp=now)
     db_session.commit()
 
-    results = get_active_encounters(db_session)
-    result_ids = [r.id for r in results]
+    results = encounter_queue.list_queue(db_session)
+    result_ids = [r.encounter_id for r in results]
 
     assert result_ids.index(urgent.id) < result_ids.index(non_urgent.id)
 
 
-def test_get_active_encounters_oldest_first_within_group(db_session):
+def test_queue_oldest_first_within_group(db_session):
     """Within urgency group, ordered oldest arrival first."""
     patient = make_patient(db_session)
     nurse = make_user(db_session)
@@ -188,8 +222,8 @@ def test_get_active_encounters_oldest_first_within_group(db_session):
                            encounter_timestamp=now)
     db_session.commit()
 
-    results = get_active_encounters(db_session)
-    result_ids = [r.id for r in results]
+    results = encounter_queue.list_queue(db_session)
+    result_ids = [r.encounter_id for r in results]
 
     assert result_ids.index(older.id) < result_ids.index(newer.id)
 
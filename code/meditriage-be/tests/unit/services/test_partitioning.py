@@ -0,0 +1,45 @@
+import pytest
+from datetime import date
+
+from app.services.partitioning import (
+    Partition,
+    _copy_out,
+    add_months,
+    archive_partitions,
+    create_partition_sql,
+    ensure_partitions,
+    is_partitioned,
+    months_between,
+    partition_name,
+)
+
+
+def test_month_arithmetic_crosses_years():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert months_between(date(2026, 11, 17), date(2027, 1, 1)) == [
+        date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1),
+    ]
+
+
+def test_partition_ddl_covers_one_month():
+    assert partition_name("triage_interactions", date(2026, 12, 1)) == "triage_interactions_2026_12"
+    assert create_partition_sql("consultation_messages", date(2026, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS consultation_messages_2026_12 PARTITION OF consultation_messages "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+
+
+def test_maintenance_is_a_no_op_without_postgres_partitions(db_session, tmp_path):
+    assert not is_partitioned(db_session, "triage_interactions")
+    assert ensure_partitions(db_session, months_ahead=3) == []
+    assert archive_partitions(db_session, retention_months=24, archive_dir=tmp_path) == []
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(ValueError):
+        archive_partitions(db_session, retention_months=0, archive_dir=tmp_path)
+
+
+def test_archive_copy_needs_a_psycopg_driver(db_session, tmp_path):
+    partition = Partition("triage_interactions", "triage_interactions_2024_01", date(2024, 1, 1))
+    with pytest.raises(RuntimeError, match="psycopg"):
+        _copy_out(db_session, partition, tmp_path / "out.csv.gz")
@@ -0,0 +1,61 @@
+import io
+import pytest
+from datetime import date
+
+from app.models.patient import Patient, PatientBlockingKey, Gender
+from app.services import patient_lookup
+from app.services.patient_import import detect_format, import_patients
+
+CSV_HEADER = "national_id,first_name,last_name,date_of_birth,gender,contact_number\n"
+
+
+def test_csv_import_loads_valid_rows_and_reports_the_rest(db_session):
+    """Invalid rows, NICs repeated in the file and NICs already registered are reported by line."""
+    db_session.add(Patient(national_id="198501010001", first_name="Old", last_name="Record", date_of_birth=date(1985, 1, 1)))
+    db_session.commit()
+    csv_text = CSV_HEADER + (
+        "199001010001,Nimal,Perera,1990-01-01,MALE,+94771234567\n"   # line 2
+        "199001010002,Kumari,Silva,1990-02-02,,\n"                   # line 3
+        "123,Too,Short,1990-01-01,,\n"                               # line 4: invalid NIC
+        "199001010003,Bad,Date,not-a-date,,\n"                       # line 5: invalid DOB
+        "199001010001,Nimal,Again,1990-01-01,,\n"                    # line 6: repeated in file
+        "198501010001,Old,Record,1985-01-01,,\n"                     # line 7: already registered
+    )
+
+    report = import_patients(db_session, io.StringIO(csv_text), "csv", chunk_size=2)
+
+    assert (report.total_rows, report.imported, report.failed) == (6, 2, 4)
+    assert sorted(error.line for error in report.errors) == [4, 5, 6, 7]
+    assert any("date_of_birth" in error.error for error in report.errors if error.line == 5)
+    nimal = db_session.query(Patient).filter_by(national_id="199001010001").one()
+    assert nimal.gender == Gender.MALE
+    assert db_session.query(Patient).filter_by(national_id="199001010002").one().gender is None
+    # Duplicate-detection keys are loaded with the patients
+    assert db_session.query(PatientBlockingKey).filter_by(patient_id=nimal.id).count() >= 3
+
+
+def test_ndjson_import_reports_malformed_lines(db_session):
+    ndjson = (
+        '{"national_id": "199001010001", "first_name": "Nimal", "last_name": "Perera", "date_of_birth": "1990-01-01"}\n'
+        "\n"
+        "{not json\n"
+        "[1, 2]\n"
+    )
+    report = import_patients(db_session, io.StringIO(ndjson), "ndjson")
+    assert report.imported == 1
+    assert [(error.line, error.error.split(":")[0]) for error in report.errors] == [
+        (3, "Invalid JSON"), (4, "Expected a JSON object"),
+    ]
+
+
+def test_import_rebuilds_loaded_lookup_index(db_session):
+    patient_lookup.load_from_db(db_session)
+    import_patients(db_session, io.StringIO(CSV_HEADER + "199001010001,Nimal,Perera,1990-01-01,,\n"), "csv")
+    assert [entry.national_id for entry in patient_lookup.get_lookup_index().lookup("nimal")] == ["199001010001"]
+
+
+def test_detect_format():
+    assert detect_format("register.CSV") == "csv"
+    assert detect_format("register.jsonl") == "ndjson"
+    with pytest.raises(ValueError):
+        detect_format("register.xlsx")
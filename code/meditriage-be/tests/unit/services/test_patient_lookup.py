@@ -0,0 +1,85 @@
+import uuid
+from datetime import date
+
+from app.models.patient import Patient
+from app.schemas.patient import PatientCreate, PatientUpdate
+from app.services import patient_lookup, patient_service
+from app.services.patient_lookup import LookupEntry, PatientLookupIndex
+
+
+def entry(nic, first, last):
+    return LookupEntry(uuid.uuid4(), nic, first, last, date(1990, 1, 1))
+
+
+def test_lookup_matches_prefixes_of_nic_and_name_tokens():
+    """Each query word must prefix some token; exact tokens come before longer ones."""
+    nimal = entry("199012345678", "Nimal", "Perera")
+    kamal = entry("852223334V", "Kamal", "Nimalsiri")
+    sunimal = entry("770000001V", "Sunimal", "Silva")
+    index = PatientLookupIndex()
+    index.build([kamal, nimal, sunimal])
+
+    assert index.lookup("nimal") == [nimal, kamal]
+    assert index.lookup("NIMAL per") == [nimal]
+    assert index.lookup("8522") == [kamal]
+    assert index.lookup("852223334v") == [kamal]
+    assert index.lookup("mal") == []
+    assert index.lookup("   ") == []
+
+
+def test_lookup_result_size_is_bounded():
+    index = PatientLookupIndex()
+    index.build(entry(f"9000{i:05d}", "Saman", "Kumara") for i in range(200))
+    assert len(index.lookup("saman", limit=5)) == 5
+    assert len(index.lookup("saman", limit=10_000)) == patient_lookup.MAX_LIMIT
+
+
+def test_upsert_and_remove_keep_index_current():
+    index = PatientLookupIndex()
+    original = entry("111111111", "John", "Doe")
+    index.build([original])
+
+    renamed = original._replace(last_name="Perera")
+    index.upsert(renamed)
+    assert index.lookup("doe") == []
+    assert index.lookup("perera") == [renamed]
+    assert len(index) == 1
+
+    index.remove(original.id)
+    assert index.lookup("john") == []
+    assert len(index) == 0
+
+
+def test_changes_during_build_are_replayed():
+    """A patient saved while the build streams rows is not lost when the new arrays are swapped in."""
+    index = PatientLookupIndex()
+    added = entry("222222222", "Jane", "Smith")
+
+    def rows():
+        yield entry("111111111", "John", "Doe")
+        index.upsert(added)  # e.g. create_patient on another request
+
+    index.build(rows())
+    assert index.lookup("jane") == [added]
+    assert index.lookup("john")
+
+
+def test_patient_service_keeps_loaded_index_current(db_session):
+    """create/update/delete go through to the index once it is loaded from the database."""
+    db_session.add(Patient(national_id="333333333", first_name="Amal", last_name="Fernando", date_of_birth=date(1980, 5, 5)))
+    db_session.commit()
+    patient_lookup.load_from_db(db_session, batch_size=1)
+    index = patient_lookup.get_lookup_index()
+    assert [e.national_id for e in index.lookup("ama")] == ["333333333"]
+
+    created = patient_service.create_patient(
+        PatientCreate(national_id="444444444", first_name="Amara", last_name="Silva", date_of_birth=date(1991, 1, 1)),
+        db_session,
+    )
+    assert {e.national_id for e in index.lookup("ama")} == {"333333333", "444444444"}
+
+    patient_service.update_patient(created.id, PatientUpdate(first_name="Kumari"), db_session)
+    assert [e.first_name for e in index.lookup("kum")] == ["Kumari"]
+
+    patient_service.soft_delete_patient(created.id, db_session)
+    assert index.lookup("kum") == []
@@ -0,0 +1,112 @@
+import pytest
+from datetime import date
+from types import SimpleNamespace
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.patient import Patient
+from app.services.patient_search import FULL_NAME, _name_score, search
+
+
+def add_patients(db_session, *people):
+    patients = [
+        Patient(national_id=nic, first_name=first, last_name=last, date_of_birth=date(1990, 1, 1))
+        for nic, first, last in people
+    ]
+    db_session.add_all(patients)
+    db_session.commit()
+    return patients
+
+
+def test_name_search_matches_full_name_and_ranks_best_first(db_session):
+    """Queries spanning first and last name match; exact and prefix matches rank above substrings."""
+    add_patients(
+        db_session,
+        ("111111111", "Nimal", "Perera"),
+        ("222222222", "Kamal", "Nimalsiri"),
+        ("333333333", "Sunimal", "Silva"),
+    )
+
+    assert [p.first_name for p in search(db_session, name="nimal perera").patients] == ["Nimal"]
+    ranked = [p.first_name for p in search(db_session, name="  NIMAL ").patients]
+    assert ranked == ["Nimal", "Kamal", "Sunimal"]
+
+
+def test_name_search_pages_with_cursor(db_session):
+    """Keyset pages cover every match exactly once."""
+    add_patients(db_session, *[(f"9000000{i:02d}", f"Saman{i}", "Kumara") for i in range(7)])
+
+    seen, cursor = [], None
+    while True:
+        page = search(db_session, name="kumara", limit=3, cursor=cursor)
+        seen += [p.national_id for p in page.patients]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert sorted(seen) == sorted(f"9000000{i:02d}" for i in range(7))
+    assert len(seen) == len(set(seen))
+
+
+def test_name_search_pages_through_tied_scores(db_session):
+    """Every row sharing one score is returned once, and paging ends."""
+    add_patients(db_session, *[(f"8000000{i:02d}", "Nimal", "Perera") for i in range(5)])
+
+    pages, cursor = [], None
+    while len(pages) < 10:
+        page = search(db_session, name="nimal perera", limit=2, cursor=cursor)
+        pages.append([p.national_id for p in page.patients])
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    seen = [nic for page in pages for nic in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(seen) == sorted(f"8000000{i:02d}" for i in range(5))
+
+
+def test_postgres_name_score_is_double_precision():
+    """The score is cast to float8 so the JSON float in the cursor compares equal to it."""
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=postgresql.dialect()))
+    sql = str(select(_name_score(db, "x")).compile(dialect=postgresql.dialect()))
+    assert "CAST(word_similarity(" in sql and "AS FLOAT(53))" in sql
+
+
+def test_nic_prefix_search_orders_by_nic(db_session):
+    """A partial NIC narrows to patients whose NIC starts with it; the exact NIC comes first."""
+    add_patients(
+        db_session,
+        ("1990123456", "A", "One"),
+        ("199012345", "B", "Two"),
+        ("2000123456", "C", "Three"),
+    )
+
+    page = search(db_session, nic_prefix="19901234", limit=1)
+    assert [p.national_id for p in page.patients] == ["199012345"]
+    rest = search(db_session, nic_prefix="19901234", limit=1, cursor=page.next_cursor)
+    assert [p.national_id for p in rest.patients] == ["1990123456"]
+    assert rest.next_cursor is None
+
+
+def test_like_wildcards_in_query_are_literal(db_session):
+    add_patients(db_session, ("111111111", "John", "Doe"))
+    assert search(db_session, name="%").patients == []
+    assert search(db_session, nic_prefix="_").patients == []
+
+
+def test_nic_search_is_exact(db_session):
+    """`nic` answers "is this patient registered": a NIC that prefixes another patient's finds nobody."""
+    add_patients(db_session, ("1990123456", "A", "One"))
+    assert search(db_session, nic="199012345").patients == []
+    assert [p.first_name for p in search(db_session, nic=" 1990123456 ").patients] == ["A"]
+
+
+def test_malformed_cursor_rejected(db_session):
+    with pytest.raises(HTTPException) as exc:
+        search(db_session, name="john", cursor="not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_postgres_expression_matches_trigram_index():
+    """The name expression must compile to the indexed expression or Postgres ignores the GIN index."""
+    sql = str(select(Patient.id).where(FULL_NAME.op("%>")("x")).compile(dialect=postgresql.dialect()))
+    assert "lower(patients.first_name || ' ' || patients.last_name) %%>" in sql
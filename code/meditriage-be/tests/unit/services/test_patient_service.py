@@ -15,7 +15,8 @@ from app.services.patient_service import (
     get_patient_by_id,
     update_patient,
     soft_delete_patient,
-    get_patient_encounter_history
+    get_patient_encounter_history,
+    get_encounter_history_page,
 )
 
 
@@ -313,6 +314,55 @@ def test_get_patient_encounter_history(db_session):
     assert summary.doctor_name == "Dr. House"
 
 
+def test_get_patient_encounter_history_loads_staff_eagerly(db_session, query_budget):
+    """Nurse and doctor names are joined into the projection: one query, however many rows."""
+    p = Patient(national_id="111111111112", first_name="Jane", last_name="Doe", date_of_birth=date(1990, 1, 1))
+    nurse = User(role=UserRole.NURSE, full_name="Nurse Ratched")
+    doctor = User(role=UserRole.DOCTOR, full_name="Dr. House")
+    db_session.add_all([p, nurse, doctor])
+    db_session.commit()
+    for _ in range(3):
+        db_session.add(MedicalEncounter(
+            patient_id=p.id, nurse_id=nurse.id, doctor_id=doctor.id, status=EncounterStatus.COMPLETED
+        ))
+    db_session.commit()
+    patient_id = p.id
+    db_session.expunge_all()
+
+    with query_budget(1):
+        history = get_patient_encounter_history(patient_id, db_session)
+    assert [(h.nurse_name, h.doctor_name) for h in history] == [("Nurse Ratched", "Dr. House")] * 3
+
+
+def test_get_encounter_history_pages_with_cursor(db_session):
+    """Keyset pages walk the history newest first, ties on timestamp broken by id."""
+    p = Patient(national_id="111111111113", first_name="Chronic", last_name="Patient", date_of_birth=date(1950, 1, 1))
+    nurse = User(role=UserRole.NURSE, full_name="Nurse Ratched")
+    db_session.add_all([p, nurse])
+    db_session.commit()
+    base = datetime(2026, 1, 1, 9, 0)
+    timestamps = [base + timedelta(days=i // 2) for i in range(7)]  # pairs share a timestamp
+    for ts in timestamps:
+        db_session.add(MedicalEncounter(
+            patient_id=p.id, nurse_id=nurse.id, status=EncounterStatus.COMPLETED, encounter_timestamp=ts
+        ))
+    db_session.commit()
+
+    seen, cursor = [], None
+    while True:
+        page = get_encounter_history_page(p.id, db_session, limit=3, cursor=cursor)
+        seen += page.encounters
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert len({e.id for e in seen}) == 7
+    assert [e.encounter_timestamp for e in seen] == sorted(timestamps, reverse=True)
+
+    with pytest.raises(HTTPException) as exc:
+        get_encounter_history_page(p.id, db_session, cursor="bad")
+    assert exc.value.status_code == 400
+
+
 def test_get_patient_encounter_history_excludes_deleted(db_session):
     """Verify that soft-deleted encounters are excluded from history."""
     p = Patient(
@@ -0,0 +1,143 @@
+import random
+import pytest
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+from fastapi import HTTPException
+
+from app.models.clinical import ClinicalNote, EncounterStatus
+from app.models.patient import Patient
+from app.models.user import User, UserRole
+from app.schemas.clinical import ClinicalNoteUpdate, EncounterUpdateRequest
+from app.services import encounter_service, queue_scheduler
+from app.services.queue_scheduler import IndexedHeap, QueueScheduler
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+def row(minutes_ago, urgent=False, status=EncounterStatus.AWAITING_REVIEW, doctor_id=None, encounter_id=None):
+    return SimpleNamespace(
+        encounter_id=encounter_id or uuid4(), patient_id=uuid4(), patient_name="John Doe", nurse_id=uuid4(),
+        doctor_id=doctor_id, doctor_name=None, status=status, is_urgent=urgent, chief_complaint=None,
+        encounter_timestamp=NOW - timedelta(minutes=minutes_ago),
+    )
+
+
+@pytest.fixture
+def scheduler():
+    return QueueScheduler(urgent_sla_minutes=15, routine_sla_minutes=120, unavailable_delay_minutes=60)
+
+
+def test_indexed_heap_matches_sorted_reference():
+    rng = random.Random(3)
+    heap, reference = IndexedHeap(), {}
+    for _ in range(2000):
+        item = rng.randrange(200)
+        if rng.random() < 0.3:
+            heap.remove(item)
+            reference.pop(item, None)
+        else:
+            key = rng.random()
+            heap.push(item, key)
+            reference[item] = key
+        assert heap.peek() == (min((k, i) for i, k in reference.items()) if reference else None)
+    assert heap.ordered() == sorted((k, i) for i, k in reference.items())
+
+
+def test_urgent_first_at_equal_wait_but_routine_ages_past_it(scheduler):
+    routine, urgent = row(10), row(10, urgent=True)
+    long_waiting = row(110)  # 10 minutes from its deadline; the urgent one has 5
+    overdue = row(130)
+    for entry in (routine, urgent, long_waiting, overdue):
+        scheduler.apply(entry)
+
+    order = [entry.encounter_id for entry in scheduler.ordered()]
+    assert order == [overdue.encounter_id, urgent.encounter_id, long_waiting.encounter_id, routine.encounter_id]
+    assert scheduler.ordered(1)[0].sla_used(NOW) > 1
+
+
+def test_next_for_doctor_picks_own_or_unassigned_by_deadline(scheduler):
+    doctor, other = uuid4(), uuid4()
+    unassigned = row(30)
+    own = row(20, urgent=True, doctor_id=doctor)
+    others = row(200, doctor_id=other)
+    in_triage = row(300, status=EncounterStatus.TRIAGE_IN_PROGRESS)
+    for entry in (unassigned, own, others, in_triage):
+        scheduler.apply(entry)
+
+    assert scheduler.next_for_doctor(doctor).encounter_id == own.encounter_id
+    assert scheduler.next_for_doctor(uuid4()).encounter_id == unassigned.encounter_id
+
+    scheduler.apply(SimpleNamespace(**{**vars(own), "status": EncounterStatus.COMPLETED}))
+    assert scheduler.next_for_doctor(doctor).encounter_id == unassigned.encounter_id
+    assert len(scheduler) == 3
+
+
+def test_unavailable_doctor_patients_move_down(scheduler):
+    doctor = uuid4()
+    assigned, unassigned = row(60, doctor_id=doctor), row(30)
+    scheduler.apply(assigned)
+    scheduler.apply(unassigned)
+    assert scheduler.ordered()[0].encounter_id == assigned.encounter_id
+
+    scheduler.set_doctor_available(doctor, False)
+    assert [entry.encounter_id for entry in scheduler.ordered()] == [unassigned.encounter_id, assigned.encounter_id]
+
+    scheduler.set_doctor_available(doctor, True)
+    assert scheduler.ordered()[0].encounter_id == assigned.encounter_id
+
+
+def test_refresh_applies_committed_changes_incrementally(db_session, query_budget):
+    patient = Patient(national_id="199012345678", first_name="John", last_name="Doe", date_of_birth=date(1990, 1, 1))
+    nurse = User(role=UserRole.NURSE, full_name="Nurse Silva")
+    doctor = User(role=UserRole.DOCTOR, full_name="Dr. Perera")
+    db_session.add_all([patient, nurse, doctor])
+    db_session.commit()
+    first = encounter_service.create_encounter(patient.id, nurse.id, "Cough", db_session)
+    second = encounter_service.create_encounter(patient.id, nurse.id, "Chest pain", db_session)
+
+    scheduler = queue_scheduler.refresh(db_session)
+    assert len(scheduler) == 2
+    assert scheduler.next_for_doctor(doctor.id) is None
+
+    encounter_service.update_encounter(second.id, EncounterUpdateRequest(
+        is_urgent=True, status=EncounterStatus.AWAITING_REVIEW,
+    ), db_session)
+    with query_budget(1):
+        queue_scheduler.refresh(db_session)
+    assert scheduler.next_for_doctor(doctor.id).encounter_id == second.id
+    assert scheduler.ordered()[0].encounter_id == second.id
+
+    db_session.add(ClinicalNote(encounter_id=second.id, subjective="Chest pain"))
+    db_session.commit()
+    encounter_service.update_clinical_note(second.id, ClinicalNoteUpdate(is_finalized=True), doctor, db_session)
+    queue_scheduler.refresh(db_session)
+    assert [entry.encounter_id for entry in scheduler.ordered()] == [first.id]
+
+
+def test_sla_targets_must_be_positive():
+    with pytest.raises(ValueError):
+        QueueScheduler(urgent_sla_minutes=0, routine_sla_minutes=120, unavailable_delay_minutes=60)
+
+
+def test_availability_is_stored_and_reloaded(db_session):
+    patient = Patient(national_id="199012345678", first_name="John", last_name="Doe", date_of_birth=date(1990, 1, 1))
+    nurse = User(role=UserRole.NURSE, full_name="Nurse Silva")
+    doctor = User(role=UserRole.DOCTOR, full_name="Dr. Perera")
+    db_session.add_all([patient, nurse, doctor])
+    db_session.commit()
+    assigned = encounter_service.create_encounter(patient.id, nurse.id, "Cough", db_session)
+    encounter_service.update_encounter(assigned.id, EncounterUpdateRequest(doctor_id=doctor.id), db_session)
+    unassigned = encounter_service.create_encounter(patient.id, nurse.id, "Fever", db_session)
+
+    queue_scheduler.set_doctor_availability(doctor.id, False, db_session)
+
+    # A fresh process (or another worker's next full reload) reads it back
+    queue_scheduler.get_scheduler().clear()
+    scheduler = queue_scheduler.refresh(db_session)
+    assert not scheduler.is_available(doctor.id)
+    assert [entry.encounter_id for entry in scheduler.ordered()] == [unassigned.id, assigned.id]
+
+    with pytest.raises(HTTPException) as excinfo:
+        queue_scheduler.set_doctor_availability(nurse.id, False, db_session)
+    assert excinfo.value.status_code == 404
@@ -22,11 +22,12 @@ const NicGatekeeperModal: React.FC<NicGatekeeperModalProps> = ({ isOpen, onClose
         setIsLoading(true);
 
         try {
-            // Search for existing patient by NIC
+            // Search for existing patient by NIC (exact match)
             const results = await patientService.searchPatients({ nic: nic.trim() });
-            if (results.length > 0) {
+            const existing = results.find(r => r.national_id === nic.trim());
+            if (existing) {
                 // Patient found — pass data for auto-fill
-                onProceed(results[0]);
+                onProceed(existing);
             } else {
                 // New patient — proceed with only NIC
                 onProceed({ national_id: nic.trim() });
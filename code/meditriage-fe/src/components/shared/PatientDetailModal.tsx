@@ -31,7 +31,9 @@ const getStatusLabel = (status: TriageStatus) => {
 
 const PatientDetailModal: React.FC<PatientDetailModalProps> = ({ isOpen, onClose, patient, showToast, onRemoveCase, userRole, onStartDiagnosing, onUpdateCase }) => {
     const [history, setHistory] = useState<patientService.EncounterSummary[]>([]);
+    const [historyCursor, setHistoryCursor] = useState<string | null>(null);
     const [loadingHistory, setLoadingHistory] = useState(false);
+    const [loadingMoreHistory, setLoadingMoreHistory] = useState(false);
     const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
     const [showDeleteRecordConfirm, setShowDeleteRecordConfirm] = useState(false);
     const [selectedEncounterId, setSelectedEncounterId] = useState<string | null>(null);
@@ -57,9 +59,13 @@ const PatientDetailModal: React.FC<PatientDetailModalProps> = ({ isOpen, onClose
     useEffect(() => {
         if (isOpen && patient?.patientId) {
             setHistoryPage(0);
+            setHistoryCursor(null);
             setLoadingHistory(true);
             patientService.getPatientHistory(patient.patientId)
-                .then(h => setHistory(h))
+                .then(page => {
+                    setHistory(page.encounters);
+                    setHistoryCursor(page.nextCursor);
+                })
                 .catch(() => setHistory([]))
                 .finally(() => setLoadingHistory(false));
 
@@ -78,6 +84,7 @@ const PatientDetailModal: React.FC<PatientDetailModalProps> = ({ isOpen, onClose
                 .catch(() => setPatientDetails(null));
         } else {
             setHistory([]);
+            setHistoryCursor(null);
             setPatientDetails(null);
         }
     }, [isOpen, patient?.patientId]);
@@ -91,6 +98,28 @@ const PatientDetailModal: React.FC<PatientDetailModalProps> = ({ isOpen, onClose
         : history;
     const totalHistoryPages = Math.max(1, Math.ceil(pastHistory.length / HISTORY_PAGE_SIZE));
     const paginatedHistory = pastHistory.slice(historyPage * HISTORY_PAGE_SIZE, (historyPage + 1) * HISTORY_PAGE_SIZE);
+    // Older encounters are fetched from the server when paging past the loaded ones
+    const hasMoreHistory = historyCursor !== null;
+
+    const handleNextHistoryPage = async () => {
+        if (historyPage < totalHistoryPages - 1) {
+            setHistoryPage(p => p + 1);
+            return;
+        }
+        const patientId = patient?.patientId;
+        if (!hasMoreHistory || !patientId || loadingMoreHistory) return;
+        setLoadingMoreHistory(true);
+        try {
+            const page = await patientService.getPatientHistory(patientId, historyCursor);
+            setHistory(h => [...h, ...page.encounters]);
+            setHistoryCursor(page.nextCursor);
+            if (page.encounters.length > 0) setHistoryPage(p => p + 1);
+        } catch (err: any) {
+            showToast(err?.message || 'Failed to load older visits', 'error');
+        } finally {
+            setLoadingMoreHistory(false);
+        }
+    };
 
     const handleDelete = async () => {
         try {
@@ -313,7 +342,7 @@ const PatientDetailModal: React.FC<PatientDetailModalProps> = ({ isOpen, onClose
                                             ))}
                                         </div>
 
-                                        {totalHistoryPages > 1 && (
+                                        {(totalHistoryPages > 1 || hasMoreHistory) && (
                                             <div className="flex items-center justify-center gap-4 mt-3 pt-2">
                                                 <button
                                                     onClick={() => setHistoryPage(p => Math.max(0, p - 1))}
@@ -322,10 +351,10 @@ const PatientDetailModal: React.FC<PatientDetailModalProps> = ({ isOpen, onClose
                                                 >
                                                     <svg className="w-4 h-4 text-gray-600" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M15 19l-7-7 7-7" /></svg>
                                                 </button>
-                                                <span className="text-xs font-semibold text-gray-500">Page {historyPage + 1} of {totalHistoryPages}</span>
+                                                <span className="text-xs font-semibold text-gray-500">Page {historyPage + 1} of {totalHistoryPages}{hasMoreHistory ? '+' : ''}</span>
                                                 <button
-                                                    onClick={() => setHistoryPage(p => Math.min(totalHistoryPages - 1, p + 1))}
-                                                    disabled={historyPage >= totalHistoryPages - 1}
+                                                    onClick={handleNextHistoryPage}
+                                                    disabled={loadingMoreHistory || (historyPage >= totalHistoryPages - 1 && !hasMoreHistory)}
                                                     className="w-8 h-8 flex items-center justify-center rounded-full hover:bg-gray-100 transition-colors disabled:opacity-30 disabled:cursor-not-allowed"
                                                 >
                                                     <svg className="w-4 h-4 text-gray-600" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M9 5l7 7-7 7" /></svg>
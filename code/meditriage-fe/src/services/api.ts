@@ -23,11 +23,11 @@ export const setOnUnauthorized = (callback: (() => void) | null) => {
     onUnauthorizedCallback = callback;
 };
 
-// Generic fetch wrapper with JWT injection
-async function request<T>(
+// Generic fetch wrapper with JWT injection; throws on non-2xx responses
+async function send(
     endpoint: string,
     options: RequestInit = {}
-): Promise<T> {
+): Promise<Response> {
     const headers: Record<string, string> = {
         'Content-Type': 'application/json',
         ...(options.headers as Record<string, string>),
@@ -56,6 +56,15 @@ async function request<T>(
         throw new Error(message);
     }
 
+    return response;
+}
+
+async function request<T>(
+    endpoint: string,
+    options: RequestInit = {}
+): Promise<T> {
+    const response = await send(endpoint, options);
+
     // 204 No Content has no body
     if (response.status === 204) {
         return {} as T;
@@ -68,6 +77,12 @@ async function request<T>(
 export const api = {
     get: <T>(endpoint: string) => request<T>(endpoint, { method: 'GET' }),
 
+    // GET that also returns the response headers (e.g. X-Next-Cursor of paged lists)
+    getWithHeaders: async <T>(endpoint: string): Promise<{ data: T; headers: Headers }> => {
+        const response = await send(endpoint, { method: 'GET' });
+        return { data: await response.json() as T, headers: response.headers };
+    },
+
     post: <T>(endpoint: string, body?: unknown) =>
         request<T>(endpoint, {
             method: 'POST',
@@ -37,13 +37,15 @@ export const createPatient = async (data: {
     return api.post<PatientResponse>('/patients', data);
 };
 
-// Search patients by NIC or name
+// Search patients by NIC (exact), NIC prefix (type-ahead) or name
 export const searchPatients = async (params: {
     nic?: string;
+    nicPrefix?: string;
     name?: string;
 }): Promise<PatientResponse[]> => {
     const queryParts: string[] = [];
     if (params.nic) queryParts.push(`nic=${encodeURIComponent(params.nic)}`);
+    if (params.nicPrefix) queryParts.push(`nic_prefix=${encodeURIComponent(params.nicPrefix)}`);
     if (params.name) queryParts.push(`name=${encodeURIComponent(params.name)}`);
     const query = queryParts.length ? `?${queryParts.join('&')}` : '';
     return api.get<PatientResponse[]>(`/patients/search${query}`);
@@ -70,7 +72,14 @@ export const deletePatient = async (patientId: string): Promise<{ success: boole
     return api.delete<{ success: boolean; id: string }>(`/patients/${patientId}`);
 };
 
-// Get patient encounter history
-export const getPatientHistory = async (patientId: string): Promise<EncounterSummary[]> => {
-    return api.get<EncounterSummary[]>(`/patients/${patientId}/history`);
+export interface EncounterHistoryPage {
+    encounters: EncounterSummary[];
+    nextCursor: string | null;  // null when there are no older encounters
+}
+
+// Get one page of patient encounter history, newest first; pass nextCursor to get the next page
+export const getPatientHistory = async (patientId: string, cursor?: string | null): Promise<EncounterHistoryPage> => {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    const { data, headers } = await api.getWithHeaders<EncounterSummary[]>(`/patients/${patientId}/history${query}`);
+    return { encounters: data, nextCursor: headers.get('X-Next-Cursor') };
 };